@@ -18,11 +18,25 @@ __pdoc__ = {}
 __pdoc__[".venv"] = False
 
 
-from . import constructs
-from core.default.cloudmapper import DefaultMapper
-from core.default.components import Cdev_FileSystem_Component
-
-# Ergonomic mapping so that the global project instance is in a more logical place for end developers.
-Project = constructs.project.Project
-Mapper = DefaultMapper
-Component = Cdev_FileSystem_Component
+import importlib
+
+# Ergonomic mapping so that the global project instance is in a more logical place for end developers. The attributes
+# are only imported when they are first used, so that starting the cli does not import every construct and mapper.
+_LAZY_ATTRIBUTES = {
+    "constructs": ("cdev.constructs", None),
+    "Project": ("cdev.constructs.project", "Project"),
+    "Mapper": ("core.default.cloudmapper", "DefaultMapper"),
+    "Component": ("core.default.components", "Cdev_FileSystem_Component"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attribute_name = _LAZY_ATTRIBUTES.get(name)
+    module = importlib.import_module(module_name)
+
+    value = getattr(module, attribute_name) if attribute_name else module
+    globals()[name] = value
+    return value
@@ -1,30 +1,19 @@
 import argparse
 from dataclasses import dataclass, field
+import importlib
 import json
 import logging
 import os
-from typing import Any, Callable, List
+from typing import TYPE_CHECKING, Any, Callable, List
 
-from pydantic import FilePath, ValidationError
-
-from core.constructs.output_manager import OutputManager
 from core.utils.exceptions import cdev_core_error, wrap_base_exception
 
-from ..commands import (
-    cloud_output,
-    environment,
-    plan,
-    deploy,
-    destroy,
-    project_initializer,
-    run,
-    sync,
-    git_safe,
-    remove_resource,
-)
-
-from cdev.constructs.project import CDEV_PROJECT_FILE, CDEV_FOLDER, Project
-from cdev.default.project import local_project, local_project_info
+# The commands, project and output modules import most of the framework, so they are only imported once a command
+# has been selected. This keeps `cdev --help` and argument errors fast.
+if TYPE_CHECKING:
+    from core.constructs.output_manager import OutputManager
+    from cdev.constructs.project import Project
+    from cdev.default.project import local_project_info
 
 parser = argparse.ArgumentParser(description="cdev cli")
 subparsers = parser.add_subparsers(title="sub_command", description="valid subcommands")
@@ -87,6 +76,7 @@ def wrap_load_and_initialize_project(
 
         try:
             _project = load_and_initialize_project(initialize=initialize)
+            _initialize_logger(log_level, _project if initialize else None)
         except cdev_core_error as e:
             _output_manager.print_exception(e)
             return
@@ -118,16 +108,49 @@ def wrap_load_and_initialize_project(
     return wrapped_caller
 
 
-def _initialize_output_manager(output_type: str) -> OutputManager:
-    return OutputManager()
+def lazy_command(dotted_path: str) -> Callable:
+    """Command handler that only imports the module of the handler when the command is called.
+
+    Args:
+        dotted_path (str): python path of the handler. ex: cdev.commands.plan.plan_command_cli
+
+    Returns:
+        Callable: handler
+    """
+
+    def inner(*args, **kwargs):
+        module_name, function_name = dotted_path.rsplit(".", 1)
+        handler = getattr(importlib.import_module(module_name), function_name)
+
+        return handler(*args, **kwargs)
+
+    return inner
+
+
+def _initialize_logger(log_level: int, project: "Project" = None) -> None:
+    from cdev.cli.logger import set_global_logger_from_cli
+
+    settings = (
+        project.get_current_environment().get_workspace().settings if project else None
+    )
+    set_global_logger_from_cli(log_level, settings)
+
+
+def _initialize_output_manager(output_type: str) -> "OutputManager":
+    from core.constructs.output_manager import create_output_manager
+
+    return create_output_manager(output_type)
 
 
-def load_and_initialize_project(initialize: bool = True) -> Project:
+def load_and_initialize_project(initialize: bool = True) -> "Project":
     """Create the global instance of the `Project` object as a `local_project` instance. If provided, also initialize the `Project`.
 
     Args:
         initialize (bool, optional): Initialize the project. Defaults to True.
     """
+    from cdev.constructs.project import CDEV_PROJECT_FILE, CDEV_FOLDER
+    from cdev.default.project import local_project
+
     base_directory = os.getcwd()
 
     project_info_location = os.path.join(base_directory, CDEV_FOLDER, CDEV_PROJECT_FILE)
@@ -143,16 +166,20 @@ def load_and_initialize_project(initialize: bool = True) -> Project:
 
 
 def _load_local_project_information(
-    project_info_location: FilePath,
-) -> local_project_info:
+    project_info_location: str,
+) -> "local_project_info":
     """Help function to load the project info json file
 
     Args:
-        project_info_location (FilePath): location of project info json
+        project_info_location (str): location of project info json
 
     Returns:
         local_project_info
     """
+    from pydantic import ValidationError
+
+    from cdev.default.project import local_project_info
+
     with open(project_info_location, "r") as fh:
         try:
             json_information = json.load(fh)
@@ -176,7 +203,7 @@ CDEV_COMMANDS = [
     {
         "name": "init",
         "help": "Create a new project",
-        "default": project_initializer.create_project_cli,
+        "default": lazy_command("cdev.commands.project_initializer.create_project_cli"),
         "args": [
             {"dest": "name", "type": str, "help": "Name of the new project"},
             {
@@ -191,7 +218,7 @@ CDEV_COMMANDS = [
         "name": "environment",
         "help": "Change and create environments for deployment",
         "default": wrap_load_and_initialize_project(
-            environment.environment_cli, initialize=False
+            lazy_command("cdev.commands.environment.environment_cli"), initialize=False
         ),
         "subcommands": [
             {
@@ -268,7 +295,9 @@ CDEV_COMMANDS = [
     {
         "name": "plan",
         "help": "See the differences that have been made since the last deployment",
-        "default": wrap_load_and_initialize_project(plan.plan_command_cli),
+        "default": wrap_load_and_initialize_project(
+            lazy_command("cdev.commands.plan.plan_command_cli")
+        ),
         "args": [
             {
                 "dest": "--detail",
@@ -280,7 +309,9 @@ CDEV_COMMANDS = [
     {
         "name": "deploy",
         "help": "Deploy a set of changes",
-        "default": wrap_load_and_initialize_project(deploy.deploy_command_cli),
+        "default": wrap_load_and_initialize_project(
+            lazy_command("cdev.commands.deploy.deploy_command_cli")
+        ),
         "args": [
             {
                 "dest": "--disable-prompt",
@@ -297,13 +328,15 @@ CDEV_COMMANDS = [
     {
         "name": "destroy",
         "help": "Destroy all the resources in the current environment",
-        "default": wrap_load_and_initialize_project(destroy.destroy_command_cli),
+        "default": wrap_load_and_initialize_project(
+            lazy_command("cdev.commands.destroy.destroy_command_cli")
+        ),
     },
     {
         "name": "output",
         "help": "See the generated cloud output",
         "default": wrap_load_and_initialize_project(
-            cloud_output.cloud_output_command_cli
+            lazy_command("cdev.commands.cloud_output.cloud_output_command_cli")
         ),
         "args": [
             {
@@ -322,7 +355,7 @@ CDEV_COMMANDS = [
         "name": "remove-resource",
         "help": "Remove a resource from the stored backend. This will untrack the resources.",
         "default": wrap_load_and_initialize_project(
-            remove_resource.remove_resource_command_cli
+            lazy_command("cdev.commands.remove_resource.remove_resource_command_cli")
         ),
         "args": [
             {
@@ -340,7 +373,9 @@ CDEV_COMMANDS = [
     {
         "name": "run",
         "help": "This command is used to run user defined and resource functions.",
-        "default": wrap_load_and_initialize_project(run.run_command_cli),
+        "default": wrap_load_and_initialize_project(
+            lazy_command("cdev.commands.run.run_command_cli")
+        ),
         "args": [
             {"dest": "subcommand", "help": "the user defined command to call"},
             {"dest": "subcommand_args", "nargs": argparse.REMAINDER},
@@ -349,7 +384,9 @@ CDEV_COMMANDS = [
     {
         "name": "sync",
         "help": "Watch for changes in the filesystem and perform a deploy automatically",
-        "default": wrap_load_and_initialize_project(sync.sync_command_cli),
+        "default": wrap_load_and_initialize_project(
+            lazy_command("cdev.commands.sync.sync_command_cli")
+        ),
         "args": [
             {
                 "dest": "--no-default",
@@ -371,12 +408,17 @@ CDEV_COMMANDS = [
                 "type": str,
                 "help": "do not watch for any file that matches the following pattern ['.cdev/**','__pycache__/*']",
             },
+            {
+                "dest": "--hot-swap",
+                "action": "store_true",
+                "help": "when only the source code of a function changed, upload the new code directly to the function instead of performing a full update",
+            },
         ],
     },
     {
         "name": "git-safe",
         "help": "Safe versions of some git operations",
-        "default": git_safe.git_safe_cli,
+        "default": lazy_command("cdev.commands.git_safe.git_safe_cli"),
         "subcommands": [
             {
                 "command": "install-merger",
@@ -467,8 +509,8 @@ def add_general_output_options(parser: argparse.ArgumentParser) -> None:
         type=str,
         choices=["json", "plain-text", "rich"],
         dest=OUTPUT_TYPE_ARG,
-        default="rich",
-        help="BASE CDEV OPTION -> change the type of output generated",
+        default=None,
+        help="BASE CDEV OPTION -> change the type of output generated. Defaults to 'rich' in a terminal and 'plain-text' otherwise",
     )
 
     parser.add_argument(
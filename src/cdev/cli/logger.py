@@ -1,8 +1,34 @@
+from typing import Optional
+
+from core.constructs.settings import Settings
 from core.utils import logger
 
 
-def set_global_logger_from_cli(log_level: int) -> None:
+def set_global_logger_from_cli(
+    log_level: Optional[int], settings: Optional[Settings] = None
+) -> None:
+    """Replace the global logger with one that shows logs at the level set by the cli and writes the log file as
+    configured by the settings of the workspace.
+
+    Args:
+        log_level (Optional[int]): None to only write errors to the log file
+        settings (Optional[Settings], optional): Defaults to None.
+    """
+    kw_args = {}
+
+    if settings:
+        kw_args = {
+            "max_bytes": settings.LOG_FILE_MAX_BYTES,
+            "backup_count": settings.LOG_FILE_BACKUP_COUNT,
+            "compress": settings.COMPRESS_LOG_FILES,
+            "queue_size": settings.LOG_QUEUE_SIZE,
+            "drop_policy": settings.LOG_DROP_POLICY,
+        }
 
-    new_log = logger.cdev_logger(show_logs=True, logging_level=log_level)
+    new_log = logger.cdev_logger(
+        show_logs=log_level is not None,
+        logging_level=log_level if log_level is not None else "ERROR",
+        **kw_args,
+    )
 
     logger.set_global_logger(new_log)
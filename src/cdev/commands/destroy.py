@@ -38,4 +38,4 @@ def destroy_command(project: Project, output_manager: OutputManager) -> None:
     differences_structured = ws.sort_differences(differences)
     ws.set_state(Workspace_State.EXECUTING_BACKEND)
 
-    ws.deploy_differences(differences_structured)
+    ws.deploy_differences(differences_structured, output_manager)
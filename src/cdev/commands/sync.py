@@ -11,9 +11,12 @@ def sync_command_cli(
     ignore: str,
     project: Project,
     output_manager: OutputManager,
+    hot_swap: bool = False,
     **kwargs
 ) -> None:
-    sync_command(disable_prompt, no_default, watch, ignore, project, output_manager)
+    sync_command(
+        disable_prompt, no_default, watch, ignore, project, output_manager, hot_swap
+    )
 
 
 def sync_command(
@@ -23,6 +26,9 @@ def sync_command(
     ignore: str,
     project: Project,
     output_manager: OutputManager,
+    hot_swap: bool = False,
 ) -> None:
     ws = project.get_current_environment().get_workspace()
-    core_sync_command(disable_prompt, no_default, watch, ignore, ws, output_manager)
+    core_sync_command(
+        disable_prompt, no_default, watch, ignore, ws, output_manager, hot_swap
+    )
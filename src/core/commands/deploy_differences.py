@@ -16,7 +16,10 @@ def execute_deployment_cli(args) -> None:
 
 
 def execute_deployment(
-    workspace: Workspace, output: OutputManager, no_prompt: Optional[bool] = False
+    workspace: Workspace,
+    output: OutputManager,
+    no_prompt: Optional[bool] = False,
+    changed_files: Optional[List[str]] = None,
 ) -> None:
     """Execute the process for a deployment. This includes generating the current frontend representation of the desired resources.
     Then after confirmation, deploy any needed changes.
@@ -25,8 +28,11 @@ def execute_deployment(
         workspace (Workspace): Workspace to execute the process within.
         output (OutputManager): Output manager for sending messages to the console.
         no_prompt (bool): If set to True, we don't ask the user to confirm before deploying the resources.
+        changed_files (List[str], optional): If provided, only the components affected by these files are rendered and deployed.
     """
-    unsorted_differences = execute_frontend(workspace, output)
+    unsorted_differences = execute_frontend(
+        workspace, output, changed_files=changed_files
+    )
 
     if not unsorted_differences:
         return
@@ -41,7 +47,7 @@ def execute_deployment(
             return
 
     workspace.set_state(Workspace_State.EXECUTING_BACKEND)
-    workspace.deploy_differences(differences_structured)
+    workspace.deploy_differences(differences_structured, output)
 
     workspace_output = workspace.render_outputs()
 
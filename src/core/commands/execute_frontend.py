@@ -23,6 +23,7 @@ def execute_frontend(
     workspace: Workspace,
     output: OutputManager,
     previous_component_names: List[str] = None,
+    changed_files: List[str] = None,
 ) -> Optional[Tuple[
     List[Component_Difference],
     List[Resource_Difference],
@@ -34,6 +35,8 @@ def execute_frontend(
         workspace (Workspace): Workspace to execute the process within.
         output (OutputManager): Output manager for sending messages to the console.
         previous_component_names (List[str], optional): components to diff against. Defaults to None.
+        changed_files (List[str], optional): files changed since the last execution. When provided, only the
+            components affected by the changes are rendered and diffed. Defaults to None.
 
     Returns:
         Tuple[ List[Component_Difference], List[Resource_Difference], List[Resource_Reference_Difference], ]: _description_
@@ -42,7 +45,21 @@ def execute_frontend(
     log.debug("Executing Frontend")
 
     workspace.set_state(Workspace_State.EXECUTING_FRONTEND)
-    current_state = workspace.generate_current_state()
+
+    component_names = (
+        workspace.get_components_affected_by_changes(changed_files)
+        if changed_files
+        else None
+    )
+
+    if component_names is not None:
+        log.debug("Components affected by changes: %s", component_names)
+
+        if not component_names:
+            output.print("No Differences")
+            return None
+
+    current_state = workspace.generate_current_state(component_names)
 
     output.print_local_state(current_state)
 
@@ -56,6 +73,12 @@ def execute_frontend(
     else:
         diff_previous_component_names = previous_component_names
 
+    if component_names is not None:
+        # Unaffected components are unchanged so there is no need to diff them
+        diff_previous_component_names = [
+            x for x in diff_previous_component_names if x in component_names
+        ]
+
     output.print_components_to_diff_against(diff_previous_component_names)
 
     differences = workspace.create_state_differences(
@@ -66,7 +89,7 @@ def execute_frontend(
         output.print_state_differences(differences)
     else:
         differences = None
-        print("No Differences")
+        output.print("No Differences")
 
     log.debug("Finish Executing Frontend")
 
@@ -11,8 +11,11 @@ def execute_sync(
     ignore: str,
     ws: Workspace,
     output_manager: OutputManager,
+    hot_swap: bool = False,
 ) -> None:
-    core_sync_command(disable_prompt, no_default, watch, ignore, ws, output_manager)
+    core_sync_command(
+        disable_prompt, no_default, watch, ignore, ws, output_manager, hot_swap
+    )
 
 
 def core_sync_command(
@@ -22,10 +25,14 @@ def core_sync_command(
     ignore: str,
     workspace: Workspace,
     output_manager: OutputManager,
+    hot_swap: bool = False,
 ) -> None:
     """
     watch the filesystem for changes and then run the deploy command
     """
+    if hot_swap:
+        workspace.settings.HOT_SWAP_FUNCTION_CODE = True
+
     try:
         workspace_watcher = WorkspaceWatcher(
             workspace,
@@ -5,7 +5,7 @@ Properties of a component:
 """
 
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
 
 from pydantic import BaseModel
@@ -142,3 +142,17 @@ class Component:
 
     def get_name(self) -> str:
         return self.name
+
+    def get_changes_affecting(self, changed_files: Iterable[str]) -> Optional[Set[str]]:
+        """Determine which of a set of changed files could change the rendered output of this component. This is used
+        to only render the components affected by a change when watching a workspace for changes.
+
+        By default, a component can not determine this, so it is always rendered again after any change.
+
+        Args:
+            changed_files (Iterable[str]): full paths of the changed files
+
+        Returns:
+            Optional[Set[str]]: the changed files that affect the component or None if it can not be determined
+        """
+        return None
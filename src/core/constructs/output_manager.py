@@ -4,7 +4,11 @@
 
 """
 from enum import Enum
-from typing import Any, List, Optional, Tuple, Union
+import json
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union
 
 
 from rich.console import Console
@@ -13,6 +17,7 @@ from rich.progress import Progress, TaskID
 from rich.pretty import Pretty
 from rich.traceback import Traceback
 from rich.table import Table
+from rich.text import Text
 
 
 from core.constructs.components import (
@@ -37,6 +42,14 @@ from core.utils.exceptions import cdev_core_error, wrapped_base_exception
 CLOUD_OUTPUT_LABEL_COLOR = "cyan"
 CLOUD_OUTPUT_VALUE_COLOR = "yellow"
 
+RICH_OUTPUT = "rich"
+PLAIN_TEXT_OUTPUT = "plain-text"
+JSON_OUTPUT = "json"
+OUTPUT_TYPES = [JSON_OUTPUT, PLAIN_TEXT_OUTPUT, RICH_OUTPUT]
+
+# Smallest number of seconds between progress updates of a streaming output
+STREAMING_PROGRESS_INTERVAL = 2.0
+
 printable_type = Union[str, bool, int, frozenset, frozendict, Enum]
 NEW_LINE = "\n"
 TAB = "  "
@@ -92,6 +105,11 @@ class OutputManager:
         self._progress = progress
         self._detail_plan = False
 
+    @property
+    def is_streaming(self) -> bool:
+        """Whether the output is written as a stream of lines instead of a live display"""
+        return False
+
     def set_detail_plan(self, value: bool) -> None:
         self._detail_plan = value
 
@@ -541,6 +559,296 @@ class OutputTask:
         """Start the given task progress bar"""
         self._output_manager._progress.start_task(self._task_id)
 
+    def complete(self, comment: str, **kwargs) -> None:
+        """Mark the task as completed successfully
+
+        Args:
+            comment (str): final comment of the task
+            kwargs: passed to `update`
+        """
+        self.update(comment=comment, **kwargs)
+
+    def fail(self, comment: str, **kwargs) -> None:
+        """Mark the task as failed
+
+        Args:
+            comment (str): reason the task failed
+            kwargs: passed to `update`
+        """
+        self.update(comment=comment, **kwargs)
+
+
+class StreamingConsole(CdevCoreConsole):
+    """Console that renders each print to plain text and passes it to a callback instead of writing to a terminal"""
+
+    def __init__(self, write: Callable[[str], None], **kwargs) -> None:
+        super().__init__(no_color=True, highlight=False, force_terminal=False, **kwargs)
+        self._write = write
+
+    def print(self, *objects: Any, **kwargs) -> None:
+        with self.capture() as capture:
+            super().print(*objects, **kwargs)
+
+        self._write(capture.get().rstrip("\n"))
+
+
+class StreamingOutputManager(OutputManager):
+    """Output Manager that writes plain text lines or json lines events instead of a live display.
+
+    Deployment tasks write a line when they start, complete or fail. Progress updates between those are written at
+    most once every `progress_interval` seconds across all tasks, so the cost of the output does not grow with the
+    number of resources being deployed. This is used when the output is not a terminal, such as in CI.
+    """
+
+    def __init__(
+        self,
+        output_type: str = PLAIN_TEXT_OUTPUT,
+        stream: TextIO = None,
+        progress_interval: float = STREAMING_PROGRESS_INTERVAL,
+    ) -> None:
+        """Initialize the Output Manager
+
+        Args:
+            output_type (str, optional): PLAIN_TEXT_OUTPUT or JSON_OUTPUT. Defaults to PLAIN_TEXT_OUTPUT.
+            stream (TextIO, optional): Defaults to the current sys.stdout.
+            progress_interval (float, optional): seconds. Defaults to STREAMING_PROGRESS_INTERVAL.
+        """
+        if output_type not in [PLAIN_TEXT_OUTPUT, JSON_OUTPUT]:
+            raise Exception(f"Unknown streaming output type {output_type}")
+
+        console = StreamingConsole(self._write_message)
+        super().__init__(console)
+        self._no_emoji_console = console
+
+        self._output_type = output_type
+        self._stream = stream
+        self._progress_interval = progress_interval
+
+        self._lock = threading.Lock()
+        self._last_progress_time = None
+        self._total_tasks = 0
+        self._completed_tasks = 0
+        self._failed_tasks = 0
+        self._skipped_updates = 0
+
+    @property
+    def is_streaming(self) -> bool:
+        return True
+
+    def print_header(self, resource_state_uuid: str) -> None:
+        self.print(f"Resource State: {resource_state_uuid}")
+
+    def print_cloud_output(self, outputs: List[Tuple[str, Any]]) -> None:
+        if self._output_type == PLAIN_TEXT_OUTPUT:
+            super().print_cloud_output(outputs)
+            return
+
+        self._write_event(
+            "cloud_output",
+            outputs={
+                tag: deep_convert_to_mutable(cloud_output)
+                for tag, cloud_output in outputs
+            },
+        )
+
+    def create_task(
+        self,
+        description: str,
+        start: bool = True,
+        total: int = 100,
+        completed: int = 0,
+        visible: bool = True,
+        **fields: Any,
+    ) -> "StreamingOutputTask":
+        """Create a task that writes its start, completion and failure to the output
+
+        Returns:
+            StreamingOutputTask
+        """
+        with self._lock:
+            self._total_tasks += 1
+
+        task = StreamingOutputTask(self, Text.from_markup(description).plain)
+
+        if start:
+            task.start_task()
+
+        return task
+
+    def print_summary(self) -> None:
+        """Write the number of tasks that completed and failed"""
+        with self._lock:
+            counts = self._get_counts()
+
+        if self._output_type == JSON_OUTPUT:
+            self._write_event(
+                "summary", skipped_updates=self._skipped_updates, **counts
+            )
+        else:
+            self._write_line(
+                f"{counts['completed']} completed, {counts['failed']} failed, {counts['total']} total"
+            )
+
+    def _task_started(self, task: "StreamingOutputTask") -> None:
+        self._write_task_event("node_started", task, "started")
+
+    def _task_updated(self, task: "StreamingOutputTask", comment: str) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            if (
+                self._last_progress_time is not None
+                and now - self._last_progress_time < self._progress_interval
+            ):
+                self._skipped_updates += 1
+                return
+
+            self._last_progress_time = now
+
+        self._write_task_event("node_progress", task, comment, comment=comment)
+
+    def _task_finished(
+        self, task: "StreamingOutputTask", comment: str, failed: bool
+    ) -> None:
+        with self._lock:
+            if failed:
+                self._failed_tasks += 1
+            else:
+                self._completed_tasks += 1
+
+        duration_ms = (
+            None
+            if task.start_time is None
+            else (time.monotonic() - task.start_time) * 1000
+        )
+
+        if failed:
+            self._write_task_event(
+                "node_failed",
+                task,
+                f"failed{self._format_duration(duration_ms)}: {comment}",
+                duration_ms=duration_ms,
+                reason=comment,
+            )
+        else:
+            self._write_task_event(
+                "node_finished",
+                task,
+                f"finished{self._format_duration(duration_ms)}",
+                duration_ms=duration_ms,
+            )
+
+    def _write_task_event(
+        self, event: str, task: "StreamingOutputTask", message: str, **fields: Any
+    ) -> None:
+        with self._lock:
+            counts = self._get_counts()
+
+        if self._output_type == JSON_OUTPUT:
+            self._write_event(event, node=task.description, **counts, **fields)
+        else:
+            self._write_line(
+                f"[{counts['completed'] + counts['failed']}/{counts['total']}] {task.description}: {message}"
+            )
+
+    def _write_message(self, message: str) -> None:
+        if self._output_type == JSON_OUTPUT:
+            self._write_event("message", message=message)
+        else:
+            self._write_line(message)
+
+    def _write_event(self, event: str, **fields: Any) -> None:
+        self._write_line(
+            json.dumps(
+                {"event": event, "timestamp": time.time(), **fields}, default=str
+            )
+        )
+
+    def _write_line(self, line: str) -> None:
+        stream = self._stream or sys.stdout
+
+        with self._lock:
+            stream.write(line + "\n")
+            stream.flush()
+
+    def _get_counts(self) -> Dict[str, int]:
+        return {
+            "completed": self._completed_tasks,
+            "failed": self._failed_tasks,
+            "total": self._total_tasks,
+        }
+
+    def _format_duration(self, duration_ms: Optional[float]) -> str:
+        return "" if duration_ms is None else f" in {duration_ms / 1000:.1f}s"
+
+
+class StreamingOutputTask(OutputTask):
+    """Output task of a StreamingOutputManager. Comments are written as rate limited progress updates."""
+
+    def __init__(
+        self, output_manager: StreamingOutputManager, description: str
+    ) -> None:
+        super().__init__(output_manager, None)
+        self.description = description
+        self.start_time = None
+        self._is_finished = False
+
+    def print(self, msg: str) -> None:
+        self._output_manager.print(msg)
+
+    def update(self, *args, description: str = None, **fields: Any) -> None:
+        if description:
+            self.description = Text.from_markup(description).plain
+
+        comment = fields.get("comment")
+        if comment and not self._is_finished:
+            self._output_manager._task_updated(self, Text.from_markup(comment).plain)
+
+    def start_task(self) -> None:
+        if self.start_time is not None:
+            return
+
+        self.start_time = time.monotonic()
+        self._output_manager._task_started(self)
+
+    def complete(self, comment: str, **kwargs) -> None:
+        self._finish(comment, failed=False)
+
+    def fail(self, comment: str, **kwargs) -> None:
+        self._finish(comment, failed=True)
+
+    def _finish(self, comment: str, failed: bool) -> None:
+        if self._is_finished:
+            return
+
+        self._is_finished = True
+        self._output_manager._task_finished(
+            self, Text.from_markup(comment).plain, failed
+        )
+
+
+def create_output_manager(
+    output_type: Optional[str] = None, stream: TextIO = None
+) -> OutputManager:
+    """Create the Output Manager for an output type. When no type is given, the rich live display is used if the
+    output is a terminal and plain text lines are used otherwise.
+
+    Args:
+        output_type (Optional[str], optional): One of OUTPUT_TYPES. Defaults to None.
+        stream (TextIO, optional): Defaults to sys.stdout.
+
+    Returns:
+        OutputManager
+    """
+    if output_type is None:
+        is_terminal = (stream or sys.stdout).isatty()
+        output_type = RICH_OUTPUT if is_terminal else PLAIN_TEXT_OUTPUT
+
+    if output_type == RICH_OUTPUT:
+        return OutputManager(CdevCoreConsole(file=stream) if stream else None)
+
+    return StreamingOutputManager(output_type, stream)
+
 
 def _create_detailed_formatted(
     datum: printable_type, tabs: int = 0, isListItem: bool = False
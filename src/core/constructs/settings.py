@@ -91,6 +91,36 @@ class Settings(BaseSettings):
 
     PACKAGE_AWS_PACKAGES: bool = False
 
+    # Only parse functions from files that have changed since the last render
+    USE_COMPONENT_FILE_INDEX: bool = True
+
+    # Prune dependency layers to the modules reachable from the handler ('static' or 'import')
+    PRUNE_LAYER_MODE: Optional[str] = None
+
+    # Globs (relative to the layer python folder) of files to always keep when pruning layers
+    PRUNE_LAYER_INCLUDES: List[str] = []
+
+    # Include bytecode compiled for the runtime version of Python in function and layer artifacts
+    PRECOMPILE_ARTIFACTS: bool = False
+
+    # Upload the artifact directly to a function when only its source code changed
+    HOT_SWAP_FUNCTION_CODE: bool = False
+
+    # Rotate the log file when it reaches this many bytes. 0 never rotates the file
+    LOG_FILE_MAX_BYTES: int = 0
+
+    # Number of rotated log files to keep
+    LOG_FILE_BACKUP_COUNT: int = 5
+
+    # Compress the rotated log files with gzip
+    COMPRESS_LOG_FILES: bool = False
+
+    # Largest number of log records waiting to be written
+    LOG_QUEUE_SIZE: int = 10000
+
+    # What to do with a log record when the queue is full ('drop_newest', 'drop_oldest' or 'block')
+    LOG_DROP_POLICY: str = "drop_newest"
+
     class Config:
         env_prefix = "cdev_"
         validate_assignment = True
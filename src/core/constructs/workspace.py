@@ -5,11 +5,7 @@
 from dataclasses import dataclass, field
 from enum import Enum
 import inspect
-from typing import Callable, List, Dict, Any, Tuple, Optional
-
-from networkx.algorithms.dag import topological_sort
-from networkx.classes.digraph import DiGraph
-from networkx.classes.graph import NodeView
+from typing import TYPE_CHECKING, Callable, Iterable, List, Dict, Any, Tuple, Optional
 
 from pydantic import BaseModel
 
@@ -65,6 +61,11 @@ from core.utils.exceptions import cdev_core_error
 
 from core.constructs.types import F
 
+# networkx is only imported when differences are deployed, so that commands that only read the state do not import it
+if TYPE_CHECKING:
+    from networkx.classes.digraph import DiGraph
+    from networkx.classes.graph import NodeView
+
 
 _GLOBAL_WORKSPACE: "Workspace" = None
 
@@ -516,14 +517,56 @@ class Workspace:
         raise NotImplementedError
 
     @wrap_phase([Workspace_State.EXECUTING_FRONTEND])
-    def generate_current_state(self) -> List[ComponentModel]:
+    def generate_current_state(
+        self, component_names: Optional[List[str]] = None
+    ) -> List[ComponentModel]:
         """Execute the components of this workspace to generate the current desired state of the resources.
 
+        Args:
+            component_names (Optional[List[str]], optional): Only render the components with these names. Defaults to None (all components).
+
         Returns:
             Current State (List[ComponentModel]): The current state generated by the components.
         """
 
-        rv = [component.render() for component in self.get_components()]
+        rv = [
+            component.render()
+            for component in self.get_components()
+            if component_names is None or component.get_name() in component_names
+        ]
+        return rv
+
+    @wrap_phase([Workspace_State.EXECUTING_FRONTEND])
+    def get_components_affected_by_changes(
+        self, changed_files: Iterable[str]
+    ) -> Optional[List[str]]:
+        """Determine the components that need to be rendered again because of a set of changed files.
+
+        If any changed file is not known to affect a component (i.e. a settings file), it could affect any component
+        so None is returned to denote that all components should be rendered.
+
+        Args:
+            changed_files (Iterable[str]): full paths of the changed files
+
+        Returns:
+            Optional[List[str]]: names of the affected components or None if all components are affected
+        """
+        changed_files = set(changed_files)
+        claimed_files = set()
+
+        rv = []
+        for component in self.get_components():
+            affecting_files = component.get_changes_affecting(changed_files)
+
+            if affecting_files is None or affecting_files:
+                rv.append(component.get_name())
+
+            if affecting_files:
+                claimed_files.update(affecting_files)
+
+        if not claimed_files.issuperset(changed_files):
+            return None
+
         return rv
 
     @wrap_phase([Workspace_State.EXECUTING_FRONTEND])
@@ -563,7 +606,7 @@ class Workspace:
             List[Resource_Reference_Difference],
             List[Resource_Difference],
         ],
-    ) -> DiGraph:
+    ) -> "DiGraph":
         """Given the sets of differences, sort them into a topological deployment order based on dependencies between resource outputs
 
         Args:
@@ -575,15 +618,42 @@ class Workspace:
         return topological_helper.generate_sorted_resources(differences)
 
     @wrap_phase([Workspace_State.EXECUTING_BACKEND])
-    def deploy_differences(self, differences_dag: DiGraph) -> None:
+    def deploy_differences(
+        self, differences_dag: "DiGraph", output: OutputManager = None
+    ) -> None:
         """Given the sets of differences, sort them into a topological deployment order based on dependencies between resource outputs
 
         Args:
             differences (Tuple[ List[Component_Difference], List[Resource_Reference_Difference], List[Resource_Difference], ])
+            output (OutputManager, optional): A streaming Output Manager writes the progress of the deployment as lines instead of a live display. Defaults to None.
 
         Returns:
             DiGraph
         """
+        from networkx.algorithms.dag import topological_sort
+
+        all_nodes_sorted: List["NodeView"] = [
+            x for x in topological_sort(differences_dag)
+        ]
+
+        if output and output.is_streaming:
+            node_to_task = {
+                x: output.create_task(
+                    output.create_output_description(x),
+                    start=False,
+                    total=10,
+                    comment="Waiting",
+                )
+                for x in all_nodes_sorted
+            }
+
+            try:
+                self._deploy_nodes(differences_dag, node_to_task)
+            finally:
+                output.print_summary()
+
+            return
+
         console = Console()
         with Progress(
             SpinnerColumn(),
@@ -595,10 +665,6 @@ class Workspace:
         ) as progress:
             output_manager = OutputManager(console, progress)
 
-            all_nodes_sorted: List[NodeView] = [
-                x for x in topological_sort(differences_dag)
-            ]
-
             # There seems to be some bug in Rich that causes a deadlock when creating a bunch of Tasks in a row.
             # The problem seems to be around it refreshing after creating each task, so to avoid this problem,
             # we are disabling the console while the task are created. Then turn the console back on when they
@@ -619,23 +685,28 @@ class Workspace:
             # Re-enable to console to update
             output_manager._progress.disable = False
 
-            topological_helper.topological_iteration(
-                differences_dag,
-                self.wrap_output_deploy_change(node_to_task),
-                failed_parent_handler=self.wrap_output_failed_child(node_to_task),
-            )
+            self._deploy_nodes(differences_dag, node_to_task)
+
+    def _deploy_nodes(
+        self, differences_dag: "DiGraph", node_to_task: Dict["NodeView", OutputTask]
+    ) -> None:
+        topological_helper.topological_iteration(
+            differences_dag,
+            self.wrap_output_deploy_change(node_to_task),
+            failed_parent_handler=self.wrap_output_failed_child(node_to_task),
+        )
 
     @wrap_phase([Workspace_State.EXECUTING_BACKEND])
-    def wrap_output_failed_child(self, tasks: Dict[NodeView, OutputTask]):
+    def wrap_output_failed_child(self, tasks: Dict["NodeView", OutputTask]):
         """Wrapped function that fails any resource that has a failed parent
 
         Args:
             tasks (Dict[NodeView, OutputTask])
         """
 
-        def mark_failure_by_parent(change: NodeView) -> None:
+        def mark_failure_by_parent(change: "NodeView") -> None:
             output_task = tasks.get(change)
-            output_task.update(
+            output_task.fail(
                 advance=10,
                 comment="Failed because parent resource failed to deploy :cross_mark:",
             )
@@ -643,14 +714,14 @@ class Workspace:
         return mark_failure_by_parent
 
     @wrap_phase([Workspace_State.EXECUTING_BACKEND])
-    def wrap_output_deploy_change(self, tasks: Dict[NodeView, OutputTask]):
+    def wrap_output_deploy_change(self, tasks: Dict["NodeView", OutputTask]):
         """Wrapped function callers mapper and updates backend
 
         Args:
             tasks (Dict[NodeView, OutputTask])
         """
 
-        def deploy_change(change: NodeView) -> None:
+        def deploy_change(change: "NodeView") -> None:
             output_task = tasks.get(change)
             output_task.start_task()
 
@@ -743,7 +814,7 @@ class Workspace:
                         transaction_token,
                         {"message": "deployment error"},
                     )
-                    output_task.update(
+                    output_task.fail(
                         advance=10,
                         comment="Failed because mapper raised error :cross_mark:",
                     )
@@ -777,7 +848,7 @@ class Workspace:
                         transaction_token,
                         {"message": "backend error"},
                     )
-                    output_task.update(
+                    output_task.fail(
                         advance=10,
                         comment="Failed because backend raised error :cross_mark:",
                     )
@@ -804,7 +875,7 @@ class Workspace:
                     f"Trying to deploy node {change} but it is not a correct type "
                 )
 
-            output_task.update(completed=10, comment="Completed :white_check_mark:")
+            output_task.complete(completed=10, comment="Completed :white_check_mark:")
 
         return deploy_change
 
@@ -974,7 +1045,10 @@ class Workspace:
         all_search_locations_list = self.get_commands()
 
         obj, program_name, command_name, is_command = find_specified_command(
-            command_list, all_search_locations_list, output=output
+            command_list,
+            all_search_locations_list,
+            output=output,
+            cache_directory=self.settings.CACHE_DIRECTORY if self.settings else None,
         )
 
         if is_command:
@@ -1,19 +1,21 @@
-import time
-from typing import Optional
-
-from watchdog.tricks import Trick
+from typing import Optional, Set
 
 from core.constructs.workspace import Workspace
 from core.constructs.output_manager import OutputManager
 from core.commands.deploy_differences import execute_deployment
-from watchdog.observers import Observer
+from core.utils.debounced_watcher import DebouncedWatcher
+
 
+class WorkspaceWatcher(DebouncedWatcher):
+    """Executes some commands in response to modified files.
 
-class WorkspaceWatcher(Trick):
-    """Executes some commands in response to modified files."""
+    All the paths changed by a burst of events are deployed together, and only the components affected by those
+    paths are rendered and diffed.
+    """
 
     _default_patterns_to_watch = ["src/**/*.py", "settings/*"]
     _default_patterns_to_ignore = [".cdev/**", "__pycache__/*"]
+    _watching_message = "Watching for changes in the workspace..."
 
     def __init__(
         self,
@@ -23,74 +25,32 @@ class WorkspaceWatcher(Trick):
         no_default: Optional[bool] = False,
         patterns_to_watch: Optional[str] = None,
         patterns_to_ignore: Optional[str] = None,
+        debounce_seconds: Optional[float] = 0.5,
     ) -> None:
 
         self._no_prompt = no_prompt
         self._workspace = workspace
-        self._output = output
-        self._base_folder = self._workspace.settings.BASE_PATH
-        self._observer = None
-        self._perform_deployment = False
-
-        all_patterns_to_watch = None
-        if patterns_to_watch:
-            all_patterns_to_watch = patterns_to_watch.split(",")
-
-        if not no_default:
-            if all_patterns_to_watch:
-                all_patterns_to_watch += self._default_patterns_to_watch
-            else:
-                all_patterns_to_watch = self._default_patterns_to_watch
-
-        all_patterns_to_ignore = None
-        if patterns_to_ignore:
-            all_patterns_to_ignore = patterns_to_ignore.split(",")
-
-        if not no_default:
-            if all_patterns_to_ignore:
-                all_patterns_to_ignore += self._default_patterns_to_ignore
-            else:
-                all_patterns_to_ignore = self._default_patterns_to_ignore
 
         super().__init__(
-            patterns=all_patterns_to_watch,
-            ignore_patterns=all_patterns_to_ignore,
-            ignore_directories=False,
+            self._workspace.settings.BASE_PATH,
+            output=output,
+            no_default=no_default,
+            patterns_to_watch=patterns_to_watch,
+            patterns_to_ignore=patterns_to_ignore,
+            debounce_seconds=debounce_seconds,
         )
 
-    def watch(self) -> None:
-        self._output._console.print("Watching for changes in the workspace...")
-        # Prevent multiples observers
-        self._stop()
+    def _handle_changes(self, changed_paths: Set[str], deleted_paths: Set[str]) -> None:
+        # A deleted file can change the components that depend on it just like a modified file
+        changed_files = changed_paths | deleted_paths
 
-        self._observer = Observer()
-        self._observer.schedule(self, self._base_folder, recursive=True)
-        self._observer.start()
-        try:
-            while True:
-                if self._perform_deployment:
-                    self._output._console.print(
-                        "Ignoring future changes until deployment is finished"
-                    )
-                    execute_deployment(
-                        self._workspace, self._output, no_prompt=self._no_prompt
-                    )
-                    self._workspace.clear_output()
-                    self._output._console.print("Enabling watch again")
-                    self._perform_deployment = False
-                else:
-                    time.sleep(1)
-        except KeyboardInterrupt:
-            self._stop()
-
-    def on_any_event(self, event):
-        self._perform_deployment = True
-
-    def _stop(self) -> None:
-        if not self._observer:
-            return
-
-        observer = self._observer
-        self._observer = None
-        observer.stop()
-        observer.join()
+        self._output.print(
+            f"Deploying changes to {len(changed_files)} file(s). Changes made during the deployment will be deployed after it finishes"
+        )
+        execute_deployment(
+            self._workspace,
+            self._output,
+            no_prompt=self._no_prompt,
+            changed_files=sorted(changed_files),
+        )
+        self._workspace.clear_output()
@@ -4,11 +4,10 @@
 from argparse import ArgumentParser
 import boto3
 import os
-import mimetypes
 
 from core.constructs.commands import BaseCommand
 
-from core.default.commands import utils as command_utils
+from core.default.commands import s3_utils, utils as command_utils
 
 from . import utils as bucket_utils
 
@@ -35,7 +34,13 @@ class cp(BaseCommand):
         parser.add_argument(
             "--recursive",
             action="store_true",
-            help="The destination of the file. Must either be a local path or bucket location (bucket://<component>.<name>/<path>)",
+            help="Copy all the files in a directory or all the objects under a remote path.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=s3_utils.DEFAULT_MAX_WORKERS,
+            help="Number of files to transfer concurrently when copying recursively.",
         )
 
     def command(self, *args, **kwargs) -> None:
@@ -62,6 +67,9 @@ class cp(BaseCommand):
                 f"Source {source_raw} is neither a valid location on the file system or a valid remote location"
             )
 
+        # A single local file is copied the same way with or without '--recursive'
+        is_recursive = is_recursive and (is_source_remote or os.path.isdir(source))
+
         if bucket_utils.is_valid_remote(destination_raw):
             is_destination_remote = True
             destination = bucket_utils.parse_remote_location(destination_raw)
@@ -74,6 +82,11 @@ class cp(BaseCommand):
             is_destination_remote = False
             destination = destination_raw
 
+        elif is_recursive:
+            # The destination directory is created when the files are downloaded
+            is_destination_remote = False
+            destination = destination_raw
+
         else:
             raise Exception(
                 f"Destination {destination_raw} is neither a valid location on the file system or a valid remote location"
@@ -84,6 +97,16 @@ class cp(BaseCommand):
                 f"Both destination ({destination}) and source ({source}) are file system locations"
             )
 
+        if is_recursive:
+            self._copy_recursive(
+                source,
+                is_source_remote,
+                destination,
+                is_destination_remote,
+                kwargs.get("max_workers") or s3_utils.DEFAULT_MAX_WORKERS,
+            )
+            return
+
         s3 = boto3.resource("s3")
 
         if is_destination_remote and not is_source_remote:
@@ -101,9 +124,7 @@ class cp(BaseCommand):
             else:
                 key_name = source
 
-            mimetype, _ = mimetypes.guess_type(source)
-            if mimetype is None:
-                raise Exception("Failed to guess mimetype")
+            mimetype = s3_utils.guess_content_type(source)
 
             self.output.print(f"Upload {source_raw} ->  {destination_raw}")
             bucket.upload_file(source, key_name, ExtraArgs={"ContentType": mimetype})
@@ -142,3 +163,137 @@ class cp(BaseCommand):
             destination_bucket.copy(
                 {"Bucket": source_bucket_name, "Key": source.path}, destination_key
             )
+
+    def _copy_recursive(
+        self,
+        source,
+        is_source_remote: bool,
+        destination,
+        is_destination_remote: bool,
+        max_workers: int,
+    ) -> None:
+        """Copy all the files in a directory or under a remote path. Files that already exist at the destination
+        with the same size and etag are skipped, so an interrupted copy can be run again to resume it.
+
+        Args:
+            source (Union[str, remote_location]): local directory or remote location
+            is_source_remote (bool)
+            destination (Union[str, remote_location]): local directory or remote location
+            is_destination_remote (bool)
+            max_workers (int): number of concurrent transfers
+        """
+        s3_client = boto3.client("s3")
+        transfer_config = s3_utils.create_transfer_config(max_workers)
+
+        def _print_transfer(item, error: Exception) -> None:
+            name = item.fp if isinstance(item, s3_utils.local_object) else item.source
+
+            if error:
+                self.output.print(f"Failed to copy {name}: {error}")
+            else:
+                self.output.print(f"Copied {name}")
+
+        if is_destination_remote and not is_source_remote:
+            # Remote destination and local directory.
+            # Copying up
+            bucket_name = self._get_bucket_name(destination)
+            prefix = s3_utils.get_prefix(destination.path)
+
+            local_objects = []
+            for subdir, dirs, files in os.walk(source):
+                for file in files:
+                    full_path = os.path.join(subdir, file)
+                    key_name = prefix + os.path.relpath(full_path, source).replace(
+                        os.sep, "/"
+                    )
+
+                    local_objects.append(
+                        s3_utils.create_local_object(
+                            full_path, key_name, s3_utils.guess_content_type(full_path)
+                        )
+                    )
+
+            # The manifest records the etag of objects uploaded in multiple parts, which can not be compared with
+            # the md5 of the file
+            manifest = s3_utils.SyncManifest(s3_utils.SYNC_MANIFEST_LOCATION)
+            manifest_entries = manifest.get_bucket_entries(bucket_name)
+
+            plan = s3_utils.plan_sync(
+                local_objects,
+                s3_utils.list_remote_objects(s3_client, bucket_name, prefix),
+                manifest_entries,
+            )
+
+            result = s3_utils.upload_objects(
+                s3_client,
+                bucket_name,
+                plan.uploads,
+                max_workers=max_workers,
+                transfer_config=transfer_config,
+                manifest_entries=manifest_entries,
+                callback=_print_transfer,
+            )
+            result.unchanged = plan.unchanged
+
+            manifest.dump_to_file()
+            self.output.print(result.summary("Uploaded"))
+
+        elif not is_destination_remote and is_source_remote:
+            # Local destination and remote source.
+            # Pulling down
+            bucket_name = self._get_bucket_name(source)
+            prefix = s3_utils.get_prefix(source.path)
+
+            items, unchanged = s3_utils.plan_download(
+                s3_utils.list_remote_objects(s3_client, bucket_name, prefix),
+                prefix,
+                destination,
+            )
+
+            result = s3_utils.download_objects(
+                s3_client,
+                bucket_name,
+                items,
+                max_workers=max_workers,
+                transfer_config=transfer_config,
+                callback=_print_transfer,
+            )
+            result.unchanged = unchanged
+            self.output.print(result.summary("Downloaded"))
+
+        else:
+            # Remote destination and remote source.
+            # Copied within S3
+            source_bucket_name = self._get_bucket_name(source)
+            destination_bucket_name = self._get_bucket_name(destination)
+            source_prefix = s3_utils.get_prefix(source.path)
+            destination_prefix = s3_utils.get_prefix(destination.path)
+
+            items, unchanged = s3_utils.plan_copy(
+                s3_utils.list_remote_objects(
+                    s3_client, source_bucket_name, source_prefix
+                ),
+                source_prefix,
+                s3_utils.list_remote_objects(
+                    s3_client, destination_bucket_name, destination_prefix
+                ),
+                destination_prefix,
+            )
+
+            result = s3_utils.copy_objects(
+                s3_client,
+                source_bucket_name,
+                destination_bucket_name,
+                items,
+                max_workers=max_workers,
+                transfer_config=transfer_config,
+                callback=_print_transfer,
+            )
+            result.unchanged = unchanged
+            self.output.print(result.summary("Copied"))
+
+    def _get_bucket_name(self, location: bucket_utils.remote_location) -> str:
+        cloud_output = command_utils.get_cloud_output_from_cdev_name(
+            location.component_name, RUUID, location.cdev_bucket_name
+        )
+        return cloud_output.get("bucket_name")
@@ -3,12 +3,11 @@
 from argparse import ArgumentParser
 import boto3
 import os
-import mimetypes
 
 from core.constructs.commands import BaseCommand
 from core.utils.paths import get_full_path_from_workspace_base
 
-from core.default.commands import utils as command_utils
+from core.default.commands import s3_utils, utils as command_utils
 
 RUUID = "cdev::simple::bucket"
 
@@ -32,6 +31,17 @@ class sync_files(BaseCommand):
             action="store_true",
             help="Clear the existing content of the bucket before syncing the new data.",
         )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete objects from the bucket that do not exist in the content folder.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=s3_utils.DEFAULT_MAX_WORKERS,
+            help="Number of files to upload concurrently.",
+        )
 
     def command(self, *args, **kwargs) -> None:
         (
@@ -52,22 +62,35 @@ class sync_files(BaseCommand):
 
         bucket_name = cloud_output.get("bucket_name")
 
-        s3 = boto3.resource("s3")
-        bucket = s3.Bucket(bucket_name)
+        max_workers = kwargs.get("max_workers") or s3_utils.DEFAULT_MAX_WORKERS
+        s3_client = boto3.client("s3")
 
         if clear_bucket:
-            bucket.object_versions.delete()
+            boto3.resource("s3").Bucket(bucket_name).object_versions.delete()
 
+        manifest = s3_utils.SyncManifest(s3_utils.SYNC_MANIFEST_LOCATION)
+        manifest_entries = manifest.get_bucket_entries(bucket_name)
+
+        local_objects = []
         for subdir, dirs, files in os.walk(final_dir):
             for file in files:
                 full_path = os.path.join(subdir, file)
 
-                key_name = os.path.relpath(full_path, final_dir)
+                key_name = os.path.relpath(full_path, final_dir).replace(os.sep, "/")
 
-                mimetype, _ = mimetypes.guess_type(full_path)
-                if mimetype is None:
-                    raise Exception("Failed to guess mimetype")
-                self.output.print(f"Uploading file -> {full_path}")
-                bucket.upload_file(
-                    full_path, key_name, ExtraArgs={"ContentType": mimetype}
+                local_objects.append(
+                    s3_utils.create_local_object(
+                        full_path, key_name, s3_utils.guess_content_type(full_path)
+                    )
                 )
+
+        plan = s3_utils.plan_sync(
+            local_objects,
+            s3_utils.list_remote_objects(s3_client, bucket_name),
+            manifest_entries,
+            delete=kwargs.get("delete"),
+        )
+
+        s3_utils.apply_sync_plan(
+            s3_client, bucket_name, plan, manifest, self.output, max_workers=max_workers
+        )
@@ -7,4 +7,5 @@ These are the commands that are available for use on the simple xlambda.
 
 execute: Trigger a deployed function with a given event and context
 logs: Get the logs from a deployed function
+tune: Measure a deployed function at a set of memory sizes and recommend one
 """
@@ -2,14 +2,30 @@ import json
 import os
 
 from argparse import ArgumentParser
-from typing import Dict
+from typing import Dict, List, Mapping
 from boto3 import client
+from botocore.config import Config
+from rich.table import Table
 
+from core.constructs.cloud_output import (
+    cloud_output_dynamic_model,
+    evaluate_dynamic_output,
+)
 from core.constructs.commands import BaseCommand
+from core.constructs.workspace import Workspace
 from core.default.commands import utils as command_utils
+from core.default.resources.simple.xlambda import (
+    LAMBDA_LAYER_RUUID,
+    simple_function_model,
+)
+from core.utils import paths
+
+from . import invoke_utils, local_utils
 
 RUUID = "cdev::simple::function"
 
+LOCAL_ARTIFACTS_DIRECTORY = "local_artifacts"
+
 
 class execute(BaseCommand):
 
@@ -31,6 +47,31 @@ class execute(BaseCommand):
             type=str,
             help="Raw string form of event object to provide as input to the function. Can not be used with '--event' flag.",
         )
+        parser.add_argument(
+            "--local",
+            action="store_true",
+            help="Execute the packaged handler and dependency layers of the function in this process instead of in the cloud, with the environment variables of the deployed function.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="Number of concurrent invocations for a load test. Strings in the event can use the {{index}}, {{uuid}}, {{timestamp}} and {{random}} placeholders.",
+        )
+        parser.add_argument(
+            "--count",
+            type=int,
+            help="Total number of invocations for a load test.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            help="Seconds to keep invoking the function for in a load test.",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Write the result of each invocation of a load test to a csv file. Without '--concurrency', '--count' or '--duration', the function is invoked once.",
+        )
 
     def command(self, *args, **kwargs) -> None:
 
@@ -44,10 +85,26 @@ class execute(BaseCommand):
             full_function_name
         )
 
+        # The results can only be written by a load test, so '--output' alone is a load test of one invocation
+        is_load_test = any(
+            kwargs.get(x) for x in ["concurrency", "count", "duration", "output"]
+        )
+
+        if kwargs.get("local"):
+            if is_load_test:
+                raise Exception("Can not use '--local' with a load test")
+
+            self._execute_locally(component_name, function_name, event_data)
+            return
+
         cloud_name = command_utils.get_cloud_output_from_cdev_name(
             component_name, RUUID, function_name
         ).get("cloud_id")
 
+        if is_load_test:
+            self._run_load_test(cloud_name, event_data, **kwargs)
+            return
+
         lambda_client = client("lambda")
 
         self.output.print(f"executing {full_function_name}")
@@ -59,30 +116,196 @@ class execute(BaseCommand):
 
         self.output.print(str(response))
 
+    def _execute_locally(
+        self, component_name: str, function_name: str, event_data: Dict
+    ) -> None:
+        resource: simple_function_model = command_utils.get_resource_from_cdev_name(
+            component_name, RUUID, function_name
+        )
+
+        handler_directory = self._extract_local_artifact(resource.filepath)
+        layer_directories = [
+            self._extract_local_artifact(x)
+            for x in self._get_layer_artifact_paths(component_name, resource)
+        ]
+
+        environment_variables = {
+            "AWS_LAMBDA_FUNCTION_NAME": function_name,
+            "AWS_LAMBDA_FUNCTION_MEMORY_SIZE": str(resource.configuration.memory_size),
+            "LAMBDA_TASK_ROOT": handler_directory,
+            **{
+                k: str(self._resolve_cloud_output(component_name, v))
+                for k, v in resource.configuration.environment_variables.items()
+            },
+        }
+
+        self.output.print(f"executing {component_name}.{function_name} locally")
+
+        # Nothing is printed inside the isolated environment because the modules imported lazily by the output are
+        # not importable there
+        result = None
+        handler_ms = None
+        with local_utils.IsolatedEnvironment(
+            local_utils.get_import_paths(handler_directory, layer_directories),
+            environment_variables,
+        ):
+            handler_function, init_ms, error = local_utils.load_handler(
+                resource.configuration.handler
+            )
+
+            if not error:
+                result, handler_ms, error = local_utils.invoke_handler(
+                    handler_function,
+                    event_data,
+                    local_utils.LocalContext(
+                        function_name,
+                        resource.configuration.memory_size,
+                        resource.configuration.timeout,
+                    ),
+                )
+
+        if error:
+            self.output.print(error)
+        else:
+            self.output.print(json.dumps(result, default=str))
+
+        if handler_ms is None:
+            self.output.print(f"Init: {init_ms:.2f} ms")
+        else:
+            self.output.print(f"Init: {init_ms:.2f} ms, Handler: {handler_ms:.2f} ms")
+
+    def _extract_local_artifact(self, artifact_path: str) -> str:
+        artifact_fp = paths.get_full_path_from_workspace_base(artifact_path)
+
+        if not os.path.isfile(artifact_fp):
+            raise Exception(
+                f"Artifact {artifact_fp} does not exist. Run 'cdev deploy' to create the artifacts of the function"
+            )
+
+        return local_utils.extract_artifact(
+            artifact_fp,
+            os.path.join(
+                Workspace.instance().settings.INTERMEDIATE_FOLDER_LOCATION,
+                LOCAL_ARTIFACTS_DIRECTORY,
+                os.path.basename(artifact_fp)[: -len(".zip")],
+            ),
+        )
+
+    def _get_layer_artifact_paths(
+        self, component_name: str, resource: simple_function_model
+    ) -> List[str]:
+        rv = []
+
+        for dependency in resource.external_dependencies:
+            if isinstance(dependency, str):
+                self.output.print(
+                    f"Skipping deployed layer {dependency} that is not available locally"
+                )
+                continue
+
+            if dependency.get("ruuid") == LAMBDA_LAYER_RUUID:
+                rv.append(
+                    command_utils.get_resource_from_cdev_name(
+                        component_name, LAMBDA_LAYER_RUUID, dependency.get("name")
+                    ).artifact_path
+                )
+
+        return rv
+
+    def _resolve_cloud_output(self, component_name: str, value):
+        if not (isinstance(value, Mapping) and value.get("id") == "cdev_cloud_output"):
+            return value
+
+        ws = Workspace.instance()
+        resolved_value = ws.get_backend().get_cloud_output_value_by_name(
+            ws.get_resource_state_uuid(),
+            component_name,
+            value.get("ruuid"),
+            value.get("name"),
+            value.get("key"),
+        )
+
+        if value.get("output_operations"):
+            return evaluate_dynamic_output(
+                resolved_value, cloud_output_dynamic_model(**value)
+            )
+
+        return resolved_value
+
+    def _run_load_test(self, cloud_name: str, event_data: Dict, **kwargs) -> None:
+        concurrency = kwargs.get("concurrency") or 1
+        count = kwargs.get("count")
+        duration = kwargs.get("duration")
+        output = kwargs.get("output")
+
+        if count is None and duration is None:
+            count = concurrency
+
+        # Throttles are counted instead of retried, and the pool needs a connection per worker
+        lambda_client = client(
+            "lambda",
+            config=Config(
+                max_pool_connections=max(10, concurrency),
+                read_timeout=900,
+                retries={"max_attempts": 0},
+            ),
+        )
+
+        self.output.print(
+            f"invoking {kwargs.get('function_id')} with {concurrency} concurrent workers"
+        )
+        results = invoke_utils.run_invocations(
+            lambda x: invoke_utils.invoke(
+                lambda_client,
+                cloud_name,
+                invoke_utils.render_event(event_data, x),
+                x,
+            ),
+            concurrency=concurrency,
+            count=count,
+            duration=duration,
+        )
+
+        self.output.print(self._create_summary_table(invoke_utils.summarize(results)))
+
+        errors = [x.error for x in results if x.error]
+        if errors:
+            self.output.print(f"Errors: {', '.join(sorted(set(errors)))}")
+
+        if output:
+            invoke_utils.write_results_csv(results, output)
+            self.output.print(f"Wrote {len(results)} results to {output}")
+
+    def _create_summary_table(self, summary: Dict) -> Table:
+        table = Table(
+            title=(
+                f"{summary.get('invocations')} invocations in {summary.get('seconds'):.2f}s "
+                f"({summary.get('throughput'):.1f}/s), {summary.get('errors')} errors, "
+                f"{summary.get('throttles')} throttles, {summary.get('cold_starts')} cold starts"
+            )
+        )
+
+        table.add_column("ms")
+        for column in ["p50", "p90", "p99"]:
+            table.add_column(column, justify="right")
+
+        for name, label in [
+            ("latency_ms", "Latency"),
+            ("duration_ms", "Duration"),
+            ("billed_duration_ms", "Billed Duration"),
+            ("init_duration_ms", "Init Duration"),
+        ]:
+            table.add_row(label, *self._format_percentiles(summary.get(name)))
+
+        return table
+
+    def _format_percentiles(self, percentiles: Dict) -> List[str]:
+        return [
+            "-" if percentiles.get(x) is None else f"{percentiles.get(x):.1f}"
+            for x in ["p50", "p90", "p99"]
+        ]
+
     def _get_event_data(self, *args, **kwargs) -> Dict:
-        event_file_location: str = kwargs.get("event")
-        event_raw_data: str = kwargs.get("event_data")
-
-        if event_file_location and event_raw_data:
-            raise Exception("Can not provide both '--event-data' and '--event'")
-
-        if event_file_location:
-            if not os.path.isfile(event_file_location):
-                raise Exception(f"{event_file_location} is not a valid file location")
-
-            with open(event_file_location) as fh:
-                try:
-                    event_data = json.load(fh)
-                    return event_data
-                except Exception as e:
-                    print(e)
-                    raise Exception(f"Could not load {event_file_location} as json")
-
-        if event_raw_data:
-            try:
-                event_data = json.loads(event_raw_data)
-                return event_data
-            except Exception as e:
-                print(e)
-                raise Exception(f"Could not load {event_raw_data} as json")
-        return {}
+        return invoke_utils.load_event_data(
+            kwargs.get("event"), kwargs.get("event_data")
+        )
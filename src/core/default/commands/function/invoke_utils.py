@@ -0,0 +1,381 @@
+"""Utilities for invoking a deployed function many times and measuring its performance
+
+Invocations are made by a pool of workers, each of which invokes the function again as soon as its previous
+invocation returns, until a number of invocations have been made or a duration has passed. Each invocation requests
+the tail of its logs, and the `REPORT` line of the tail provides the duration, billed duration and init duration
+measured by Lambda alongside the latency measured by the client.
+"""
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from dataclasses import asdict, dataclass, fields
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import uuid
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+
+THROTTLE_ERROR_CODES = {"TooManyRequestsException", "EC2ThrottledException"}
+
+_TEMPLATE_REGEX = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+_REPORT_FIELDS = {
+    "duration_ms": r"\tDuration: ([0-9.]+) ms",
+    "billed_duration_ms": r"Billed Duration: ([0-9.]+) ms",
+    "memory_size_mb": r"Memory Size: ([0-9]+) MB",
+    "max_memory_used_mb": r"Max Memory Used: ([0-9]+) MB",
+    "init_duration_ms": r"Init Duration: ([0-9.]+) ms",
+}
+
+
+#######################
+##### Models
+#######################
+
+
+@dataclass
+class invocation_result:
+    index: int
+    start_time: float
+    latency_ms: float
+    status_code: Optional[int] = None
+    throttled: bool = False
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
+    billed_duration_ms: Optional[float] = None
+    init_duration_ms: Optional[float] = None
+    memory_size_mb: Optional[int] = None
+    max_memory_used_mb: Optional[int] = None
+
+
+#######################
+##### Events
+#######################
+
+
+def load_event_data(
+    event_file_location: Optional[str] = None, event_raw_data: Optional[str] = None
+) -> Any:
+    """Load an event from a json file or a json string
+
+    Args:
+        event_file_location (Optional[str], optional): Defaults to None.
+        event_raw_data (Optional[str], optional): Defaults to None.
+
+    Raises:
+        Exception: both or an invalid event was provided
+
+    Returns:
+        Any: event, or an empty dictionary if no event was provided
+    """
+    if event_file_location and event_raw_data:
+        raise Exception("Can not provide both '--event-data' and '--event'")
+
+    if event_file_location:
+        if not os.path.isfile(event_file_location):
+            raise Exception(f"{event_file_location} is not a valid file location")
+
+        with open(event_file_location) as fh:
+            try:
+                return json.load(fh)
+            except Exception as e:
+                raise Exception(f"Could not load {event_file_location} as json") from e
+
+    if event_raw_data:
+        try:
+            return json.loads(event_raw_data)
+        except Exception as e:
+            raise Exception(f"Could not load {event_raw_data} as json") from e
+
+    return {}
+
+
+def render_event(template: Any, index: int) -> Any:
+    """Replace the placeholders in the strings of an event with the values for an invocation.
+
+    The available placeholders are `{{index}}`, `{{uuid}}`, `{{timestamp}}` (milliseconds) and `{{random}}` (an int
+    between 0 and 1000000). A string that only contains a placeholder is replaced by the value, so numbers keep their
+    type.
+
+    Args:
+        template (Any): json event
+        index (int): index of the invocation
+
+    Raises:
+        Exception: unknown placeholder
+
+    Returns:
+        Any: event for the invocation
+    """
+    if isinstance(template, dict):
+        return {k: render_event(v, index) for k, v in template.items()}
+
+    if isinstance(template, list):
+        return [render_event(x, index) for x in template]
+
+    if not isinstance(template, str) or "{{" not in template:
+        return template
+
+    match = _TEMPLATE_REGEX.fullmatch(template)
+    if match:
+        return _get_template_value(match.group(1), index)
+
+    return _TEMPLATE_REGEX.sub(
+        lambda x: str(_get_template_value(x.group(1), index)), template
+    )
+
+
+def _get_template_value(name: str, index: int) -> Any:
+    if name == "index":
+        return index
+
+    if name == "uuid":
+        return str(uuid.uuid4())
+
+    if name == "timestamp":
+        return int(time.time() * 1000)
+
+    if name == "random":
+        return random.randint(0, 1000000)
+
+    raise Exception(
+        f"Unknown event placeholder '{name}'. Use one of index, uuid, timestamp or random"
+    )
+
+
+#######################
+##### Invoking
+#######################
+
+
+def parse_report(log_tail: str) -> Dict:
+    """Parse the `REPORT` line of the tail of the logs of an invocation
+
+    Args:
+        log_tail (str)
+
+    Returns:
+        Dict: values of the report fields that are present
+    """
+    report = next((x for x in log_tail.splitlines() if x.startswith("REPORT ")), None)
+
+    if not report:
+        return {}
+
+    rv = {}
+    for name, regex in _REPORT_FIELDS.items():
+        match = re.search(regex, report)
+
+        if match:
+            rv[name] = (
+                int(match.group(1)) if name.endswith("_mb") else float(match.group(1))
+            )
+
+    return rv
+
+
+def invoke(
+    client, function_name: str, payload: Any, index: int = 0
+) -> invocation_result:
+    """Invoke a function once and measure it
+
+    Args:
+        client: boto3 lambda client
+        function_name (str)
+        payload (Any): json event
+        index (int, optional): index of the invocation. Defaults to 0.
+
+    Returns:
+        invocation_result
+    """
+    start_time = time.time()
+    start = time.perf_counter()
+
+    try:
+        response = client.invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse",
+            LogType="Tail",
+            Payload=json.dumps(payload),
+        )
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        return invocation_result(
+            index=index,
+            start_time=start_time,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            status_code=e.response.get("ResponseMetadata", {}).get("HTTPStatusCode"),
+            throttled=code in THROTTLE_ERROR_CODES,
+            error=code,
+        )
+    except BotoCoreError as e:
+        # Connection errors and timeouts have no response, so the name of the error is recorded
+        return invocation_result(
+            index=index,
+            start_time=start_time,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            error=type(e).__name__,
+        )
+
+    # Read the payload so the latency includes the whole response
+    response.get("Payload").read()
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    log_tail = base64.b64decode(response.get("LogResult", "")).decode(errors="replace")
+
+    return invocation_result(
+        index=index,
+        start_time=start_time,
+        latency_ms=latency_ms,
+        status_code=response.get("StatusCode"),
+        error=response.get("FunctionError"),
+        **parse_report(log_tail),
+    )
+
+
+def run_invocations(
+    invoke_function: Callable[[int], invocation_result],
+    concurrency: int = 1,
+    count: Optional[int] = None,
+    duration: Optional[float] = None,
+    callback: Callable[[invocation_result], None] = None,
+) -> List[invocation_result]:
+    """Invoke a function from a pool of workers until a number of invocations have been made or a duration has passed
+
+    Args:
+        invoke_function (Callable[[int], invocation_result]): makes the invocation with the given index
+        concurrency (int, optional): number of workers. Defaults to 1.
+        count (Optional[int], optional): total number of invocations. Defaults to None.
+        duration (Optional[float], optional): seconds to keep invoking for. Defaults to None.
+        callback (Callable[[invocation_result], None], optional): called after each invocation. Defaults to None.
+
+    Raises:
+        Exception: neither a count or a duration was provided
+
+    Returns:
+        List[invocation_result]: ordered by index
+    """
+    if count is None and duration is None:
+        raise Exception("Must provide a count or a duration for the invocations")
+
+    deadline = time.perf_counter() + duration if duration is not None else None
+    lock = threading.Lock()
+    next_index = 0
+    rv = []
+
+    def _get_next_index() -> Optional[int]:
+        nonlocal next_index
+
+        with lock:
+            if count is not None and next_index >= count:
+                return None
+
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+
+            next_index += 1
+            return next_index - 1
+
+    def _work() -> None:
+        while True:
+            index = _get_next_index()
+            if index is None:
+                return
+
+            result = invoke_function(index)
+
+            with lock:
+                rv.append(result)
+
+                if callback:
+                    callback(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(_work) for _ in range(concurrency)]:
+            future.result()
+
+    return sorted(rv, key=lambda x: x.index)
+
+
+#######################
+##### Results
+#######################
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Percentile of a set of values, interpolated between the closest ranks
+
+    Args:
+        values (List[float])
+        p (float): between 0 and 100
+
+    Returns:
+        Optional[float]: None if there are no values
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(results: List[invocation_result]) -> Dict:
+    """Aggregate the results of a set of invocations
+
+    Args:
+        results (List[invocation_result])
+
+    Returns:
+        Dict: counts, throughput and the p50/p90/p99 of the latency, duration, billed duration and init duration
+    """
+    if results:
+        elapsed = max(x.start_time + x.latency_ms / 1000 for x in results) - min(
+            x.start_time for x in results
+        )
+    else:
+        elapsed = 0
+
+    rv = {
+        "invocations": len(results),
+        "errors": len([x for x in results if x.error and not x.throttled]),
+        "throttles": len([x for x in results if x.throttled]),
+        "cold_starts": len([x for x in results if x.init_duration_ms is not None]),
+        "seconds": elapsed,
+        "throughput": len(results) / elapsed if elapsed else 0,
+    }
+
+    for name in ["latency_ms", "duration_ms", "billed_duration_ms", "init_duration_ms"]:
+        values = [getattr(x, name) for x in results if getattr(x, name) is not None]
+
+        rv[name] = {f"p{p}": percentile(values, p) for p in (50, 90, 99)}
+
+    rv["total_billed_duration_ms"] = sum(
+        x.billed_duration_ms for x in results if x.billed_duration_ms is not None
+    )
+
+    return rv
+
+
+def write_results_csv(results: List[invocation_result], fp: str) -> None:
+    """Write the result of each invocation as a row of a csv file
+
+    Args:
+        results (List[invocation_result])
+        fp (str)
+    """
+    with open(fp, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, [x.name for x in fields(invocation_result)])
+        writer.writeheader()
+
+        for result in results:
+            writer.writerow(asdict(result))
@@ -0,0 +1,284 @@
+"""Utilities for executing the packaged artifacts of a function in the current process
+
+The handler artifact and the dependency layers of a function are extracted into the intermediate folder and placed on
+an isolated `sys.path` that mirrors the runtime: the handler artifact first, then the `python` folder of each layer,
+then the standard library. Installed packages are only importable for the modules that the runtime provides, so a
+handler that runs locally imports the same trimmed code that is deployed.
+"""
+from importlib.machinery import PathFinder
+import importlib
+import os
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import uuid
+import zipfile
+
+from pydantic import DirectoryPath, FilePath
+
+from core.utils.logger import log
+
+
+# Top level modules that the runtime provides without them being packaged
+RUNTIME_MODULES = {
+    "boto3",
+    "botocore",
+    "jmespath",
+    "s3transfer",
+    "dateutil",
+    "urllib3",
+    "six",
+}
+
+# Layers are extracted to /opt, and the runtime adds /opt/python to the path
+LAYER_PYTHON_DIRECTORY = "python"
+
+_EXTRACTED_MARKER_FILE = ".cdev_extracted"
+
+
+#######################
+##### Artifacts
+#######################
+
+
+def extract_artifact(artifact_fp: FilePath, directory: DirectoryPath) -> DirectoryPath:
+    """Extract an artifact into a directory, unless the directory already holds the current version of the artifact
+
+    Args:
+        artifact_fp (FilePath): zip archive
+        directory (DirectoryPath)
+
+    Returns:
+        DirectoryPath: directory
+    """
+    stat = os.stat(artifact_fp)
+    version = f"{stat.st_size}:{stat.st_mtime_ns}"
+    marker_fp = os.path.join(directory, _EXTRACTED_MARKER_FILE)
+
+    if os.path.isfile(marker_fp):
+        with open(marker_fp) as fh:
+            if fh.read() == version:
+                return directory
+
+    _remove_directory_contents(directory)
+
+    with zipfile.ZipFile(artifact_fp) as archive:
+        archive.extractall(directory)
+
+    with open(marker_fp, "w") as fh:
+        fh.write(version)
+
+    log.debug("Extracted %s to %s", artifact_fp, directory)
+    return directory
+
+
+def _remove_directory_contents(directory: DirectoryPath) -> None:
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+        return
+
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for name in files:
+            os.remove(os.path.join(root, name))
+
+        for name in dirs:
+            os.rmdir(os.path.join(root, name))
+
+
+def get_import_paths(
+    handler_directory: DirectoryPath, layer_directories: List[DirectoryPath]
+) -> List[DirectoryPath]:
+    return [
+        handler_directory,
+        *[os.path.join(x, LAYER_PYTHON_DIRECTORY) for x in layer_directories],
+    ]
+
+
+#######################
+##### Environment
+#######################
+
+
+class _RuntimeModuleFinder:
+    """Meta path finder that only finds the runtime provided modules in the installed packages"""
+
+    def __init__(self, paths: List[str], module_names: set) -> None:
+        self._paths = paths
+        self._module_names = module_names
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        # Submodules are found from the path of their package
+        if "." in fullname or fullname not in self._module_names:
+            return None
+
+        return PathFinder.find_spec(fullname, self._paths)
+
+
+class IsolatedEnvironment:
+    """Context manager that runs code with only the given import paths, the standard library and the runtime provided
+    modules importable, and with the given environment variables set.
+
+    Modules imported inside the context are removed when it exits. The modules already loaded by the current process,
+    other than the standard library and the runtime provided modules, are hidden while inside the context.
+    """
+
+    def __init__(
+        self,
+        import_paths: List[DirectoryPath],
+        environment_variables: Dict[str, str] = {},
+        runtime_modules: set = RUNTIME_MODULES,
+    ) -> None:
+        self._import_paths = [os.path.abspath(x) for x in import_paths]
+        self._environment_variables = environment_variables
+        self._runtime_modules = runtime_modules
+
+    def __enter__(self) -> "IsolatedEnvironment":
+        self._previous_path = list(sys.path)
+        self._previous_meta_path = list(sys.meta_path)
+        self._previous_environ = dict(os.environ)
+        self._previous_modules = dict(sys.modules)
+
+        site_paths = [x for x in sys.path if _is_site_path(x)]
+        standard_paths = [
+            x
+            for x in sys.path
+            if x and x.startswith(sys.base_prefix) and not _is_site_path(x)
+        ]
+
+        # Hide loaded modules that would otherwise shadow the modules of the artifacts or be importable without
+        # being packaged
+        artifact_modules = _get_top_level_modules(self._import_paths)
+        for name, module in list(sys.modules.items()):
+            top_level_name = name.split(".")[0]
+
+            if top_level_name in artifact_modules or not (
+                top_level_name in self._runtime_modules
+                or _is_standard_module(module, standard_paths)
+            ):
+                del sys.modules[name]
+
+        sys.path[:] = [*self._import_paths, *standard_paths]
+        sys.meta_path.append(_RuntimeModuleFinder(site_paths, self._runtime_modules))
+        sys.path_importer_cache.clear()
+        importlib.invalidate_caches()
+
+        os.environ.update(self._environment_variables)
+        return self
+
+    def __exit__(self, *args) -> None:
+        sys.path[:] = self._previous_path
+        sys.meta_path[:] = self._previous_meta_path
+        sys.path_importer_cache.clear()
+
+        for name in list(sys.modules):
+            if name not in self._previous_modules:
+                del sys.modules[name]
+
+        sys.modules.update(self._previous_modules)
+
+        os.environ.clear()
+        os.environ.update(self._previous_environ)
+
+
+def _is_site_path(path: str) -> bool:
+    return "site-packages" in path or "dist-packages" in path
+
+
+def _is_standard_module(module, standard_paths: List[str]) -> bool:
+    # Built in modules do not have a file
+    fp = getattr(module, "__file__", None)
+
+    if not fp:
+        return True
+
+    return not _is_site_path(fp) and any(fp.startswith(x) for x in standard_paths)
+
+
+def _get_top_level_modules(directories: List[DirectoryPath]) -> set:
+    rv = set()
+
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+
+        for name in os.listdir(directory):
+            if name.endswith(".py"):
+                rv.add(name[:-3])
+            elif os.path.isdir(os.path.join(directory, name)) and name.isidentifier():
+                rv.add(name)
+
+    return rv
+
+
+#######################
+##### Invoking
+#######################
+
+
+class LocalContext:
+    """Context object passed to a handler that is executed locally, with the attributes of the runtime context"""
+
+    def __init__(self, function_name: str, memory_size: int, timeout: int) -> None:
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = (
+            f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        )
+        self.memory_limit_in_mb = memory_size
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = f"/aws/lambda/{function_name}"
+        self.log_stream_name = "local"
+        self._deadline = time.time() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.time()) * 1000))
+
+
+def load_handler(handler: str) -> Tuple[Optional[Callable], float, Optional[str]]:
+    """Import the module of a handler and get the handler function
+
+    Args:
+        handler (str): python path of the handler. ex: src.handlers.hello_world
+
+    Returns:
+        Tuple[Optional[Callable], float, Optional[str]]: handler function, the time to import its module in
+            milliseconds and the traceback of any error
+    """
+    module_name, function_name = handler.rsplit(".", 1)
+
+    start = time.perf_counter()
+
+    try:
+        handler_function = getattr(importlib.import_module(module_name), function_name)
+        error = None
+    except Exception:
+        handler_function = None
+        error = traceback.format_exc()
+
+    return handler_function, (time.perf_counter() - start) * 1000, error
+
+
+def invoke_handler(
+    handler_function: Callable, event: Any, context: LocalContext
+) -> Tuple[Any, float, Optional[str]]:
+    """Call a handler function and measure it
+
+    Args:
+        handler_function (Callable)
+        event (Any)
+        context (LocalContext)
+
+    Returns:
+        Tuple[Any, float, Optional[str]]: result, time of the call in milliseconds and the traceback of any error
+    """
+    start = time.perf_counter()
+
+    try:
+        result = handler_function(event, context)
+        error = None
+    except Exception:
+        result = None
+        error = traceback.format_exc()
+
+    return result, (time.perf_counter() - start) * 1000, error
@@ -1,3 +1,4 @@
+import json
 import time, datetime
 
 from argparse import ArgumentParser
@@ -8,8 +9,7 @@ from botocore.exceptions import ClientError
 
 from core.constructs.commands import BaseCommand
 
-from core.utils import hasher
-from core.default.commands import utils as command_utils
+from core.default.commands import log_utils, utils as command_utils
 
 RUUID = "cdev::simple::function"
 
@@ -30,6 +30,16 @@ class show_logs(BaseCommand):
             action="store_true",
             help="watch the logs. If this flag is passed, only --start_time flag is read",
         )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="number of groups of log streams to read concurrently. Defaults to 1 when watching and 4 when exporting the logs",
+        )
+        parser.add_argument(
+            "--export",
+            type=str,
+            help="write the events, or the results of --query, to a json lines file. Files ending in .gz are compressed. Reads the events between --start_time and --end_time",
+        )
         parser.add_argument(
             "--tail", action="store_true", help="show the tail of the logs"
         )
@@ -62,8 +72,10 @@ class show_logs(BaseCommand):
             return
 
         watch_val = kwargs.get("watch")
-        if watch_val:
-            self._watch_log_group(cloud_group_name)
+        if kwargs.get("export"):
+            self._export_log_group(cloud_group_name, **kwargs)
+        elif watch_val:
+            self._watch_log_group(cloud_group_name, kwargs.get("concurrency") or 1)
         else:
             query_val = kwargs.get("query")
             if query_val is None:
@@ -183,44 +195,71 @@ class show_logs(BaseCommand):
             if response["status"] != "Running":
                 break
 
-    def _watch_log_group(self, group_name: str) -> None:
+    def _export_log_group(self, cloud_group_name: str, **kwargs) -> None:
+        export_fp = kwargs.get("export")
+        start_time_val = kwargs.get("start_time")
+        end_time_val = kwargs.get("end_time")
+        query_val = kwargs.get("query")
 
-        events_hash = set()
-        keep_watching = True
         cloud_client = client("logs")
-        while keep_watching:
-            previous_refresh_time = int(
-                (time.mktime(datetime.datetime.now().timetuple()) - 60) * 1000
-            )
-            keep_watching = self._read_from_streams(
-                cloud_client, group_name, events_hash, previous_refresh_time
-            )
-            time.sleep(0.2)
+        start = time.perf_counter()
 
-    def _read_from_streams(
-        self,
-        cloud_client,
-        group_name: str,
-        events_hash: set,
-        previous_refresh_time,
-    ) -> bool:
-        try:
-            streams = self._get_streams_for_cloud_group_name(cloud_client, group_name)
-            for stream in streams:
-                self._process_stream(
+        with log_utils.open_export_file(export_fp) as fh:
+            if query_val:
+                if start_time_val is None:
+                    start_time_val = datetime.datetime.today() - datetime.timedelta(
+                        weeks=52
+                    )
+
+                if end_time_val is None:
+                    end_time_val = datetime.datetime.now()
+
+                results = log_utils.run_query(
                     cloud_client,
-                    stream,
-                    group_name,
-                    events_hash,
-                    previous_refresh_time
+                    cloud_group_name,
+                    " ".join([str(item) for item in query_val]),
+                    int(start_time_val.timestamp()),
+                    int(end_time_val.timestamp()),
+                )
+                for result in results:
+                    fh.write(json.dumps(result) + "\n")
+
+                count = len(results)
+            else:
+                count = log_utils.export_events(
+                    cloud_client,
+                    cloud_group_name,
+                    fh,
+                    start_time=int(start_time_val.timestamp() * 1000)
+                    if start_time_val
+                    else None,
+                    end_time=int(end_time_val.timestamp() * 1000)
+                    if end_time_val
+                    else None,
+                    max_workers=kwargs.get("concurrency") or 4,
+                )
+
+        self.output.print(
+            f"Exported {count} records to {export_fp} in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _watch_log_group(self, group_name: str, concurrency: int = 1) -> None:
+        cloud_client = client("logs")
+        cursor = log_utils.LogEventCursor(start_time=int((time.time() - 60) * 1000))
+        backoff = log_utils.AdaptiveBackoff()
+
+        try:
+            while True:
+                events = log_utils.poll_events(
+                    cloud_client, group_name, cursor, max_workers=concurrency
                 )
+                for event in events:
+                    self.output.print(self._format_event(event))
 
-            return True
+                time.sleep(backoff.reset() if events else backoff.next_interval())
         except KeyboardInterrupt:
             self.output.print("Interrupted")
 
-        return False
-
     def _get_streams_for_cloud_group_name(self, cloud_client, cloud_group_name: str) -> List[str]:
         try:
             log_streams_rv = cloud_client.describe_log_streams(
@@ -232,43 +271,6 @@ class show_logs(BaseCommand):
         except ClientError:
             raise Exception(f"Function {cloud_group_name} has not generated any logs. Trigger the function to generate logs.")
 
-    def _process_stream(
-        self,
-        cloud_client,
-        stream,
-        group_name: str,
-        events_hash: set,
-        previous_refresh_time: int
-    ) -> None:
-        log_events = cloud_client.get_log_events(
-            logGroupName=group_name,
-            logStreamName=stream,
-            startTime=previous_refresh_time,
-            startFromHead=True,
-        )
-
-        for stream_event in log_events.get("events"):
-            self._process_stream_event(stream_event, events_hash)
-
-    def _process_stream_event(
-        self,
-        event: dict,
-        events_hash: set,
-    ) -> None:
-
-        event_hash = hasher.hash_list(
-            [
-                event.get("timestamp"),
-                event.get("message"),
-                event.get("ingestionTime"),
-            ]
-        )
-
-        if event_hash not in events_hash:
-            self.output.print(self._format_event(event))
-
-        events_hash.add(event_hash)
-
     def _format_event(self, event) -> str:
         the_timestamp = datetime.datetime.fromtimestamp(event.get("timestamp") / 1000).strftime("%Y-%m-%d %H:%M:%S")
         the_message = event.get("message")
@@ -0,0 +1,139 @@
+from argparse import ArgumentParser
+import os
+import time
+
+from boto3 import client
+from botocore.config import Config
+from rich.table import Table
+
+from core.constructs.commands import BaseCommand
+from core.constructs.workspace import Workspace
+from core.default.commands import utils as command_utils
+from core.utils.file_manager import safe_json_write
+
+from . import invoke_utils, tune_utils
+
+RUUID = "cdev::simple::function"
+
+TUNING_DIRECTORY = "tuning"
+
+
+class tune(BaseCommand):
+
+    help = """
+        Measure a deployed function at a set of memory sizes and recommend the fastest or cheapest one.
+    """
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "function_id", type=str, help="The id of the function to tune."
+        )
+        parser.add_argument(
+            "--memory-sizes",
+            type=int,
+            nargs="+",
+            default=tune_utils.DEFAULT_MEMORY_SIZES,
+            help="Memory sizes (MB) to measure the function at.",
+        )
+        parser.add_argument(
+            "--invocations",
+            type=int,
+            default=tune_utils.DEFAULT_INVOCATIONS,
+            help="Number of invocations at each memory size.",
+        )
+        parser.add_argument(
+            "--strategy",
+            type=str,
+            choices=[tune_utils.COST_STRATEGY, tune_utils.SPEED_STRATEGY],
+            default=tune_utils.COST_STRATEGY,
+            help="Recommend the cheapest or the fastest memory size.",
+        )
+        parser.add_argument(
+            "--event",
+            type=str,
+            help="File (json) location of event object to provide as input to the function. Can not be used with '--event-data` flag.",
+        )
+        parser.add_argument(
+            "--event-data",
+            type=str,
+            help="Raw string form of event object to provide as input to the function. Can not be used with '--event' flag.",
+        )
+
+    def command(self, *args, **kwargs) -> None:
+        event_data = invoke_utils.load_event_data(
+            kwargs.get("event"), kwargs.get("event_data")
+        )
+
+        full_function_name = kwargs.get("function_id")
+        (
+            component_name,
+            function_name,
+        ) = command_utils.get_component_and_resource_from_qualified_name(
+            full_function_name
+        )
+
+        cloud_name = command_utils.get_cloud_output_from_cdev_name(
+            component_name, RUUID, function_name
+        ).get("cloud_id")
+
+        self.output.print(
+            f"tuning {full_function_name}. The original memory size is restored afterwards."
+        )
+        result = tune_utils.tune_function(
+            client("lambda", config=Config(read_timeout=900)),
+            cloud_name,
+            event_data,
+            memory_sizes=kwargs.get("memory_sizes") or tune_utils.DEFAULT_MEMORY_SIZES,
+            invocations=kwargs.get("invocations") or tune_utils.DEFAULT_INVOCATIONS,
+            strategy=kwargs.get("strategy") or tune_utils.COST_STRATEGY,
+            callback=lambda x: self.output.print(
+                f"Measured {x.memory_size} MB ({x.invocations} invocations, {x.errors} errors)"
+            ),
+        )
+
+        self.output.print(self._create_results_table(result))
+
+        if result.recommended_memory_size is None:
+            self.output.print(
+                "No memory size completed all of its invocations without errors"
+            )
+        else:
+            self.output.print(
+                f"Recommended memory size for {result.strategy}: {result.recommended_memory_size} MB "
+                f"(currently {result.original_memory_size} MB)"
+            )
+
+        results_fp = os.path.join(
+            Workspace.instance().settings.INTERMEDIATE_FOLDER_LOCATION,
+            TUNING_DIRECTORY,
+            f"{full_function_name}.json",
+        )
+        os.makedirs(os.path.dirname(results_fp), exist_ok=True)
+        safe_json_write({"timestamp": time.time(), **result.to_dict()}, results_fp)
+
+        self.output.print(f"Wrote results to {results_fp}")
+
+    def _create_results_table(self, result: tune_utils.tuning_result) -> Table:
+        table = Table(title=f"Memory sizes of {result.function_name}")
+
+        table.add_column("Memory (MB)", justify="right")
+        table.add_column("Avg Duration (ms)", justify="right")
+        table.add_column("p90 Duration (ms)", justify="right")
+        table.add_column("Avg Billed (ms)", justify="right")
+        table.add_column("Cost per 1M (USD)", justify="right")
+        table.add_column("Errors", justify="right")
+
+        for x in result.results:
+            table.add_row(
+                f"{x.memory_size}{' *' if x.memory_size == result.recommended_memory_size else ''}",
+                self._format(x.average_duration_ms),
+                self._format(x.p90_duration_ms),
+                self._format(x.average_billed_duration_ms),
+                "-" if x.average_cost is None else f"{x.average_cost * 1000000:.2f}",
+                str(x.errors),
+            )
+
+        return table
+
+    def _format(self, value) -> str:
+        return "-" if value is None else f"{value:.1f}"
@@ -0,0 +1,278 @@
+"""Utilities for choosing the memory size of a function by measuring it at a set of memory sizes
+
+The configuration of the function is updated to each memory size in turn, and the function is invoked a fixed number
+of times at each size. The billed duration of the invocations gives the cost of an invocation at each size, and the
+recommended size is the fastest or the cheapest. The original memory size is always restored.
+"""
+from dataclasses import asdict, dataclass, field
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from core.utils.logger import log
+
+from . import invoke_utils
+
+
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1536, 2048, 3008]
+
+DEFAULT_INVOCATIONS = 10
+
+SPEED_STRATEGY = "speed"
+COST_STRATEGY = "cost"
+
+# Price in USD of a GB-second of duration for each architecture, and of a request
+GB_SECOND_PRICES = {"x86_64": 0.0000166667, "arm64": 0.0000133334}
+REQUEST_PRICE = 0.0000002
+
+# Largest number of seconds to wait for a configuration update to complete
+UPDATE_TIMEOUT = 120
+
+
+#######################
+##### Models
+#######################
+
+
+@dataclass
+class memory_result:
+    memory_size: int
+    invocations: int = 0
+    errors: int = 0
+    cold_starts: int = 0
+    average_duration_ms: Optional[float] = None
+    p90_duration_ms: Optional[float] = None
+    average_billed_duration_ms: Optional[float] = None
+    average_cost: Optional[float] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return (
+            self.invocations > 0
+            and not self.errors
+            and self.average_duration_ms is not None
+        )
+
+
+@dataclass
+class tuning_result:
+    function_name: str
+    original_memory_size: int
+    architecture: str
+    strategy: str
+    results: List[memory_result] = field(default_factory=list)
+    recommended_memory_size: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+#######################
+##### Costs
+#######################
+
+
+def get_invocation_cost(
+    billed_duration_ms: float, memory_size: int, architecture: str = "x86_64"
+) -> float:
+    """Price of an invocation in USD
+
+    Args:
+        billed_duration_ms (float)
+        memory_size (int): MB
+        architecture (str, optional): Defaults to "x86_64".
+
+    Returns:
+        float
+    """
+    gb_seconds = (memory_size / 1024) * (billed_duration_ms / 1000)
+
+    return gb_seconds * GB_SECOND_PRICES.get(architecture) + REQUEST_PRICE
+
+
+def summarize_memory_size(
+    memory_size: int,
+    results: List[invoke_utils.invocation_result],
+    architecture: str = "x86_64",
+) -> memory_result:
+    """Aggregate the invocations made at a memory size.
+
+    Cold starts are excluded from the durations when there are warm invocations, so the first invocation after each
+    configuration update does not skew the comparison.
+
+    Args:
+        memory_size (int)
+        results (List[invoke_utils.invocation_result])
+        architecture (str, optional): Defaults to "x86_64".
+
+    Returns:
+        memory_result
+    """
+    rv = memory_result(
+        memory_size=memory_size,
+        invocations=len(results),
+        errors=len([x for x in results if x.error]),
+        cold_starts=len([x for x in results if x.init_duration_ms is not None]),
+    )
+
+    measured = [x for x in results if not x.error and x.billed_duration_ms is not None]
+    warm = [x for x in measured if x.init_duration_ms is None]
+    measured = warm or measured
+
+    if not measured:
+        return rv
+
+    durations = [x.duration_ms for x in measured]
+    billed_durations = [x.billed_duration_ms for x in measured]
+
+    rv.average_duration_ms = sum(durations) / len(durations)
+    rv.p90_duration_ms = invoke_utils.percentile(durations, 90)
+    rv.average_billed_duration_ms = sum(billed_durations) / len(billed_durations)
+    rv.average_cost = get_invocation_cost(
+        rv.average_billed_duration_ms, memory_size, architecture
+    )
+
+    return rv
+
+
+def recommend_memory_size(
+    results: List[memory_result], strategy: str = COST_STRATEGY
+) -> Optional[int]:
+    """Choose the fastest or the cheapest memory size. Ties are broken by the other measure and then by the smaller
+    memory size.
+
+    Args:
+        results (List[memory_result])
+        strategy (str, optional): SPEED_STRATEGY or COST_STRATEGY. Defaults to COST_STRATEGY.
+
+    Returns:
+        Optional[int]: None if no memory size had only successful invocations
+    """
+    valid_results = [x for x in results if x.is_valid]
+
+    if not valid_results:
+        return None
+
+    if strategy == SPEED_STRATEGY:
+        key = lambda x: (x.average_duration_ms, x.average_cost, x.memory_size)
+    elif strategy == COST_STRATEGY:
+        key = lambda x: (x.average_cost, x.average_duration_ms, x.memory_size)
+    else:
+        raise Exception(f"Unknown tuning strategy {strategy}")
+
+    return min(valid_results, key=key).memory_size
+
+
+#######################
+##### Tuning
+#######################
+
+
+def wait_for_update(
+    client,
+    function_name: str,
+    sleep: Callable[[float], None] = time.sleep,
+    timeout: float = UPDATE_TIMEOUT,
+) -> Dict:
+    """Wait for a configuration update of a function to complete
+
+    Args:
+        client: boto3 lambda client
+        function_name (str)
+        sleep (Callable[[float], None], optional): Defaults to time.sleep.
+        timeout (float, optional): seconds. Defaults to UPDATE_TIMEOUT.
+
+    Raises:
+        Exception: the update failed or did not complete in time
+
+    Returns:
+        Dict: configuration of the function
+    """
+    waited = 0.0
+    interval = 0.5
+
+    while True:
+        configuration = client.get_function_configuration(FunctionName=function_name)
+        status = configuration.get("LastUpdateStatus", "Successful")
+
+        if status == "Successful":
+            return configuration
+
+        if status == "Failed":
+            raise Exception(
+                f"Update of {function_name} failed: {configuration.get('LastUpdateStatusReason')}"
+            )
+
+        if waited >= timeout:
+            raise Exception(f"Update of {function_name} did not complete in {timeout}s")
+
+        sleep(interval)
+        waited += interval
+
+
+def tune_function(
+    client,
+    function_name: str,
+    event: Any = {},
+    memory_sizes: List[int] = DEFAULT_MEMORY_SIZES,
+    invocations: int = DEFAULT_INVOCATIONS,
+    strategy: str = COST_STRATEGY,
+    sleep: Callable[[float], None] = time.sleep,
+    callback: Callable[[memory_result], None] = None,
+) -> tuning_result:
+    """Measure a function at each memory size and recommend one, restoring the original memory size afterwards
+
+    Args:
+        client: boto3 lambda client
+        function_name (str)
+        event (Any, optional): event for the invocations, which can use the placeholders of `invoke_utils.render_event`. Defaults to {}.
+        memory_sizes (List[int], optional): MB. Defaults to DEFAULT_MEMORY_SIZES.
+        invocations (int, optional): invocations at each memory size. Defaults to DEFAULT_INVOCATIONS.
+        strategy (str, optional): SPEED_STRATEGY or COST_STRATEGY. Defaults to COST_STRATEGY.
+        sleep (Callable[[float], None], optional): Defaults to time.sleep.
+        callback (Callable[[memory_result], None], optional): called after each memory size. Defaults to None.
+
+    Returns:
+        tuning_result
+    """
+    if strategy not in [SPEED_STRATEGY, COST_STRATEGY]:
+        raise Exception(f"Unknown tuning strategy {strategy}")
+
+    configuration = wait_for_update(client, function_name, sleep)
+    original_memory_size = configuration.get("MemorySize")
+
+    rv = tuning_result(
+        function_name=function_name,
+        original_memory_size=original_memory_size,
+        architecture=(configuration.get("Architectures") or ["x86_64"])[0],
+        strategy=strategy,
+    )
+
+    try:
+        for memory_size in memory_sizes:
+            client.update_function_configuration(
+                FunctionName=function_name, MemorySize=memory_size
+            )
+            wait_for_update(client, function_name, sleep)
+
+            results = invoke_utils.run_invocations(
+                lambda x: invoke_utils.invoke(
+                    client, function_name, invoke_utils.render_event(event, x), x
+                ),
+                count=invocations,
+            )
+
+            result = summarize_memory_size(memory_size, results, rv.architecture)
+            rv.results.append(result)
+
+            log.debug("Tuned %s at %s MB: %s", function_name, memory_size, result)
+            if callback:
+                callback(result)
+
+    finally:
+        client.update_function_configuration(
+            FunctionName=function_name, MemorySize=original_memory_size
+        )
+        wait_for_update(client, function_name, sleep)
+
+    rv.recommended_memory_size = recommend_memory_size(rv.results, strategy)
+    return rv
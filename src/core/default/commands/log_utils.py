@@ -0,0 +1,462 @@
+"""Utilities for efficiently reading the events of a log group
+
+Events are read with `filter_log_events`, which returns the events of all the streams of a group in a single
+paginated call. When watching a group, a cursor keeps the timestamp of the latest event seen so that each poll only
+reads new events. Events can arrive a little after their timestamp, so each poll looks back a short window from the
+cursor, and the ids of recently seen events are kept in a bounded window to remove the duplicates.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+import queue
+import threading
+import time
+from typing import IO, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+DEFAULT_LOOKBACK_MS = 5 * 1000
+
+# Number of event ids kept to remove duplicate events read by overlapping polls
+DEFAULT_MAX_SEEN_EVENTS = 10000
+
+# Largest number of streams that can be passed to a single `filter_log_events` call
+MAX_STREAMS_PER_FILTER = 100
+
+# The last event time of a stream is only eventually consistent, so streams are treated as active for this long after it
+STREAM_ACTIVITY_LAG_MS = 60 * 60 * 1000
+
+# Number of events buffered between the readers and the writer of an export
+EXPORT_QUEUE_SIZE = 10000
+
+_QUERY_DONE_STATUSES = {"Complete", "Failed", "Cancelled", "Timeout"}
+
+
+#######################
+##### Watching
+#######################
+
+
+class LogEventCursor:
+    """Position of a watcher in a log group.
+
+    The cursor is the timestamp of the latest event seen, and the ids of the most recently seen events are kept in an
+    LRU window of a fixed size, so the memory used does not grow with the length of the session.
+    """
+
+    def __init__(
+        self,
+        start_time: int,
+        lookback_ms: int = DEFAULT_LOOKBACK_MS,
+        max_seen_events: int = DEFAULT_MAX_SEEN_EVENTS,
+    ) -> None:
+        """
+        Args:
+            start_time (int): timestamp in milliseconds to start reading from
+            lookback_ms (int, optional): window before the cursor that is read again for late events. Defaults to DEFAULT_LOOKBACK_MS.
+            max_seen_events (int, optional): number of event ids to remember. Defaults to DEFAULT_MAX_SEEN_EVENTS.
+        """
+        self._timestamp = start_time
+        self._lookback_ms = lookback_ms
+        self._max_seen_events = max_seen_events
+        self._seen_events: "OrderedDict[str, None]" = OrderedDict()
+
+    @property
+    def timestamp(self) -> int:
+        return self._timestamp
+
+    @property
+    def start_time(self) -> int:
+        return max(0, self._timestamp - self._lookback_ms)
+
+    def add(self, event: Dict) -> bool:
+        """Record an event and move the cursor forward
+
+        Args:
+            event (Dict): log event
+
+        Returns:
+            bool: True if the event has not been seen before
+        """
+        event_id = event.get("eventId")
+
+        if event_id in self._seen_events:
+            self._seen_events.move_to_end(event_id)
+            return False
+
+        self._seen_events[event_id] = None
+        if len(self._seen_events) > self._max_seen_events:
+            self._seen_events.popitem(last=False)
+
+        self._timestamp = max(self._timestamp, event.get("timestamp", 0))
+        return True
+
+
+class AdaptiveBackoff:
+    """Polling interval that grows while no new events arrive and resets when they do."""
+
+    def __init__(
+        self,
+        min_interval: float = 0.2,
+        max_interval: float = 5.0,
+        factor: float = 2.0,
+    ) -> None:
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._factor = factor
+        self._interval = min_interval
+
+    def reset(self) -> float:
+        self._interval = self._min_interval
+        return self._interval
+
+    def next_interval(self) -> float:
+        interval = self._interval
+        self._interval = min(self._max_interval, self._interval * self._factor)
+        return interval
+
+
+def poll_events(
+    client,
+    group_name: str,
+    cursor: LogEventCursor,
+    max_workers: int = 1,
+) -> List[Dict]:
+    """Read the events of a log group that are newer than the cursor
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        cursor (LogEventCursor): updated with the new events
+        max_workers (int, optional): number of groups of streams to read concurrently. Defaults to 1.
+
+    Returns:
+        List[Dict]: new events ordered by timestamp
+    """
+    start_time = cursor.start_time
+
+    if max_workers > 1:
+        events = fetch_events_concurrently(
+            client,
+            group_name,
+            get_active_streams(client, group_name, start_time),
+            start_time,
+            max_workers=max_workers,
+        )
+    else:
+        events = list(fetch_events(client, group_name, start_time))
+
+    events.sort(key=lambda x: (x.get("timestamp"), x.get("eventId")))
+
+    return [x for x in events if cursor.add(x)]
+
+
+#######################
+##### Reading
+#######################
+
+
+def fetch_events(
+    client,
+    group_name: str,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    stream_names: Optional[List[str]] = None,
+) -> Iterator[Dict]:
+    """Read the events of a log group page by page
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        start_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        end_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        stream_names (Optional[List[str]], optional): only read these streams. Defaults to None.
+
+    Raises:
+        Exception: the log group does not exist
+
+    Yields:
+        Iterator[Dict]: log events
+    """
+    args = {"logGroupName": group_name}
+
+    if start_time is not None:
+        args["startTime"] = start_time
+
+    if end_time is not None:
+        args["endTime"] = end_time
+
+    if stream_names:
+        args["logStreamNames"] = stream_names
+
+    while True:
+        try:
+            response = client.filter_log_events(**args)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ResourceNotFoundException":
+                raise Exception(
+                    f"Function {group_name} has not generated any logs. Trigger the function to generate logs."
+                )
+            raise e
+
+        yield from response.get("events", [])
+
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+
+        args["nextToken"] = next_token
+
+
+def get_active_streams(
+    client, group_name: str, start_time: Optional[int] = None
+) -> List[str]:
+    """Get the streams of a log group that have events after a given time
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        start_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+
+    Returns:
+        List[str]: stream names, most recently active first
+    """
+    rv = []
+    args = {"logGroupName": group_name, "orderBy": "LastEventTime", "descending": True}
+
+    while True:
+        response = client.describe_log_streams(**args)
+
+        for stream in response.get("logStreams", []):
+            last_event_time = stream.get("lastEventTimestamp") or stream.get(
+                "creationTime", 0
+            )
+            if (
+                start_time is not None
+                and last_event_time < start_time - STREAM_ACTIVITY_LAG_MS
+            ):
+                # Streams are ordered by their last event, so no later stream has new events
+                return rv
+
+            rv.append(stream.get("logStreamName"))
+
+        next_token = response.get("nextToken")
+        if not next_token:
+            return rv
+
+        args["nextToken"] = next_token
+
+
+def fetch_events_concurrently(
+    client,
+    group_name: str,
+    stream_names: List[str],
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    max_workers: int = 4,
+) -> List[Dict]:
+    """Read the events of a set of streams by splitting the streams into groups that are read concurrently
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        stream_names (List[str])
+        start_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        end_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        max_workers (int, optional): number of concurrent reads. Defaults to 4.
+
+    Returns:
+        List[Dict]: log events
+    """
+    if not stream_names:
+        return []
+
+    groups = split_streams(stream_names, max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda x: list(fetch_events(client, group_name, start_time, end_time, x)),
+            groups,
+        )
+
+        return [event for result in results for event in result]
+
+
+def split_streams(stream_names: List[str], max_workers: int) -> List[List[str]]:
+    """Split a set of streams into at least one group per worker, with no more than MAX_STREAMS_PER_FILTER streams
+    in each group.
+
+    Args:
+        stream_names (List[str])
+        max_workers (int)
+
+    Returns:
+        List[List[str]]
+    """
+    group_size = min(
+        MAX_STREAMS_PER_FILTER, max(1, -(-len(stream_names) // max_workers))
+    )
+
+    return [
+        stream_names[i : i + group_size]
+        for i in range(0, len(stream_names), group_size)
+    ]
+
+
+#######################
+##### Exporting
+#######################
+
+
+def open_export_file(fp: str) -> IO:
+    """Open a file to export events to. Files ending in '.gz' are compressed with gzip.
+
+    Args:
+        fp (str)
+
+    Returns:
+        IO: text file
+    """
+    if fp.endswith(".gz"):
+        return gzip.open(fp, "wt", encoding="utf-8")
+
+    return open(fp, "w", encoding="utf-8")
+
+
+def export_events(
+    client,
+    group_name: str,
+    fh: IO,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    max_workers: int = 4,
+) -> int:
+    """Write the events of a log group to a file as json lines.
+
+    The streams are split into groups that are paged concurrently. Events are passed from the readers to the writer
+    through a bounded queue, so the memory used does not depend on the number of events. Events are written in the
+    order they are read, so they are only ordered by timestamp within each group of streams.
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        fh (IO): file to write to
+        start_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        end_time (Optional[int], optional): timestamp in milliseconds. Defaults to None.
+        max_workers (int, optional): number of concurrent readers. Defaults to 4.
+
+    Returns:
+        int: number of events written
+    """
+    stream_groups = split_streams(
+        get_active_streams(client, group_name, start_time), max_workers
+    )
+    events: "queue.Queue" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> None:
+        while not stop.is_set():
+            try:
+                events.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _read(stream_names: List[str]) -> None:
+        try:
+            for event in fetch_events(
+                client, group_name, start_time, end_time, stream_names
+            ):
+                if stop.is_set():
+                    return
+
+                _put(event)
+        finally:
+            _put(done)
+
+    rv = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_read, x) for x in stream_groups]
+
+        try:
+            remaining = len(futures)
+            while remaining:
+                event = events.get()
+
+                if event is done:
+                    remaining -= 1
+                    continue
+
+                fh.write(json.dumps(_to_export_event(event)) + "\n")
+                rv += 1
+        finally:
+            stop.set()
+
+        for future in futures:
+            # Raise any error of the readers
+            future.result()
+
+    return rv
+
+
+def run_query(
+    client,
+    group_name: str,
+    query: str,
+    start_time: int,
+    end_time: int,
+    backoff: AdaptiveBackoff = None,
+) -> List[Dict]:
+    """Run a Logs Insights query and wait for its results
+
+    Args:
+        client: boto3 logs client
+        group_name (str)
+        query (str)
+        start_time (int): timestamp in seconds
+        end_time (int): timestamp in seconds
+        backoff (AdaptiveBackoff, optional): interval between checks of the status of the query. Defaults to None.
+
+    Raises:
+        Exception: the query did not complete
+
+    Returns:
+        List[Dict]: results as a dictionary of each field to its value
+    """
+    backoff = backoff or AdaptiveBackoff(min_interval=0.5, max_interval=5.0)
+
+    query_id = client.start_query(
+        logGroupName=group_name,
+        startTime=start_time,
+        endTime=end_time,
+        queryString=query,
+    )["queryId"]
+
+    while True:
+        response = client.get_query_results(queryId=query_id)
+
+        if response.get("status") in _QUERY_DONE_STATUSES:
+            break
+
+        time.sleep(backoff.next_interval())
+
+    if not response.get("status") == "Complete":
+        raise Exception(f"Query {query_id} did not complete: {response.get('status')}")
+
+    return [
+        {x.get("field"): x.get("value") for x in result if not x.get("field") == "@ptr"}
+        for result in response.get("results", [])
+    ]
+
+
+def _to_export_event(event: Dict) -> Dict:
+    return {
+        "timestamp": event.get("timestamp"),
+        "ingestionTime": event.get("ingestionTime"),
+        "logStreamName": event.get("logStreamName"),
+        "eventId": event.get("eventId"),
+        "message": event.get("message"),
+    }
@@ -6,4 +6,5 @@ class SimpleCommandContainer(BaseCommandContainer):
 These are the commands that are available for use on a relational db.
 
 shell: Open an interactive terminal to your db.
+load: Load the rows of a csv or json lines file into your db.
 """
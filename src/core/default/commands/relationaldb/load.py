@@ -0,0 +1,139 @@
+from argparse import ArgumentParser
+import itertools
+import os
+import time
+from typing import Dict, Iterator, List
+
+import boto3
+
+from core.constructs.commands import BaseCommand
+from core.default.commands.relationaldb.utils import (
+    RUUID,
+    get_db_info_from_cdev_name,
+)
+from core.default.commands import utils as command_utils
+
+from . import load_utils
+
+
+class load(BaseCommand):
+    help = """
+        Load the rows of a csv or json lines file into a relational db.
+    """
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "resource",
+            type=str,
+            help="The database to load into. Name must include component name. ex: comp1.myDb",
+        )
+        parser.add_argument(
+            "--file",
+            type=str,
+            required=True,
+            help="The location of the data file. Either a csv file (.csv) with a header row or a json lines file (.jsonl) with one row per line",
+        )
+        parser.add_argument(
+            "--table",
+            type=str,
+            help="Table to insert the rows into. The columns are the keys of the first row",
+        )
+        parser.add_argument(
+            "--sql",
+            type=str,
+            help="Statement to execute for each row, with a named parameter for each column. ex: 'INSERT INTO users (id, name) VALUES (:id, :name)'",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=load_utils.DEFAULT_BATCH_SIZE,
+            help="Number of rows sent in each call",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=load_utils.DEFAULT_MAX_WORKERS,
+            help="Number of batches to execute concurrently",
+        )
+        parser.add_argument(
+            "--infer-types",
+            action="store_true",
+            help="Convert the values of a csv file into numbers, booleans and nulls instead of sending them as strings",
+        )
+
+    def command(self, *args, **kwargs) -> None:
+        (
+            component_name,
+            database_name,
+        ) = command_utils.get_component_and_resource_from_qualified_name(
+            kwargs.get("resource")
+        )
+
+        data_file = kwargs.get("file")
+        table_name = kwargs.get("table")
+        sql = kwargs.get("sql")
+
+        if table_name and sql:
+            raise Exception("Can not provide both --table and --sql arguments")
+
+        if not (table_name or sql):
+            raise Exception("Must provide either --table or --sql arguments")
+
+        if not os.path.isfile(data_file):
+            raise Exception(f"{data_file} is not a valid data file")
+
+        rows = load_utils.iter_rows_from_file(
+            data_file, infer_types=kwargs.get("infer_types")
+        )
+
+        if table_name:
+            first_row = next(rows, None)
+
+            if first_row is None:
+                self.output.print(f"No rows in {data_file}")
+                return
+
+            column_names = list(first_row.keys())
+            engine = command_utils.get_resource_from_cdev_name(
+                component_name, RUUID, database_name
+            ).Engine
+            sql = load_utils.create_insert_statement(table_name, column_names, engine)
+            rows = self._align_rows(itertools.chain([first_row], rows), column_names)
+
+        cluster_arn, secret_arn, db_name = get_db_info_from_cdev_name(
+            component_name, database_name
+        )
+
+        self._last_print = time.perf_counter()
+        result = load_utils.execute_batches(
+            boto3.client("rds-data"),
+            cluster_arn,
+            secret_arn,
+            db_name,
+            sql,
+            rows,
+            batch_size=kwargs.get("batch_size") or load_utils.DEFAULT_BATCH_SIZE,
+            max_workers=kwargs.get("max_workers") or load_utils.DEFAULT_MAX_WORKERS,
+            callback=self._print_progress,
+        )
+
+        self.output.print(result.summary())
+
+        for error in result.errors[:5]:
+            self.output.print(error)
+
+    def _align_rows(
+        self, rows: Iterator[Dict], column_names: List[str]
+    ) -> Iterator[Dict]:
+        # Every parameter set of a batch must provide the parameters of the insert statement
+        for row in rows:
+            yield {k: row.get(k) for k in column_names}
+
+    def _print_progress(self, result: load_utils.load_result) -> None:
+        now = time.perf_counter()
+
+        if now - self._last_print < 1:
+            return
+
+        self._last_print = now
+        self.output.print(f"Loaded {result.rows} rows ({result.rate:.0f} rows/s)")
@@ -0,0 +1,339 @@
+"""Utilities for loading data into a relational db through the Data API
+
+Rows are read one at a time from a csv or json lines file and sent as the parameter sets of a single parameterized
+statement with `batch_execute_statement`. Batches are executed concurrently by a pool of threads, and only a
+bounded number of batches are waiting to be executed at any time, so files larger than memory can be loaded.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import csv
+from dataclasses import dataclass, field
+import itertools
+import json
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from core.utils.logger import log
+
+
+DEFAULT_BATCH_SIZE = 500
+
+DEFAULT_MAX_WORKERS = 4
+
+POSTGRES_ENGINES = {"aurora-postgresql"}
+
+_INT_REGEX = re.compile(r"^-?(0|[1-9][0-9]*)$")
+_FLOAT_REGEX = re.compile(r"^-?[0-9]+\.[0-9]+([eE][-+]?[0-9]+)?$")
+_DOLLAR_QUOTE_REGEX = re.compile(r"\$[A-Za-z_0-9]*\$")
+
+
+#######################
+##### Models
+#######################
+
+
+@dataclass
+class load_result:
+    rows: int = 0
+    failed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0
+
+    def summary(self) -> str:
+        return (
+            f"Loaded {self.rows} rows in {self.batches} batches, failed {self.failed} "
+            f"({self.seconds:.2f}s, {self.rate:.0f} rows/s)"
+        )
+
+
+#######################
+##### Statements
+#######################
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """Split a script into its statements on the semicolons that are not inside a string, quoted identifier,
+    comment or dollar quoted block.
+
+    Args:
+        sql (str): script
+
+    Returns:
+        List[str]: statements without the separating semicolons. Statements that only contain comments are removed.
+    """
+    statements = []
+    current = []
+    has_code = False
+    i = 0
+
+    while i < len(sql):
+        char = sql[i]
+
+        if char in ("'", '"', "`"):
+            # Quotes are escaped by doubling them, which is handled by reading the two quoted parts in turn
+            end = sql.find(char, i + 1)
+            end = len(sql) if end == -1 else end + 1
+            has_code = True
+
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            end = len(sql) if end == -1 else end + 1
+
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            end = len(sql) if end == -1 else end + 2
+
+        elif char == "$" and _DOLLAR_QUOTE_REGEX.match(sql, i):
+            tag = _DOLLAR_QUOTE_REGEX.match(sql, i).group(0)
+            end = sql.find(tag, i + len(tag))
+            end = len(sql) if end == -1 else end + len(tag)
+            has_code = True
+
+        elif char == ";":
+            if has_code:
+                statements.append("".join(current).strip())
+
+            current = []
+            has_code = False
+            i += 1
+            continue
+
+        else:
+            end = i + 1
+            has_code = has_code or not char.isspace()
+
+        current.append(sql[i:end])
+        i = end
+
+    if has_code:
+        statements.append("".join(current).strip())
+
+    return statements
+
+
+def create_insert_statement(
+    table_name: str, column_names: List[str], engine: str
+) -> str:
+    """Create a parameterized insert statement with a named parameter for each column. The table and column names
+    are quoted for the engine, and each part of a qualified table name (ex: schema.table) is quoted separately.
+
+    Args:
+        table_name (str)
+        column_names (List[str])
+        engine (str): engine of the db. ex: aurora-postgresql
+
+    Raises:
+        Exception: Two columns have the same parameter name
+
+    Returns:
+        str
+    """
+    parameter_names = {}
+    for column_name in column_names:
+        parameter_name = _get_parameter_name(column_name)
+
+        if parameter_name in parameter_names:
+            raise Exception(
+                f"Columns '{parameter_names.get(parameter_name)}' and '{column_name}' can not both be loaded because they have the same parameter name '{parameter_name}'"
+            )
+
+        parameter_names[parameter_name] = column_name
+
+    quoted_table_name = ".".join(
+        quote_identifier(x, engine) for x in table_name.split(".")
+    )
+    quoted_column_names = ", ".join(quote_identifier(x, engine) for x in column_names)
+
+    return (
+        f"INSERT INTO {quoted_table_name} ({quoted_column_names}) "
+        f"VALUES ({', '.join(':' + x for x in parameter_names)})"
+    )
+
+
+def quote_identifier(name: str, engine: str) -> str:
+    """Quote a table or column name with double quotes for postgres and backticks for mysql
+
+    Args:
+        name (str)
+        engine (str)
+
+    Returns:
+        str
+    """
+    quote = '"' if engine in POSTGRES_ENGINES else "`"
+    return quote + name.replace(quote, quote * 2) + quote
+
+
+def _get_parameter_name(column_name: str) -> str:
+    return re.sub(r"\W", "_", column_name)
+
+
+#######################
+##### Rows
+#######################
+
+
+def iter_rows_from_file(fp: str, infer_types: bool = False) -> Iterator[Dict]:
+    """Read the rows of a csv (.csv) or json lines (.jsonl) file one at a time
+
+    Args:
+        fp (str)
+        infer_types (bool, optional): convert the values of csv files into numbers, booleans and nulls. Defaults to False.
+
+    Yields:
+        Iterator[Dict]: column name to value
+    """
+    if fp.endswith(".csv"):
+        with open(fp, newline="") as fh:
+            for row in csv.DictReader(fh):
+                yield {
+                    k: _infer_type(v) for k, v in row.items()
+                } if infer_types else row
+
+    elif fp.endswith(".jsonl"):
+        with open(fp) as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+    else:
+        raise Exception(f"Data file {fp} must be a .csv or .jsonl file")
+
+
+def _infer_type(value: str) -> Any:
+    if value == "":
+        return None
+
+    if _INT_REGEX.match(value):
+        return int(value)
+
+    if _FLOAT_REGEX.match(value):
+        return float(value)
+
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+
+    return value
+
+
+def to_sql_parameters(row: Dict) -> List[Dict]:
+    """Translate a row into the parameters of a Data API statement
+
+    Args:
+        row (Dict): column name to value
+
+    Returns:
+        List[Dict]: parameters
+    """
+    return [
+        {"name": _get_parameter_name(k), "value": _to_sql_value(v)}
+        for k, v in row.items()
+    ]
+
+
+def _to_sql_value(value: Any) -> Dict:
+    if value is None:
+        return {"isNull": True}
+
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+
+    if isinstance(value, int):
+        return {"longValue": value}
+
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    if isinstance(value, bytes):
+        return {"blobValue": value}
+
+    if isinstance(value, (dict, list)):
+        return {"stringValue": json.dumps(value)}
+
+    # Decimals and any other values are sent as strings and converted by the database
+
+    return {"stringValue": str(value)}
+
+
+#######################
+##### Loading
+#######################
+
+
+def execute_batches(
+    client,
+    cluster_arn: str,
+    secret_arn: str,
+    database_name: str,
+    sql: str,
+    rows: Iterable[Dict],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    callback: Callable[[load_result], None] = None,
+) -> load_result:
+    """Execute a parameterized statement for a stream of rows with concurrent `batch_execute_statement` calls
+
+    Args:
+        client: boto3 rds-data client
+        cluster_arn (str)
+        secret_arn (str)
+        database_name (str)
+        sql (str): parameterized statement
+        rows (Iterable[Dict]): column name to value
+        batch_size (int, optional): rows in each call. Defaults to DEFAULT_BATCH_SIZE.
+        max_workers (int, optional): number of concurrent calls. Defaults to DEFAULT_MAX_WORKERS.
+        callback (Callable[[load_result], None], optional): called with the running result after each batch. Defaults to None.
+
+    Returns:
+        load_result
+    """
+    rv = load_result()
+    start = time.perf_counter()
+    rows = iter(rows)
+
+    def _execute(batch: List[Dict]) -> None:
+        client.batch_execute_statement(
+            resourceArn=cluster_arn,
+            secretArn=secret_arn,
+            database=database_name,
+            sql=sql,
+            parameterSets=[to_sql_parameters(x) for x in batch],
+        )
+
+    def _complete(futures) -> None:
+        for future in futures:
+            size = in_flight.pop(future)
+            error = future.exception()
+
+            if error:
+                log.error("Failed to execute batch: %s", error)
+                rv.failed += size
+                rv.errors.append(str(error))
+            else:
+                rv.rows += size
+                rv.batches += 1
+
+            rv.seconds = time.perf_counter() - start
+
+            if callback:
+                callback(rv)
+
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+            if len(in_flight) >= 2 * max_workers:
+                # Only keep a bounded number of batches in memory
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                _complete(done)
+
+            in_flight[executor.submit(_execute, batch)] = len(batch)
+
+        _complete(list(wait(list(in_flight)).done))
+
+    rv.seconds = time.perf_counter() - start
+    return rv
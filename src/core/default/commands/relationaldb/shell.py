@@ -1,10 +1,12 @@
 import cmd
+import csv
+import json
 import readline
 import os
 
 from argparse import ArgumentParser
 from core.constructs.workspace import Workspace
-from typing import List, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 import aurora_data_api
 from rich.console import Console
@@ -14,6 +16,12 @@ from core.constructs.commands import BaseCommand
 from core.default.commands.relationaldb.utils import get_db_info_from_cdev_name
 from core.default.commands import utils as command_utils
 
+from . import load_utils
+
+
+# Number of rows fetched from the database and rendered at a time
+DEFAULT_PAGE_SIZE = 100
+
 
 class shell(BaseCommand):
     help = """
@@ -32,6 +40,23 @@ class shell(BaseCommand):
         parser.add_argument(
             "-f", "--file", nargs="+", help="execute sql commands from a file"
         )
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            help="write the results of --command to a csv (.csv) or json lines (.jsonl) file instead of the terminal",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=DEFAULT_PAGE_SIZE,
+            help="number of rows to fetch and display at a time",
+        )
+        parser.add_argument(
+            "--max-rows",
+            type=int,
+            help="largest number of rows to display for a query. In the interactive shell, rows are displayed a page at a time by default",
+        )
 
     def command(self, *args, **kwargs) -> None:
         (
@@ -43,10 +68,21 @@ class shell(BaseCommand):
 
         c_command = kwargs.get("command")
         f_command = kwargs.get("file")
+        output = kwargs.get("output")
+        self._page_size = kwargs.get("page_size") or DEFAULT_PAGE_SIZE
+        self._max_rows = kwargs.get("max_rows")
+
+        if output and c_command is None:
+            raise Exception("--output can only be used with --command")
+
         cluster_arn, secret_arn, db_name = get_db_info_from_cdev_name(
             component_name, database_name
         )
-        if c_command is not None:
+        if c_command is not None and output:
+            self.export_sql_command(
+                c_command[0], cluster_arn, secret_arn, db_name, output
+            )
+        elif c_command is not None:
             self.run_sql_command(c_command[0], cluster_arn, secret_arn, db_name)
         elif f_command is not None:
             try:
@@ -55,7 +91,7 @@ class shell(BaseCommand):
                 raise e
             sql_file = fd.read()
             fd.close()
-            sql_commands = sql_file.split(";")
+            sql_commands = load_utils.split_sql_statements(sql_file)
             self.run_multiple_sql_commands(
                 sql_commands, cluster_arn, secret_arn, db_name
             )
@@ -68,15 +104,40 @@ class shell(BaseCommand):
                 with open(history_location, "a"):
                     pass
             interactive_shell(
-                fmt(Console()), cluster_arn, secret_arn, db_name, history_location
+                fmt(Console()),
+                cluster_arn,
+                secret_arn,
+                db_name,
+                history_location,
+                page_size=self._page_size,
+                max_rows=self._max_rows,
             ).cmdloop()
 
     def run_sql_command(
         self, query_string: str, cluster_arn: str, secret_arn: str, db_name: str
     ):
         connection = db_connection(cluster_arn, secret_arn, db_name)
-        col_descriptions, rows, updated_row_cnt = connection.execute(query_string)
-        fmt(Console()).print_results(col_descriptions, rows, updated_row_cnt)
+        col_descriptions, pages, updated_row_cnt = connection.execute_paginated(
+            query_string, self._page_size
+        )
+        fmt(Console()).print_pages(
+            col_descriptions, pages, updated_row_cnt, max_rows=self._max_rows
+        )
+
+    def export_sql_command(
+        self,
+        query_string: str,
+        cluster_arn: str,
+        secret_arn: str,
+        db_name: str,
+        output: str,
+    ):
+        connection = db_connection(cluster_arn, secret_arn, db_name)
+        col_descriptions, pages, updated_row_cnt = connection.execute_paginated(
+            query_string, self._page_size
+        )
+        row_cnt = write_results(col_descriptions, pages, output)
+        self.output.print(f"Wrote {row_cnt} rows to {output}")
 
     def run_multiple_sql_commands(
         self, query_list: List, cluster_arn: str, secret_arn: str, db_name: str
@@ -117,6 +178,41 @@ class db_connection:
                 cursor._current_response.get("numberOfRecordsUpdated"),
             )
 
+    def execute_paginated(
+        self, line: str, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List, Iterator[List], Optional[int]]:
+        """Execute a statement and fetch the rows of the results a page at a time. Results that are larger than the
+        response size limit of the Data API are read through a server side cursor by `aurora_data_api`.
+
+        Args:
+            line (str): statement
+            page_size (int, optional): number of rows in each page. Defaults to DEFAULT_PAGE_SIZE.
+
+        Returns:
+            Tuple[List, Iterator[List], Optional[int]]: column descriptions, pages of rows and number of updated rows
+        """
+        cursor = self.conn.cursor()
+        cursor.arraysize = page_size
+        cursor.execute(line)
+
+        def _pages() -> Iterator[List]:
+            with cursor:
+                while True:
+                    rows = cursor.fetchmany(page_size)
+
+                    if not rows:
+                        return
+
+                    yield rows
+
+        current_response = cursor._current_response or {}
+
+        return (
+            cursor.description,
+            _pages(),
+            current_response.get("numberOfRecordsUpdated"),
+        )
+
     def begin(self) -> None:
         res = self.conn._client.begin_transaction(
             database=self._db_name,
@@ -140,21 +236,99 @@ class fmt:
     def print_results(
         self, column_descriptions: List, rows: List, updated_rows: int
     ) -> None:
-        if rows:
-            display = Table()
-
-            headers = [f"{x[0]} ({x[1].__name__})" for x in column_descriptions]
-
-            data = [[str(y) for y in x] for x in rows]
+        self.print_pages(column_descriptions, [rows], updated_rows)
 
+    def print_pages(
+        self,
+        column_descriptions: List,
+        pages: Iterable[List],
+        updated_rows: int,
+        max_rows: Optional[int] = None,
+        more: Callable[[], bool] = None,
+    ) -> int:
+        """Render the rows of the results a page at a time, so that only one page is held in memory.
+
+        Args:
+            column_descriptions (List)
+            pages (Iterable[List]): pages of rows
+            updated_rows (int)
+            max_rows (Optional[int], optional): stop after this many rows. Defaults to None.
+            more (Callable[[], bool], optional): called before each page after the first to ask whether to continue. Defaults to None.
+
+        Returns:
+            int: number of rows rendered
+        """
+        headers = None
+        row_cnt = 0
+        pages = iter(pages)
+        page = next(pages, None)
+
+        while page:
+            if max_rows is not None and row_cnt + len(page) >= max_rows:
+                page = page[: max_rows - row_cnt]
+
+            if headers is None:
+                headers = [f"{x[0]} ({x[1].__name__})" for x in column_descriptions]
+
+            display = Table(show_header=row_cnt == 0)
             [display.add_column(header=x) for x in headers]
-            [display.add_row(*x) for x in data]
+            [display.add_row(*[str(y) for y in x]) for x in page]
 
             self._console.print(display)
+            row_cnt += len(page)
+
+            if max_rows is not None and row_cnt >= max_rows:
+                if next(pages, None):
+                    self._console.print(f"Showing the first {row_cnt} rows")
+                break
+
+            page = next(pages, None)
+
+            if page and more and not more():
+                break
 
         if updated_rows:
             self._console.print(f"UPDATED {updated_rows} ROWS")
 
+        return row_cnt
+
+
+def write_results(column_descriptions: List, pages: Iterable[List], fp: str) -> int:
+    """Stream the rows of the results to a csv (.csv) or json lines (.jsonl) file
+
+    Args:
+        column_descriptions (List)
+        pages (Iterable[List]): pages of rows
+        fp (str)
+
+    Returns:
+        int: number of rows written
+    """
+    is_csv = fp.endswith(".csv")
+
+    if not is_csv and not fp.endswith(".jsonl"):
+        raise Exception(f"Output file {fp} must be a .csv or .jsonl file")
+
+    column_names = [x[0] for x in column_descriptions or []]
+    row_cnt = 0
+
+    with open(fp, "w", newline="") as fh:
+        if is_csv:
+            writer = csv.writer(fh)
+            writer.writerow(column_names)
+
+        for page in pages:
+            for row in page:
+                if is_csv:
+                    writer.writerow(row)
+                else:
+                    fh.write(json.dumps(dict(zip(column_names, row)), default=str))
+                    fh.write("\n")
+
+            row_cnt += len(page)
+
+    return row_cnt
+
 
 class interactive_shell(cmd.Cmd):
     def __init__(
@@ -164,6 +338,8 @@ class interactive_shell(cmd.Cmd):
         secret_arn: str,
         database_name: str,
         history_location: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_rows: Optional[int] = None,
     ) -> None:
         super().__init__()
         self.histfile = history_location
@@ -171,17 +347,35 @@ class interactive_shell(cmd.Cmd):
         self.prompt = f"{database_name}=> "
         self._db_connection = db_connection(cluster_arn, secret_arn, database_name)
         self.formater = fmt
+        self._page_size = page_size
+        self._max_rows = max_rows
 
     def default(self, line) -> None:
         try:
             readline.add_history(line)
             readline.insert_text(readline.get_line_buffer())
             readline.write_history_file(self.histfile)
-            col_descriptions, rows, updated_row_cnt = self._db_connection.execute(line)
-            self.formater.print_results(col_descriptions, rows, updated_row_cnt)
+            (
+                col_descriptions,
+                pages,
+                updated_row_cnt,
+            ) = self._db_connection.execute_paginated(line, self._page_size)
+            self.formater.print_pages(
+                col_descriptions,
+                pages,
+                updated_row_cnt,
+                max_rows=self._max_rows,
+                more=self._more,
+            )
         except Exception as e:
             self.formater._console.print(e)
 
+    def _more(self) -> bool:
+        answer = self.formater._console.input(
+            "-- More -- (Enter to continue, q to stop) "
+        )
+        return not answer.strip().lower().startswith("q")
+
     def do_quit(self, arg) -> bool:
         return True
 
@@ -0,0 +1,686 @@
+"""Utilities for efficiently syncing local files with a bucket
+
+Syncing is split into planning and applying. The remote objects are listed once, and each local file is compared
+with its remote object using the MD5 of the file. S3 uses the MD5 of an object as its ETag, except for objects
+that were uploaded in multiple parts. For those objects, the ETag recorded in the sync manifest after the last
+upload is used instead. Only the changed files are then uploaded on a pool of threads, and removed keys are
+deleted in batches.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+import uuid
+
+from boto3.s3.transfer import TransferConfig
+from pydantic import FilePath
+
+from core.constructs.output_manager import OutputManager
+from core.utils.cache import FileLoadableCache
+from core.utils.file_manager import safe_json_write
+from core.utils.logger import log
+
+
+SYNC_MANIFEST_LOCATION = ".cdev/intermediate/cache/s3_sync_manifest.json"
+
+DEFAULT_MAX_WORKERS = 16
+
+# Largest number of keys that can be removed with a single `delete_objects` call
+DELETE_BATCH_SIZE = 1000
+
+# Changes to more paths than this are invalidated with a single wildcard path
+MAX_INVALIDATION_PATHS = 1000
+
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def create_transfer_config(max_workers: int = DEFAULT_MAX_WORKERS) -> TransferConfig:
+    """Create the transfer configuration shared by all the transfers of a sync.
+
+    Files are already transferred concurrently, so each transfer only uses a few threads for its parts.
+
+    Args:
+        max_workers (int, optional): number of concurrent transfers. Defaults to DEFAULT_MAX_WORKERS.
+
+    Returns:
+        TransferConfig
+    """
+    return TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=max(2, 32 // max_workers),
+        use_threads=True,
+    )
+
+
+#######################
+##### Models
+#######################
+
+
+@dataclass
+class local_object:
+    fp: FilePath
+    key: str
+    content_type: str
+    size: int
+    md5: str
+
+
+@dataclass
+class transfer_item:
+    source: str
+    destination: str
+    size: int
+
+
+@dataclass
+class sync_plan:
+    uploads: List[local_object] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed_keys(self) -> List[str]:
+        return [x.key for x in self.uploads] + self.deletes
+
+
+@dataclass
+class sync_result:
+    """Result of a set of transfers. `failed` holds the destination key or path of each failed transfer and the
+    key of each failed delete."""
+
+    uploaded: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    failed: List[str] = field(default_factory=list)
+    bytes_transferred: int = 0
+    seconds: float = 0.0
+
+    def summary(self, action: str = "Uploaded") -> str:
+        throughput = self.bytes_transferred / self.seconds if self.seconds else 0
+
+        return (
+            f"{action} {self.uploaded}, deleted {self.deleted}, unchanged {self.unchanged}, failed {len(self.failed)} "
+            f"({_format_bytes(self.bytes_transferred)} in {self.seconds:.2f}s, {_format_bytes(throughput)}/s)"
+        )
+
+    def get_successful_keys(self, keys: Iterable[str]) -> List[str]:
+        """Keys that did not fail to transfer or delete
+
+        Args:
+            keys (Iterable[str])
+
+        Returns:
+            List[str]
+        """
+        failed = set(self.failed)
+        return [x for x in keys if x not in failed]
+
+
+class SyncManifest(FileLoadableCache):
+    """Implementation of FileLoadableCache that stores the objects uploaded by the sync utilities.
+
+    Entries are keyed by the bucket name and have the form {<key>: {"md5": str, "etag": str}}
+    """
+
+    def dump_to_file(self) -> None:
+        safe_json_write(self._cache_data, self.fp)
+
+    def _load_from_file(self, fp: FilePath) -> Dict:
+        if not os.path.isfile(fp):
+            return {}
+
+        try:
+            with open(fp) as fh:
+                return json.load(fh)
+        except Exception as e:
+            return {}
+
+    def get_bucket_entries(self, bucket_name: str) -> Dict[str, Dict]:
+        if not self.in_cache(bucket_name):
+            self.update_cache(bucket_name, {})
+
+        return self.get_from_cache(bucket_name)
+
+
+#######################
+##### Planning
+#######################
+
+
+def compute_md5(fp: FilePath) -> str:
+    """Compute the MD5 of a file without reading the whole file into memory
+
+    Args:
+        fp (FilePath)
+
+    Returns:
+        str: hex digest
+    """
+    md5 = hashlib.md5()
+
+    with open(fp, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_READ_CHUNK_SIZE), b""):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+def guess_content_type(fp: FilePath, default: str = "binary/octet-stream") -> str:
+    mimetype, _ = mimetypes.guess_type(fp)
+    return mimetype or default
+
+
+def create_local_object(fp: FilePath, key: str, content_type: str) -> local_object:
+    return local_object(
+        fp=fp,
+        key=key,
+        content_type=content_type,
+        size=os.path.getsize(fp),
+        md5=compute_md5(fp),
+    )
+
+
+def list_remote_objects(client, bucket_name: str, prefix: str = "") -> Dict[str, Dict]:
+    """List all the objects in a bucket under a prefix
+
+    Args:
+        client: boto3 s3 client
+        bucket_name (str)
+        prefix (str, optional): Defaults to "".
+
+    Returns:
+        Dict[str, Dict]: key to the etag and size of the object
+    """
+    rv = {}
+    paginator = client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for item in page.get("Contents", []):
+            rv[item.get("Key")] = {
+                "etag": item.get("ETag", "").strip('"'),
+                "size": item.get("Size"),
+            }
+
+    return rv
+
+
+def is_object_unchanged(
+    local: local_object, remote: Optional[Dict], manifest_entry: Optional[Dict]
+) -> bool:
+    """Compare a local file with the remote object at its key
+
+    Args:
+        local (local_object)
+        remote (Optional[Dict]): etag and size of the remote object
+        manifest_entry (Optional[Dict]): md5 and etag recorded when the object was last uploaded
+
+    Returns:
+        bool
+    """
+    if not remote or not remote.get("size") == local.size:
+        return False
+
+    if remote.get("etag") == local.md5:
+        return True
+
+    # Objects uploaded in multiple parts do not use the md5 as the etag
+    return bool(manifest_entry) and manifest_entry == {
+        "md5": local.md5,
+        "etag": remote.get("etag"),
+    }
+
+
+def plan_sync(
+    local_objects: Iterable[local_object],
+    remote_objects: Dict[str, Dict],
+    manifest_entries: Dict[str, Dict] = {},
+    delete: bool = False,
+) -> sync_plan:
+    """Determine the uploads and deletes needed to make the remote objects match the local objects
+
+    Args:
+        local_objects (Iterable[local_object])
+        remote_objects (Dict[str, Dict]): listed remote objects
+        manifest_entries (Dict[str, Dict], optional): manifest entries of the bucket. Defaults to {}.
+        delete (bool, optional): delete remote objects that do not have a local object. Defaults to False.
+
+    Returns:
+        sync_plan
+    """
+    rv = sync_plan()
+    local_keys = set()
+
+    for local in local_objects:
+        local_keys.add(local.key)
+
+        if is_object_unchanged(
+            local, remote_objects.get(local.key), manifest_entries.get(local.key)
+        ):
+            rv.unchanged += 1
+        else:
+            rv.uploads.append(local)
+
+    if delete:
+        rv.deletes = sorted(x for x in remote_objects if x not in local_keys)
+
+    return rv
+
+
+def get_prefix(path: Optional[str]) -> str:
+    """Get the prefix of the keys under a remote path when it is used as a folder
+
+    Args:
+        path (Optional[str])
+
+    Returns:
+        str: path ending in '/' or an empty string for the root of the bucket
+    """
+    path = (path or "").strip("/")
+    return f"{path}/" if path else ""
+
+
+def is_file_unchanged(fp: FilePath, remote: Dict) -> bool:
+    """Compare a local file with a remote object it would be downloaded from.
+
+    The size is always compared. The md5 is only compared when the etag of the object is its md5, because the etag of
+    objects uploaded in multiple parts can not be computed from the file.
+
+    Args:
+        fp (FilePath)
+        remote (Dict): etag and size of the remote object
+
+    Returns:
+        bool
+    """
+    if not os.path.isfile(fp) or not os.path.getsize(fp) == remote.get("size"):
+        return False
+
+    etag = remote.get("etag", "")
+    return "-" in etag or compute_md5(fp) == etag
+
+
+def plan_download(
+    remote_objects: Dict[str, Dict], prefix: str, directory: str
+) -> Tuple[List[transfer_item], int]:
+    """Determine the keys under a prefix that need to be downloaded into a directory
+
+    Args:
+        remote_objects (Dict[str, Dict]): listed remote objects
+        prefix (str): prefix of the keys, which is removed to get the relative path of each file
+        directory (str): local directory
+
+    Raises:
+        Exception: A key would be written outside of the directory
+
+    Returns:
+        Tuple[List[transfer_item], int]: downloads and number of unchanged files
+    """
+    rv = []
+    unchanged = 0
+    full_directory = os.path.abspath(directory)
+
+    for key, remote in sorted(remote_objects.items()):
+        if not key.startswith(prefix) or key.endswith("/"):
+            # Keys ending in '/' are folder markers created by the console
+            continue
+
+        fp = os.path.normpath(
+            os.path.join(full_directory, *key[len(prefix) :].split("/"))
+        )
+
+        if os.path.commonpath([full_directory, fp]) != full_directory or (
+            fp == full_directory
+        ):
+            raise Exception(
+                f"Object {key} can not be downloaded because its path is outside of {directory}"
+            )
+
+        if is_file_unchanged(fp, remote):
+            unchanged += 1
+        else:
+            rv.append(transfer_item(key, fp, remote.get("size")))
+
+    return rv, unchanged
+
+
+def plan_copy(
+    source_objects: Dict[str, Dict],
+    source_prefix: str,
+    destination_objects: Dict[str, Dict],
+    destination_prefix: str,
+) -> Tuple[List[transfer_item], int]:
+    """Determine the keys under a prefix that need to be copied to a prefix in another bucket. Objects that already
+    exist at the destination with the same size and etag are skipped.
+
+    Args:
+        source_objects (Dict[str, Dict]): listed objects of the source bucket
+        source_prefix (str)
+        destination_objects (Dict[str, Dict]): listed objects of the destination bucket
+        destination_prefix (str)
+
+    Returns:
+        Tuple[List[transfer_item], int]: copies and number of unchanged objects
+    """
+    rv = []
+    unchanged = 0
+
+    for key, remote in sorted(source_objects.items()):
+        if not key.startswith(source_prefix) or key.endswith("/"):
+            continue
+
+        destination_key = destination_prefix + key[len(source_prefix) :]
+
+        if destination_objects.get(destination_key) == remote:
+            unchanged += 1
+        else:
+            rv.append(transfer_item(key, destination_key, remote.get("size")))
+
+    return rv, unchanged
+
+
+#######################
+##### Applying
+#######################
+
+
+def upload_objects(
+    client,
+    bucket_name: str,
+    objects: List[local_object],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    transfer_config: TransferConfig = None,
+    manifest_entries: Dict[str, Dict] = None,
+    callback: Callable[[local_object, Optional[Exception]], None] = None,
+) -> sync_result:
+    """Upload a set of local objects concurrently
+
+    Args:
+        client: boto3 s3 client
+        bucket_name (str)
+        objects (List[local_object])
+        max_workers (int, optional): number of concurrent uploads. Defaults to DEFAULT_MAX_WORKERS.
+        transfer_config (TransferConfig, optional): Defaults to `create_transfer_config(max_workers)`.
+        manifest_entries (Dict[str, Dict], optional): manifest entries of the bucket to update. Defaults to None.
+        callback (Callable[[local_object, Optional[Exception]], None], optional): called after each upload. Defaults to None.
+
+    Returns:
+        sync_result
+    """
+    transfer_config = transfer_config or create_transfer_config(max_workers)
+
+    def _upload(local: local_object) -> Optional[str]:
+        client.upload_file(
+            local.fp,
+            bucket_name,
+            local.key,
+            ExtraArgs={"ContentType": local.content_type},
+            Config=transfer_config,
+        )
+
+        if local.size < transfer_config.multipart_threshold:
+            return local.md5
+
+        # Multipart uploads have an etag that is not the md5, so it is recorded for future comparisons
+        return (
+            client.head_object(Bucket=bucket_name, Key=local.key)
+            .get("ETag", "")
+            .strip('"')
+        )
+
+    def _on_success(local: local_object, etag: str) -> None:
+        if manifest_entries is not None:
+            manifest_entries[local.key] = {"md5": local.md5, "etag": etag}
+
+    return _run_transfers(
+        _upload, objects, max_workers, lambda x: x.key, _on_success, callback
+    )
+
+
+def download_objects(
+    client,
+    bucket_name: str,
+    items: List[transfer_item],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    transfer_config: TransferConfig = None,
+    callback: Callable[[transfer_item, Optional[Exception]], None] = None,
+) -> sync_result:
+    """Download a set of keys concurrently
+
+    Args:
+        client: boto3 s3 client
+        bucket_name (str)
+        items (List[transfer_item]): keys and the local file paths to download them to
+        max_workers (int, optional): number of concurrent downloads. Defaults to DEFAULT_MAX_WORKERS.
+        transfer_config (TransferConfig, optional): Defaults to `create_transfer_config(max_workers)`.
+        callback (Callable[[transfer_item, Optional[Exception]], None], optional): called after each download. Defaults to None.
+
+    Returns:
+        sync_result
+    """
+    transfer_config = transfer_config or create_transfer_config(max_workers)
+
+    def _download(item: transfer_item) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(item.destination)), exist_ok=True)
+        client.download_file(
+            bucket_name, item.source, item.destination, Config=transfer_config
+        )
+
+    return _run_transfers(
+        _download, items, max_workers, lambda x: x.destination, callback=callback
+    )
+
+
+def copy_objects(
+    client,
+    source_bucket_name: str,
+    destination_bucket_name: str,
+    items: List[transfer_item],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    transfer_config: TransferConfig = None,
+    callback: Callable[[transfer_item, Optional[Exception]], None] = None,
+) -> sync_result:
+    """Copy a set of keys between buckets concurrently. The objects are copied by S3 without being transferred
+    through the local machine.
+
+    Args:
+        client: boto3 s3 client
+        source_bucket_name (str)
+        destination_bucket_name (str)
+        items (List[transfer_item]): source and destination keys
+        max_workers (int, optional): number of concurrent copies. Defaults to DEFAULT_MAX_WORKERS.
+        transfer_config (TransferConfig, optional): Defaults to `create_transfer_config(max_workers)`.
+        callback (Callable[[transfer_item, Optional[Exception]], None], optional): called after each copy. Defaults to None.
+
+    Returns:
+        sync_result
+    """
+    transfer_config = transfer_config or create_transfer_config(max_workers)
+
+    def _copy(item: transfer_item) -> None:
+        client.copy(
+            {"Bucket": source_bucket_name, "Key": item.source},
+            destination_bucket_name,
+            item.destination,
+            Config=transfer_config,
+        )
+
+    return _run_transfers(
+        _copy, items, max_workers, lambda x: x.destination, callback=callback
+    )
+
+
+def _run_transfers(
+    transfer: Callable,
+    items: List,
+    max_workers: int,
+    get_name: Callable[[object], str],
+    on_success: Callable = None,
+    callback: Callable = None,
+) -> sync_result:
+    rv = sync_result()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(transfer, x): x for x in items}
+
+        for future in as_completed(futures):
+            item = futures.get(future)
+            error = future.exception()
+
+            if error:
+                log.error("Failed to transfer %s: %s", get_name(item), error)
+                rv.failed.append(get_name(item))
+
+            else:
+                rv.uploaded += 1
+                rv.bytes_transferred += item.size
+
+                if on_success:
+                    on_success(item, future.result())
+
+            if callback:
+                callback(item, error)
+
+    rv.seconds = time.perf_counter() - start
+    return rv
+
+
+def delete_keys(
+    client,
+    bucket_name: str,
+    keys: List[str],
+    manifest_entries: Dict[str, Dict] = None,
+) -> List[str]:
+    """Delete a set of keys in batches
+
+    Args:
+        client: boto3 s3 client
+        bucket_name (str)
+        keys (List[str])
+        manifest_entries (Dict[str, Dict], optional): manifest entries of the bucket to update. Defaults to None.
+
+    Returns:
+        List[str]: keys that could not be deleted
+    """
+    failed = []
+
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[i : i + DELETE_BATCH_SIZE]
+
+        response = client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": x} for x in batch], "Quiet": True},
+        )
+
+        batch_failed = [x.get("Key") for x in response.get("Errors", [])]
+
+        for error in response.get("Errors", []):
+            log.error("Failed to delete %s: %s", error.get("Key"), error.get("Message"))
+
+        failed.extend(batch_failed)
+
+        if manifest_entries is not None:
+            for key in batch:
+                if key not in batch_failed:
+                    manifest_entries.pop(key, None)
+
+    return failed
+
+
+def apply_sync_plan(
+    client,
+    bucket_name: str,
+    plan: sync_plan,
+    manifest: SyncManifest,
+    output: OutputManager,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> sync_result:
+    """Upload and delete the objects of a sync plan, record them in the manifest and print a summary
+
+    Args:
+        client: boto3 s3 client
+        bucket_name (str)
+        plan (sync_plan)
+        manifest (SyncManifest): manifest the plan was made with
+        output (OutputManager): prints each transfer and the summary
+        max_workers (int, optional): number of concurrent uploads. Defaults to DEFAULT_MAX_WORKERS.
+
+    Returns:
+        sync_result
+    """
+    manifest_entries = manifest.get_bucket_entries(bucket_name)
+
+    def _print_upload(local: local_object, error: Exception) -> None:
+        if error:
+            output.print(f"Failed to upload {local.fp}: {error}")
+        else:
+            output.print(f"{local.fp} -> {local.key} ({local.content_type})")
+
+    result = upload_objects(
+        client,
+        bucket_name,
+        plan.uploads,
+        max_workers=max_workers,
+        manifest_entries=manifest_entries,
+        callback=_print_upload,
+    )
+
+    for key in plan.deletes:
+        output.print(f"Deleting {key}")
+
+    failed_deletes = delete_keys(client, bucket_name, plan.deletes, manifest_entries)
+    result.deleted = len(plan.deletes) - len(failed_deletes)
+    result.failed.extend(failed_deletes)
+    result.unchanged = plan.unchanged
+
+    manifest.dump_to_file()
+    output.print(result.summary())
+
+    return result
+
+
+def invalidate_keys(client, distribution_id: str, keys: Iterable[str]) -> Optional[str]:
+    """Create a CloudFront invalidation for the paths of a set of changed keys
+
+    Args:
+        client: boto3 cloudfront client
+        distribution_id (str)
+        keys (Iterable[str]): changed keys
+
+    Returns:
+        Optional[str]: id of the invalidation or None if there were no keys
+    """
+    paths = sorted(set("/" + quote(x) for x in keys))
+
+    if not paths:
+        return None
+
+    if len(paths) > MAX_INVALIDATION_PATHS:
+        paths = ["/*"]
+
+    response = client.create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": paths},
+            "CallerReference": str(uuid.uuid4()),
+        },
+    )
+
+    return response.get("Invalidation", {}).get("Id")
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+
+        value = value / 1024
+
+    return f"{value:.1f} TB"
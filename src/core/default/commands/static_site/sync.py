@@ -4,15 +4,16 @@ from argparse import ArgumentParser
 import boto3
 import os
 import mimetypes
+from typing import Iterable, List, Set, Tuple
 
-from pydantic import FilePath
+from pydantic import DirectoryPath, FilePath
 
 from core.constructs.commands import BaseCommand
 from core.default.resources.simple.static_site import (
     simple_static_site_model,
 )
 from core.utils.paths import get_full_path_from_workspace_base
-from core.default.commands import utils as command_utils
+from core.default.commands import s3_utils, utils as command_utils
 
 from core.default.commands.static_site.watcher import StaticSiteWatcher
 
@@ -43,6 +44,17 @@ class sync_files(BaseCommand):
             action="store_true",
             help="If set, preserve the .html extension for objects.",
         )
+        parser.add_argument(
+            "--no-delete",
+            action="store_true",
+            help="Do not delete objects from the bucket that no longer exist in the content folder.",
+        )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=s3_utils.DEFAULT_MAX_WORKERS,
+            help="Number of files to upload concurrently.",
+        )
         parser.add_argument(
             "--keep-in-sync",
             action="store_true",
@@ -79,6 +91,8 @@ class sync_files(BaseCommand):
         self._watch_files = kwargs.get("watch")
         self._no_default = kwargs.get("no-default")
         self._no_prompt = kwargs.get("disable-prompt")
+        self._no_delete = kwargs.get("no_delete")
+        self._max_workers = kwargs.get("max_workers") or s3_utils.DEFAULT_MAX_WORKERS
 
     def _perform_deployment(self, resource_name: str) -> None:
         (
@@ -93,66 +107,264 @@ class sync_files(BaseCommand):
             component_name, RUUID, static_site_name
         )
 
-        index_document = resource.index_document
-        error_document = resource.error_document
         final_dir = self._get_final_directory(resource)
 
-        s3 = boto3.resource("s3")
-
         # bucket_name isn't optional
         bucket_name = cloud_output["bucket_name"]
-        bucket = s3.Bucket(bucket_name)
+        s3_client = boto3.client("s3")
 
         if self._clear_bucket_first:
-            bucket.object_versions.delete()
+            boto3.resource("s3").Bucket(bucket_name).object_versions.delete()
+
+        manifest = s3_utils.SyncManifest(s3_utils.SYNC_MANIFEST_LOCATION)
+        manifest_entries = manifest.get_bucket_entries(bucket_name)
 
+        local_objects = []
         for subdir, dirs, files in os.walk(final_dir):
             for file in files:
                 full_path = os.path.join(subdir, file)
-                potential_key_name = os.path.relpath(full_path, final_dir)
-
-                if (
-                    potential_key_name == index_document
-                    or potential_key_name == error_document
-                ):
-                    # We want to always preserve the index and error documents if they are available
-                    mimetype, _ = mimetypes.guess_type(full_path)
-                    key_name = potential_key_name
-
-                elif (not self._preserve_html) and file.split(".")[1] == "html":
-                    mimetype = "text/html"
-                    # remove the .html file handle to make the url prettier
-                    key_name = potential_key_name[:-5]
-
-                else:
-                    mimetype, _ = mimetypes.guess_type(full_path)
-                    key_name = potential_key_name
-
-                if mimetype is None:
-                    mimetype = "text"
-                self.output.print(f"{full_path} -> {key_name} ({mimetype})")
-                bucket.upload_file(
-                    full_path, key_name, ExtraArgs={"ContentType": mimetype}
+                key_name, mimetype = self._get_key_and_mimetype(
+                    full_path, final_dir, resource
                 )
+                local_objects.append(
+                    s3_utils.create_local_object(full_path, key_name, mimetype)
+                )
+
+        plan = s3_utils.plan_sync(
+            local_objects,
+            s3_utils.list_remote_objects(s3_client, bucket_name),
+            manifest_entries,
+            delete=not self._no_delete,
+        )
+
+        result = s3_utils.apply_sync_plan(
+            s3_client,
+            bucket_name,
+            plan,
+            manifest,
+            self.output,
+            max_workers=self._max_workers,
+        )
+
+        self._invalidate_keys(
+            cloud_output,
+            result.get_successful_keys(plan.changed_keys),
+            resource,
+        )
+
+    def _get_key_and_mimetype(
+        self,
+        full_path: FilePath,
+        final_dir: DirectoryPath,
+        resource: simple_static_site_model,
+    ) -> Tuple[str, str]:
+        """Get the key and content type of a file in the content folder
+
+        Args:
+            full_path (FilePath): path of the file
+            final_dir (DirectoryPath): content folder
+            resource (simple_static_site_model): static site
+
+        Returns:
+            Tuple[str, str]: key and mimetype
+        """
+        potential_key_name = os.path.relpath(full_path, final_dir).replace(os.sep, "/")
+
+        if (
+            potential_key_name == resource.index_document
+            or potential_key_name == resource.error_document
+        ):
+            # We want to always preserve the index and error documents if they are available
+            mimetype, _ = mimetypes.guess_type(full_path)
+            key_name = potential_key_name
+
+        elif (not self._preserve_html) and os.path.splitext(full_path)[1] == ".html":
+            mimetype = "text/html"
+            # remove the .html file handle to make the url prettier
+            key_name = potential_key_name[:-5]
+
+        else:
+            mimetype, _ = mimetypes.guess_type(full_path)
+            key_name = potential_key_name
+
+        if mimetype is None:
+            mimetype = "text"
+
+        return key_name, mimetype
+
+    def _invalidate_keys(
+        self, cloud_output: dict, keys: List[str], resource: simple_static_site_model
+    ) -> None:
+        """Invalidate the cached version of the changed keys in the CDN
+
+        Args:
+            cloud_output (dict): cloud output of the static site
+            keys (List[str]): changed keys
+            resource (simple_static_site_model): static site
+        """
+        cloudfront_id = cloud_output.get("cloudfront_id")
+
+        if not cloudfront_id or not keys:
+            return
+
+        if resource.index_document in keys:
+            # The index document is also served at the root of the site
+            keys = [*keys, ""]
+
+        s3_utils.invalidate_keys(boto3.client("cloudfront"), cloudfront_id, keys)
+        self.output.print(f"Invalidated {len(keys)} path(s) in the CDN")
+
+    def _perform_incremental_deployment(
+        self,
+        resource: simple_static_site_model,
+        cloud_output: dict,
+        final_dir: DirectoryPath,
+        changed_paths: Iterable[str],
+        deleted_paths: Iterable[str],
+    ) -> None:
+        """Upload and delete only the objects of a set of changed paths in the content folder.
+
+        The keys and mimetypes follow the same rules as a full sync. Files whose md5 matches the manifest entry of
+        their key are skipped, and all the changed keys are invalidated in the CDN with a single invalidation.
+
+        Args:
+            resource (simple_static_site_model): static site
+            cloud_output (dict): cloud output of the static site
+            final_dir (DirectoryPath): content folder
+            changed_paths (Iterable[str]): full paths of created or modified files or directories
+            deleted_paths (Iterable[str]): full paths of deleted files or directories
+        """
+        bucket_name = cloud_output["bucket_name"]
+        s3_client = boto3.client("s3")
+
+        manifest = s3_utils.SyncManifest(s3_utils.SYNC_MANIFEST_LOCATION)
+        manifest_entries = manifest.get_bucket_entries(bucket_name)
+
+        uploads = []
+        unchanged = 0
+        for full_path in self._expand_changed_paths(changed_paths):
+            key_name, mimetype = self._get_key_and_mimetype(
+                full_path, final_dir, resource
+            )
+            local = s3_utils.create_local_object(full_path, key_name, mimetype)
+
+            if manifest_entries.get(key_name, {}).get("md5") == local.md5:
+                unchanged += 1
+            else:
+                uploads.append(local)
+
+        upload_keys = set(x.key for x in uploads)
+        deletes = sorted(
+            x
+            for x in self._get_deleted_keys(
+                deleted_paths, final_dir, resource, manifest_entries
+            )
+            if x not in upload_keys
+        )
+
+        plan = s3_utils.sync_plan(uploads=uploads, deletes=deletes, unchanged=unchanged)
+        result = s3_utils.apply_sync_plan(
+            s3_client,
+            bucket_name,
+            plan,
+            manifest,
+            self.output,
+            max_workers=self._max_workers,
+        )
+
+        self._invalidate_keys(
+            cloud_output,
+            result.get_successful_keys(plan.changed_keys),
+            resource,
+        )
+
+    def _expand_changed_paths(self, changed_paths: Iterable[str]) -> List[str]:
+        """Get the files of a set of changed paths. A directory that was moved into the content folder only has an
+        event for the directory itself, so all the files in it are included.
+
+        Args:
+            changed_paths (Iterable[str])
+
+        Returns:
+            List[str]: full paths of the existing files
+        """
+        rv = []
+        for changed_path in sorted(changed_paths):
+            if os.path.isdir(changed_path):
+                for subdir, dirs, files in os.walk(changed_path):
+                    rv.extend(os.path.join(subdir, x) for x in files)
+
+            elif os.path.isfile(changed_path):
+                rv.append(changed_path)
+
+        return rv
+
+    def _get_deleted_keys(
+        self,
+        deleted_paths: Iterable[str],
+        final_dir: DirectoryPath,
+        resource: simple_static_site_model,
+        manifest_entries: dict,
+    ) -> Set[str]:
+        """Get the keys of a set of deleted paths. The event of a deleted directory does not say what files were in
+        it, so the keys under the directory are found in the manifest.
+
+        Args:
+            deleted_paths (Iterable[str])
+            final_dir (DirectoryPath): content folder
+            resource (simple_static_site_model): static site
+            manifest_entries (dict): manifest entries of the bucket
+
+        Returns:
+            Set[str]: keys to delete
+        """
+        rv = set()
+        for deleted_path in deleted_paths:
+            if os.path.exists(deleted_path):
+                # Recreated before the sync started
+                continue
+
+            key_name, _ = self._get_key_and_mimetype(deleted_path, final_dir, resource)
+            rv.add(key_name)
+
+            directory_prefix = (
+                os.path.relpath(deleted_path, final_dir).replace(os.sep, "/") + "/"
+            )
+            rv.update(x for x in manifest_entries if x.startswith(directory_prefix))
+
+        return rv
 
     def _watch_filesystem(self) -> None:
         """
-        Watch for filesystem changes
+        Watch for filesystem changes and sync only the changed files
         """
         (
             component_name,
             static_site_name,
-        ) = self.get_component_and_resource_from_qualified_name(self._resource_name)
+        ) = command_utils.get_component_and_resource_from_qualified_name(
+            self._resource_name
+        )
 
         resource: simple_static_site_model = command_utils.get_resource_from_cdev_name(
             component_name, RUUID, static_site_name
         )
+        cloud_output = command_utils.get_cloud_output_from_cdev_name(
+            component_name, RUUID, static_site_name
+        )
         final_dir = self._get_final_directory(resource)
 
+        def _deploy_changes(changed_paths: Set[str], deleted_paths: Set[str]) -> None:
+            try:
+                self._perform_incremental_deployment(
+                    resource, cloud_output, final_dir, changed_paths, deleted_paths
+                )
+            except Exception as e:
+                self.output.print(f"Failed to sync changes: {e}")
+
         try:
             static_site_watcher = StaticSiteWatcher(
                 final_dir,
-                deployment_function=self._perform_deployment,
+                deployment_function=_deploy_changes,
                 no_prompt=self._no_prompt,
                 no_default=self._no_default,
                 patterns_to_watch=self._watch_files,
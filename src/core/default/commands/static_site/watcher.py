@@ -1,94 +1,48 @@
-import time
-from typing import Optional, Callable
+from typing import Callable, Optional, Set
 
 from pydantic import FilePath
-from watchdog.tricks import Trick
 
 from core.constructs.output_manager import OutputManager
-from watchdog.observers import Observer
+from core.utils.debounced_watcher import DebouncedWatcher
 
 
-class StaticSiteWatcher(Trick):
-    """Executes some commands in response to modified files."""
+class StaticSiteWatcher(DebouncedWatcher):
+    """Executes some commands in response to modified files.
+
+    The deployment function is called with only the changed and deleted paths of each burst of events, so that the
+    files can be uploaded or deleted individually instead of syncing the whole site.
+    """
 
     _default_patterns_to_watch = ["*.html", "*.js", "*.jpg", "*.png"]
     _default_patterns_to_ignore = [".cdev/**", "__pycache__/*", "*.py"]
+    _watching_message = "Watching for changes in the static site..."
 
     def __init__(
         self,
         base_folder: FilePath,
-        deployment_function: Callable,
+        deployment_function: Callable[[Set[str], Set[str]], None],
         no_prompt: Optional[bool] = False,
         no_default: Optional[bool] = False,
         patterns_to_watch: Optional[str] = None,
         patterns_to_ignore: Optional[str] = None,
-        output: "Console" = None,
+        output: OutputManager = None,
+        debounce_seconds: Optional[float] = 0.2,
     ) -> None:
 
-        self._base_folder = base_folder
         self._deployment_function = deployment_function
         self._no_prompt = no_prompt
-        self._output = output
-        self._observer = None
-        self._perform_deployment = False
-
-        all_patterns_to_watch = None
-        if patterns_to_watch:
-            all_patterns_to_watch = patterns_to_watch.split(",")
-
-        if not no_default:
-            if all_patterns_to_watch:
-                all_patterns_to_watch += self._default_patterns_to_watch
-            else:
-                all_patterns_to_watch = self._default_patterns_to_watch
-
-        all_patterns_to_ignore = None
-        if patterns_to_ignore:
-            all_patterns_to_ignore = patterns_to_ignore.split(",")
-
-        if not no_default:
-            if all_patterns_to_ignore:
-                all_patterns_to_ignore += self._default_patterns_to_ignore
-            else:
-                all_patterns_to_ignore = self._default_patterns_to_ignore
 
         super().__init__(
-            patterns=all_patterns_to_watch,
-            ignore_patterns=all_patterns_to_ignore,
-            ignore_directories=False,
+            base_folder,
+            output=output,
+            no_default=no_default,
+            patterns_to_watch=patterns_to_watch,
+            patterns_to_ignore=patterns_to_ignore,
+            debounce_seconds=debounce_seconds,
         )
 
-    def watch(self) -> None:
-        self._output.write("Watching for changes in the static site...")
-        # Prevent multiples observers
-        self._stop()
-
-        self._observer = Observer()
-        self._observer.schedule(self, self._base_folder, recursive=True)
-        self._observer.start()
-        try:
-            while True:
-                if self._perform_deployment:
-                    self._deploy_static_files()
-                    self._perform_deployment = False
-                else:
-                    time.sleep(1)
-        except KeyboardInterrupt:
-            self._stop()
-
-    def on_any_event(self, event):
-        self._perform_deployment = True
-
-    def _stop(self) -> None:
-        if not self._observer:
-            return
-
-        observer = self._observer
-        self._observer = None
-        observer.stop()
-        observer.join()
-
-    def _deploy_static_files(self):
-        self._output.write("Ignoring future changes until deployment is finished")
-        self._deployment_function()
-        self._output.write("Enabling watch again")
+    def _handle_changes(self, changed_paths: Set[str], deleted_paths: Set[str]) -> None:
+        self._output.print(
+            f"Syncing {len(changed_paths)} changed and {len(deleted_paths)} deleted path(s). Changes made during the sync will be synced after it finishes"
+        )
+        self._deployment_function(changed_paths, deleted_paths)
@@ -0,0 +1,475 @@
+"""Utilities for reading and writing large numbers of items in a table
+
+Items are written with `batch_write_item` in batches of the largest size DynamoDB allows. Batches are written
+concurrently by a pool of threads, and items that DynamoDB does not process because of throttling are retried with
+an exponential backoff. Input files are read one item at a time, and only a bounded number of batches are waiting
+to be written at any time, so files larger than memory can be loaded.
+
+Tables are read with a parallel scan, where each thread scans one segment of the table. An optional rate limiter
+shared by all the threads keeps the total throughput under a given number of items per second.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.utils.logger import log
+
+
+# Largest number of requests in a single `batch_write_item` call
+BATCH_WRITE_SIZE = 25
+
+DEFAULT_MAX_WORKERS = 8
+
+DEFAULT_MAX_RETRIES = 8
+
+DEFAULT_TOTAL_SEGMENTS = 8
+
+_BASE_BACKOFF_SECONDS = 0.05
+_MAX_BACKOFF_SECONDS = 5.0
+
+
+#######################
+##### Models
+#######################
+
+
+@dataclass
+class batch_result:
+    processed: int = 0
+    failed: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.processed / self.seconds if self.seconds else 0
+
+    def summary(self, action: str = "Wrote") -> str:
+        return (
+            f"{action} {self.processed} items, failed {self.failed}, retried {self.retries} batches "
+            f"({self.seconds:.2f}s, {self.rate:.0f} items/s)"
+        )
+
+
+#######################
+##### Reading
+#######################
+
+
+def iter_items_from_file(fp: str) -> Iterator[Dict]:
+    """Read the items of a data file one at a time.
+
+    Files ending in '.jsonl' have one item per line. Other files are json documents with the items in an 'items'
+    key. These are streamed with `ijson` when it is installed, and loaded into memory otherwise.
+
+    Args:
+        fp (str)
+
+    Raises:
+        Exception: a json document does not contain the 'items' key
+
+    Yields:
+        Iterator[Dict]: items
+    """
+    if fp.endswith(".jsonl"):
+        with open(fp) as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+        return
+
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson:
+        with open(fp, "rb") as fh:
+            yield from ijson.items(fh, "items.item")
+
+        return
+
+    log.debug("ijson is not installed so %s is loaded into memory", fp)
+
+    with open(fp) as fh:
+        data = json.load(fh)
+
+    if "items" not in data:
+        raise Exception(f"Loaded data from {fp} does not contain the 'items' key")
+
+    yield from data.get("items")
+
+
+def batched(values: Iterable, size: int) -> Iterator[List]:
+    batch = []
+
+    for value in values:
+        batch.append(value)
+
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+#######################
+##### Writing
+#######################
+
+
+class RateLimiter:
+    """Token bucket shared by threads to limit the number of items processed per second.
+
+    A thread that takes more tokens than are available reserves them and sleeps until they would have been refilled,
+    so waiting threads are served in the order they arrived.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            rate (float): items per second
+            burst (Optional[float], optional): largest number of unused tokens that are kept. Defaults to one second of items.
+            clock (Callable[[], float], optional): Defaults to time.monotonic.
+            sleep (Callable[[float], None], optional): Defaults to time.sleep.
+        """
+        self._rate = rate
+        self._burst = burst if burst is not None else rate
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self._burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> None:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= amount
+            wait_seconds = -self._tokens / self._rate if self._tokens < 0 else 0
+
+        if wait_seconds:
+            self._sleep(wait_seconds)
+
+
+def write_batch(
+    client,
+    table_name: str,
+    requests: List[Dict],
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Write a batch of requests, retrying the unprocessed items with an exponential backoff with jitter.
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        requests (List[Dict]): 'PutRequest' or 'DeleteRequest' write requests
+        max_retries (int, optional): Defaults to DEFAULT_MAX_RETRIES.
+        sleep (Callable[[float], None], optional): Defaults to time.sleep.
+
+    Raises:
+        Exception: the items were still unprocessed after the max retries
+
+    Returns:
+        int: number of retries
+    """
+    for attempt in range(max_retries + 1):
+        response = client.batch_write_item(RequestItems={table_name: requests})
+        requests = response.get("UnprocessedItems", {}).get(table_name)
+
+        if not requests:
+            return attempt
+
+        if attempt < max_retries:
+            sleep(
+                random.uniform(
+                    0,
+                    min(_MAX_BACKOFF_SECONDS, _BASE_BACKOFF_SECONDS * 2**attempt),
+                )
+            )
+
+    raise Exception(
+        f"{len(requests)} items were still unprocessed after {max_retries} retries"
+    )
+
+
+def write_requests(
+    client,
+    table_name: str,
+    requests: Iterable[Dict],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    callback: Callable[[batch_result], None] = None,
+) -> batch_result:
+    """Write a stream of requests in batches on a pool of threads
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        requests (Iterable[Dict]): 'PutRequest' or 'DeleteRequest' write requests
+        max_workers (int, optional): number of concurrent batches. Defaults to DEFAULT_MAX_WORKERS.
+        max_retries (int, optional): retries for unprocessed items of each batch. Defaults to DEFAULT_MAX_RETRIES.
+        callback (Callable[[batch_result], None], optional): called with the running result after each batch. Defaults to None.
+
+    Returns:
+        batch_result
+    """
+    rv = batch_result()
+    start = time.perf_counter()
+
+    def _complete(futures) -> None:
+        for future in futures:
+            size = in_flight.pop(future)
+            error = future.exception()
+
+            if error:
+                log.error("Failed to write batch to %s: %s", table_name, error)
+                rv.failed += size
+                rv.errors.append(str(error))
+            else:
+                rv.processed += size
+                rv.retries += future.result()
+
+            rv.seconds = time.perf_counter() - start
+
+            if callback:
+                callback(rv)
+
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in batched(requests, BATCH_WRITE_SIZE):
+            if len(in_flight) >= 2 * max_workers:
+                # Only keep a bounded number of batches in memory
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                _complete(done)
+
+            future = executor.submit(
+                write_batch, client, table_name, batch, max_retries
+            )
+            in_flight[future] = len(batch)
+
+        _complete(list(wait(list(in_flight)).done))
+
+    rv.seconds = time.perf_counter() - start
+    return rv
+
+
+#######################
+##### Scanning
+#######################
+
+
+def scan_segment(
+    client,
+    table_name: str,
+    segment: int,
+    total_segments: int,
+    exclusive_start_key: Optional[Dict] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    **scan_args,
+) -> Iterator[Tuple[List[Dict], Optional[Dict]]]:
+    """Scan a segment of a table page by page
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        segment (int)
+        total_segments (int)
+        exclusive_start_key (Optional[Dict], optional): key to continue a previous scan from. Defaults to None.
+        rate_limiter (Optional[RateLimiter], optional): limiter that each page of items is taken from. Defaults to None.
+        scan_args: additional arguments for `scan`
+
+    Yields:
+        Iterator[Tuple[List[Dict], Optional[Dict]]]: items of each page and the key to continue the scan from, which
+        is None after the last page
+    """
+    args = {
+        "TableName": table_name,
+        "Segment": segment,
+        "TotalSegments": total_segments,
+        **scan_args,
+    }
+
+    if exclusive_start_key:
+        args["ExclusiveStartKey"] = exclusive_start_key
+
+    while True:
+        response = client.scan(**args)
+        items = response.get("Items", [])
+
+        if rate_limiter and items:
+            rate_limiter.acquire(len(items))
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        yield items, last_evaluated_key
+
+        if not last_evaluated_key:
+            return
+
+        args["ExclusiveStartKey"] = last_evaluated_key
+
+
+def parallel_scan(
+    client,
+    table_name: str,
+    process_page: Callable[[int, List[Dict], Optional[Dict]], None],
+    total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+    start_keys: Optional[Dict[int, Optional[Dict]]] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    segments: Optional[Iterable[int]] = None,
+    **scan_args,
+) -> None:
+    """Scan the segments of a table concurrently, with one thread per segment
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        process_page (Callable[[int, List[Dict], Optional[Dict]], None]): called from the thread of a segment with the
+            segment, the items of a page and the key to continue the scan from
+        total_segments (int, optional): Defaults to DEFAULT_TOTAL_SEGMENTS.
+        start_keys (Optional[Dict[int, Optional[Dict]]], optional): segment to the key to continue its scan from.
+            Segments that are not included are scanned from the start. Defaults to None.
+        rate_limiter (Optional[RateLimiter], optional): Defaults to None.
+        segments (Optional[Iterable[int]], optional): segments to scan. Defaults to all the segments.
+        scan_args: additional arguments for `scan`
+    """
+    start_keys = start_keys or {}
+    segments = list(range(total_segments)) if segments is None else list(segments)
+
+    if not segments:
+        return
+
+    def _scan(segment: int) -> None:
+        for items, last_evaluated_key in scan_segment(
+            client,
+            table_name,
+            segment,
+            total_segments,
+            start_keys.get(segment),
+            rate_limiter,
+            **scan_args,
+        ):
+            process_page(segment, items, last_evaluated_key)
+
+    with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+        for future in [executor.submit(_scan, x) for x in segments]:
+            # Raise any error of the segments
+            future.result()
+
+
+def delete_items(
+    client,
+    table_name: str,
+    key_names: List[str],
+    total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    callback: Callable[[batch_result], None] = None,
+) -> batch_result:
+    """Delete all the items of a table. Each segment of a parallel scan deletes the keys of its pages with its own
+    batches.
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        key_names (List[str]): names of the key attributes of the table
+        total_segments (int, optional): Defaults to DEFAULT_TOTAL_SEGMENTS.
+        rate_limiter (Optional[RateLimiter], optional): Defaults to None.
+        max_retries (int, optional): retries for unprocessed items of each batch. Defaults to DEFAULT_MAX_RETRIES.
+        callback (Callable[[batch_result], None], optional): called with the aggregated result after each page. Defaults to None.
+
+    Returns:
+        batch_result
+    """
+    rv = batch_result()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def _delete_page(segment: int, items: List[Dict], _) -> None:
+        processed = 0
+        failed = 0
+        retries = 0
+        errors = []
+
+        for batch in batched(items, BATCH_WRITE_SIZE):
+            # A failed batch is counted instead of stopping the scan of every segment
+            try:
+                retries += write_batch(
+                    client,
+                    table_name,
+                    [{"DeleteRequest": {"Key": x}} for x in batch],
+                    max_retries,
+                )
+                processed += len(batch)
+            except Exception as e:
+                log.error("Failed to delete batch from %s: %s", table_name, e)
+                failed += len(batch)
+                errors.append(str(e))
+
+        with lock:
+            rv.processed += processed
+            rv.failed += failed
+            rv.retries += retries
+            rv.errors.extend(errors)
+            rv.seconds = time.perf_counter() - start
+
+            if callback:
+                callback(rv)
+
+    parallel_scan(
+        client,
+        table_name,
+        _delete_page,
+        total_segments,
+        rate_limiter=rate_limiter,
+        # Only retrieve the keys for each item in the table (minimize data transfer)
+        # The placeholders are indexed because key names can have characters that are not valid in a placeholder
+        ProjectionExpression=", ".join(f"#k{i}" for i in range(len(key_names))),
+        ExpressionAttributeNames={f"#k{i}": key for i, key in enumerate(key_names)},
+    )
+
+    rv.seconds = time.perf_counter() - start
+    return rv
+
+
+class ProgressPrinter:
+    """Callback for the batch utilities that prints the progress at most once per interval"""
+
+    def __init__(
+        self,
+        print_function: Callable[[str], None],
+        interval: float = 1.0,
+        action: str = "Wrote",
+    ) -> None:
+        self._print_function = print_function
+        self._interval = interval
+        self._action = action
+        self._last_print: Optional[float] = None
+
+    def __call__(self, result: batch_result) -> None:
+        now = time.perf_counter()
+
+        if self._last_print is not None and now - self._last_print < self._interval:
+            return
+
+        self._last_print = now
+        self._print_function(
+            f"{self._action} {result.processed} items ({result.rate:.0f} items/s)"
+        )
@@ -5,6 +5,8 @@ from argparse import ArgumentParser
 from core.constructs.commands import BaseCommand
 from core.default.commands import utils as command_utils
 
+from . import batch_utils
+
 
 RUUID = "cdev::simple::table"
 
@@ -19,6 +21,17 @@ Clear the current data from a given Table. This should only be used on developme
         parser.add_argument(
             "resource_name", type=str, help="The resource you want to sync data to"
         )
+        parser.add_argument(
+            "--segments",
+            type=int,
+            default=batch_utils.DEFAULT_TOTAL_SEGMENTS,
+            help="Number of segments of the table to scan and delete concurrently.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="Largest number of items to delete per second across all segments.",
+        )
 
     def command(self, *args, **kwargs) -> None:
         """
@@ -44,30 +57,15 @@ Clear the current data from a given Table. This should only be used on developme
         # get the table keys
         tableKeyNames = [key.get("AttributeName") for key in table.key_schema]
 
-        # Only retrieve the keys for each item in the table (minimize data transfer)
-        projectionExpression = ", ".join("#" + key for key in tableKeyNames)
-        expressionAttrNames = {"#" + key: key for key in tableKeyNames}
+        rate = kwargs.get("rate")
 
-        counter = 0
-        page = table.scan(
-            ProjectionExpression=projectionExpression,
-            ExpressionAttributeNames=expressionAttrNames,
+        result = batch_utils.delete_items(
+            boto3.client("dynamodb"),
+            table_cloud_name,
+            tableKeyNames,
+            total_segments=kwargs.get("segments") or batch_utils.DEFAULT_TOTAL_SEGMENTS,
+            rate_limiter=batch_utils.RateLimiter(rate) if rate else None,
+            callback=batch_utils.ProgressPrinter(self.output.print, action="Deleted"),
         )
-        with table.batch_writer() as batch:
-            while page["Count"] > 0:
-                counter += page["Count"]
-                # Delete items in batches
-                for itemKeys in page["Items"]:
-                    self.output.print(f"Removing item {itemKeys}")
-                    batch.delete_item(Key=itemKeys)
-                # Fetch the next page
-                if "LastEvaluatedKey" in page:
-                    page = table.scan(
-                        ProjectionExpression=projectionExpression,
-                        ExpressionAttributeNames=expressionAttrNames,
-                        ExclusiveStartKey=page["LastEvaluatedKey"],
-                    )
-                else:
-                    break
-
-        self.output.print(f"Deleted {counter}")
+
+        self.output.print(result.summary("Deleted"))
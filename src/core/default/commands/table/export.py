@@ -0,0 +1,79 @@
+from argparse import ArgumentParser
+
+import boto3
+
+from core.constructs.commands import BaseCommand
+from core.default.commands import utils as command_utils
+from core.utils.paths import get_full_path_from_workspace_base
+
+from . import batch_utils, export_utils
+
+
+RUUID = "cdev::simple::table"
+
+
+class export(BaseCommand):
+
+    help = """
+Export all the data of a given Table into a shard per scan segment. Running the command again with the same output
+directory resumes an interrupted export.
+"""
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument(
+            "resource_name", type=str, help="The resource you want to export data from"
+        )
+        parser.add_argument(
+            "--output", type=str, required=True, help="Directory to write the shards to"
+        )
+        parser.add_argument(
+            "--format",
+            choices=[export_utils.JSONL_FORMAT, export_utils.PARQUET_FORMAT],
+            default=export_utils.JSONL_FORMAT,
+            help="Format of the shards. Parquet requires pyarrow.",
+        )
+        parser.add_argument(
+            "--compress",
+            action="store_true",
+            help="Compress json lines shards with gzip.",
+        )
+        parser.add_argument(
+            "--segments",
+            type=int,
+            default=batch_utils.DEFAULT_TOTAL_SEGMENTS,
+            help="Number of segments of the table to scan concurrently. Also the number of shards.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="Largest number of items to read per second across all segments.",
+        )
+
+    def command(self, *args, **kwargs) -> None:
+        (
+            component_name,
+            table_resource_name,
+        ) = command_utils.get_component_and_resource_from_qualified_name(
+            kwargs.get("resource_name")
+        )
+
+        cloud_output = command_utils.get_cloud_output_from_cdev_name(
+            component_name, RUUID, table_resource_name
+        )
+        table_cloud_name = cloud_output.get("table_name")
+
+        output_directory = get_full_path_from_workspace_base(kwargs.get("output"))
+        rate = kwargs.get("rate")
+
+        result = export_utils.export_table(
+            boto3.client("dynamodb"),
+            table_cloud_name,
+            output_directory,
+            total_segments=kwargs.get("segments") or batch_utils.DEFAULT_TOTAL_SEGMENTS,
+            output_format=kwargs.get("format") or export_utils.JSONL_FORMAT,
+            compress=kwargs.get("compress"),
+            rate_limiter=batch_utils.RateLimiter(rate) if rate else None,
+            callback=batch_utils.ProgressPrinter(self.output.print, action="Exported"),
+        )
+
+        self.output.print(f"{result.summary('Exported')} -> {output_directory}")
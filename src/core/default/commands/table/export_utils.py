@@ -0,0 +1,353 @@
+"""Utilities for exporting the items of a table to files
+
+A table is exported with a parallel scan, and the items of each segment are written to their own json lines shard as
+each page is read, so the memory used does not depend on the size of the table. After each page, the key to continue
+the scan from and the size of the shard are recorded in a checkpoint file. An interrupted export can then be resumed
+by truncating each shard to its recorded size and continuing the scan of each segment from its recorded key.
+
+Shards can be compressed with gzip. Each page is written as its own gzip member, which keeps the shards truncatable
+and still readable as a single gzip file.
+
+Shards can also be converted into parquet files once the scan is complete, which requires `pyarrow`.
+"""
+import base64
+from decimal import Decimal
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from pydantic import DirectoryPath, FilePath
+
+from core.utils.cache import FileLoadableCache
+from core.utils.file_manager import safe_json_write
+from core.utils.logger import log
+
+from . import batch_utils, utils as table_utils
+
+
+JSONL_FORMAT = "jsonl"
+PARQUET_FORMAT = "parquet"
+
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+
+# Number of rows read from a shard for each row group of a parquet file
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+#######################
+##### Checkpoints
+#######################
+
+
+class ExportCheckpoint(FileLoadableCache):
+    """Implementation of FileLoadableCache that stores the progress of each segment of an export.
+
+    Segments are stored as {<segment>: {"key": Optional[Dict], "offset": int, "items": int, "done": bool}}. The cache
+    is updated by the thread of each segment, so updates and dumps are made under a lock.
+    """
+
+    def __init__(self, fp: FilePath) -> None:
+        super().__init__(fp)
+        self._lock = threading.Lock()
+
+    def dump_to_file(self) -> None:
+        with self._lock:
+            safe_json_write(self._cache_data, self.fp)
+
+    def _load_from_file(self, fp: FilePath) -> Dict:
+        if not os.path.isfile(fp):
+            return {}
+
+        with open(fp) as fh:
+            return json.load(fh)
+
+    def start(
+        self, table_name: str, total_segments: int, output_format: str, compress: bool
+    ) -> None:
+        """Start a new export or check that an existing export used the same arguments
+
+        Args:
+            table_name (str)
+            total_segments (int)
+            output_format (str)
+            compress (bool)
+
+        Raises:
+            Exception: the existing export used different arguments
+        """
+        export_args = {
+            "table_name": table_name,
+            "total_segments": total_segments,
+            "format": output_format,
+            "compress": bool(compress),
+        }
+
+        if not self.in_cache("export"):
+            self.update_cache("export", export_args)
+            self.update_cache("segments", {})
+            self.dump_to_file()
+
+        elif not self.get_from_cache("export") == export_args:
+            raise Exception(
+                f"Export in progress at {self.fp} was started with different arguments {self.get_from_cache('export')}"
+            )
+
+    def get_segment(self, segment: int) -> Dict:
+        return self.get_from_cache("segments").get(
+            str(segment), {"key": None, "offset": 0, "items": 0, "done": False}
+        )
+
+    def get_start_key(self, segment: int) -> Optional[Dict]:
+        return _decode_key(self.get_segment(segment).get("key"))
+
+    def update_segment(
+        self, segment: int, key: Optional[Dict], offset: int, items: int
+    ) -> None:
+        with self._lock:
+            self.get_from_cache("segments")[str(segment)] = {
+                "key": _encode_key(key),
+                "offset": offset,
+                "items": items,
+                "done": key is None,
+            }
+
+
+def _encode_key(key: Optional[Dict]) -> Optional[Dict]:
+    # Binary key attributes are stored as base64
+    if not key:
+        return key
+
+    return {
+        k: {"B64": base64.b64encode(v.get("B")).decode()} if "B" in v else v
+        for k, v in key.items()
+    }
+
+
+def _decode_key(key: Optional[Dict]) -> Optional[Dict]:
+    if not key:
+        return key
+
+    return {
+        k: {"B": base64.b64decode(v.get("B64"))} if "B64" in v else v
+        for k, v in key.items()
+    }
+
+
+#######################
+##### Exporting
+#######################
+
+
+def get_shard_path(
+    output_directory: DirectoryPath, segment: int, compress: bool = False
+) -> str:
+    return os.path.join(
+        output_directory, f"segment-{segment:05d}.jsonl{'.gz' if compress else ''}"
+    )
+
+
+def export_table(
+    client,
+    table_name: str,
+    output_directory: DirectoryPath,
+    total_segments: int = batch_utils.DEFAULT_TOTAL_SEGMENTS,
+    output_format: str = JSONL_FORMAT,
+    compress: bool = False,
+    rate_limiter: Optional[batch_utils.RateLimiter] = None,
+    callback: Callable[[batch_utils.batch_result], None] = None,
+) -> batch_utils.batch_result:
+    """Export all the items of a table into a shard per segment, resuming any previous export in the directory
+
+    Args:
+        client: boto3 dynamodb client
+        table_name (str)
+        output_directory (DirectoryPath)
+        total_segments (int, optional): Defaults to batch_utils.DEFAULT_TOTAL_SEGMENTS.
+        output_format (str, optional): JSONL_FORMAT or PARQUET_FORMAT. Defaults to JSONL_FORMAT.
+        compress (bool, optional): compress json lines shards with gzip. Defaults to False.
+        rate_limiter (Optional[batch_utils.RateLimiter], optional): Defaults to None.
+        callback (Callable[[batch_utils.batch_result], None], optional): called with the aggregated result after each page. Defaults to None.
+
+    Returns:
+        batch_utils.batch_result: items exported by this run
+    """
+    if output_format not in [JSONL_FORMAT, PARQUET_FORMAT]:
+        raise Exception(f"Unsupported export format {output_format}")
+
+    if output_format == PARQUET_FORMAT:
+        # Fail before the scan if the dependency is missing
+        _import_pyarrow()
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    checkpoint = ExportCheckpoint(os.path.join(output_directory, CHECKPOINT_FILE_NAME))
+    checkpoint.start(table_name, total_segments, output_format, compress)
+
+    remaining_segments = [
+        x for x in range(total_segments) if not checkpoint.get_segment(x).get("done")
+    ]
+
+    for segment in remaining_segments:
+        # Remove anything written after the last checkpoint of the segment
+        shard_fp = get_shard_path(output_directory, segment, compress)
+        with open(shard_fp, "ab") as fh:
+            fh.truncate(checkpoint.get_segment(segment).get("offset"))
+
+    rv = batch_utils.batch_result()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def _write_page(segment: int, items: List[Dict], last_key: Optional[Dict]) -> None:
+        data = "".join(
+            json.dumps(table_utils.recursive_untranslate_data(x), default=_json_default)
+            + "\n"
+            for x in items
+        ).encode()
+
+        if compress and data:
+            data = gzip.compress(data)
+
+        shard_fp = get_shard_path(output_directory, segment, compress)
+        with open(shard_fp, "ab") as fh:
+            fh.write(data)
+            offset = fh.tell()
+
+        segment_checkpoint = checkpoint.get_segment(segment)
+        checkpoint.update_segment(
+            segment, last_key, offset, segment_checkpoint.get("items") + len(items)
+        )
+        checkpoint.dump_to_file()
+
+        with lock:
+            rv.processed += len(items)
+            rv.seconds = time.perf_counter() - start
+
+            if callback:
+                callback(rv)
+
+    batch_utils.parallel_scan(
+        client,
+        table_name,
+        _write_page,
+        total_segments,
+        start_keys={x: checkpoint.get_start_key(x) for x in remaining_segments},
+        rate_limiter=rate_limiter,
+        segments=remaining_segments,
+    )
+
+    if output_format == PARQUET_FORMAT:
+        for segment in range(total_segments):
+            shard_fp = get_shard_path(output_directory, segment, compress)
+
+            if os.path.isfile(shard_fp):
+                convert_shard_to_parquet(
+                    shard_fp,
+                    os.path.join(output_directory, f"segment-{segment:05d}.parquet"),
+                )
+                os.remove(shard_fp)
+
+    rv.seconds = time.perf_counter() - start
+    return rv
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable")
+
+
+#######################
+##### Parquet
+#######################
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception(
+            "Exporting to parquet requires pyarrow. Install it with `pip install pyarrow`"
+        )
+
+    return pyarrow
+
+
+def _read_shard(shard_fp: FilePath) -> Iterator[Dict]:
+    opener = gzip.open if shard_fp.endswith(".gz") else open
+
+    with opener(shard_fp, "rt") as fh:
+        for line in fh:
+            yield json.loads(line)
+
+
+def _get_column_type(pyarrow, value_types: set):
+    if value_types == {str}:
+        return pyarrow.string()
+
+    if value_types == {bool}:
+        return pyarrow.bool_()
+
+    if value_types == {int}:
+        return pyarrow.int64()
+
+    if value_types and value_types.issubset({int, float}):
+        return pyarrow.float64()
+
+    # Nested or mixed values are stored as json
+    return pyarrow.string()
+
+
+def convert_shard_to_parquet(shard_fp: FilePath, parquet_fp: FilePath) -> int:
+    """Convert a json lines shard into a parquet file.
+
+    Items do not need to have the same attributes, so the shard is read once to find the columns and their types,
+    and then again to write the rows in groups. Attributes whose values are not all strings, booleans or numbers are
+    stored as json strings.
+
+    Args:
+        shard_fp (FilePath)
+        parquet_fp (FilePath)
+
+    Returns:
+        int: number of rows
+    """
+    pyarrow = _import_pyarrow()
+
+    column_types: Dict[str, set] = {}
+    for item in _read_shard(shard_fp):
+        for k, v in item.items():
+            value_types = column_types.setdefault(k, set())
+
+            if v is not None:
+                value_types.add(type(v))
+
+    schema = pyarrow.schema(
+        [(k, _get_column_type(pyarrow, v)) for k, v in column_types.items()]
+    )
+    json_columns = [
+        x.name
+        for x in schema
+        if x.type == pyarrow.string() and not column_types.get(x.name) == {str}
+    ]
+
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(parquet_fp, schema) as writer:
+        for batch in batch_utils.batched(_read_shard(shard_fp), PARQUET_ROW_GROUP_SIZE):
+            for item in batch:
+                for column in json_columns:
+                    if item.get(column) is not None:
+                        item[column] = json.dumps(item.get(column))
+
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+            rows += len(batch)
+
+    log.debug("Converted %s rows of %s to %s", rows, shard_fp, parquet_fp)
+    return rows
@@ -1,14 +1,16 @@
 from argparse import ArgumentParser
 import json
 import os
+from typing import Dict, Iterable, Iterator
+
+import boto3
 
 from core.constructs.commands import BaseCommand
 
 from core.default.resources.simple.table import simple_table_model
-from core.default.mappers import aws_client
 from core.default.commands import utils as command_utils
 
-from . import utils as table_utils
+from . import batch_utils, utils as table_utils
 
 
 RUUID = "cdev::simple::table"
@@ -20,11 +22,19 @@ class put_object(BaseCommand):
             "resource_name", type=str, help="The resource you want to sync data to"
         )
         parser.add_argument(
-            "--file", type=str, help="The location of the json file containing data"
+            "--file",
+            type=str,
+            help="The location of the data file. Either a json file with an 'items' key or a json lines file (.jsonl) with one item per line",
         )
         parser.add_argument(
             "--data", type=str, help="The json data you want to put in the db"
         )
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=batch_utils.DEFAULT_MAX_WORKERS,
+            help="Number of batches to write concurrently.",
+        )
 
     def command(self, *args, **kwargs) -> None:
 
@@ -61,54 +71,65 @@ class put_object(BaseCommand):
                 self.output.print("Data provided was not a valid json string")
                 return
 
+            if "items" not in data:
+                raise Exception(f"Provided data does not contain the 'items' key")
+
+            items = iter(data.get("items"))
+
         if data_file:
             if not os.path.isfile(data_file):
                 raise Exception(f"{data_file} is not a valid data file")
 
-            try:
-                with open(data_file) as fp:
-                    data = json.load(fp)
-
-            except Exception as e:
-                print(e)
-                raise e
-
-            if "items" not in data:
-                raise Exception(
-                    f"Loaded data from {data_file} does not contain the 'items' key"
-                )
+            items = batch_utils.iter_items_from_file(data_file)
 
         attributes_dict = {
             x.get("attribute_name"): x.get("attribute_type")
             for x in resource.attributes
         }
 
-        for datum in data.get("items"):
-            is_data_valid, msg = table_utils.validate_data(
-                datum, attributes_dict, resource.keys
-            )
+        result = batch_utils.write_requests(
+            boto3.client("dynamodb"),
+            table_cloud_name,
+            self._create_put_requests(items, attributes_dict, resource.keys),
+            max_workers=kwargs.get("max_workers") or batch_utils.DEFAULT_MAX_WORKERS,
+            callback=batch_utils.ProgressPrinter(self.output.print),
+        )
 
-            if not is_data_valid:
-                self.output.print(msg)
-                return
+        self.output.print(result.summary())
+
+        if self._invalid_items:
+            self.output.print(f"Skipped {self._invalid_items} invalid items")
+
+    def _create_put_requests(
+        self, items: Iterable[Dict], attributes: Dict, keys: list
+    ) -> Iterator[Dict]:
+        """Validate and translate items into write requests as they are read
 
-        try:
+        Args:
+            items (Iterable[Dict])
+            attributes (Dict): attribute name to attribute type
+            keys (list): keys of the table
 
-            translated_data = [
-                table_utils.recursive_translate_data(x) for x in data.get("items")
-            ]
-        except:
-            self.output.print("Could not translate data to dynamodb put item form")
+        Yields:
+            Iterator[Dict]: 'PutRequest' write requests
+        """
+        self._invalid_items = 0
 
-        try:
-            for datum in translated_data:
-                aws_client.run_client_function(
-                    "dynamodb",
-                    "put_item",
-                    {"TableName": table_cloud_name, "Item": datum},
+        for item in items:
+            is_data_valid, msg = table_utils.validate_data(item, attributes, keys)
+
+            if not is_data_valid:
+                self.output.print(msg)
+                self._invalid_items += 1
+                continue
+
+            try:
+                translated_item = table_utils.recursive_translate_data(item)
+            except Exception as e:
+                self.output.print(
+                    f"Could not translate {item} to dynamodb put item form"
                 )
+                self._invalid_items += 1
+                continue
 
-                self.output.print(f"Wrote {datum} to {table_resource_name}")
-        except Exception as e:
-            self.output.print(f"Could not write data to table {table_resource_name}")
-            return
+            yield {"PutRequest": {"Item": translated_item}}
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from typing import Dict, List, Tuple, Any, Optional
 
 from core.constructs.resource import ResourceModel
@@ -38,7 +39,7 @@ def get_resource_from_cdev_name(component_name: str, cdev_name: str) -> Optional
         return None
 
 
-_attribute_types_to_python_type = {"S": [str], "N": [int, float], "B": [bytes]}
+_attribute_types_to_python_type = {"S": [str], "N": [int, float, Decimal], "B": [bytes]}
 
 
 def validate_data(data: Dict, attributes: Dict, keys: List[Dict]) -> Tuple[bool, str]:
@@ -66,36 +67,95 @@ def validate_data(data: Dict, attributes: Dict, keys: List[Dict]) -> Tuple[bool,
 
 
 def recursive_translate_data(value) -> Dict:
+    """Translate a python value into the DynamoDB attribute value form. Dictionaries are translated into a map
+    of their translated values, which is the form of a full item.
+
+    Args:
+        value: python value
+
+    Returns:
+        Dict: attribute value
+    """
     if isinstance(value, str):
         transformed_val = {"S": value}
-    elif isinstance(value, (int, float)):
-        transformed_val = {"N": value}
-    elif isinstance(value, float):
-        transformed_val = {"N": value}
+    elif isinstance(value, bool):
+        transformed_val = {"BOOL": value}
+    elif isinstance(value, (int, float, Decimal)):
+        transformed_val = {"N": str(value)}
     elif isinstance(value, bytes):
         transformed_val = {"B": value}
-    elif isinstance(value, bool):
-        transformed_val = {"BOOl": value}
-    elif not value:
+    elif value is None:
         transformed_val = {"NULL": True}
     elif isinstance(value, list):
-        if all(isinstance(x, str) for x in value):
+        if value and all(isinstance(x, str) for x in value):
             transformed_val = {"SS": [x for x in value]}
-        elif all(isinstance(x, (int, float)) for x in value):
-            transformed_val = {"NS": [x for x in value]}
-        elif all(isinstance(x, bytes) for x in value):
+        elif value and all(
+            isinstance(x, (int, float, Decimal)) and not isinstance(x, bool)
+            for x in value
+        ):
+            transformed_val = {"NS": [str(x) for x in value]}
+        elif value and all(isinstance(x, bytes) for x in value):
             transformed_val = {"BS": [x for x in value]}
         else:
-            transformed_val = {"L": [recursive_translate_data(value)]}
+            transformed_val = {"L": [_translate_attribute(x) for x in value]}
 
     elif isinstance(value, dict):
-        transformed_val = {k: recursive_translate_data(v) for k, v in value.items()}
+        transformed_val = {k: _translate_attribute(v) for k, v in value.items()}
 
     else:
-        raise Exception
+        raise Exception(f"Can not translate {type(value)} into a DynamoDB attribute")
 
     return transformed_val
 
+
+def _translate_attribute(value) -> Dict:
+    if isinstance(value, dict):
+        return {"M": recursive_translate_data(value)}
+
+    return recursive_translate_data(value)
+
+
+def recursive_untranslate_data(item: Dict) -> Dict:
+    """Inverse of `recursive_translate_data` for an item. Translate a DynamoDB item into a dictionary of python
+    values.
+
+    Args:
+        item (Dict): attribute name to attribute value
+
+    Returns:
+        Dict
+    """
+    return {k: _untranslate_attribute(v) for k, v in item.items()}
+
+
+def _untranslate_attribute(value: Dict) -> Any:
+    attribute_type, attribute_value = next(iter(value.items()))
+
+    if attribute_type not in _attribute_value_translators:
+        raise Exception(f"Can not translate DynamoDB attribute type {attribute_type}")
+
+    return _attribute_value_translators[attribute_type](attribute_value)
+
+
+def _untranslate_number(value: str):
+    number = Decimal(value)
+    return int(number) if number == number.to_integral_value() else float(number)
+
+
+_attribute_value_translators = {
+    "S": lambda x: x,
+    "N": _untranslate_number,
+    "B": lambda x: x,
+    "BOOL": lambda x: x,
+    "NULL": lambda x: None,
+    "SS": lambda x: list(x),
+    "NS": lambda x: [_untranslate_number(y) for y in x],
+    "BS": lambda x: list(x),
+    "L": lambda x: [_untranslate_attribute(y) for y in x],
+    "M": recursive_untranslate_data,
+}
+
+
 def get_dynamodb_info_from_cdev_name(
     component_name: str, cdev_database_name: str
 ) -> Tuple[Any, Any]:
@@ -1,3 +1,5 @@
+from typing import Iterable, List, Set
+
 from core.utils.fs_manager import finder
 
 
@@ -11,11 +13,19 @@ class Cdev_FileSystem_Component(Component):
     This component uses provided libraries in Cdev to generate resources. Using this component, you can create serverless
     functions using the provided Cdev annotations that also provides functionality to parse the desired folder out of the
     file to make it more efficient.
+
+    By default, only the python files at the top level of the folder are loaded. Provide `includes` and `excludes`
+    globs relative to the folder to control which files are loaded (i.e. `includes=["**/*.py"]` to recursively load
+    all python files in the folder).
     """
 
-    def __init__(self, fp, name):
+    def __init__(
+        self, fp, name, includes: List[str] = None, excludes: List[str] = None
+    ):
         super().__init__(name)
         self.fp = fp
+        self.includes = includes
+        self.excludes = excludes
 
     def render(self) -> ComponentModel:
         """Render this component based on the information in the files at the provided folder path
@@ -23,7 +33,9 @@ class Cdev_FileSystem_Component(Component):
         Returns:
             ComponentModel
         """
-        resources_sorted, references_sorted = finder.parse_folder(self.fp)
+        resources_sorted, references_sorted = finder.parse_folder(
+            self.fp, self.includes, self.excludes
+        )
         total_component_hash = hasher.hash_list(
             [x.hash for x in resources_sorted] + [x.hash for x in references_sorted]
         )
@@ -37,3 +49,15 @@ class Cdev_FileSystem_Component(Component):
         )
 
         return rv
+
+    def get_changes_affecting(self, changed_files: Iterable[str]) -> Set[str]:
+        """A change affects this component if it is within the folder of the component or is a relative module
+        that a function in the component depends on.
+
+        Args:
+            changed_files (Iterable[str]): full paths of the changed files
+
+        Returns:
+            Set[str]: the changed files that affect the component
+        """
+        return finder.get_changes_affecting_folder(self.fp, changed_files)
@@ -1,6 +1,8 @@
 from time import sleep
-from typing import Callable, List, Optional, Any
-import boto3
+from typing import Callable, List, Optional, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import boto3
 
 AVAILABLE_SERVICES = {
     "lambda",
@@ -16,7 +18,8 @@ AVAILABLE_SERVICES = {
 
 def _get_boto_client(
     service_name, credentials=None, profile_name=None
-) -> boto3.session.Session:
+) -> "boto3.session.Session":
+    import boto3
 
     # TODO readd this check after development is finished and we have the full list of services
     # if not service_name in AVAILABLE_SERVICES:
@@ -34,13 +37,15 @@ def _get_boto_client(
     return session.client(service_name)
 
 
-def get_boto_client(service_name) -> boto3.session.Session:
+def get_boto_client(service_name) -> "boto3.session.Session":
     # TODO: Come back and make this settable from the workspace settings
     # if not cdev_settings.SETTINGS.get("CREDENTIALS"):
     return _get_boto_client(service_name)
 
 
 def get_current_region() -> str:
+    import boto3
+
     my_session = boto3.session.Session()
     my_region = my_session.region_name
     return my_region
@@ -12,11 +12,10 @@ from core.default.resources.simple import xlambda as simple_xlambda
 
 from core.utils import paths as core_paths, hasher
 from core.utils.logger import log
-from core.utils.platforms import lambda_python_environment
+from core.utils.platforms import lambda_python_environment_aws_params
 
 
 from .. import aws_client
-from boto3.s3.transfer import TransferConfig
 
 
 # from .lambda_event_deployer import EVENT_TO_HANDLERS
@@ -32,15 +31,11 @@ from .role_deployer import (
 from .event_deployer import EVENT_TO_HANDLERS
 
 
-python_environment_to_aws_params: Dict[lambda_python_environment, Tuple] = {
-    lambda_python_environment.py37: ("python3.7", "x86_64"),
-    lambda_python_environment.py38_x86_64: ("python3.8", "x86_64"),
-    lambda_python_environment.py38_arm64: ("python3.8", "arm64"),
-    lambda_python_environment.py39_x86_64: ("python3.9", "x86_64"),
-    lambda_python_environment.py39_arm64: ("python3.9", "arm64"),
-    lambda_python_environment.py3_x86_64: ("python3.9", "x86_64"),
-    lambda_python_environment.py3_arm64: ("python3.9", " arm64"),
-}
+# Aws Lambda accepts artifacts of up to 50 MB when they are uploaded directly to the function
+MAX_DIRECT_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Fields of a function that only change when the source code of the function changes
+_SOURCE_CODE_FIELDS = {"hash", "src_code_hash", "filepath"}
 
 
 AssumeRolePolicyDocumentJSON = """{
@@ -123,7 +118,7 @@ def _create_simple_lambda(
 
     output_task.update(comment=f"Create Lambda function")
 
-    runtime, arch = python_environment_to_aws_params.get(resource.platform)
+    runtime, arch = lambda_python_environment_aws_params.get(resource.platform)
 
     lambda_function_args = {
         "FunctionName": function_name,
@@ -251,6 +246,14 @@ def _update_simple_lambda(
 
     mutable_previous_output = dict(previous_output)
 
+    if Workspace.instance().settings.HOT_SWAP_FUNCTION_CODE and _can_hot_swap(
+        previous_resource, new_resource
+    ):
+        _hot_swap_source_code(
+            output_task, function_name, mutable_previous_output, new_resource
+        )
+        return mutable_previous_output
+
     _update_configuration(output_task, function_name, previous_resource, new_resource)
     sleep(3)
     did_update_permission = _update_permissions(
@@ -492,6 +495,71 @@ def _update_source_code(
     return True
 
 
+def _can_hot_swap(
+    previous_resource: simple_xlambda.simple_function_model,
+    new_resource: simple_xlambda.simple_function_model,
+) -> bool:
+    """A change can be hot swapped if only the source code of the function changed and the artifact is small enough
+    to be uploaded directly to the function.
+
+    Args:
+        previous_resource (simple_xlambda.simple_function_model)
+        new_resource (simple_xlambda.simple_function_model)
+
+    Returns:
+        bool
+    """
+    if previous_resource.src_code_hash == new_resource.src_code_hash:
+        return False
+
+    if not previous_resource.dict(exclude=_SOURCE_CODE_FIELDS) == new_resource.dict(
+        exclude=_SOURCE_CODE_FIELDS
+    ):
+        return False
+
+    zip_location = core_paths.get_full_path_from_workspace_base(new_resource.filepath)
+
+    return (
+        os.path.isfile(zip_location)
+        and os.path.getsize(zip_location) <= MAX_DIRECT_UPLOAD_BYTES
+    )
+
+
+def _hot_swap_source_code(
+    output_task: OutputTask,
+    function_name: str,
+    mutable_previous_output: Dict,
+    new_resource: simple_xlambda.simple_function_model,
+) -> None:
+    """Update the source code of a function by uploading the artifact directly to the function. This skips the upload
+    to the artifact bucket and the waits between the steps of a full update.
+
+    Args:
+        output_task (OutputTask)
+        function_name (str)
+        mutable_previous_output (Dict)
+        new_resource (simple_xlambda.simple_function_model)
+    """
+    output_task.update(comment=f"Hot swapping Source Code")
+
+    zip_location = core_paths.get_full_path_from_workspace_base(new_resource.filepath)
+
+    with open(zip_location, "rb") as fh:
+        aws_client.run_client_function(
+            "lambda",
+            "update_function_code",
+            {
+                "FunctionName": function_name,
+                "ZipFile": fh.read(),
+                "Publish": True,
+            },
+        )
+
+    # The deployed code is no longer the artifact stored in the artifact bucket
+    mutable_previous_output.pop("artifact_key", None)
+    log.debug("Simple lambda, source code hot swapped")
+
+
 def _update_dependencies(
     output_task: OutputTask,
     function_name: str,
@@ -670,6 +738,8 @@ def _upload_s3_dependency(
         # TODO better exception
         raise Exception
 
+    from boto3.s3.transfer import TransferConfig
+
     config = TransferConfig(
         multipart_threshold=1024 * 25,
         max_concurrency=10,
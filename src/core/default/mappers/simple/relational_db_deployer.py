@@ -1,4 +1,3 @@
-import boto3
 import json
 from typing import Any, Dict
 from uuid import uuid4
@@ -73,7 +72,7 @@ def _create_simple_relational_db(
         comment=f"Wating for DB to become available. This might take a minute."
     )
     aws_client.monitor_status(
-        boto3.client("rds").describe_db_clusters,
+        aws_client.get_boto_client("rds").describe_db_clusters,
         {
             "DBClusterIdentifier": cluster_name,
         },
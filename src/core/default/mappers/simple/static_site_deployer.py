@@ -1,4 +1,3 @@
-import boto3
 import json
 from typing import Any, Dict
 from uuid import uuid4
@@ -148,7 +147,7 @@ def _create_simple_static_site(
     cloudfront_domain = rv.get("Distribution").get("DomainName")
 
     aws_client.monitor_status(
-        boto3.client("cloudfront").get_distribution,
+        aws_client.get_boto_client("cloudfront").get_distribution,
         {
             "Id": cloudfront_id,
         },
@@ -286,7 +285,7 @@ def _remove_simple_static_site(
         comment="[blink]Disabling site on Aws Cloudfront CDN.This will take a few minutes[/blink]"
     )
     aws_client.monitor_status(
-        boto3.client("cloudfront").get_distribution,
+        aws_client.get_boto_client("cloudfront").get_distribution,
         {"Id": previous_cloudfront_id},
         "InProgress",
         lambda x: x.get("Distribution").get("Status"),
@@ -301,6 +300,8 @@ def _remove_simple_static_site(
 
     bucket_name = previous_output.get("bucket_name")
 
+    import boto3
+
     s3 = boto3.resource("s3")
     bucket = s3.Bucket(bucket_name)
     output_task.update(comment="Deleting all items in the bucket")
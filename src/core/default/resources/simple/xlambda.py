@@ -261,6 +261,7 @@ class SimpleFunction(PermissionsGrantableMixin, TaggableMixin, Resource):
         preserve_function: Callable = None,
         nonce: str = "",
         tags: Dict[str, str] = {},
+        precompile: bool = None,
     ) -> None:
         """
 
@@ -276,6 +277,7 @@ class SimpleFunction(PermissionsGrantableMixin, TaggableMixin, Resource):
             preserve_function (Callable, optional): the original function that is being deployed. This allows the returned object ro remain Callable. Default to None.
             nonce (str, optional): Nonce to make the resource hash unique if there are conflicting resources with same configuration.
             tags (Dict[str, str]): A set of tags to add to the resource
+            precompile (bool, optional): Include precompiled bytecode in the artifacts. Defaults to None (use the workspace setting).
         """
 
         super().__init__(name=cdev_name, ruuid=RUUID, nonce=nonce, tags=tags)
@@ -294,6 +296,9 @@ class SimpleFunction(PermissionsGrantableMixin, TaggableMixin, Resource):
 
         self._platform = platform or get_current_closest_platform()
 
+        # Only used when creating the artifacts so it is not part of the hash
+        self.precompile = precompile
+
         self._preserved_function = preserve_function
         self.__annotations__ = preserve_function.__annotations__
         self.__doc__ = preserve_function.__doc__
@@ -410,6 +415,7 @@ def simple_function_annotation(
     includes: List[str] = [],
     nonce: str = "",
     tags: Dict[str, str] = None,
+    precompile: bool = None,
 ) -> Callable[[Callable], SimpleFunction]:
     """This annotation is used to designate that a function should be deployed as a Serverless function.
 
@@ -425,6 +431,7 @@ def simple_function_annotation(
         includes (List[str], optional): Set of identifiers to extra global statements to include in parsed artifacts. Defaults to [].
         nonce (str, optional): Nonce to make the resource hash unique if there are conflicting resources with same configuration.
         tags (dict[str, str]): A set pf tags to use to identify the resource.
+        precompile (bool, optional): Include bytecode compiled for the runtime in the artifacts to reduce cold start time. Defaults to None (use the workspace setting).
 
     Returns:
         Callable[[Callable], SimpleFunction]: wrapper that returns the `SimpleFunction`
@@ -468,6 +475,7 @@ def simple_function_annotation(
             preserve_function=func,
             nonce=nonce,
             tags=tags,
+            precompile=precompile,
         )
 
     return create_function
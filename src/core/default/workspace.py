@@ -106,9 +106,14 @@ class local_workspace(Workspace):
         return self._state
 
     @wrap_phase([Workspace_State.EXECUTING_FRONTEND])
-    def generate_current_state(self) -> List[ComponentModel]:
+    def generate_current_state(
+        self, component_names: Optional[List[str]] = None
+    ) -> List[ComponentModel]:
         rv = []
         for component in self.get_components():
+            if component_names is not None and component.name not in component_names:
+                continue
+
             self._current_component = component.name
             rv.append(component.render())
 
@@ -3,17 +3,27 @@
 [detailed description]
 
 """
-from dataclasses import dataclass, field
+import ast
+from dataclasses import asdict, dataclass, field
+import importlib.util
 import inspect
+import json
 import os
-from typing import List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from core.constructs.commands import BaseCommand, BaseCommandContainer
 from core.constructs.output_manager import OutputManager
 
+from core.utils.file_manager import safe_json_write
+from core.utils.logger import log
 from core.utils.module_loader import import_module
 from core.utils.exceptions import cdev_core_error
 
+COMMAND_INDEX_FILE_NAME = "command_index.json"
+
+# Changing the format of the index invalidates any previously cached index
+COMMAND_INDEX_VERSION = 1
+
 ###############################
 ##### Exceptions
 ###############################
@@ -43,67 +53,247 @@ class TooManyCommandClasses(CommandFinderError):
     help_resources: List[str] = field(default_factory=lambda: [])
 
 
+###############################
+##### Models
+###############################
+
+
+@dataclass
+class command_index_entry:
+    """A command or command container found in a search location.
+
+    The class name and help are read from the source of the module without importing it, so they are None when the
+    class does not directly derive from BaseCommand or BaseCommandContainer.
+    """
+
+    module: str
+    is_command: bool
+    class_name: Optional[str] = None
+    help: Optional[str] = None
+
+
 ###############################
 ##### Api
 ###############################
 
 
 def find_specified_command(
-    command_list: List[str], all_search_locations_list: List[str], output: OutputManager
+    command_list: List[str],
+    all_search_locations_list: List[str],
+    output: OutputManager,
+    cache_directory: str = None,
 ) -> Tuple[Union[BaseCommand, BaseCommandContainer], str, str, bool]:
     """Search the provided locations for the given command.
 
+    The locations are searched in order using the command index, so only the module of the found command is imported.
+
     Args:
-        command_list (List[str]): _description_
-        all_search_locations_list (List[str]): _description_
+        command_list (List[str]): Parts of the command
+        all_search_locations_list (List[str]): Python module paths of the search locations
+        output (OutputManager): Output passed to the initialized command
+        cache_directory (str, optional): Directory to cache the command index in. Defaults to None.
 
     Raises:
         NoCommandFound
 
     Returns:
-        Tuple[Union[BaseCommand, BaseCommandContainer], str, str, bool]: _description_
+        Tuple[Union[BaseCommand, BaseCommandContainer], str, str, bool]: The initialized object, program name, command name and if it is a command
     """
-
-    command_list_copy = command_list.copy()
+    command_name = ".".join(command_list)
+    command_index = load_command_index(all_search_locations_list, cache_directory)
 
     for search_location in all_search_locations_list:
-        # Search locations are denoted as python module paths, so convert the module to a path to search from
-        mod = import_module(search_location)
-        search_location_path = os.path.dirname(mod.__file__)
-
-        did_find, is_command = _recursive_find_specified_command(
-            command_list.copy(), search_location_path
-        )
+        entry = command_index.get(search_location, {}).get(command_name)
 
-        if not did_find:
+        if not entry:
             continue
 
-        full_command_module_name = f"{search_location}.{'.'.join(command_list_copy)}"
-
-        if is_command:
+        if entry.is_command:
             initialized_object = initialize_command_module(
-                full_command_module_name, output
+                entry.module, output, entry.class_name
             )
 
         else:
             initialized_object = initialize_command_container_module(
-                full_command_module_name, output
+                entry.module, output, entry.class_name
             )
 
-        final_path_name = f"{search_location}.{'.'.join(command_list_copy[:-1])}"
-        command_name = command_list_copy[-1]
-        return initialized_object, final_path_name, command_name, is_command
+        final_path_name = f"{search_location}.{'.'.join(command_list[:-1])}"
+        return initialized_object, final_path_name, command_list[-1], entry.is_command
 
     raise NoCommandFound(
-        error_message=f"No Command or Commands Container found for `{'.'.join(command_list_copy)}` in the given list of search locations ({all_search_locations_list})"
+        error_message=f"No Command or Commands Container found for `{command_name}` in the given list of search locations ({all_search_locations_list})"
     )
 
 
-def initialize_command_module(mod_path: str, output: OutputManager) -> BaseCommand:
+def list_commands(
+    all_search_locations_list: List[str],
+    cache_directory: str = None,
+    include_unresolved: bool = False,
+) -> Dict[str, command_index_entry]:
+    """List the commands and command containers of the search locations without importing them.
+
+    When a command is in more than one location, the first location is used to match `find_specified_command`.
+
+    Args:
+        all_search_locations_list (List[str]): Python module paths of the search locations
+        cache_directory (str, optional): Directory to cache the command index in. Defaults to None.
+        include_unresolved (bool, optional): Include the modules without a class found in their source, such as helper modules. Defaults to False.
+
+    Returns:
+        Dict[str, command_index_entry]: Command name to entry, sorted by command name
+    """
+    rv = {}
+    command_index = load_command_index(all_search_locations_list, cache_directory)
+
+    for search_location in all_search_locations_list:
+        for command_name, entry in command_index.get(search_location, {}).items():
+            rv.setdefault(command_name, entry)
+
+    return {k: v for k, v in sorted(rv.items()) if include_unresolved or v.class_name}
+
+
+def load_command_index(
+    all_search_locations_list: List[str], cache_directory: str = None
+) -> Dict[str, Dict[str, command_index_entry]]:
+    """Load the command index of each search location, rebuilding the index of a location when the modification time
+    of any of its directories changed. Adding, removing or renaming a command changes the modification time of its
+    directory.
+
+    Args:
+        all_search_locations_list (List[str]): Python module paths of the search locations
+        cache_directory (str, optional): Directory to cache the command index in. The index is not cached when None. Defaults to None.
+
+    Returns:
+        Dict[str, Dict[str, command_index_entry]]: Search location to command name to entry
+    """
+    cache_fp = (
+        os.path.join(cache_directory, COMMAND_INDEX_FILE_NAME)
+        if cache_directory
+        else None
+    )
+    cached_index = _load_cached_command_index(cache_fp)
+
+    rv = {}
+    has_changed = False
+
+    for search_location in all_search_locations_list:
+        search_location_path = _get_search_location_path(search_location)
+        cached_location = cached_index.get(search_location)
+
+        # A location that can not be found has no directories, so its empty index stays fresh until it can be found
+        if (
+            cached_location
+            and cached_location.get("directory") == search_location_path
+            and (
+                search_location_path is None
+                or _is_fresh(cached_location.get("mtimes", {}))
+            )
+        ):
+            rv[search_location] = {
+                k: command_index_entry(**v)
+                for k, v in cached_location.get("commands").items()
+            }
+            continue
+
+        log.debug("Building command index for %s", search_location)
+        commands, mtimes = build_command_index(search_location, search_location_path)
+
+        rv[search_location] = commands
+        cached_index[search_location] = {
+            "directory": search_location_path,
+            "mtimes": mtimes,
+            "commands": {k: asdict(v) for k, v in commands.items()},
+        }
+        has_changed = True
+
+    if cache_fp and has_changed:
+        try:
+            safe_json_write(
+                {"version": COMMAND_INDEX_VERSION, "locations": cached_index}, cache_fp
+            )
+        except Exception as e:
+            # The index is only an optimization so a read only workspace can still run commands
+            log.debug("Could not write command index to %s: %s", cache_fp, e)
+
+    return rv
+
+
+def build_command_index(
+    search_location: str, search_location_path: Optional[str]
+) -> Tuple[Dict[str, command_index_entry], Dict[str, int]]:
+    """Walk the directory of a search location for commands and command containers.
+
+    A command is a python file and a command container is a directory with an `__init__.py` file. The class name
+    and help of each are read from its source.
+
+    Args:
+        search_location (str): Python module path of the search location
+        search_location_path (Optional[str]): Directory of the search location
+
+    Returns:
+        Tuple[Dict[str, command_index_entry], Dict[str, int]]: Command name to entry, and the modification time of each walked directory
+    """
+    commands = {}
+    mtimes = {}
+
+    if not search_location_path:
+        return commands, mtimes
+
+    for directory, directory_names, file_names in os.walk(search_location_path):
+        directory_names[:] = sorted(
+            x for x in directory_names if not x.startswith(("_", "."))
+        )
+        mtimes[directory] = os.stat(directory).st_mtime_ns
+
+        relative_parts = os.path.relpath(directory, search_location_path).split(os.sep)
+        relative_parts = [x for x in relative_parts if x != "."]
+
+        if relative_parts and "__init__.py" in file_names:
+            class_name, help = _find_class_in_source(
+                os.path.join(directory, "__init__.py"), "BaseCommandContainer"
+            )
+            # A command of the same name in the parent directory was walked first and is kept
+            commands.setdefault(
+                ".".join(relative_parts),
+                command_index_entry(
+                    module=".".join([search_location, *relative_parts]),
+                    is_command=False,
+                    class_name=class_name,
+                    help=help,
+                ),
+            )
+
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".py") or file_name.startswith("_"):
+                continue
+
+            command_parts = [*relative_parts, file_name[:-3]]
+            class_name, help = _find_class_in_source(
+                os.path.join(directory, file_name), "BaseCommand"
+            )
+            commands.setdefault(
+                ".".join(command_parts),
+                command_index_entry(
+                    module=".".join([search_location, *command_parts]),
+                    is_command=True,
+                    class_name=class_name,
+                    help=help,
+                ),
+            )
+
+    return commands, mtimes
+
+
+def initialize_command_module(
+    mod_path: str, output: OutputManager, class_name: str = None
+) -> BaseCommand:
     """Given a path to a command, initialize the given command.
 
     Args:
         mod_path (str): path to the command module
+        output (OutputManager): Output passed to the command
+        class_name (str, optional): name of the command class, which is found by inspecting the module when not provided or not valid. Defaults to None.
 
     Raises:
         TooManyCommandClasses: The module contained more than one command
@@ -114,6 +304,11 @@ def initialize_command_module(mod_path: str, output: OutputManager) -> BaseComma
     """
 
     mod = import_module(mod_path)
+
+    potential_obj = getattr(mod, class_name, None) if class_name else None
+    if inspect.isclass(potential_obj) and issubclass(potential_obj, BaseCommand):
+        return potential_obj(output=output)
+
     # Check for the class that derives from BaseCommand... if there is more then one class then throw error (note this is a current implementation detail)
     # because it is easier if their is only one command per file so that we can use the file name as the command name
     _has_found_a_valid_command = False
@@ -144,12 +339,14 @@ def initialize_command_module(mod_path: str, output: OutputManager) -> BaseComma
 
 
 def initialize_command_container_module(
-    mod_path: str, output: OutputManager
+    mod_path: str, output: OutputManager, class_name: str = None
 ) -> BaseCommandContainer:
     """Given a path to a command, initialize the given command container.
 
     Args:
         mod_path (str): path to the command module
+        output (OutputManager): Output passed to the command container
+        class_name (str, optional): name of the command container class, which is found by inspecting the module when not provided or not valid. Defaults to None.
 
     Raises:
         TooManyCommandClasses: The module contained more than one command
@@ -160,6 +357,12 @@ def initialize_command_container_module(
     """
     mod = import_module(mod_path)
 
+    potential_obj = getattr(mod, class_name, None) if class_name else None
+    if inspect.isclass(potential_obj) and issubclass(
+        potential_obj, BaseCommandContainer
+    ):
+        return potential_obj(output=output)
+
     # Check for the class that derives from BaseCommandContainer... if there is more then one class then throw error (note this is a current implementation detail)
     # because it is easier if their is only one command per file so that we can use the file name as the command name
     _has_found_a_valid_command_container = False
@@ -189,39 +392,97 @@ def initialize_command_container_module(
     return initialized_obj
 
 
-def _recursive_find_specified_command(
-    command_list: List[str], search_path: str
-) -> Tuple[bool, bool]:
-    """Return if the given command list results in a potential found command or command container
+def _get_search_location_path(search_location: str) -> Optional[str]:
+    """Find the directory of a search location without importing it. Only the parent packages are imported.
+
+    Args:
+        search_location (str): Python module path of the search location
+
+    Returns:
+        Optional[str]: None if the search location can not be found
+    """
+    try:
+        spec = importlib.util.find_spec(search_location)
+    except (ImportError, ValueError):
+        return None
+
+    if not spec or not spec.submodule_search_locations:
+        return None
+
+    return os.path.abspath(list(spec.submodule_search_locations)[0])
+
 
-    Recursively check at each step if the next part in the command list is valid. If at the end of the
-    list return that something was found. If at any point there is a missing link then return False.
+def _load_cached_command_index(cache_fp: Optional[str]) -> Dict:
+    if not cache_fp or not os.path.isfile(cache_fp):
+        return {}
+
+    try:
+        with open(cache_fp) as fh:
+            data = json.load(fh)
+    except Exception as e:
+        log.debug("Could not load command index from %s: %s", cache_fp, e)
+        return {}
+
+    if data.get("version") != COMMAND_INDEX_VERSION:
+        return {}
+
+    return data.get("locations", {})
+
+
+def _is_fresh(mtimes: Dict[str, int]) -> bool:
+    try:
+        return bool(mtimes) and all(
+            os.stat(directory).st_mtime_ns == mtime
+            for directory, mtime in mtimes.items()
+        )
+    except OSError:
+        return False
+
+
+def _find_class_in_source(
+    fp: str, base_class_name: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """Find the class deriving directly from the base class in a python file, and the `help` attribute of the class
+    if it is a string literal.
 
     Args:
-        command_list (List[str]): List of command parts
-        search_path (str): Path the search from
+        fp (str): python file
+        base_class_name (str): name of the base class
 
     Returns:
-        Tuple[bool, bool]: Found, Is_Command
+        Tuple[Optional[str], Optional[str]]: class name, help
     """
+    try:
+        with open(fp, "rb") as fh:
+            tree = ast.parse(fh.read(), filename=fp)
+    except (SyntaxError, ValueError, OSError):
+        return None, None
+
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
 
-    if len(command_list) == 1:
-        # A location was specified and we are the final part of the command so the command must be a py file in this dir
-        # of be a directory that has a command container
-        if os.path.isfile(os.path.join(search_path, command_list[0] + ".py")):
-            return True, True
+        base_names = [
+            x.id if isinstance(x, ast.Name) else getattr(x, "attr", None)
+            for x in node.bases
+        ]
+        if base_class_name not in base_names:
+            continue
 
-        if os.path.isdir(os.path.join(search_path, command_list[0])):
-            if os.path.join(os.path.join(search_path, command_list[0], "__init__.py")):
-                return True, False
+        for statement in node.body:
+            if not isinstance(statement, ast.Assign) or not any(
+                isinstance(x, ast.Name) and x.id == "help" for x in statement.targets
+            ):
+                continue
 
-        return False, False
+            try:
+                help = ast.literal_eval(statement.value)
+            except ValueError:
+                break
 
-    next_command_part = command_list.pop(0)
+            if isinstance(help, str):
+                return node.name, inspect.cleandoc(help)
 
-    if not next_command_part in os.listdir(search_path):
-        return False, False
+        return node.name, None
 
-    return _recursive_find_specified_command(
-        command_list, os.path.join(search_path, next_command_part)
-    )
+    return None, None
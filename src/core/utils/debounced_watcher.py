@@ -0,0 +1,146 @@
+import os
+import queue
+from typing import Dict, List, Optional, Set, Tuple
+
+from pydantic import DirectoryPath
+from watchdog.events import EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED
+from watchdog.observers import Observer
+from watchdog.tricks import Trick
+
+from core.constructs.output_manager import OutputManager
+
+
+class DebouncedWatcher(Trick):
+    """Watches a folder and handles the files changed by each burst of events together.
+
+    The paths of changed and deleted files are put on a queue as events arrive. Once no new events have arrived for
+    the debounce period, `_handle_changes` is called with all the queued paths. Events that arrive while the changes
+    are being handled stay on the queue and are handled after it finishes.
+    """
+
+    _default_patterns_to_watch: List[str] = []
+    _default_patterns_to_ignore: List[str] = []
+
+    # Printed when the watcher starts and after each set of changes is handled
+    _watching_message = "Watching for changes..."
+
+    def __init__(
+        self,
+        base_folder: DirectoryPath,
+        output: Optional[OutputManager] = None,
+        no_default: Optional[bool] = False,
+        patterns_to_watch: Optional[str] = None,
+        patterns_to_ignore: Optional[str] = None,
+        debounce_seconds: Optional[float] = 0.5,
+    ) -> None:
+
+        self._base_folder = base_folder
+        self._output = output
+        self._observer = None
+        self._debounce_seconds = debounce_seconds
+        self._events: "queue.Queue[Tuple[str, bool]]" = queue.Queue()
+
+        all_patterns_to_watch = None
+        if patterns_to_watch:
+            all_patterns_to_watch = patterns_to_watch.split(",")
+
+        if not no_default:
+            if all_patterns_to_watch:
+                all_patterns_to_watch += self._default_patterns_to_watch
+            else:
+                all_patterns_to_watch = self._default_patterns_to_watch
+
+        all_patterns_to_ignore = None
+        if patterns_to_ignore:
+            all_patterns_to_ignore = patterns_to_ignore.split(",")
+
+        if not no_default:
+            if all_patterns_to_ignore:
+                all_patterns_to_ignore += self._default_patterns_to_ignore
+            else:
+                all_patterns_to_ignore = self._default_patterns_to_ignore
+
+        super().__init__(
+            patterns=all_patterns_to_watch,
+            ignore_patterns=all_patterns_to_ignore,
+            ignore_directories=False,
+        )
+
+    def watch(self) -> None:
+        self._output.print(self._watching_message)
+        # Prevent multiples observers
+        self._stop()
+
+        self._observer = Observer()
+        self._observer.schedule(self, self._base_folder, recursive=True)
+        self._observer.start()
+        try:
+            while True:
+                changed_paths, deleted_paths = self._get_changed_paths()
+
+                if changed_paths or deleted_paths:
+                    self._handle_changes(changed_paths, deleted_paths)
+                    self._output.print(self._watching_message)
+        except KeyboardInterrupt:
+            self._stop()
+
+    def on_any_event(self, event):
+        # Creating or modifying a file also modifies its directory, but the file has its own event
+        if event.is_directory and event.event_type in [
+            EVENT_TYPE_CREATED,
+            EVENT_TYPE_MODIFIED,
+        ]:
+            return
+
+        dest_path = getattr(event, "dest_path", None)
+
+        # A moved file is deleted from its source path
+        is_deleted = event.event_type == EVENT_TYPE_DELETED or bool(dest_path)
+        self._events.put((os.path.abspath(event.src_path), is_deleted))
+
+        if dest_path:
+            self._events.put((os.path.abspath(dest_path), False))
+
+    def _get_changed_paths(self) -> Tuple[Set[str], Set[str]]:
+        """Wait for a change and then collect changes until no new change has arrived for the debounce period.
+
+        Only the latest event of each path is kept, so a file that is deleted and then created again is changed.
+
+        Returns:
+            Tuple[Set[str], Set[str]]: full paths of the changed and deleted files. Empty if no change arrived within a second.
+        """
+        try:
+            events = [self._events.get(timeout=1)]
+        except queue.Empty:
+            return set(), set()
+
+        while True:
+            try:
+                events.append(self._events.get(timeout=self._debounce_seconds))
+            except queue.Empty:
+                break
+
+        latest: Dict[str, bool] = dict(events)
+
+        return (
+            {k for k, is_deleted in latest.items() if not is_deleted},
+            {k for k, is_deleted in latest.items() if is_deleted},
+        )
+
+    def _handle_changes(self, changed_paths: Set[str], deleted_paths: Set[str]) -> None:
+        """Handle the files changed by a burst of events
+
+        Args:
+            changed_paths (Set[str]): full paths of the created, modified or moved files
+            deleted_paths (Set[str]): full paths of the deleted files and the source paths of moved files
+        """
+        raise NotImplementedError
+
+    def _stop(self) -> None:
+        if not self._observer:
+            return
+
+        observer = self._observer
+        self._observer = None
+        observer.stop()
+        observer.join()
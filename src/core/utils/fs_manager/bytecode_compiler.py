@@ -0,0 +1,211 @@
+"""Utilities to precompile the python files of an artifact into bytecode
+
+The file system of a deployed function is read only, so the interpreter can not write the bytecode of the
+modules it compiles. Every cold start therefore compiles every imported module from source again. Adding the
+bytecode to the artifact removes this work from the cold start.
+
+The bytecode is written to the standard `__pycache__` location next to each source file using unchecked hash
+based pycs (PEP 552). This means the interpreter uses the bytecode without checking the mtime or hash of
+the source, which is safe because the source and bytecode are always deployed together.
+
+Bytecode is specific to the minor version of Python, so an interpreter with the same version as the target
+runtime must be available locally to compile the files.
+"""
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from zipfile import ZipFile
+
+from pydantic import DirectoryPath, FilePath
+
+from core.utils.logger import log
+
+
+# Directories the artifacts are extracted to in the deployed runtime
+HANDLER_RUNTIME_DIRECTORY = "/var/task"
+LAYER_RUNTIME_DIRECTORY = "/opt"
+
+_COMPILE_SCRIPT = """
+import json, py_compile, sys
+
+rv = []
+for source, cfile, dfile in json.load(sys.stdin):
+    try:
+        py_compile.compile(
+            source,
+            cfile=cfile,
+            dfile=dfile,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        rv.append(True)
+    except Exception:
+        rv.append(False)
+
+print(json.dumps(rv))
+"""
+
+
+def get_interpreter(version: Tuple[int, int]) -> Optional[str]:
+    """Find a local interpreter for the given version of Python
+
+    Args:
+        version (Tuple[int, int]): major and minor version
+
+    Returns:
+        Optional[str]: path to the interpreter or None if no interpreter is available
+    """
+    if tuple(sys.version_info[:2]) == tuple(version):
+        return sys.executable
+
+    return shutil.which(f"python{version[0]}.{version[1]}")
+
+
+def get_cache_tag(version: Tuple[int, int]) -> str:
+    return f"cpython-{version[0]}{version[1]}"
+
+
+def compile_records(
+    records: List[Tuple[FilePath, str]],
+    version: Tuple[int, int],
+    output_directory: DirectoryPath,
+    runtime_directory: str,
+) -> List[Tuple[FilePath, str]]:
+    """Compile the python files in a set of records and add the bytecode files to the records
+
+    Args:
+        records (List[Tuple[FilePath, str]]): original file path and path within the archive
+        version (Tuple[int, int]): major and minor version of Python of the target runtime
+        output_directory (DirectoryPath): directory to write the bytecode files to
+        runtime_directory (str): directory the archive is extracted to in the runtime. Used for tracebacks.
+
+    Returns:
+        List[Tuple[FilePath, str]]: original records plus the bytecode records
+    """
+    interpreter = get_interpreter(version)
+
+    if not interpreter:
+        log.warning(
+            "Can not precompile artifact for Python %s.%s because no matching interpreter is available",
+            *version,
+        )
+        return records
+
+    cache_tag = get_cache_tag(version)
+
+    jobs = []
+    for original_path, zip_path in records:
+        zip_path = zip_path.replace(os.sep, "/")
+
+        if not zip_path.endswith(".py"):
+            continue
+
+        dirname, filename = posixpath.split(zip_path)
+        bytecode_zip_path = posixpath.join(
+            dirname, "__pycache__", f"{filename[:-3]}.{cache_tag}.pyc"
+        )
+
+        jobs.append(
+            (
+                original_path,
+                os.path.join(output_directory, bytecode_zip_path),
+                posixpath.join(runtime_directory, zip_path),
+                bytecode_zip_path,
+            )
+        )
+
+    if not jobs:
+        return records
+
+    result = subprocess.run(
+        [interpreter, "-c", _COMPILE_SCRIPT],
+        input=json.dumps([x[:3] for x in jobs]),
+        capture_output=True,
+        text=True,
+    )
+
+    try:
+        compiled = json.loads(result.stdout.strip().splitlines()[-1])
+    except Exception as e:
+        raise Exception(f"Could not compile artifact bytecode: {result.stderr}")
+
+    # Files that do not compile (i.e. templates or files for other versions) are still packaged as source
+    bytecode_records = [
+        (cfile, bytecode_zip_path)
+        for (_, cfile, _, bytecode_zip_path), is_compiled in zip(jobs, compiled)
+        if is_compiled
+    ]
+
+    log.debug(
+        "Compiled %s of %s python files for %s",
+        len(bytecode_records),
+        len(jobs),
+        cache_tag,
+    )
+
+    return [*records, *bytecode_records]
+
+
+def benchmark_import_time(
+    archive_fp: FilePath, module_name: str, runs: int = 5, prefix: str = ""
+) -> Dict[str, float]:
+    """Measure the time to import a module from an artifact with and without the bytecode included in the archive.
+
+    The archive is extracted twice, once with the bytecode and once without, and the module is imported in a new
+    interpreter for each run. Writing bytecode is disabled, which matches the read only file system of a deployed
+    function where every cold start compiles the sources again.
+
+    Args:
+        archive_fp (FilePath): artifact created with precompiled bytecode
+        module_name (str): module to import
+        runs (int, optional): number of imports to average. Defaults to 5.
+        prefix (str, optional): directory within the archive to add to the path (i.e. 'python' for layers). Defaults to "".
+
+    Returns:
+        Dict[str, float]: average import time in seconds for the 'source' and 'bytecode' versions
+    """
+    rv = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, include_bytecode in [("source", False), ("bytecode", True)]:
+            extract_directory = os.path.join(tmp_dir, name)
+
+            with ZipFile(archive_fp) as zipfile:
+                members = [
+                    x
+                    for x in zipfile.namelist()
+                    if include_bytecode or not x.endswith(".pyc")
+                ]
+                zipfile.extractall(extract_directory, members)
+
+            rv[name] = _time_import(
+                os.path.join(extract_directory, prefix), module_name, runs
+            )
+
+    return rv
+
+
+def _time_import(path: DirectoryPath, module_name: str, runs: int) -> float:
+    script = f"import time; start = time.perf_counter(); import {module_name}; print(time.perf_counter() - start)"
+
+    durations = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-B", "-c", script],
+            cwd=path,
+            env={**os.environ, "PYTHONPATH": path},
+            capture_output=True,
+            text=True,
+        )
+
+        if not result.returncode == 0:
+            raise Exception(f"Could not import {module_name}: {result.stderr}")
+
+        durations.append(float(result.stdout.strip().splitlines()[-1]))
+
+    return sum(durations) / len(durations)
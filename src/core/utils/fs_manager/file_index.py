@@ -0,0 +1,412 @@
+"""Persistent index of the files that make up a file system component
+
+Rendering a component requires loading each Python file in the component folder, but the expensive
+part of the process is parsing and packaging the Serverless Functions defined in those files. This
+module provides the utilities to discover the files that make up a component using include and
+exclude globs, and a file backed index that records the state of each discovered file:
+
+    path -> size, mtime, hash, dependencies, last rendered functions
+
+On the next render, a function is only parsed and packaged again if its file, one of the files packaged
+with it, its configuration, or the environment used to create the artifacts has changed.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from pydantic import DirectoryPath, FilePath
+
+from core.default.resources.simple.xlambda import (
+    dependency_layer_model,
+    simple_function_model,
+)
+from core.utils import hasher, paths
+from core.utils.cache import FileLoadableCache
+from core.utils.file_manager import safe_json_write, _recursive_make_immutable
+from core.utils.logger import log
+
+
+FILE_INDEX_CACHE_LOCATION = ".cdev/intermediate/cache/component_file_index.json"
+
+# By default only the python files at the top level of the component folder are loaded. Use
+# an include value of '**/*.py' to recursively load all python files in the component.
+DEFAULT_INCLUDES = ["*.py"]
+DEFAULT_EXCLUDES = ["**/__pycache__/**", "**/.*/**"]
+
+
+#######################
+##### Discovery
+#######################
+
+
+def find_component_files(
+    folder_path: DirectoryPath,
+    includes: List[str] = None,
+    excludes: List[str] = None,
+) -> List[FilePath]:
+    """Find all the files in a component folder that match at least one include glob and none of the exclude globs.
+
+    Globs are matched against the path of the file relative to the component folder. A `*` matches within a
+    single directory while a `**` matches across directories.
+
+    Args:
+        folder_path (DirectoryPath): component folder to search
+        includes (List[str], optional): globs of files to include. Defaults to DEFAULT_INCLUDES.
+        excludes (List[str], optional): globs of files to exclude. Defaults to DEFAULT_EXCLUDES.
+
+    Returns:
+        List[FilePath]: sorted full paths of the matched files
+    """
+    include_patterns = [_compile_glob(x) for x in (includes or DEFAULT_INCLUDES)]
+    exclude_patterns = [
+        _compile_glob(x) for x in (DEFAULT_EXCLUDES if excludes is None else excludes)
+    ]
+
+    rv = []
+    for dirname, subdirs, files in os.walk(folder_path):
+        relative_dir = os.path.relpath(dirname, folder_path).replace(os.sep, "/")
+        relative_dir = "" if relative_dir == "." else relative_dir + "/"
+
+        # Prune any directory that is completely excluded so that it is never walked
+        subdirs[:] = sorted(
+            x
+            for x in subdirs
+            if not _matches_any(f"{relative_dir}{x}/", exclude_patterns)
+        )
+
+        for filename in files:
+            relative_fp = relative_dir + filename
+
+            if _matches_any(relative_fp, include_patterns) and not _matches_any(
+                relative_fp, exclude_patterns
+            ):
+                rv.append(os.path.join(dirname, filename))
+
+    return sorted(rv)
+
+
+def _compile_glob(pattern: str) -> Pattern:
+    """Translate a path glob into a compiled regex
+
+    Args:
+        pattern (str): glob using '*', '**' and '?'
+
+    Returns:
+        Pattern
+    """
+    regex = ""
+    i = 0
+
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    return re.compile(regex)
+
+
+def _matches_any(relative_path: str, patterns: List[Pattern]) -> bool:
+    return any(x.fullmatch(relative_path) for x in patterns)
+
+
+#######################
+##### Index
+#######################
+
+
+def get_file_stats(fp: FilePath) -> Dict:
+    """Get the information used to detect changes in a file
+
+    Args:
+        fp (FilePath)
+
+    Returns:
+        Dict: size, mtime and hash of the file
+    """
+    stat = os.stat(fp)
+
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": hasher.hash_file(fp, bypass_cache=True),
+    }
+
+
+def is_file_unchanged(fp: FilePath, stats: Dict) -> bool:
+    """Check a file against the previously recorded stats of the file.
+
+    The size and mtime are checked first to avoid reading the file. If they differ, the file is only considered
+    changed if the hash of the contents also differs.
+
+    Args:
+        fp (FilePath)
+        stats (Dict): previously recorded stats
+
+    Returns:
+        bool
+    """
+    if not os.path.isfile(fp):
+        return False
+
+    stat = os.stat(fp)
+
+    if stat.st_size == stats.get("size") and stat.st_mtime_ns == stats.get("mtime"):
+        return True
+
+    if stat.st_size != stats.get("size"):
+        return False
+
+    if hasher.hash_file(fp, bypass_cache=True) != stats.get("hash"):
+        return False
+
+    # Contents are the same so refresh the mtime to avoid hashing on the next check
+    stats["mtime"] = stat.st_mtime_ns
+    return True
+
+
+def expand_dependency_paths(dependencies: Iterable[str]) -> List[FilePath]:
+    """Expand any directory modules into the files that will be packaged with them
+
+    Args:
+        dependencies (Iterable[str]): file and directory paths
+
+    Returns:
+        List[FilePath]
+    """
+    rv = []
+    for dependency in dependencies:
+        if os.path.isdir(dependency):
+            for dirname, subdirs, files in os.walk(dependency):
+                subdirs[:] = [x for x in subdirs if not x == "__pycache__"]
+                rv.extend(os.path.join(dirname, x) for x in files)
+
+        elif os.path.isfile(dependency):
+            rv.append(dependency)
+
+    return rv
+
+
+class ComponentFileIndex(FileLoadableCache):
+    """Implementation of FileLoadableCache that stores information about the files of file system components.
+
+    Each entry is keyed by the path of a file relative to the Workspace and has the form:
+
+        {
+            "size": int,
+            "mtime": int,
+            "hash": str,
+            "dependencies": {<path>: {"size": int, "mtime": int, "hash": str}},
+            "functions": {
+                <handler>: {"key": str, "function": Dict, "layers": List[Dict], "dependencies": List[str]}
+            }
+        }
+
+    The index is only valid for a single `environment_hash`, which should represent the resource state, settings and
+    installed distributions used to create the artifacts. Entries from a different environment are dropped on load.
+    """
+
+    def __init__(self, fp: FilePath, environment_hash: str) -> None:
+        self._environment_hash = environment_hash
+        super().__init__(fp)
+
+    def dump_to_file(self) -> None:
+        safe_json_write(
+            {"environment_hash": self._environment_hash, "files": self._cache_data},
+            self.fp,
+        )
+
+    def _load_from_file(self, fp: FilePath) -> Dict:
+        if not os.path.isfile(fp):
+            return {}
+
+        try:
+            with open(fp) as fh:
+                raw_data = json.load(fh)
+        except Exception as e:
+            # Could not load the file so just return an empty index
+            return {}
+
+        if not raw_data.get("environment_hash") == self._environment_hash:
+            log.debug("Environment changed since %s was written", fp)
+            return {}
+
+        return raw_data.get("files", {})
+
+    def is_file_unchanged(self, fp: FilePath) -> bool:
+        """Check whether a file and all the files packaged with it are unchanged since they were indexed
+
+        Args:
+            fp (FilePath): full path to the file
+
+        Returns:
+            bool
+        """
+        entry = self.get_from_cache(paths.get_relative_to_workspace_path(fp))
+
+        if not entry:
+            return False
+
+        if not is_file_unchanged(fp, entry):
+            return False
+
+        return all(
+            is_file_unchanged(paths.get_full_path_from_workspace_base(k), v)
+            for k, v in entry.get("dependencies", {}).items()
+        )
+
+    def get_function(
+        self, fp: FilePath, handler: str, key: str
+    ) -> Optional[Tuple[simple_function_model, List[dependency_layer_model]]]:
+        """Get the last rendered function and layers for a handler if the file and function are unchanged.
+
+        Args:
+            fp (FilePath): full path to the file
+            handler (str): name of the handler in the file
+            key (str): identifier of the function before it was parsed
+
+        Returns:
+            Optional[Tuple[simple_function_model, List[dependency_layer_model]]]
+        """
+        entry = self.get_from_cache(paths.get_relative_to_workspace_path(fp))
+
+        if not entry:
+            return None
+
+        function_info = entry.get("functions", {}).get(handler)
+
+        if not function_info or not function_info.get("key") == key:
+            return None
+
+        function = simple_function_model(
+            **_recursive_make_immutable(function_info.get("function"))
+        )
+        layers = [
+            dependency_layer_model(**_recursive_make_immutable(x))
+            for x in function_info.get("layers")
+        ]
+
+        # The artifacts are in the intermediate folder, which can be deleted at any time
+        _artifacts = [function.filepath, *[x.artifact_path for x in layers]]
+        if not all(
+            os.path.isfile(paths.get_full_path_from_workspace_base(x))
+            for x in _artifacts
+        ):
+            return None
+
+        return function, layers
+
+    def reset_file(self, fp: FilePath) -> None:
+        """Reset the entry for a file that has changed. All previously indexed functions are removed.
+
+        Args:
+            fp (FilePath): full path to the file
+        """
+        self.update_cache(
+            paths.get_relative_to_workspace_path(fp),
+            {**get_file_stats(fp), "dependencies": {}, "functions": {}},
+        )
+
+    def update_function(
+        self,
+        fp: FilePath,
+        handler: str,
+        key: str,
+        function: simple_function_model,
+        layers: List[dependency_layer_model],
+        dependencies: Iterable[str],
+    ) -> None:
+        """Record the rendered function and layers of a handler along with the files packaged with it.
+
+        Args:
+            fp (FilePath): full path to the file
+            handler (str): name of the handler in the file
+            key (str): identifier of the function before it was parsed
+            function (simple_function_model): rendered function
+            layers (List[dependency_layer_model]): rendered layers
+            dependencies (Iterable[str]): files and directories packaged with the handler
+        """
+        relative_fp = paths.get_relative_to_workspace_path(fp)
+
+        if not self.in_cache(relative_fp):
+            self.reset_file(fp)
+
+        entry = self.get_from_cache(relative_fp)
+        dependencies = list(dependencies)
+
+        for dependency in expand_dependency_paths(dependencies):
+            relative_dependency = paths.get_relative_to_workspace_path(dependency)
+
+            if relative_dependency == relative_fp:
+                continue
+
+            if relative_dependency not in entry["dependencies"]:
+                entry["dependencies"][relative_dependency] = get_file_stats(dependency)
+
+        entry["functions"][handler] = {
+            "key": key,
+            "function": function.dict(),
+            "layers": [x.dict() for x in layers],
+            "dependencies": sorted(
+                paths.get_relative_to_workspace_path(x) for x in dependencies
+            ),
+        }
+
+    def get_affected_functions(
+        self, changed_files: Iterable[FilePath]
+    ) -> Dict[str, List[str]]:
+        """Get the indexed functions that would change because of changes to the given files.
+
+        A function is affected if the change is to the file it is defined in or to any of the
+        relative modules that are packaged with it.
+
+        Args:
+            changed_files (Iterable[FilePath]): full paths of the changed files
+
+        Returns:
+            Dict[str, List[str]]: relative path of the file a function is defined in to the affected handler names
+        """
+        relative_changed_files = [
+            paths.get_relative_to_workspace_path(x) for x in changed_files
+        ]
+
+        rv = {}
+        for relative_fp, entry in self._cache_data.items():
+            for handler, function_info in entry.get("functions", {}).items():
+                modules = [relative_fp, *function_info.get("dependencies", [])]
+
+                if any(
+                    changed == module or changed.startswith(module + "/")
+                    for changed in relative_changed_files
+                    for module in modules
+                ):
+                    rv.setdefault(relative_fp, []).append(handler)
+
+        return rv
+
+    def remove_missing_files(self, folder_path: DirectoryPath) -> None:
+        """Remove the entries of any file in a folder that no longer exists
+
+        Args:
+            folder_path (DirectoryPath): full path to the folder
+        """
+        relative_folder = paths.get_relative_to_workspace_path(folder_path)
+
+        for key in list(self._cache_data.keys()):
+            if not relative_folder == "." and not key.startswith(relative_folder + "/"):
+                continue
+
+            if not os.path.isfile(paths.get_full_path_from_workspace_base(key)):
+                self._cache_data.pop(key)
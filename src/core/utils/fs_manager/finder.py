@@ -1,6 +1,6 @@
 import os
 import sys
-from typing import Dict, List, Set, Tuple, Union
+from typing import Dict, Iterable, List, Set, Tuple, Union
 from dataclasses import dataclass, field
 from pydantic import DirectoryPath
 from pydantic.types import FilePath
@@ -23,12 +23,20 @@ from core.default.resources.simple.xlambda import (
     simple_function_model,
 )
 
-from core.utils import module_loader, paths
+from core.utils import hasher, module_loader, paths
 from core.utils.logger import log
+from core.utils.platforms import get_platform_python_version
 
 from serverless_parser import parser as serverless_parser
 
-from core.utils.fs_manager import handler_optimizer, package_generator, modules_manager
+from core.utils.fs_manager import (
+    file_index,
+    handler_optimizer,
+    layer_pruner,
+    package_generator,
+    modules_manager,
+    relative_generator,
+)
 from core.utils.exceptions import cdev_core_error
 
 
@@ -77,11 +85,15 @@ Error optimizing modules used in {filepath} for function '{function_name}'. Orig
 
 def parse_folder(
     folder_path: DirectoryPath,
+    includes: List[str] = None,
+    excludes: List[str] = None,
 ) -> Tuple[List[ResourceModel], List[ResourceReferenceModel]]:
     """Search through the given folder looking for resource and references in Python files.
 
     Args:
         folder_path (DirectoryPath): The directory to parse
+        includes (List[str], optional): Globs of the files to load. Defaults to the top level python files.
+        excludes (List[str], optional): Globs of the files to ignore. Defaults to `__pycache__` and hidden folders.
 
     Returns:
         Tuple[
@@ -95,7 +107,8 @@ def parse_folder(
 
     Most resources are passed back as is, but there are optimizations performed on the `simple functions`.
     Namely, Serverless functions are parsed to optimized the actual deployed artifact using the
-    cparser library and then have their dependencies managed also.
+    cparser library and then have their dependencies managed also. The results of parsing the functions
+    are stored in a `ComponentFileIndex`, so that only functions from new or modified files are parsed again.
     """
 
     package_generator.DistributionEnvironment.create_environment()
@@ -105,11 +118,15 @@ def parse_folder(
 
     log.debug("Finding resources in folder %s", folder_path)
 
-    python_files = [
-        f
-        for f in os.listdir(folder_path)
-        if os.path.isfile(os.path.join(folder_path, f)) and f[-3:] == ".py"
-    ]
+    python_files = file_index.find_component_files(folder_path, includes, excludes)
+
+    index = (
+        file_index.ComponentFileIndex(
+            file_index.FILE_INDEX_CACHE_LOCATION, _get_environment_hash()
+        )
+        if Workspace.instance().settings.USE_COMPONENT_FILE_INDEX
+        else None
+    )
 
     # [{<resource>}]
     resources_rv = SortedKeyList(key=lambda x: x.hash)
@@ -117,7 +134,7 @@ def parse_folder(
 
     for pf in python_files:
         found_resources, found_references = _find_resources_information_from_file(
-            os.path.join(folder_path, pf)
+            pf, index
         )
 
         if found_resources:
@@ -126,12 +143,86 @@ def parse_folder(
         if found_references:
             references_rv.update(found_references)
 
+    if index:
+        index.remove_missing_files(folder_path)
+        index.dump_to_file()
+
+    relative_generator.save_dependency_cache()
+
     # Any duplicate layers can be removed
     cleaned_resources_rv = _deduplicate_resources_list(resources_rv)
 
     return cleaned_resources_rv, references_rv
 
 
+def get_changes_affecting_folder(
+    folder_path: DirectoryPath, changed_files: Iterable[FilePath]
+) -> Set[FilePath]:
+    """Find the changed files that could change the resources rendered from a folder. A file affects the folder if it
+    is within the folder or if a module within the folder depends on it through relative imports.
+
+    Args:
+        folder_path (DirectoryPath): component folder
+        changed_files (Iterable[FilePath]): full paths of the changed files
+
+    Returns:
+        Set[FilePath]: the changed files that affect the folder
+    """
+    folder_path = os.path.abspath(folder_path)
+
+    def _is_in_folder(fp: str) -> bool:
+        return fp == folder_path or fp.startswith(folder_path + os.sep)
+
+    rv = set()
+    for changed_file in changed_files:
+        if _is_in_folder(os.path.abspath(changed_file)) or any(
+            _is_in_folder(x)
+            for x in relative_generator.get_dependent_modules(changed_file)
+        ):
+            rv.add(changed_file)
+
+    return rv
+
+
+def _get_environment_hash() -> str:
+    """Create a hash representing the environment used to create the function artifacts.
+
+    Returns:
+        str: hash
+    """
+    distributions = sorted(
+        f"{x.project_name}=={x.parsed_version}"
+        for x in package_generator.DistributionEnvironment.distributions
+    )
+
+    return hasher.hash_list(
+        [
+            Workspace.instance().get_resource_state_uuid(),
+            Workspace.instance().settings.PACKAGE_AWS_PACKAGES,
+            Workspace.instance().settings.PRUNE_LAYER_MODE,
+            Workspace.instance().settings.PRECOMPILE_ARTIFACTS,
+            hasher.hash_list(Workspace.instance().settings.PRUNE_LAYER_INCLUDES),
+            hasher.hash_list(distributions),
+        ]
+    )
+
+
+def _get_index_key(function: SimpleFunction) -> str:
+    """Create the key used to identify a function in the file index before it is parsed.
+
+    Args:
+        function (SimpleFunction)
+
+    Returns:
+        str: key
+    """
+    if function.precompile is None:
+        return function.hash
+
+    # Precompiling changes the artifacts but is not part of the hash of the function
+    return hasher.hash_list([function.hash, function.precompile])
+
+
 def _deduplicate_resources_list(resources: List[Resource]) -> List[Resource]:
     """Remove duplicated layer resources
 
@@ -194,11 +285,13 @@ def _get_module_name_from_path(fp: FilePath):
 
 def _find_resources_information_from_file(
     fp: FilePath,
+    index: file_index.ComponentFileIndex = None,
 ) -> Tuple[List[ResourceModel], List[ResourceReferenceModel]]:
     """Load a file and find top level objects that are Resources or References
 
     Args:
         fp (FilePath): path to python file
+        index (ComponentFileIndex, optional): index of previously parsed functions. Defaults to None.
 
     Raises:
         Exception: [description]
@@ -242,10 +335,34 @@ def _find_resources_information_from_file(
         elif isinstance(obj, Resource_Reference):
             reference_rv.append(obj.render())
 
+    if functions_to_parse and index:
+        full_file_path = paths.get_full_path_from_workspace_base(fp)
+
+        if not index.is_file_unchanged(full_file_path):
+            log.debug("File %s is new or modified since it was last indexed", fp)
+            index.reset_file(full_file_path)
+
+        for function_name in list(functions_to_parse):
+            cached_info = index.get_function(
+                full_file_path,
+                function_name,
+                _get_index_key(function_name_to_info.get(function_name)),
+            )
+
+            if cached_info:
+                log.debug("Using indexed function %s from %s", function_name, fp)
+                cached_function, cached_layers = cached_info
+                resource_rv.append(cached_function)
+                resource_rv.extend(cached_layers)
+                functions_to_parse.remove(function_name)
+
     if functions_to_parse:
         log.debug("Parsing functions (%s) from %s", functions_to_parse, fp)
         parsed_function_info, parsed_dependency_info = _parse_serverless_functions(
-            fp, functions_to_parse, handler_name_to_info=function_name_to_info
+            fp,
+            functions_to_parse,
+            handler_name_to_info=function_name_to_info,
+            index=index,
         )
 
         resource_rv.extend(parsed_function_info)
@@ -260,6 +377,7 @@ def _parse_serverless_functions(
     handler_name_to_info: Dict[str, SimpleFunction],
     manual_includes: Dict = {},
     global_includes: List = [],
+    index: file_index.ComponentFileIndex = None,
 ) -> Tuple[List[simple_function_model], List[dependency_layer_model]]:
     """Parse a given set of function names from a given file
 
@@ -269,6 +387,7 @@ def _parse_serverless_functions(
         handler_name_to_info (Dict[str, SimpleFunction]): dict of additional information
         manual_includes (Dict, optional): Dict of information about extra lines to include. Defaults to {}.
         global_includes (List, optional): List of global lines to include. Defaults to [].
+        index (ComponentFileIndex, optional): index to record the parsed functions in. Defaults to None.
 
     Returns:
         Tuple[
@@ -287,6 +406,8 @@ def _parse_serverless_functions(
         if Workspace.instance().settings.PACKAGE_AWS_PACKAGES
         else AWS_EXCLUDE_DISTRIBUTIONS
     )
+    prune_mode = Workspace.instance().settings.PRUNE_LAYER_MODE
+    prune_includes = Workspace.instance().settings.PRUNE_LAYER_INCLUDES
 
     # Return Values
     rv_functions: List[SimpleFunction] = []
@@ -314,6 +435,12 @@ def _parse_serverless_functions(
         flattened_needed_lines = _compress_lines(parsed_function.needed_line_numbers)
 
         new_handler = _create_new_handler(full_file_path, parsed_function.name)
+
+        precompile_version = (
+            get_platform_python_version(previous_info.platform)
+            if _should_precompile(previous_info)
+            else None
+        )
         needed_python_init_files = _create_init_files(full_file_path)
 
         (
@@ -334,6 +461,7 @@ def _parse_serverless_functions(
             needed_lines=flattened_needed_lines,
             suffix=f"_{previous_info.name}",
             excludes=excludes,
+            precompile_version=precompile_version,
         )
 
         optimized_distributions = (
@@ -342,16 +470,34 @@ def _parse_serverless_functions(
             )
         )
 
-        if len(optimized_distributions) > 5:
-            raise Exception(
-                "Can not have more than 5 layers on the Aws Lambda Platform."
+        # Pruned layers are traced from the full names of the modules the handler imports
+        needed_modules = (
+            layer_pruner.get_absolute_imports(
+                [
+                    full_file_path,
+                    *file_index.expand_dependency_paths(relative_dependencies),
+                ]
             )
+            if prune_mode
+            else packaged_dependencies
+        )
+
+        # Group the distributions so that the function stays within the layer limit of the platform
+        layer_groups = package_generator.DistributionEnvironment.get_layer_plan(
+            optimized_distributions, aws_platform_exclude
+        )
 
         archive_information = [
-            package_generator.DistributionEnvironment.create_distribution_artifact(
-                x, base_archive_path, aws_platform_exclude
+            package_generator.DistributionEnvironment.create_layer_artifact(
+                x,
+                base_archive_path,
+                aws_platform_exclude,
+                needed_modules,
+                prune_mode,
+                prune_includes,
+                precompile_version,
             )
-            for x in optimized_distributions
+            for x in layer_groups
         ]
 
         dependencies_resources = [
@@ -363,20 +509,37 @@ def _parse_serverless_functions(
             for absolute_archive_path, archive_hash in archive_information
         ]
 
-        rv_functions.append(
-            _create_new_function_resource(
-                previous_info,
-                paths.get_relative_to_workspace_path(source_artifact_path),
-                source_hash,
-                dependencies_resources,
-                new_handler,
-            )
+        new_function = _create_new_function_resource(
+            previous_info,
+            paths.get_relative_to_workspace_path(source_artifact_path),
+            source_hash,
+            dependencies_resources,
+            new_handler,
         )
+
+        if index:
+            index.update_function(
+                full_file_path,
+                parsed_function.name,
+                _get_index_key(previous_info),
+                new_function.render(),
+                [x.render() for x in dependencies_resources],
+                [*needed_python_init_files, *relative_dependencies],
+            )
+
+        rv_functions.append(new_function)
         rv_layers.extend(dependencies_resources)
 
     return [x.render() for x in rv_functions], [x.render() for x in rv_layers]
 
 
+def _should_precompile(function: SimpleFunction) -> bool:
+    if function.precompile is None:
+        return Workspace.instance().settings.PRECOMPILE_ARTIFACTS
+
+    return function.precompile
+
+
 def _create_new_handler(original_file_location: FilePath, function_name: str) -> str:
     """Given a file location and function name, create the new handler path for the function
 
@@ -482,6 +645,7 @@ def _create_new_function_resource(
         nonce=previous_info.nonce,
         preserve_function=previous_info._preserved_function,
         platform=previous_info.platform,
+        precompile=previous_info.precompile,
     )
 
 
@@ -1,10 +1,10 @@
 import os
 from pydantic import DirectoryPath, FilePath
-from typing import List, Set, Tuple, Union, Any
+from typing import List, Optional, Set, Tuple, Union, Any
 import sys
 from pathlib import Path
 
-from core.utils.fs_manager import writer
+from core.utils.fs_manager import bytecode_compiler, writer
 from core.utils.operations import concatenate
 from core.utils.paths import create_path_from_workspace
 
@@ -17,6 +17,7 @@ def create_handler_artifact(
     needed_lines: List[int],
     suffix: str = "",
     excludes: Set[str] = set(),
+    precompile_version: Optional[Tuple[int, int]] = None,
 ) -> Tuple[FilePath, str]:
     """Create the handler archive and hash based on the given information.
 
@@ -28,6 +29,7 @@ def create_handler_artifact(
         additional_files (List[Union[FilePath, DirectoryPath]], optional): additional files for the artifact. Defaults to [].
         suffix (str, optional): suffix for final artifact. Defaults to "".
         excludes (Set[str], optional): folders to exclude from the artifact. Defaults to set().
+        precompile_version (Optional[Tuple[int, int]], optional): Python version to precompile the bytecode of the artifact for. Defaults to None.
 
     Returns:
         Tuple[FilePath,str]: Tuple of archive filepath and hash
@@ -58,9 +60,17 @@ def create_handler_artifact(
         ]
     )
 
-    handler_hash = writer.create_archive_and_hash(
-        [handler_final_info, *additional_files_final_info], final_output_fp
-    )
+    all_files_info = [handler_final_info, *additional_files_final_info]
+
+    if precompile_version:
+        all_files_info = bytecode_compiler.compile_records(
+            all_files_info,
+            precompile_version,
+            final_output_fp[:-4] + "_bytecode",
+            bytecode_compiler.HANDLER_RUNTIME_DIRECTORY,
+        )
+
+    handler_hash = writer.create_archive_and_hash(all_files_info, final_output_fp)
 
     return final_output_fp, handler_hash
 
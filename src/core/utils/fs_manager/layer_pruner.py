@@ -0,0 +1,351 @@
+"""Utilities to prune the files packaged into a dependency layer down to the files a handler needs
+
+By default, every file listed in the RECORD of a distribution is packaged into its layer. For large
+distributions this includes tests, type stubs, C sources and submodules that are never used by the
+handler. Pruning determines the set of modules reachable from the modules the handler imports and
+only packages those, plus any data files within the used packages.
+
+There are two modes for determining the needed modules:
+    - `static`: Parse the source of each reachable module and follow its import statements.
+    - `import`: Also import the modules in a separate python process and include every module that was loaded.
+      This captures modules that are loaded dynamically when a package is imported.
+
+Note that neither mode can see modules that are only imported at call time using dynamic imports (i.e.
+`importlib.import_module` within a function). Any such files can be explicitly included using the `includes` globs.
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Set, Tuple
+
+from pydantic import FilePath
+
+from core.utils.logger import log
+
+from .file_index import _compile_glob, _matches_any
+
+
+STATIC_MODE = "static"
+IMPORT_MODE = "import"
+
+AVAILABLE_MODES = [STATIC_MODE, IMPORT_MODE]
+
+# Files that are never needed at runtime
+PRUNED_FILES = [
+    "**/*.pyi",
+    "**/*.h",
+    "**/*.c",
+    "**/*.pyx",
+    "**/*.pxd",
+    "**/tests/**",
+    "**/test/**",
+]
+
+_LAYER_PREFIX = "python/"
+
+
+def prune_records(
+    records: List[Tuple[FilePath, str]],
+    start_modules: Iterable[str],
+    mode: str = STATIC_MODE,
+    includes: List[str] = [],
+) -> Tuple[List[Tuple[FilePath, str]], Dict]:
+    """Prune the records of a layer to only the files needed by the given modules
+
+    Args:
+        records (List[Tuple[FilePath, str]]): original file path and path within the layer archive
+        start_modules (Iterable[str]): modules directly imported by the handler
+        mode (str, optional): `static` or `import`. Defaults to `static`.
+        includes (List[str], optional): globs (relative to the layer python folder) of files to always include. Defaults to [].
+
+    Returns:
+        Tuple[List[Tuple[FilePath, str]], Dict]: pruned records and a size report
+    """
+    if mode not in AVAILABLE_MODES:
+        raise Exception(
+            f"Unknown layer pruning mode '{mode}'. Available modes are {AVAILABLE_MODES}"
+        )
+
+    module_to_record = _create_module_index(records)
+
+    if mode == STATIC_MODE:
+        needed_modules = trace_static_imports(start_modules, module_to_record)
+    else:
+        needed_modules = trace_trial_imports(start_modules, module_to_record)
+
+    needed_files = set(module_to_record.get(x)[1] for x in needed_modules)
+    needed_packages = set(x.split(".")[0] for x in needed_modules)
+
+    include_patterns = [_compile_glob(x) for x in includes]
+    pruned_patterns = [_compile_glob(x) for x in PRUNED_FILES]
+
+    rv = []
+    for original_path, zip_path in records:
+        relative_path = _get_layer_relative_path(zip_path)
+        top_level_name = relative_path.split("/")[0]
+
+        if _matches_any(relative_path, include_patterns):
+            rv.append((original_path, zip_path))
+
+        elif zip_path in needed_files:
+            # Modules reached by the trace are kept even if they match a pruned pattern (i.e. a `test` package)
+            rv.append((original_path, zip_path))
+
+        elif _matches_any(relative_path, pruned_patterns):
+            continue
+
+        elif top_level_name.endswith(".dist-info"):
+            # Metadata is small and can be used at runtime to look up versions
+            rv.append((original_path, zip_path))
+
+        elif _is_python_source(relative_path):
+            continue
+
+        elif top_level_name.split(".")[0] in needed_packages:
+            # Data files and compiled extensions within a used package
+            rv.append((original_path, zip_path))
+
+    report = {
+        "mode": mode,
+        "start_modules": sorted(start_modules),
+        "original_files": len(records),
+        "original_bytes": _get_total_size(records),
+        "pruned_files": len(rv),
+        "pruned_bytes": _get_total_size(rv),
+    }
+
+    log.debug(
+        "Pruned layer from %s bytes to %s bytes",
+        report.get("original_bytes"),
+        report.get("pruned_bytes"),
+    )
+
+    return rv, report
+
+
+def trace_static_imports(
+    start_modules: Iterable[str], module_to_record: Dict[str, Tuple[FilePath, str]]
+) -> Set[str]:
+    """Follow the import statements of the given modules to find all the reachable modules in the layer
+
+    Args:
+        start_modules (Iterable[str]): modules to start from
+        module_to_record (Dict[str, Tuple[FilePath, str]]): module name to its record
+
+    Returns:
+        Set[str]: reachable module names
+    """
+    visited = set()
+    to_visit = []
+
+    for start_module in start_modules:
+        if start_module in module_to_record:
+            to_visit.append(start_module)
+        else:
+            # Namespace packages do not have an `__init__.py`, so every module within them is a start module
+            to_visit.extend(
+                x for x in module_to_record if x.startswith(start_module + ".")
+            )
+
+    while to_visit:
+        module_name = to_visit.pop()
+
+        for candidate in _get_module_and_parents(module_name):
+            if candidate in visited or candidate not in module_to_record:
+                continue
+
+            visited.add(candidate)
+
+            original_path, zip_path = module_to_record.get(candidate)
+
+            if not original_path.endswith(".py"):
+                continue
+
+            to_visit.extend(
+                _get_imported_module_names(
+                    original_path, candidate, zip_path.endswith("__init__.py")
+                )
+            )
+
+    return visited
+
+
+def trace_trial_imports(
+    start_modules: Iterable[str], module_to_record: Dict[str, Tuple[FilePath, str]]
+) -> Set[str]:
+    """Import the given modules in a separate python process and find all the modules from the layer that were loaded
+    or are statically reachable from the loaded modules.
+
+    Args:
+        start_modules (Iterable[str]): modules to import
+        module_to_record (Dict[str, Tuple[FilePath, str]]): module name to its record
+
+    Returns:
+        Set[str]: loaded module names
+    """
+    script = """
+import importlib, json, sys
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+print(json.dumps([x for x in list(sys.modules.keys())]))
+"""
+
+    result = subprocess.run(
+        [sys.executable, "-c", script, *start_modules],
+        capture_output=True,
+        text=True,
+    )
+
+    try:
+        loaded_modules = json.loads(result.stdout.strip().splitlines()[-1])
+    except Exception as e:
+        raise Exception(
+            f"Could not trace the imports of {list(start_modules)}: {result.stderr}"
+        )
+
+    return trace_static_imports(
+        [*start_modules, *[x for x in loaded_modules if x in module_to_record]],
+        module_to_record,
+    )
+
+
+def get_absolute_imports(files: Iterable[FilePath]) -> Set[str]:
+    """Get the full names of the modules imported with absolute imports in a set of files. This is used to find
+    the start modules of a handler, since a handler that uses `from rich.console import Console` only needs the
+    modules reachable from `rich.console`.
+
+    Args:
+        files (Iterable[FilePath]): python files to parse
+
+    Returns:
+        Set[str]: module names
+    """
+    rv = set()
+    for fp in files:
+        if not fp.endswith(".py"):
+            continue
+
+        # Relative imports are packaged with the handler so they are ignored
+        rv.update(_get_imported_module_names(fp, "", False, absolute_only=True))
+
+    return rv
+
+
+def _create_module_index(
+    records: List[Tuple[FilePath, str]]
+) -> Dict[str, Tuple[FilePath, str]]:
+    """Create an index of module name to the record that provides the module
+
+    Args:
+        records (List[Tuple[FilePath, str]])
+
+    Returns:
+        Dict[str, Tuple[FilePath, str]]
+    """
+    rv = {}
+    for original_path, zip_path in records:
+        relative_path = _get_layer_relative_path(zip_path)
+
+        if not _is_python_source(relative_path) and not _is_extension(relative_path):
+            continue
+
+        parts = relative_path.split("/")
+
+        if not all(x.isidentifier() for x in parts[:-1]):
+            continue
+
+        module_name = parts[-1].split(".")[0]
+
+        if module_name == "__init__":
+            parts = parts[:-1]
+        else:
+            parts[-1] = module_name
+
+        rv[".".join(parts)] = (original_path, zip_path)
+
+    return rv
+
+
+def _get_imported_module_names(
+    fp: FilePath, module_name: str, is_package: bool, absolute_only: bool = False
+) -> Set[str]:
+    """Get the full names of the modules that are imported in a file
+
+    Args:
+        fp (FilePath): file to parse
+        module_name (str): name of the module the file represents
+        is_package (bool): the file is the `__init__.py` of a package
+        absolute_only (bool, optional): ignore relative imports. Defaults to False.
+
+    Returns:
+        Set[str]: module names
+    """
+    try:
+        with open(fp, "rb") as fh:
+            tree = ast.parse(fh.read())
+    except Exception as e:
+        log.debug("Could not parse %s for imports: %s", fp, e)
+        return set()
+
+    package_parts = (
+        module_name.split(".") if is_package else module_name.split(".")[:-1]
+    )
+
+    rv = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            rv.update(x.name for x in node.names)
+
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0:
+                base = node.module
+            elif absolute_only:
+                continue
+            elif node.level - 1 > len(package_parts):
+                # Relative import beyond the top level package
+                continue
+            else:
+                base_parts = package_parts[: len(package_parts) - (node.level - 1)]
+                base = ".".join(
+                    [*base_parts, node.module] if node.module else base_parts
+                )
+
+            if not base:
+                continue
+
+            rv.add(base)
+            # The imported names can be submodules of the base module
+            rv.update(f"{base}.{x.name}" for x in node.names if not x.name == "*")
+
+    return rv
+
+
+def _get_module_and_parents(module_name: str) -> List[str]:
+    parts = module_name.split(".")
+    return [".".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def _get_layer_relative_path(zip_path: str) -> str:
+    zip_path = zip_path.replace(os.sep, "/")
+    return (
+        zip_path[len(_LAYER_PREFIX) :]
+        if zip_path.startswith(_LAYER_PREFIX)
+        else zip_path
+    )
+
+
+def _is_python_source(relative_path: str) -> bool:
+    return relative_path.endswith(".py")
+
+
+def _is_extension(relative_path: str) -> bool:
+    return relative_path.endswith(".so") or relative_path.endswith(".pyd")
+
+
+def _get_total_size(records: List[Tuple[FilePath, str]]) -> int:
+    return sum(os.path.getsize(x[0]) for x in records if os.path.isfile(x[0]))
@@ -1,23 +1,31 @@
-from typing import Dict, List, Set, Tuple
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 from pydantic import BaseModel
 import os
 from pydantic.types import DirectoryPath, FilePath
 import itertools
-from networkx.algorithms.traversal.depth_first_search import dfs_preorder_nodes
 import json
 
-from pkg_resources import Distribution
-import pkg_resources
-
-import networkx as nx
-
 from core.utils.cache import FileLoadableCache
 from core.utils.file_manager import safe_json_write
+from core.utils.hasher import hash_list
+from core.utils.logger import log
 
+from . import bytecode_compiler, layer_pruner
 from .writer import create_archive_and_hash
 
+# pkg_resources scans every installed distribution when it is imported and networkx is large, so both are only
+# imported when the environment is created
+if TYPE_CHECKING:
+    import networkx as nx
+    from pkg_resources import Distribution, WorkingSet
+
 PACKAGED_CACHE_LOCATION = ".cdev/intermediate/cache/packaged_module_artifacts.json"
 
+LAYER_GROUPS_CACHE_LOCATION = ".cdev/intermediate/cache/layer_groups.json"
+
+# Aws Lambda only allows a function to have 5 layers attached
+MAX_LAMBDA_LAYERS = 5
+
 
 class PackagedDistributionInformation(BaseModel):
     project_name: str
@@ -69,9 +77,38 @@ class PackagedDistributionInformation(BaseModel):
     def get_base_directory(self) -> DirectoryPath:
         return self.dist_info.parent
 
+    def get_size(self) -> int:
+        """Get the total size in bytes of the files that will be packaged for this distribution
+
+        Returns:
+            int: size in bytes
+        """
+        record_file_location = os.path.join(self.dist_info, "RECORD")
+
+        with open(record_file_location, "r") as fh:
+            lines = fh.readlines()
+
+        _packaged_records = self.get_all_records()
+
+        total_size = 0
+        for line in lines:
+            parts = line.strip().rsplit(",", 2)
+
+            if len(parts) < 3 or parts[0] not in _packaged_records:
+                continue
+
+            if parts[2].isdigit():
+                total_size += int(parts[2])
+            elif os.path.isfile(os.path.join(self.get_base_directory(), parts[0])):
+                total_size += os.path.getsize(
+                    os.path.join(self.get_base_directory(), parts[0])
+                )
+
+        return total_size
+
 
 def create_packaged_distribution_information(
-    package: Distribution, working_set: pkg_resources.WorkingSet
+    package: "Distribution", working_set: "WorkingSet"
 ) -> PackagedDistributionInformation:
     """Return the needed metadata about a package.
 
@@ -141,18 +178,132 @@ class PackagedArtifactCache(FileLoadableCache):
         return validated_data
 
 
+class LayerGroupCache(FileLoadableCache):
+    """Implementation of FileLoadableCache that stores the groups of top level distributions that have been packaged
+    together as a layer, so that functions planned in later runs can prefer the layers that are already deployed.
+
+    The data has the form {"groups": [[<project name>, ...], ...]}
+    """
+
+    def dump_to_file(self) -> None:
+        safe_json_write(self._cache_data, self.fp)
+
+    def _load_from_file(self, fp: FilePath) -> Dict:
+        if not os.path.isfile(fp):
+            return {}
+
+        try:
+            with open(fp) as fh:
+                return json.load(fh)
+        except Exception as e:
+            # Could not load the file so just return an empty cache
+            return {}
+
+    def get_groups(self) -> Set[FrozenSet[str]]:
+        return set(frozenset(x) for x in self.get_from_cache("groups") or [])
+
+    def add_group(self, group: FrozenSet[str]) -> bool:
+        """Add a group of top level distributions
+
+        Args:
+            group (FrozenSet[str]): project names of the distributions
+
+        Returns:
+            bool: the group was not already in the cache
+        """
+        groups = self.get_groups()
+
+        if group in groups:
+            return False
+
+        groups.add(group)
+        self.update_cache("groups", sorted(sorted(x) for x in groups))
+        return True
+
+
+def plan_layer_groups(
+    closures: Dict[str, FrozenSet[str]],
+    sizes: Dict[str, int],
+    max_layers: int = MAX_LAMBDA_LAYERS,
+    existing_groups: Set[FrozenSet[str]] = set(),
+) -> List[FrozenSet[str]]:
+    """Group a set of top level distributions into at most `max_layers` layers.
+
+    Args:
+        closures (Dict[str, FrozenSet[str]]): top level distribution name to the names of all the distributions packaged with it
+        sizes (Dict[str, int]): size in bytes of each distribution
+        max_layers (int, optional): maximum number of layers. Defaults to MAX_LAMBDA_LAYERS.
+        existing_groups (Set[FrozenSet[str]], optional): groups already used by other functions. Defaults to set().
+
+    Returns:
+        List[FrozenSet[str]]: groups of top level distribution names
+
+    Any top level distribution already packaged as part of another top level distribution is removed. If there are still
+    more distributions than available layers, the pair of groups that would share the most bytes is merged into a single
+    composite layer until the limit is reached. Merges that recreate a group used by another function are preferred, so
+    that the same layer artifact can be reused.
+    """
+
+    def _closure_size(group: FrozenSet[str]) -> int:
+        return sum(
+            sizes.get(x, 0)
+            for x in set(itertools.chain.from_iterable(closures.get(y) for y in group))
+        )
+
+    # Distributions with nothing to package (i.e. all excluded) do not need a layer
+    _top_level_names = sorted(x for x, closure in closures.items() if closure)
+
+    # Remove top level distributions that are already contained in another distribution
+    _needed_names = [
+        x
+        for x in _top_level_names
+        if not any(
+            closures.get(x) < closures.get(y)
+            or (closures.get(x) == closures.get(y) and y < x)
+            for y in _top_level_names
+            if not y == x
+        )
+    ]
+
+    groups: List[FrozenSet[str]] = [frozenset([x]) for x in _needed_names]
+
+    while len(groups) > max_layers:
+        best_score = None
+        best_pair = None
+
+        for first, second in itertools.combinations(groups, 2):
+            merged = first.union(second)
+            merged_size = _closure_size(merged)
+            shared_size = _closure_size(first) + _closure_size(second) - merged_size
+
+            score = (merged in existing_groups, shared_size, -merged_size)
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_pair = (first, second)
+
+        groups = [x for x in groups if x not in best_pair]
+        groups.append(best_pair[0].union(best_pair[1]))
+
+    return sorted(groups, key=lambda x: sorted(x))
+
+
 class DistributionEnvironment:
     distributions: PackagedDistributionInformation = []
     _distribution_name_to_dist: Dict[str, PackagedDistributionInformation] = {}
     _all_module_names: Set[str] = set()
     _module_to_dists: Dict[str, Set[PackagedDistributionInformation]] = {}
-    _dep_graph: nx.DiGraph = nx.DiGraph()
+    _dep_graph: "nx.DiGraph" = None
     _archive_cache: PackagedArtifactCache = None
+    _layer_group_cache: LayerGroupCache = None
 
     @classmethod
     def create_environment(
         cls,
     ) -> None:
+        import networkx as nx
+        import pkg_resources
+
         cls.distributions = list(
             filter(
                 lambda x: x is not None,
@@ -180,6 +331,7 @@ class DistributionEnvironment:
                     module_name, []
                 ) + [distribution]
 
+        cls._dep_graph = nx.DiGraph()
         for distribution in cls.distributions:
             cls._dep_graph.add_node(distribution)
             for _dependency in distribution.dependencies:
@@ -188,6 +340,7 @@ class DistributionEnvironment:
                 )
 
         cls._archive_cache = PackagedArtifactCache(PACKAGED_CACHE_LOCATION)
+        cls._layer_group_cache = LayerGroupCache(LAYER_GROUPS_CACHE_LOCATION)
 
     @classmethod
     def is_module_in_distribution(cls, module_name: str) -> bool:
@@ -225,31 +378,196 @@ class DistributionEnvironment:
     def get_all_distributions_dependencies(
         cls, distribution: PackagedDistributionInformation
     ) -> Set[PackagedDistributionInformation]:
+        from networkx.algorithms.traversal.depth_first_search import (
+            dfs_preorder_nodes,
+        )
+
         return set(dfs_preorder_nodes(cls._dep_graph, distribution))
 
+    @classmethod
+    def get_layer_plan(
+        cls,
+        distributions: Set[PackagedDistributionInformation],
+        exclude_distributions: Set[str] = set(),
+        max_layers: int = MAX_LAMBDA_LAYERS,
+    ) -> List[Set[PackagedDistributionInformation]]:
+        """Group the top level distributions needed by a function into at most `max_layers` layers.
+
+        Args:
+            distributions (Set[PackagedDistributionInformation]): top level distributions
+            exclude_distributions (Set[str], optional): names of distributions that will not be packaged. Defaults to set().
+            max_layers (int, optional): maximum number of layers. Defaults to MAX_LAMBDA_LAYERS.
+
+        Returns:
+            List[Set[PackagedDistributionInformation]]: groups of top level distributions to package together
+        """
+        closures = {
+            x.project_name: frozenset(
+                y.project_name
+                for y in cls._get_packaged_distributions([x], exclude_distributions)
+            )
+            for x in distributions
+        }
+
+        sizes = {
+            y: cls._distribution_name_to_dist.get(y).get_size()
+            for y in set(itertools.chain.from_iterable(closures.values()))
+        }
+
+        groups = plan_layer_groups(
+            closures, sizes, max_layers, cls._layer_group_cache.get_groups()
+        )
+
+        return [set(cls._distribution_name_to_dist.get(y) for y in x) for x in groups]
+
+    @classmethod
+    def create_layer_artifact(
+        cls,
+        distributions: Set[PackagedDistributionInformation],
+        output_directory: str,
+        exclude_distributions: Set[str] = set(),
+        needed_modules: Iterable[str] = [],
+        prune_mode: Optional[str] = None,
+        prune_includes: List[str] = [],
+        precompile_version: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[str, str]:
+        """Create the archive for a layer made of a group of top level distributions.
+
+        A group with a single distribution is packaged as the standard layer for that distribution, so that it
+        can be shared with any other function using the distribution. Larger groups are packaged into a composite
+        layer that contains every needed distribution once.
+
+        Args:
+            distributions (Set[PackagedDistributionInformation]): top level distributions in the layer
+            output_directory (str): directory to write the archive to
+            exclude_distributions (Set[str], optional): names of distributions to not package. Defaults to set().
+            needed_modules (Iterable[str], optional): modules imported by the handler. Only used when pruning. Defaults to [].
+            prune_mode (Optional[str], optional): mode used to prune the layer. Defaults to None (no pruning).
+            prune_includes (List[str], optional): globs of files to always keep when pruning. Defaults to [].
+            precompile_version (Optional[Tuple[int, int]], optional): Python version to precompile the bytecode of the layer for. Defaults to None.
+
+        Returns:
+            Tuple[str, str]: archive path and hash
+        """
+        project_names = sorted(x.project_name for x in distributions)
+
+        if cls._layer_group_cache.add_group(frozenset(project_names)):
+            cls._layer_group_cache.dump_to_file()
+
+        if len(distributions) == 1:
+            return cls.create_distribution_artifact(
+                list(distributions)[0],
+                output_directory,
+                exclude_distributions,
+                needed_modules,
+                prune_mode,
+                prune_includes,
+                precompile_version,
+            )
+
+        archive_fp = os.path.join(
+            output_directory,
+            f"composite_{hash_list(project_names)[:16]}.zip",
+        )
+
+        return cls._create_archive(
+            "+".join(project_names) + output_directory,
+            distributions,
+            archive_fp,
+            exclude_distributions,
+            needed_modules,
+            prune_mode,
+            prune_includes,
+            precompile_version,
+        )
+
     @classmethod
     def create_distribution_artifact(
         cls,
         distribution: PackagedDistributionInformation,
         output_directory: str,
         exclude_distributions: Set[str] = set(),
+        needed_modules: Iterable[str] = [],
+        prune_mode: Optional[str] = None,
+        prune_includes: List[str] = [],
+        precompile_version: Optional[Tuple[int, int]] = None,
     ) -> Tuple[str, str]:
-        if cls._archive_cache.in_cache(distribution.project_name + output_directory):
-            return cls._archive_cache.get_from_cache(
-                distribution.project_name + output_directory
-            )
+        archive_fp = os.path.join(
+            output_directory,
+            f"{distribution.project_name}-{distribution.get_tags()}.zip",
+        )
 
-        _all_distributions = DistributionEnvironment.get_all_distributions_dependencies(
-            distribution
+        return cls._create_archive(
+            distribution.project_name + output_directory,
+            [distribution],
+            archive_fp,
+            exclude_distributions,
+            needed_modules,
+            prune_mode,
+            prune_includes,
+            precompile_version,
         )
-        _all_distributions.add(distribution)
-        _all_distributions = set(
+
+    @classmethod
+    def _get_packaged_distributions(
+        cls,
+        distributions: List[PackagedDistributionInformation],
+        exclude_distributions: Set[str] = set(),
+    ) -> Set[PackagedDistributionInformation]:
+        _all_distributions = set(distributions)
+
+        for distribution in distributions:
+            _all_distributions.update(
+                DistributionEnvironment.get_all_distributions_dependencies(distribution)
+            )
+
+        return set(
             filter(
-                lambda x: x.project_name not in exclude_distributions,
+                lambda x: x is not None and x.project_name not in exclude_distributions,
                 _all_distributions,
             )
         )
 
+    @classmethod
+    def _create_archive(
+        cls,
+        cache_key: str,
+        distributions: List[PackagedDistributionInformation],
+        archive_fp: str,
+        exclude_distributions: Set[str] = set(),
+        needed_modules: Iterable[str] = [],
+        prune_mode: Optional[str] = None,
+        prune_includes: List[str] = [],
+        precompile_version: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[str, str]:
+        _all_distributions = cls._get_packaged_distributions(
+            distributions, exclude_distributions
+        )
+
+        if prune_mode:
+            # Only the modules provided by this layer are used as the starting point of the trace
+            start_modules = sorted(
+                x
+                for x in set(needed_modules)
+                if _all_distributions.intersection(
+                    cls._module_to_dists.get(x.split(".")[0], [])
+                )
+            )
+
+            # A pruned layer depends on the modules the handler uses, so it can not be shared with
+            # handlers that use a different set of modules.
+            prune_key = hash_list([prune_mode, *start_modules, *sorted(prune_includes)])
+            cache_key = f"{cache_key};prune={prune_key}"
+            archive_fp = archive_fp[: -len(".zip")] + f"_pruned_{prune_key[:8]}.zip"
+
+        if precompile_version:
+            cache_tag = bytecode_compiler.get_cache_tag(precompile_version)
+            cache_key = f"{cache_key};bytecode={cache_tag}"
+            archive_fp = archive_fp[: -len(".zip")] + f"_{cache_tag}.zip"
+
+        if cls._archive_cache.in_cache(cache_key):
+            return cls._archive_cache.get_from_cache(cache_key)
+
         _all_records = list(
             itertools.chain.from_iterable(
                 [
@@ -265,15 +583,32 @@ class DistributionEnvironment:
             )
         )
 
-        archive_fp = os.path.join(
-            output_directory,
-            f"{distribution.project_name}-{distribution.get_tags()}.zip",
-        )
+        if prune_mode:
+            _all_records, report = layer_pruner.prune_records(
+                _all_records, start_modules, prune_mode, prune_includes
+            )
+
+            safe_json_write(report, archive_fp[: -len(".zip")] + ".prune.json")
+            log.info(
+                "Pruned layer %s from %s files (%s bytes) to %s files (%s bytes)",
+                os.path.basename(archive_fp),
+                report.get("original_files"),
+                report.get("original_bytes"),
+                report.get("pruned_files"),
+                report.get("pruned_bytes"),
+            )
+
+        if precompile_version:
+            _all_records = bytecode_compiler.compile_records(
+                _all_records,
+                precompile_version,
+                archive_fp[: -len(".zip")] + "_bytecode",
+                bytecode_compiler.LAYER_RUNTIME_DIRECTORY,
+            )
+
         archive_hash = create_archive_and_hash(_all_records, archive_fp)
 
-        cls._archive_cache.update_cache(
-            distribution.project_name + output_directory, (archive_fp, archive_hash)
-        )
+        cls._archive_cache.update_cache(cache_key, (archive_fp, archive_hash))
         cls._archive_cache.dump_to_file()
 
         return archive_fp, archive_hash
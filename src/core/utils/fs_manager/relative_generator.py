@@ -1,50 +1,191 @@
-from functools import lru_cache
-from typing import Union, List, Set, Tuple
+import json
+from typing import Dict, Union, List, Set, Tuple
 from pydantic.types import DirectoryPath, FilePath
 from pathlib import Path
 import os
 
 from serverless_parser import parser as cdev_parser
+
+from core.utils.cache import FileLoadableCache
+from core.utils.file_manager import safe_json_write
+
+from .file_index import get_file_stats, is_file_unchanged
 from .utils import module_segmenter
 
 
-@lru_cache()
+RELATIVE_DEPENDENCY_CACHE_LOCATION = (
+    ".cdev/intermediate/cache/relative_module_dependencies.json"
+)
+
+
+class RelativeDependencyCache(FileLoadableCache):
+    """Implementation of FileLoadableCache designed to persist the direct dependencies of relative modules across runs.
+
+    Each entry is keyed by the full path of the module (file or directory) and has the form:
+
+        {
+            "files": {<file>: {"size": int, "mtime": int, "hash": str}},
+            "dependencies": [<module names>]
+        }
+
+    An entry is only used if every file that makes up the module is unchanged.
+    """
+
+    def __init__(self, fp: FilePath) -> None:
+        super().__init__(fp)
+        # Reverse edges of the dependency graph and the modules of each file, built when first needed
+        self._dependents: Dict[str, Set[str]] = None
+        self._file_modules: Dict[str, Set[str]] = None
+
+    def update_cache(self, key: str, val: Dict) -> None:
+        super().update_cache(key, val)
+        self._dependents = None
+        self._file_modules = None
+
+    def dump_to_file(self) -> None:
+        safe_json_write(self._cache_data, self.fp)
+
+    def _load_from_file(self, fp: FilePath) -> Dict:
+        if not os.path.isfile(fp):
+            return {}
+
+        try:
+            with open(fp) as fh:
+                return json.load(fh)
+        except Exception as e:
+            # Could not load the file so just return an empty cache
+            return {}
+
+    def get_dependencies(self, module_path: str) -> Union[List[str], None]:
+        """Get the direct dependencies of a module if none of its files have changed
+
+        Args:
+            module_path (str): full path to the module
+
+        Returns:
+            Union[List[str], None]: module names or None if the entry is not valid
+        """
+        entry = self.get_from_cache(module_path)
+
+        if not entry:
+            return None
+
+        if not set(_get_module_files(module_path)) == set(entry.get("files")):
+            return None
+
+        if not all(is_file_unchanged(k, v) for k, v in entry.get("files").items()):
+            return None
+
+        return entry.get("dependencies")
+
+    def get_modules_with_file(self, fp: str) -> Set[str]:
+        """Get the modules that the file is part of
+
+        Args:
+            fp (str): full path to a file
+
+        Returns:
+            Set[str]: full paths of the modules
+        """
+        self._build_reverse_graph()
+        return self._file_modules.get(fp, set())
+
+    def get_dependents(self, module_path: str) -> Set[str]:
+        """Get the modules that directly depend on a module
+
+        Args:
+            module_path (str): full path to the module
+
+        Returns:
+            Set[str]: full paths of the dependent modules
+        """
+        self._build_reverse_graph()
+        return self._dependents.get(module_path, set())
+
+    def _build_reverse_graph(self) -> None:
+        if self._dependents is not None:
+            return
+
+        self._dependents = {}
+        self._file_modules = {}
+
+        for module_path, entry in self._cache_data.items():
+            for file_path in entry.get("files"):
+                self._file_modules.setdefault(file_path, set()).add(module_path)
+
+            for module_name in entry.get("dependencies"):
+                if not module_name.startswith("."):
+                    continue
+
+                try:
+                    dependency_path = _compute_relative_dependency_module(
+                        module_name, _get_module_base_directory(module_path)
+                    )
+                except Exception:
+                    # The module no longer exists
+                    continue
+
+                self._dependents.setdefault(dependency_path, set()).add(module_path)
+
+
+_DEPENDENCY_CACHE: RelativeDependencyCache = None
+
+
+def _get_dependency_cache() -> RelativeDependencyCache:
+    global _DEPENDENCY_CACHE
+
+    if _DEPENDENCY_CACHE is None:
+        _DEPENDENCY_CACHE = RelativeDependencyCache(RELATIVE_DEPENDENCY_CACHE_LOCATION)
+
+    return _DEPENDENCY_CACHE
+
+
+def save_dependency_cache() -> None:
+    """Persist the dependency information of the relative modules found in this run"""
+    if _DEPENDENCY_CACHE is not None:
+        _DEPENDENCY_CACHE.dump_to_file()
+
+
 def get_all_relative_module_dependencies(
     module_path: FilePath,
-) -> Tuple[List[str], List[str], List[str]]:
+) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Get all the dependencies of a relative module by following its relative dependencies.
+
+    Args:
+        module_path (FilePath): location of the module
 
+    Returns:
+        Tuple[Set[str], Set[str], Set[str]]: Tuple[relative_module_paths, packaged_modules, std_libraries]
+    """
     _std_dependencies: Set[str] = set()
     _pkged_dependencies: Set[str] = set()
     _relative_dependencies_paths: Set[str] = set()
 
-    _module_dir = Path(module_path).parent
-
-    (
-        _top_level_relative_dependencies_names,
-        _top_level_packaged_dependencies_names,
-        _top_level_std_dependencies_names,
-    ) = _get_relative_module_dependencies(module_path)
-
-    _std_dependencies.update(_top_level_std_dependencies_names)
-    _pkged_dependencies.update(_top_level_packaged_dependencies_names)
+    _modules_to_visit = [str(module_path)]
+    _visited_modules = set(_modules_to_visit)
 
-    for _relative_dependency_name in _top_level_relative_dependencies_names:
-        _relative_dependency_fp = _compute_relative_dependency_module(
-            _relative_dependency_name, _module_dir
-        )
-        _relative_dependencies_paths.add(_relative_dependency_fp)
+    while _modules_to_visit:
+        _current_module = _modules_to_visit.pop()
+        _module_dir = _get_module_base_directory(_current_module)
 
         (
-            _rv_relative_dependencies_names,
-            _rv_packaged_dependencies_names,
-            _rv_std_dependencies_names,
-        ) = get_all_relative_module_dependencies(_relative_dependency_fp)
+            _relative_dependencies_names,
+            _packaged_dependencies_names,
+            _std_dependencies_names,
+        ) = _get_relative_module_dependencies(_current_module)
+
+        _std_dependencies.update(_std_dependencies_names)
+        _pkged_dependencies.update(_packaged_dependencies_names)
 
-        if _rv_relative_dependencies_names:
-            _relative_dependencies_paths.update(set(_rv_relative_dependencies_names))
+        for _relative_dependency_name in _relative_dependencies_names:
+            _relative_dependency_fp = _compute_relative_dependency_module(
+                _relative_dependency_name, _module_dir
+            )
+            _relative_dependencies_paths.add(_relative_dependency_fp)
 
-        _pkged_dependencies.update(_rv_packaged_dependencies_names)
-        _std_dependencies.update(_rv_std_dependencies_names)
+            if _relative_dependency_fp not in _visited_modules:
+                _visited_modules.add(_relative_dependency_fp)
+                _modules_to_visit.append(_relative_dependency_fp)
 
     return (
         _relative_dependencies_paths,
@@ -53,6 +194,44 @@ def get_all_relative_module_dependencies(
     )
 
 
+def get_dependent_modules(fp: FilePath) -> Set[str]:
+    """Get all the previously seen relative modules that directly or transitively depend on the given file.
+
+    This uses the persisted dependency information, so it only contains modules that have been
+    used as relative dependencies of a handler.
+
+    Args:
+        fp (FilePath): full path to a file
+
+    Returns:
+        Set[str]: paths of the dependent modules
+    """
+    cache = _get_dependency_cache()
+
+    rv = set(cache.get_modules_with_file(os.path.abspath(fp)))
+    _modules_to_visit = list(rv)
+
+    while _modules_to_visit:
+        for dependent in cache.get_dependents(_modules_to_visit.pop()):
+            if dependent not in rv:
+                rv.add(dependent)
+                _modules_to_visit.append(dependent)
+
+    return rv
+
+
+def _get_module_base_directory(module_path: Union[FilePath, DirectoryPath]) -> Path:
+    """Get the directory that relative imports within a module are resolved from
+
+    Args:
+        module_path (Union[FilePath, DirectoryPath]): location of the module
+
+    Returns:
+        Path
+    """
+    return Path(module_path) if os.path.isdir(module_path) else Path(module_path).parent
+
+
 def _compute_relative_dependency_module(module_name: str, module_path: FilePath) -> str:
     """Given a relative import and originating file location, return the information about the module
 
@@ -124,26 +303,36 @@ def _count_relative_level(module_symbol: str) -> int:
     return levels
 
 
-@lru_cache()
 def _get_relative_module_dependencies(
-    module_path: Path,
+    module_path: Union[FilePath, DirectoryPath],
 ) -> Tuple[List[str], List[str], List[str]]:
-    """For the given RelativeModuleInfo Object, find the information about any modules that it links to.
+    """For the given relative module, find the information about any modules that it directly links to.
 
-    Use the module_identifier to determine the type of module based on the given module name. Then use the module_creator to generate the input
-    to use to recursively create any additional RelativeModuleInfo objects.
+    The direct dependencies are persisted with the state of the files that make up the module, so that
+    unchanged modules do not need to be parsed again.
 
     Args:
-        module (RelativeModuleInfo): provided relative module
-        module_segmenter (Callable): function to segment found modules
-        module_creator (module_info_creator): function to create ModuleInfo Objects
+        module_path (Union[FilePath, DirectoryPath]): location of the module
 
     Returns:
         Tuple[List[str], List[str], List[str]]: Tuple[relative_modules, packaged_modules, std_libraries]
     """
+    module_path = str(module_path)
+    cache = _get_dependency_cache()
 
-    # Get all the directly referenced modules in the provided relative module
-    direct_dependencies: List[str] = _get_relative_package_dependencies(module_path)
+    direct_dependencies = cache.get_dependencies(module_path)
+
+    if direct_dependencies is None:
+        # Get all the directly referenced modules in the provided relative module
+        direct_dependencies = _get_relative_package_dependencies(module_path)
+
+        cache.update_cache(
+            module_path,
+            {
+                "files": {x: get_file_stats(x) for x in _get_module_files(module_path)},
+                "dependencies": direct_dependencies,
+            },
+        )
 
     # Segment these module names
     (
@@ -159,6 +348,26 @@ def _get_relative_module_dependencies(
     )
 
 
+def _get_module_files(fp: Union[FilePath, DirectoryPath]) -> List[str]:
+    """Get the python files that make up a relative module
+
+    Args:
+        fp (Union[FilePath, DirectoryPath]): the location of the module
+
+    Returns:
+        List[str]: file paths
+    """
+    if os.path.isdir(fp):
+        return [
+            os.path.join(dir, file)
+            for dir, _, files in os.walk(fp)
+            for file in files
+            if file[-3:] == ".py"
+        ]
+
+    return [str(fp)]
+
+
 def _get_relative_package_dependencies(fp: Union[FilePath, DirectoryPath]) -> List[str]:
     """
     Get the local dependencies for a given local module by searching through the file(s) that make up the module and looking
@@ -168,25 +377,17 @@ def _get_relative_package_dependencies(fp: Union[FilePath, DirectoryPath]) -> Li
         fp (Union[FilePath, DirectoryPath]): the location of the module in question
 
     Returns:
-        dependencies (List[Tuple[str,str]]): List of dependant module names and an optional filepath if the module is a relative module
+        dependencies (List[str]): List of dependant module names
 
 
     Uses the Serverless Parser library to find all the imports in a given file.
     """
-    # Local Module can be either directory or single file
-    if os.path.isdir(fp):
-        module_names = set()
+    module_names = set()
 
-        for dir, _, files in os.walk(fp):
-            for file in files:
-                if not file[-3:] == ".py":
-                    continue
-
-                module_names = module_names.union(
-                    cdev_parser.parse_file_for_dependencies(os.path.join(dir, file))
-                )
-
-    else:
-        module_names = cdev_parser.parse_file_for_dependencies(fp)
+    # Local Module can be either directory or single file
+    for file in _get_module_files(fp):
+        module_names.update(
+            cdev_parser.parse_file_for_dependencies(file, bypass_cache=True)
+        )
 
-    return list(filter(None, module_names))
+    return sorted(filter(None, module_names))
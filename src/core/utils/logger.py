@@ -11,13 +11,59 @@ This is important in mainting that utility functions for the framework are not b
 but it also allows there to be dynamic functionality of how logs will be proccessed and displayed to the user.
 
 """
+import atexit
+import gzip
 import logging.config
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
-from typing import Dict, Union
+import queue
+import shutil
+from typing import Dict, List, Union
 
+# Largest number of records waiting to be written by the background thread
+DEFAULT_QUEUE_SIZE = 10000
+
+# What to do with a record when the queue is full
+DROP_NEWEST_POLICY = "drop_newest"
+DROP_OLDEST_POLICY = "drop_oldest"
+BLOCK_POLICY = "block"
+DROP_POLICIES = [DROP_NEWEST_POLICY, DROP_OLDEST_POLICY, BLOCK_POLICY]
+
+# Largest number of seconds to wait for room in the queue to stop the background thread
+STOP_TIMEOUT = 5
+
+# The log file is rotated when it reaches this size. A size of 0 never rotates the file.
+DEFAULT_MAX_BYTES = 0
+DEFAULT_BACKUP_COUNT = 5
+
+_JSON_LOGGER_NAME = "core_file"
+_SIMPLE_LOGGER_NAME = "core_simple"
+_RICH_LOGGER_NAME = "core_rich"
+
+# Set on the report of dropped records so that it is written regardless of the level of the handlers
+_DROP_REPORT_ATTRIBUTE = "cdev_drop_report"
+
+
+def _create_logging_settings(
+    log_level: str, max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = 0
+) -> Dict:
+    file_handler = {
+        "class": "logging.FileHandler",
+        "level": log_level,
+        "formatter": "jsonFormatter",
+        "filename": ".cdev/logs/userlogs",
+    }
+
+    if max_bytes:
+        file_handler.update(
+            {
+                "class": "logging.handlers.RotatingFileHandler",
+                "maxBytes": max_bytes,
+                "backupCount": backup_count,
+            }
+        )
 
-def _create_logging_settings(log_level: str) -> Dict:
     return {
         "version": 1,
         "filename": ".cdev/logs/userlogs",
@@ -32,12 +78,7 @@ def _create_logging_settings(log_level: str) -> Dict:
             "richFormatter": {"format": "%(name)s - %(levelname)s: %(message)s"},
         },
         "handlers": {
-            "fileHandler": {
-                "class": "logging.FileHandler",
-                "level": log_level,
-                "formatter": "jsonFormatter",
-                "filename": ".cdev/logs/userlogs",
-            },
+            "fileHandler": file_handler,
             "simpleHandler": {
                 "class": "logging.StreamHandler",
                 "level": log_level,
@@ -54,17 +95,17 @@ def _create_logging_settings(log_level: str) -> Dict:
             },
         },
         "loggers": {
-            "core_file": {
+            _JSON_LOGGER_NAME: {
                 "level": log_level,
                 "handlers": ["fileHandler"],
                 "propagate": False,
             },
-            "core_rich": {
+            _RICH_LOGGER_NAME: {
                 "level": log_level,
                 "handlers": ["richHandler"],
                 "propagate": False,
             },
-            "core_simple": {
+            _SIMPLE_LOGGER_NAME: {
                 "level": log_level,
                 "handlers": ["simpleHandler"],
                 "propagate": False,
@@ -75,6 +116,129 @@ def _create_logging_settings(log_level: str) -> Dict:
     }
 
 
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue that applies a drop policy when the queue is full.
+
+    Records are put on the queue without formatting them, so the message is only formatted by the background
+    thread. Arguments of a log call should therefore not be mutated after the call.
+    """
+
+    def __init__(
+        self, queue: queue.Queue, drop_policy: str = DROP_NEWEST_POLICY
+    ) -> None:
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown log drop policy {drop_policy}")
+
+        super().__init__(queue)
+        self.drop_policy = drop_policy
+        self.dropped_records = 0
+        self._unreported_drops = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # The report of dropped records only uses free space, so it never causes another record to be dropped
+        unreported_drops = self._unreported_drops
+        if unreported_drops and self._put(
+            self._create_drop_record(unreported_drops), allow_drop=False
+        ):
+            self._unreported_drops -= unreported_drops
+
+        if not self._put(record):
+            self.dropped_records += 1
+            self._unreported_drops += 1
+
+    def _put(self, record: logging.LogRecord, allow_drop: bool = True) -> bool:
+        if self.drop_policy == BLOCK_POLICY:
+            self.queue.put(record)
+            return True
+
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            if self.drop_policy == DROP_NEWEST_POLICY or not allow_drop:
+                return False
+
+        # Make room by dropping the oldest record. Another thread can fill the space first, so give up after one try.
+        try:
+            self.queue.get_nowait()
+            self.dropped_records += 1
+            self._unreported_drops += 1
+            self.queue.put_nowait(record)
+            return True
+        except (queue.Empty, queue.Full):
+            return False
+
+    def _create_drop_record(self, dropped_records: int) -> logging.LogRecord:
+        return logging.makeLogRecord(
+            {
+                "name": _JSON_LOGGER_NAME,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": "Dropped %d log records because the log queue was full",
+                "args": (dropped_records,),
+                _DROP_REPORT_ATTRIBUTE: True,
+            }
+        )
+
+
+class RoutingQueueListener(QueueListener):
+    """QueueListener that passes each record only to the handlers of the logger that created it"""
+
+    def __init__(
+        self, queue: queue.Queue, handlers: Dict[str, List[logging.Handler]]
+    ) -> None:
+        super().__init__(queue, respect_handler_level=True)
+        self._handlers_by_logger = handlers
+
+    def handle(self, record: logging.LogRecord) -> None:
+        record = self.prepare(record)
+
+        for handler in self._handlers_by_logger.get(record.name, []):
+            if record.levelno >= handler.level or getattr(
+                record, _DROP_REPORT_ATTRIBUTE, False
+            ):
+                handler.handle(record)
+
+    def stop(self) -> None:
+        """Write any queued records and stop the background thread. The queue can be full, so the stop sentinel is
+        put with a timeout instead of failing."""
+        if not self._thread:
+            return
+
+        try:
+            self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+        except queue.Full:
+            # The background thread is not reading the queue, so it can not be joined
+            self._thread = None
+            return
+
+        self._thread.join()
+        self._thread = None
+
+    def close(self) -> None:
+        """Write any queued records and close the handlers"""
+        if self._thread:
+            self.stop()
+
+        for handlers in self._handlers_by_logger.values():
+            for handler in handlers:
+                handler.close()
+
+
+def _compressed_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _compressing_rotator(source: str, destination: str) -> None:
+    with open(source, "rb") as source_fh, gzip.open(destination, "wb") as dest_fh:
+        shutil.copyfileobj(source_fh, dest_fh)
+
+    os.remove(source)
+
+
 class cdev_logger:
     """Wrapper around pythons basic logger object to provide a layer of flexibility for logging.
 
@@ -93,6 +257,9 @@ class cdev_logger:
     Also note the optimization around formmatted logs.
 
     For more info read https://docs.python.org/3/howto/logging.html#optimization
+
+    Records are written by a background thread that reads them from a bounded queue, so a log call only checks the
+    level and puts the unformatted record on the queue. Call `close` to write any queued records.
     """
 
     def __init__(
@@ -100,12 +267,28 @@ class cdev_logger:
         is_rich_formatted=True,
         show_logs: bool = False,
         logging_level: Union[str, int] = "ERROR",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        drop_policy: str = DROP_NEWEST_POLICY,
     ) -> None:
+        """
+        Args:
+            is_rich_formatted (bool, optional): Defaults to True.
+            show_logs (bool, optional): Write the logs to the console. Defaults to False.
+            logging_level (Union[str, int], optional): Defaults to "ERROR".
+            max_bytes (int, optional): Rotate the log file when it reaches this size. Defaults to DEFAULT_MAX_BYTES.
+            backup_count (int, optional): Number of rotated log files to keep. Defaults to DEFAULT_BACKUP_COUNT.
+            compress (bool, optional): Compress the rotated log files with gzip. Defaults to False.
+            queue_size (int, optional): Largest number of records waiting to be written. Defaults to DEFAULT_QUEUE_SIZE.
+            drop_policy (str, optional): One of DROP_POLICIES. Defaults to DROP_NEWEST_POLICY.
+        """
 
         self.is_rich_formatted = is_rich_formatted
         self.show_logs = show_logs
 
-        log_info = _create_logging_settings(logging_level)
+        log_info = _create_logging_settings(logging_level, max_bytes, backup_count)
 
         fp = os.path.join(os.getcwd(), log_info.get("filename"))
 
@@ -120,82 +303,86 @@ class cdev_logger:
                 os.utime(fp, None)
 
         logging.config.dictConfig(log_info)
-        self._json_logger = logging.getLogger("core_file")
-        self._simple_logger = logging.getLogger("core_simple")
-        self._rich_logger = logging.getLogger("core_rich")
+        self._json_logger = logging.getLogger(_JSON_LOGGER_NAME)
+        self._simple_logger = logging.getLogger(_SIMPLE_LOGGER_NAME)
+        self._rich_logger = logging.getLogger(_RICH_LOGGER_NAME)
+
+        # Move the configured handlers behind a queue that is written by a background thread
+        self._queue_handler = BoundedQueueHandler(queue.Queue(queue_size), drop_policy)
+        handlers = {}
+
+        for logger in [self._json_logger, self._simple_logger, self._rich_logger]:
+            handlers[logger.name] = list(logger.handlers)
+
+            for handler in handlers[logger.name]:
+                if compress and isinstance(handler, RotatingFileHandler):
+                    handler.namer = _compressed_namer
+                    handler.rotator = _compressing_rotator
+
+                logger.removeHandler(handler)
+
+            logger.addHandler(self._queue_handler)
+
+        self._listener = RoutingQueueListener(self._queue_handler.queue, handlers)
+        self._listener.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records dropped because the queue was full"""
+        return self._queue_handler.dropped_records
+
+    def close(self) -> None:
+        """Write any queued records and stop the background thread"""
+        self._listener.close()
 
     def _write_log(
         self,
-        *args,
-        func_name: str,
-        original_msg: str,
-        formatted_msg: str = "",
-        **kw_args,
+        level: int,
+        msg,
+        args: tuple,
+        kw_args: Dict,
+        rich_prefix: str = "",
+        rich_suffix: str = "",
     ) -> None:
         # Always write a log to the json file
-        getattr(self._json_logger, func_name)(original_msg, *args, **kw_args)
-        if self.show_logs:
-            # We need to write logs to console
-            # Either write a plain log or rich formatted log to the console
-            if not self.is_rich_formatted:
-                getattr(self._simple_logger, func_name)(original_msg, *args, **kw_args)
-            else:
-                getattr(self._rich_logger, func_name)(formatted_msg, *args, **kw_args)
+        if self._json_logger.isEnabledFor(level):
+            self._json_logger.log(level, msg, *args, **kw_args)
 
-    def debug(self, msg, *args, **kw_args) -> None:
-        if self.is_rich_formatted:
-            self._write_log(
-                *args,
-                func_name="debug",
-                original_msg=msg,
-                formatted_msg=f"[bold blue]{msg}",
-                **kw_args,
-            )
+        if not self.show_logs:
+            return
 
-        else:
-            self._write_log(*args, func_name="debug", original_msg=msg, **kw_args)
+        # We need to write logs to console
+        # Either write a plain log or rich formatted log to the console
+        if not self.is_rich_formatted:
+            self._simple_logger.log(level, msg, *args, **kw_args)
 
-    def info(self, msg, *args, **kw_args):
-        if self.is_rich_formatted:
-            self._write_log(
-                *args,
-                func_name="info",
-                original_msg=msg,
-                formatted_msg=f"[bold blue]{msg}",
-                **kw_args,
+        elif self._rich_logger.isEnabledFor(level):
+            self._rich_logger.log(
+                level, f"{rich_prefix}{msg}{rich_suffix}", *args, **kw_args
             )
 
-        else:
-            self._write_log(*args, func_name="info", original_msg=msg, **kw_args)
+    def debug(self, msg, *args, **kw_args) -> None:
+        self._write_log(logging.DEBUG, msg, args, kw_args, "[bold blue]")
 
-    def warning(self, msg, *args, **kw_args) -> None:
-        if self.is_rich_formatted:
-            self._write_log(
-                *args,
-                func_name="warning",
-                original_msg=msg,
-                formatted_msg=f"[bold yellow blink]{msg}",
-                **kw_args,
-            )
+    def info(self, msg, *args, **kw_args):
+        self._write_log(logging.INFO, msg, args, kw_args, "[bold blue]")
 
-        else:
-            self._write_log(*args, func_name="warning", original_msg=msg, **kw_args)
+    def warning(self, msg, *args, **kw_args) -> None:
+        self._write_log(logging.WARNING, msg, args, kw_args, "[bold yellow blink]")
 
     def error(self, msg, *args, **kw_args) -> None:
-        if self.is_rich_formatted:
-            self._write_log(
-                *args,
-                func_name="error",
-                original_msg=msg,
-                formatted_msg=f"[bold red blink]:cross_mark: :cross_mark: :cross_mark: {msg} :cross_mark: :cross_mark: :cross_mark:",
-                **kw_args,
-            )
-
-        else:
-            self._write_log(*args, func_name="error", original_msg=msg, **kw_args)
+        self._write_log(
+            logging.ERROR,
+            msg,
+            args,
+            kw_args,
+            "[bold red blink]:cross_mark: :cross_mark: :cross_mark: ",
+            " :cross_mark: :cross_mark: :cross_mark:",
+        )
 
     def exception(self, msg) -> None:
-        self._write_log("exception", msg, msg)
+        self._write_log(logging.ERROR, msg, (), {"exc_info": True}, "[bold red blink]")
 
 
 class global_log_container:
@@ -232,4 +419,8 @@ log = global_log_container(cdev_logger())
 def set_global_logger(new_logger: cdev_logger) -> None:
     global log
 
+    previous_logger = log._logger
     log._logger = new_logger
+
+    if previous_logger is not new_logger:
+        previous_logger.close()
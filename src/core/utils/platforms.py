@@ -1,6 +1,7 @@
 from enum import Enum
 import platform
 import sys
+from typing import Dict, Tuple
 
 
 CURRENT_PLATFORM = (
@@ -95,3 +96,34 @@ def get_current_closest_platform() -> lambda_python_environment:
         raise Exception(
             f"You are using Python {python_version}, but this is not a supported python version"
         )
+
+
+# Aws Lambda runtime and architecture of each deployment platform
+lambda_python_environment_aws_params: Dict[
+    lambda_python_environment, Tuple[str, str]
+] = {
+    lambda_python_environment.py37: ("python3.7", "x86_64"),
+    lambda_python_environment.py38_x86_64: ("python3.8", "x86_64"),
+    lambda_python_environment.py38_arm64: ("python3.8", "arm64"),
+    lambda_python_environment.py39_x86_64: ("python3.9", "x86_64"),
+    lambda_python_environment.py39_arm64: ("python3.9", "arm64"),
+    lambda_python_environment.py3_x86_64: ("python3.9", "x86_64"),
+    lambda_python_environment.py3_arm64: ("python3.9", "arm64"),
+}
+
+
+def get_platform_python_version(
+    python_environment: lambda_python_environment,
+) -> Tuple[int, int]:
+    """Get the major and minor version of Python used by a deployment platform
+
+    Args:
+        python_environment (lambda_python_environment)
+
+    Returns:
+        Tuple[int, int]: major and minor version
+    """
+    runtime, _ = lambda_python_environment_aws_params.get(python_environment)
+    major, minor = runtime[len("python") :].split(".")
+
+    return int(major), int(minor)
@@ -7,11 +7,8 @@ using the `networkx` packages as it provides helpful utilities for working with
 from concurrent.futures import ThreadPoolExecutor, Future
 from enum import Enum
 
-from networkx.classes.digraph import DiGraph
-from networkx.classes.reportviews import NodeView
 
-
-from typing import Callable, Dict, List, Set, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Set, Tuple
 from time import sleep
 
 from core.constructs.resource import (
@@ -28,6 +25,11 @@ from core.constructs.models import frozendict
 
 from core.utils.operations import concatenate
 
+# networkx is only imported when a graph is created, so that loading the workspace does not import it
+if TYPE_CHECKING:
+    from networkx.classes.digraph import DiGraph
+    from networkx.classes.reportviews import NodeView
+
 deliminator = "+"
 
 
@@ -96,7 +98,7 @@ def generate_sorted_resources(
         List[Resource_Difference],
         List[Resource_Reference_Difference],
     ]
-) -> DiGraph:
+) -> "DiGraph":
     """Given the tuple of all differences, generate a DiGraph representing a topologically valid way of applying the changes.
 
     Args:
@@ -110,6 +112,8 @@ def generate_sorted_resources(
     """
     # nx graphs work on the element level by using the __hash__ of objects added to the graph, so all the elements added to the graph should be a pydantic Model with
     # the 'frozen' feature set
+    from networkx.classes.digraph import DiGraph
+
     change_dag = DiGraph()
 
     component_differences = differences[0]
@@ -334,9 +338,9 @@ class node_state(str, Enum):
 
 
 def topological_iteration(
-    dag: DiGraph,
-    process: Callable[[NodeView], None],
-    failed_parent_handler: Callable[[NodeView], None] = None,
+    dag: "DiGraph",
+    process: Callable[["NodeView"], None],
+    failed_parent_handler: Callable[["NodeView"], None] = None,
     thread_count: int = 1,
     interval: float = 0.3,
     pass_through_exceptions: bool = False,
@@ -440,10 +444,10 @@ def topological_iteration(
 
 
 def _recursively_mark_parent_failure(
-    _node_to_state: Dict[NodeView, node_state],
-    dag: DiGraph,
-    parent_node: NodeView,
-    handler: Callable[[NodeView, OutputTask], None] = None,
+    _node_to_state: Dict["NodeView", node_state],
+    dag: "DiGraph",
+    parent_node: "NodeView",
+    handler: Callable[["NodeView", OutputTask], None] = None,
     pass_through_exceptions: bool = False,
 ) -> None:
     """Recursively mark all descendent of a failure
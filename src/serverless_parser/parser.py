@@ -33,5 +33,5 @@ def parse_functions_from_file(
     return file_information
 
 
-def parse_file_for_dependencies(file_loc: DirectoryPath):
-    return p_utils.get_file_imported_symbols(file_loc)
+def parse_file_for_dependencies(file_loc: DirectoryPath, bypass_cache: bool = False):
+    return p_utils.get_file_imported_symbols(file_loc, bypass_cache)
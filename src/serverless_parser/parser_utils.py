@@ -581,8 +581,10 @@ def get_file_information(
 _individual_file_cache = {}
 
 
-def _get_individual_files_imported_symbols(file_location) -> Set:
-    if file_location in _individual_file_cache:
+def _get_individual_files_imported_symbols(
+    file_location, bypass_cache: bool = False
+) -> Set:
+    if file_location in _individual_file_cache and not bypass_cache:
         return _individual_file_cache.get(file_location)
 
     rv = set()
@@ -626,8 +628,8 @@ def _get_individual_files_imported_symbols(file_location) -> Set:
     return rv
 
 
-def get_file_imported_symbols(file_loc: FilePath) -> Set:
+def get_file_imported_symbols(file_loc: FilePath, bypass_cache: bool = False) -> Set:
     # Walk the whole dir/children importing all python files and then searching their symbol tree to find import statements
-    rv = _get_individual_files_imported_symbols(file_loc)
+    rv = _get_individual_files_imported_symbols(file_loc, bypass_cache)
 
     return rv
@@ -0,0 +1,81 @@
+import io
+import json
+
+from rich.table import Table
+
+from core.constructs.output_manager import (
+    JSON_OUTPUT,
+    PLAIN_TEXT_OUTPUT,
+    RICH_OUTPUT,
+    OutputManager,
+    StreamingOutputManager,
+    create_output_manager,
+)
+
+
+def test_streaming_plain_text():
+    stream = io.StringIO()
+    output = StreamingOutputManager(PLAIN_TEXT_OUTPUT, stream, progress_interval=60)
+
+    first = output.create_task("[bold green]Creating:[/bold green] a", start=False)
+    second = output.create_task("Creating: b", start=False)
+
+    first.start_task()
+    first.update(advance=5, comment="Deploying on Cloud :cloud:")
+    # Updates within the progress interval are skipped
+    first.update(advance=3, comment="Completing transaction with Backend")
+    first.complete("Completed :white_check_mark:", completed=10)
+    second.fail("Failed because parent resource failed to deploy :cross_mark:")
+    output.print_summary()
+
+    lines = stream.getvalue().splitlines()
+
+    assert lines[0] == "[0/2] Creating: a: started"
+    assert lines[1].startswith("[0/2] Creating: a: Deploying on Cloud")
+    assert lines[2].startswith("[1/2] Creating: a: finished in ")
+    assert lines[3].startswith(
+        "[2/2] Creating: b: failed: Failed because parent resource failed to deploy"
+    )
+    assert lines[4] == "1 completed, 1 failed, 2 total"
+    assert len(lines) == 5
+
+
+def test_streaming_json_lines():
+    stream = io.StringIO()
+    output = StreamingOutputManager(JSON_OUTPUT, stream)
+
+    task = output.create_task("Creating: a")
+    task.fail("Failed because mapper raised error")
+
+    table = Table(title="Results")
+    table.add_column("Name")
+    table.add_row("value")
+    output.print(table)
+    output.print_cloud_output([("component.a.name", "value")])
+
+    events = [json.loads(x) for x in stream.getvalue().splitlines()]
+
+    assert [x.get("event") for x in events] == [
+        "node_started",
+        "node_failed",
+        "message",
+        "cloud_output",
+    ]
+    assert events[1].get("node") == "Creating: a"
+    assert events[1].get("reason") == "Failed because mapper raised error"
+    assert events[1].get("duration_ms") >= 0
+    assert events[1].get("failed") == 1
+    assert "Results" in events[2].get("message")
+    assert events[3].get("outputs") == {"component.a.name": "value"}
+
+
+def test_create_output_manager():
+    # A stream that is not a terminal uses the streaming output
+    assert isinstance(
+        create_output_manager(stream=io.StringIO()), StreamingOutputManager
+    )
+    assert create_output_manager(JSON_OUTPUT).is_streaming
+
+    output = create_output_manager(RICH_OUTPUT, stream=io.StringIO())
+    assert isinstance(output, OutputManager)
+    assert not output.is_streaming
@@ -3,7 +3,7 @@ from core.constructs.backend import Backend
 from core.constructs.cloud_output import cloud_output_model
 from core.constructs.workspace import Workspace, Workspace_State, Workspace_Info
 from core.constructs.resource import ResourceModel
-from core.constructs.components import ComponentModel
+from core.constructs.components import Component, ComponentModel
 
 from core.constructs.backend import Backend_Configuration
 from core.constructs.settings import Settings_Info
@@ -293,3 +293,60 @@ def test_evaluate_and_replace_previous_cloud_output():
     ws.get_resource_state_uuid = lambda: "1"
 
     simple_evaluate_and_replace_previous_cloud_output(ws)
+
+
+class FileComponent(Component):
+    """Component that is affected by the changes of a set of files"""
+
+    def __init__(self, name: str, files=None) -> None:
+        super().__init__(name)
+        self.files = files
+
+    def get_changes_affecting(self, changed_files):
+        if self.files is None:
+            return None
+
+        return set(changed_files).intersection(self.files)
+
+
+def _get_file_components_workspace() -> Workspace:
+    ws = Workspace()
+
+    ws.get_state = lambda: Workspace_State.EXECUTING_FRONTEND
+    ws.get_components = lambda: [
+        FileComponent("api", {"/src/api.py", "/src/shared.py"}),
+        FileComponent("jobs", {"/src/jobs.py", "/src/shared.py"}),
+    ]
+
+    return ws
+
+
+def test_get_components_affected_by_changes():
+    ws = _get_file_components_workspace()
+
+    assert ws.get_components_affected_by_changes(["/src/api.py"]) == ["api"]
+    assert ws.get_components_affected_by_changes(["/src/shared.py"]) == [
+        "api",
+        "jobs",
+    ]
+
+
+def test_get_components_affected_by_unclaimed_changes():
+    ws = _get_file_components_workspace()
+
+    # A change that no component claims could affect any component
+    assert ws.get_components_affected_by_changes(["/settings/base.py"]) is None
+    assert (
+        ws.get_components_affected_by_changes(["/src/api.py", "/settings/base.py"])
+        is None
+    )
+
+    # A component that can not determine its changes is always rendered again
+    ws.get_components = lambda: [
+        FileComponent("api", {"/src/api.py"}),
+        FileComponent("unknown"),
+    ]
+    assert ws.get_components_affected_by_changes(["/src/api.py"]) == [
+        "api",
+        "unknown",
+    ]
@@ -0,0 +1,82 @@
+import os
+from types import SimpleNamespace
+
+from watchdog.events import (
+    DirModifiedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from core.constructs import workspace_watcher
+
+
+class FakeWorkspace:
+    settings = SimpleNamespace(BASE_PATH="project")
+
+    def __init__(self) -> None:
+        self.cleared = 0
+
+    def clear_output(self) -> None:
+        self.cleared += 1
+
+
+class FakeOutput:
+    def __init__(self) -> None:
+        self.messages = []
+
+    def print(self, msg: str) -> None:
+        self.messages.append(msg)
+
+
+def test_burst_of_events_is_coalesced():
+    watcher = workspace_watcher.WorkspaceWatcher(
+        FakeWorkspace(), FakeOutput(), debounce_seconds=0.01
+    )
+
+    for event in [
+        FileModifiedEvent("project/src/handler.py"),
+        FileModifiedEvent("project/src/handler.py"),
+        DirModifiedEvent("project/src"),
+        FileCreatedEvent("project/src/utils.py"),
+        FileMovedEvent("project/src/old.py", "project/src/new.py"),
+        FileDeletedEvent("project/src/removed.py"),
+    ]:
+        watcher.on_any_event(event)
+
+    changed_paths, deleted_paths = watcher._get_changed_paths()
+
+    assert changed_paths == {
+        os.path.abspath(x)
+        for x in [
+            "project/src/handler.py",
+            "project/src/utils.py",
+            "project/src/new.py",
+        ]
+    }
+    assert deleted_paths == {
+        os.path.abspath(x) for x in ["project/src/old.py", "project/src/removed.py"]
+    }
+
+    # The whole burst was handled at once
+    assert watcher._get_changed_paths() == (set(), set())
+
+
+def test_changes_are_deployed_together(monkeypatch):
+    deployments = []
+    monkeypatch.setattr(
+        workspace_watcher,
+        "execute_deployment",
+        lambda workspace, output, no_prompt, changed_files: deployments.append(
+            changed_files
+        ),
+    )
+    workspace = FakeWorkspace()
+    watcher = workspace_watcher.WorkspaceWatcher(workspace, FakeOutput())
+
+    watcher._handle_changes({"/project/src/a.py"}, {"/project/src/b.py"})
+
+    # Deleted files can also change the affected components
+    assert deployments == [["/project/src/a.py", "/project/src/b.py"]]
+    assert workspace.cleared == 1
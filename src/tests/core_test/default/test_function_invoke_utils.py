@@ -0,0 +1,147 @@
+import base64
+import csv
+import io
+import os
+import threading
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from core.default.commands.function import invoke_utils
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "function_invoke_utils")
+
+REPORT = (
+    "START RequestId: 1 Version: $LATEST\n"
+    "END RequestId: 1\n"
+    "REPORT RequestId: 1\tDuration: 12.50 ms\tBilled Duration: 13 ms\t"
+    "Memory Size: 128 MB\tMax Memory Used: 40 MB\tInit Duration: 150.25 ms\t\n"
+)
+
+
+class FakeLambdaClient:
+    def __init__(self, throttle_every: int = None) -> None:
+        self.payloads = []
+        self._throttle_every = throttle_every
+        self._lock = threading.Lock()
+
+    def invoke(self, FunctionName, InvocationType, LogType, Payload):
+        with self._lock:
+            self.payloads.append(Payload)
+            count = len(self.payloads)
+
+        if self._throttle_every and count % self._throttle_every == 0:
+            raise ClientError(
+                {
+                    "Error": {"Code": "TooManyRequestsException"},
+                    "ResponseMetadata": {"HTTPStatusCode": 429},
+                },
+                "Invoke",
+            )
+
+        return {
+            "StatusCode": 200,
+            "LogResult": base64.b64encode(REPORT.encode()).decode(),
+            "Payload": io.BytesIO(b"{}"),
+        }
+
+
+class TimeoutLambdaClient:
+    def invoke(self, FunctionName, InvocationType, LogType, Payload):
+        raise ReadTimeoutError(endpoint_url="https://lambda")
+
+
+def test_render_event():
+    template = {"id": "{{index}}", "key": "item-{{ index }}", "items": ["{{uuid}}"]}
+
+    event = invoke_utils.render_event(template, 3)
+    assert event.get("id") == 3
+    assert event.get("key") == "item-3"
+    assert len(event.get("items")[0]) == 36
+
+    assert invoke_utils.render_event({"a": 1, "b": None}, 0) == {"a": 1, "b": None}
+
+    try:
+        invoke_utils.render_event("{{unknown}}", 0)
+        assert False
+    except Exception as e:
+        assert "unknown" in str(e)
+
+
+def test_parse_report():
+    assert invoke_utils.parse_report(REPORT) == {
+        "duration_ms": 12.5,
+        "billed_duration_ms": 13.0,
+        "memory_size_mb": 128,
+        "max_memory_used_mb": 40,
+        "init_duration_ms": 150.25,
+    }
+    assert invoke_utils.parse_report("START RequestId: 1\n") == {}
+
+
+def test_percentile():
+    assert invoke_utils.percentile([], 50) is None
+    assert invoke_utils.percentile([5], 99) == 5
+    assert invoke_utils.percentile([4, 1, 3, 2], 50) == 2.5
+    assert invoke_utils.percentile(list(range(101)), 90) == 90
+
+
+def test_run_invocations():
+    client = FakeLambdaClient(throttle_every=5)
+
+    results = invoke_utils.run_invocations(
+        lambda x: invoke_utils.invoke(
+            client, "function", invoke_utils.render_event({"i": "{{index}}"}, x), x
+        ),
+        concurrency=3,
+        count=10,
+    )
+
+    assert [x.index for x in results] == list(range(10))
+    assert sorted(client.payloads) == sorted(f'{{"i": {i}}}' for i in range(10))
+
+    summary = invoke_utils.summarize(results)
+    assert summary.get("invocations") == 10
+    assert summary.get("throttles") == 2
+    assert summary.get("errors") == 0
+    assert summary.get("cold_starts") == 8
+    assert summary.get("billed_duration_ms").get("p99") == 13
+    assert summary.get("total_billed_duration_ms") == 8 * 13
+
+    os.makedirs(base_dir, exist_ok=True)
+    fp = os.path.join(base_dir, "results.csv")
+    invoke_utils.write_results_csv(results, fp)
+
+    with open(fp) as fh:
+        rows = list(csv.DictReader(fh))
+
+    assert len(rows) == 10
+    assert rows[0].get("init_duration_ms") == "150.25"
+
+
+def test_run_invocations_for_duration():
+    results = invoke_utils.run_invocations(
+        lambda x: invoke_utils.invocation_result(x, 0, 0), concurrency=2, duration=0.05
+    )
+
+    assert len(results) > 0
+
+
+def test_invoke_with_connection_error():
+    result = invoke_utils.invoke(TimeoutLambdaClient(), "function", {}, index=3)
+
+    assert result.index == 3
+    assert result.error == "ReadTimeoutError"
+    assert result.status_code is None
+    assert not result.throttled
+    assert result.latency_ms >= 0
+
+
+def test_load_event_data_with_invalid_json(capsys):
+    try:
+        invoke_utils.load_event_data(None, "{invalid")
+        assert False
+    except Exception as e:
+        assert str(e) == "Could not load {invalid as json"
+        assert isinstance(e.__cause__, ValueError)
+
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,199 @@
+import io
+import os
+import sys
+from types import SimpleNamespace
+import zipfile
+
+import pytest
+
+from core.constructs.output_manager import RICH_OUTPUT, create_output_manager
+from core.default.commands.function import execute, local_utils
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "function_local_utils")
+
+HANDLER = """
+import os
+
+import locallayer
+
+def handler(event, context):
+    try:
+        import pydantic
+        has_site_packages = True
+    except ImportError:
+        has_site_packages = False
+
+    import botocore
+
+    return {
+        "value": locallayer.double(event.get("value")),
+        "env": os.environ.get("LOCAL_TEST_VALUE"),
+        "has_site_packages": has_site_packages,
+        "remaining": context.get_remaining_time_in_millis() > 0,
+    }
+"""
+
+LAYER = """
+def double(x):
+    return x * 2
+"""
+
+
+def _create_archive(name: str, files: dict) -> str:
+    os.makedirs(base_dir, exist_ok=True)
+    fp = os.path.join(base_dir, name)
+
+    with zipfile.ZipFile(fp, "w") as archive:
+        for path, contents in files.items():
+            archive.writestr(path, contents)
+
+    return fp
+
+
+def test_extract_artifact():
+    fp = _create_archive("extract.zip", {"a.py": "A = 1"})
+    directory = os.path.join(base_dir, "extract")
+
+    assert local_utils.extract_artifact(fp, directory) == directory
+    assert os.path.isfile(os.path.join(directory, "a.py"))
+
+    # The current version is not extracted again
+    os.remove(os.path.join(directory, "a.py"))
+    local_utils.extract_artifact(fp, directory)
+    assert not os.path.isfile(os.path.join(directory, "a.py"))
+
+    os.utime(fp, ns=(0, 0))
+    local_utils.extract_artifact(fp, directory)
+    assert os.path.isfile(os.path.join(directory, "a.py"))
+
+
+def test_execute_handler():
+    handler_directory = local_utils.extract_artifact(
+        _create_archive(
+            "handler.zip",
+            {"localsrc/__init__.py": "", "localsrc/handlers.py": HANDLER},
+        ),
+        os.path.join(base_dir, "handler"),
+    )
+    layer_directory = local_utils.extract_artifact(
+        _create_archive("layer.zip", {"python/locallayer.py": LAYER}),
+        os.path.join(base_dir, "layer"),
+    )
+    previous_path = list(sys.path)
+
+    with local_utils.IsolatedEnvironment(
+        local_utils.get_import_paths(handler_directory, [layer_directory]),
+        {"LOCAL_TEST_VALUE": "set"},
+    ):
+        handler_function, init_ms, error = local_utils.load_handler(
+            "localsrc.handlers.handler"
+        )
+        assert error is None
+
+        result, handler_ms, error = local_utils.invoke_handler(
+            handler_function, {"value": 2}, local_utils.LocalContext("test", 128, 30)
+        )
+
+    assert error is None
+    assert result == {
+        "value": 4,
+        "env": "set",
+        "has_site_packages": False,
+        "remaining": True,
+    }
+    assert init_ms > 0
+    assert handler_ms > 0
+
+    assert sys.path == previous_path
+    assert "localsrc" not in sys.modules
+    assert "LOCAL_TEST_VALUE" not in os.environ
+
+
+def test_load_handler_error():
+    handler_directory = local_utils.extract_artifact(
+        _create_archive(
+            "broken_handler.zip",
+            {"brokensrc/__init__.py": "", "brokensrc/handlers.py": "import missing"},
+        ),
+        os.path.join(base_dir, "broken_handler"),
+    )
+
+    with local_utils.IsolatedEnvironment(
+        local_utils.get_import_paths(handler_directory, []), {}
+    ):
+        handler_function, init_ms, error = local_utils.load_handler(
+            "brokensrc.handlers.handler"
+        )
+
+    assert handler_function is None
+    assert "No module named 'missing'" in error
+    assert init_ms > 0
+
+
+def test_execute_locally_with_broken_handler(monkeypatch):
+    handler_directory = local_utils.extract_artifact(
+        _create_archive(
+            "broken_handler.zip",
+            {"brokensrc/__init__.py": "", "brokensrc/handlers.py": "import missing"},
+        ),
+        os.path.join(base_dir, "broken_handler"),
+    )
+    resource = SimpleNamespace(
+        filepath="broken_handler.zip",
+        configuration=SimpleNamespace(
+            handler="brokensrc.handlers.handler",
+            memory_size=128,
+            timeout=30,
+            environment_variables={},
+        ),
+        external_dependencies=[],
+    )
+    monkeypatch.setattr(
+        execute.command_utils, "get_resource_from_cdev_name", lambda *args: resource
+    )
+
+    stream = io.StringIO()
+    command = execute.execute(create_output_manager(RICH_OUTPUT, stream=stream))
+    monkeypatch.setattr(command, "_extract_local_artifact", lambda x: handler_directory)
+
+    command._execute_locally("component", "handler", {})
+
+    output = stream.getvalue()
+    assert "No module named 'missing'" in output
+    assert "Init: " in output
+    assert "Handler: " not in output
+
+
+def test_invoke_handler_error():
+    def _handler(event, context):
+        raise ValueError("bad event")
+
+    result, _, error = local_utils.invoke_handler(
+        _handler, {}, local_utils.LocalContext("test", 128, 30)
+    )
+
+    assert result is None
+    assert "ValueError: bad event" in error
+
+
+def test_output_without_load_test_flags(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        execute.command_utils,
+        "get_cloud_output_from_cdev_name",
+        lambda *args: {"cloud_id": "arn"},
+    )
+
+    command = execute.execute(create_output_manager(RICH_OUTPUT, stream=io.StringIO()))
+    monkeypatch.setattr(command, "_get_event_data", lambda *args, **kwargs: {})
+    monkeypatch.setattr(
+        command,
+        "_run_load_test",
+        lambda cloud_name, event_data, **kwargs: calls.append(cloud_name),
+    )
+
+    command.command(function_id="component.handler", output="results.csv")
+    assert calls == ["arn"]
+
+    with pytest.raises(Exception, match="Can not use '--local' with a load test"):
+        command.command(function_id="component.handler", local=True, output="x.csv")
@@ -0,0 +1,123 @@
+import base64
+import io
+import math
+
+from core.default.commands.function import tune_utils
+
+
+class FakeLambdaClient:
+    """Function whose duration halves when its memory doubles, down to a floor of 100 ms"""
+
+    def __init__(self, memory_size: int = 512, failing_memory_sizes=()) -> None:
+        self.memory_size = memory_size
+        self.updates = []
+        self._failing_memory_sizes = failing_memory_sizes
+        self._pending_updates = 0
+        self._is_cold = True
+
+    def get_function_configuration(self, FunctionName):
+        if self._pending_updates:
+            self._pending_updates -= 1
+            return {"MemorySize": self.memory_size, "LastUpdateStatus": "InProgress"}
+
+        return {
+            "MemorySize": self.memory_size,
+            "LastUpdateStatus": "Successful",
+            "Architectures": ["arm64"],
+        }
+
+    def update_function_configuration(self, FunctionName, MemorySize):
+        self.updates.append(MemorySize)
+        self.memory_size = MemorySize
+        self._pending_updates = 1
+        self._is_cold = True
+
+    def invoke(self, FunctionName, InvocationType, LogType, Payload):
+        duration = max(100.0, 1600 * 128 / self.memory_size)
+        report = (
+            f"REPORT RequestId: 1\tDuration: {duration:.2f} ms\t"
+            f"Billed Duration: {math.ceil(duration)} ms\tMemory Size: {self.memory_size} MB\t"
+            f"Max Memory Used: 60 MB\t"
+        )
+
+        if self._is_cold:
+            report += "Init Duration: 500.00 ms\t"
+            self._is_cold = False
+
+        response = {
+            "StatusCode": 200,
+            "LogResult": base64.b64encode(report.encode()).decode(),
+            "Payload": io.BytesIO(b"{}"),
+        }
+
+        if self.memory_size in self._failing_memory_sizes:
+            response["FunctionError"] = "Unhandled"
+
+        return response
+
+
+def test_get_invocation_cost():
+    assert tune_utils.get_invocation_cost(1000, 1024) == (
+        tune_utils.GB_SECOND_PRICES.get("x86_64") + tune_utils.REQUEST_PRICE
+    )
+    assert tune_utils.get_invocation_cost(500, 2048, "arm64") == (
+        tune_utils.GB_SECOND_PRICES.get("arm64") + tune_utils.REQUEST_PRICE
+    )
+
+
+def test_tune_function():
+    client = FakeLambdaClient(memory_size=512, failing_memory_sizes=(128,))
+    sleeps = []
+    measured = []
+
+    result = tune_utils.tune_function(
+        client,
+        "function",
+        memory_sizes=[128, 256, 1024, 3008],
+        invocations=3,
+        sleep=sleeps.append,
+        callback=lambda x: measured.append(x.memory_size),
+    )
+
+    assert measured == [128, 256, 1024, 3008]
+    assert client.updates == [128, 256, 1024, 3008, 512]
+    assert client.memory_size == 512
+    assert len(sleeps) == 5
+
+    assert result.original_memory_size == 512
+    assert result.architecture == "arm64"
+
+    results = {x.memory_size: x for x in result.results}
+    assert results.get(128).errors == 3
+    assert not results.get(128).is_valid
+
+    # Cold starts are excluded from the durations
+    assert results.get(256).cold_starts == 1
+    assert results.get(256).average_duration_ms == 800
+
+    # 256 MB and 1024 MB cost the same, so the faster one is recommended
+    assert result.recommended_memory_size == 1024
+    assert (
+        tune_utils.recommend_memory_size(result.results, tune_utils.SPEED_STRATEGY)
+        == 3008
+    )
+    assert result.to_dict().get("results")[1].get("memory_size") == 256
+
+
+def test_tune_function_restores_memory_size():
+    client = FakeLambdaClient(memory_size=256)
+
+    def _fail(*args, **kwargs):
+        raise Exception("Invoke failed")
+
+    client.invoke = _fail
+
+    try:
+        tune_utils.tune_function(
+            client, "function", memory_sizes=[1024], sleep=lambda x: None
+        )
+        assert False
+    except Exception as e:
+        assert str(e) == "Invoke failed"
+
+    assert client.updates == [1024, 256]
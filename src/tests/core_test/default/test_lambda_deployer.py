@@ -0,0 +1,168 @@
+import os
+from types import SimpleNamespace
+
+from core.constructs.models import frozendict
+from core.default.mappers.simple import lambda_deployer
+from core.default.resources.simple import xlambda
+from core.utils.platforms import lambda_python_environment
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "lambda_deployer")
+
+
+class FakeOutputTask:
+    def update(self, **kwargs) -> None:
+        pass
+
+
+def _create_resource(
+    src_code_hash: str = "1", filepath: str = "handler.zip", memory_size: int = 128
+) -> xlambda.simple_function_model:
+    return xlambda.simple_function_model(
+        name="handler",
+        ruuid="cdev::simple::function",
+        hash=f"{src_code_hash}{filepath}{memory_size}",
+        tags=frozendict({}),
+        filepath=filepath,
+        configuration=xlambda.simple_function_configuration_model(
+            handler="handler.handler",
+            description=None,
+            environment_variables=frozendict({}),
+            memory_size=memory_size,
+            timeout=30,
+            storage=512,
+            subnets=None,
+            security_groups=None,
+        ),
+        events=frozenset(),
+        permissions=frozenset(),
+        external_dependencies=frozenset(),
+        src_code_hash=src_code_hash,
+        platform=lambda_python_environment.py3_x86_64,
+    )
+
+
+def _write_artifact(filepath: str, size: int = 10) -> None:
+    os.makedirs(base_dir, exist_ok=True)
+
+    with open(os.path.join(base_dir, filepath), "wb") as fh:
+        fh.write(b"0" * size)
+
+
+class FakeWorkspace:
+    @staticmethod
+    def instance():
+        return SimpleNamespace(settings=SimpleNamespace(HOT_SWAP_FUNCTION_CODE=True))
+
+
+def _use_artifact_directory(monkeypatch) -> None:
+    monkeypatch.setattr(lambda_deployer, "Workspace", FakeWorkspace)
+    monkeypatch.setattr(
+        lambda_deployer.core_paths,
+        "get_full_path_from_workspace_base",
+        lambda x: os.path.join(base_dir, x),
+    )
+
+
+def test_can_hot_swap(monkeypatch):
+    _use_artifact_directory(monkeypatch)
+    _write_artifact("handler_2.zip")
+    previous_resource = _create_resource()
+
+    # Only the source code changed
+    assert lambda_deployer._can_hot_swap(
+        previous_resource, _create_resource(src_code_hash="2", filepath="handler_2.zip")
+    )
+
+    # The source code did not change
+    assert not lambda_deployer._can_hot_swap(previous_resource, _create_resource())
+
+    # Another field changed along with the source code
+    assert not lambda_deployer._can_hot_swap(
+        previous_resource,
+        _create_resource(src_code_hash="2", filepath="handler_2.zip", memory_size=256),
+    )
+
+    # The artifact does not exist
+    assert not lambda_deployer._can_hot_swap(
+        previous_resource, _create_resource(src_code_hash="2", filepath="missing.zip")
+    )
+
+    # The artifact is too large to be uploaded directly to the function
+    monkeypatch.setattr(lambda_deployer, "MAX_DIRECT_UPLOAD_BYTES", 5)
+    assert not lambda_deployer._can_hot_swap(
+        previous_resource, _create_resource(src_code_hash="2", filepath="handler_2.zip")
+    )
+
+
+def test_hot_swap_source_code(monkeypatch):
+    _use_artifact_directory(monkeypatch)
+    _write_artifact("handler_2.zip")
+    calls = []
+    monkeypatch.setattr(
+        lambda_deployer.aws_client,
+        "run_client_function",
+        lambda *args: calls.append(args),
+    )
+
+    previous_output = {"cloud_id": "arn", "artifact_key": "handler-1.zip"}
+    output = lambda_deployer._update_simple_lambda(
+        "token",
+        "namespace",
+        _create_resource(),
+        _create_resource(src_code_hash="2", filepath="handler_2.zip"),
+        previous_output,
+        FakeOutputTask(),
+        "bucket",
+    )
+
+    assert calls == [
+        (
+            "lambda",
+            "update_function_code",
+            {"FunctionName": "arn", "ZipFile": b"0" * 10, "Publish": True},
+        )
+    ]
+    assert output == {"cloud_id": "arn"}
+    assert previous_output.get("artifact_key") == "handler-1.zip"
+
+
+def test_full_update_when_not_hot_swappable(monkeypatch):
+    _use_artifact_directory(monkeypatch)
+    _write_artifact("handler_2.zip")
+    steps = []
+
+    def _record_step(name: str, rv=True):
+        return lambda *args: steps.append(name) or rv
+
+    monkeypatch.setattr(lambda_deployer, "sleep", lambda x: None)
+    for name in [
+        "_update_configuration",
+        "_update_permissions",
+        "_update_source_code",
+        "_update_dependencies",
+        "_update_events",
+    ]:
+        monkeypatch.setattr(lambda_deployer, name, _record_step(name))
+    monkeypatch.setattr(
+        lambda_deployer,
+        "_hot_swap_source_code",
+        _record_step("_hot_swap_source_code"),
+    )
+
+    lambda_deployer._update_simple_lambda(
+        "token",
+        "namespace",
+        _create_resource(),
+        _create_resource(src_code_hash="2", filepath="handler_2.zip", memory_size=256),
+        {"cloud_id": "arn"},
+        FakeOutputTask(),
+        "bucket",
+    )
+
+    assert steps == [
+        "_update_configuration",
+        "_update_permissions",
+        "_update_source_code",
+        "_update_dependencies",
+        "_update_events",
+    ]
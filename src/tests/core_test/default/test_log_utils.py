@@ -0,0 +1,175 @@
+import io
+import json
+
+from core.default.commands import log_utils
+
+
+class FakeLogsClient:
+    def __init__(self, events, streams=None, page_size=2) -> None:
+        self.events = events
+        self.streams = streams or []
+        self.page_size = page_size
+        self.calls = []
+
+    def filter_log_events(self, logGroupName, startTime=0, nextToken=None, **kwargs):
+        self.calls.append(kwargs.get("logStreamNames"))
+
+        events = [
+            x
+            for x in self.events
+            if x.get("timestamp") >= startTime
+            and x.get("logStreamName")
+            in kwargs.get("logStreamNames", [x.get("logStreamName")])
+        ]
+        start = int(nextToken or 0)
+        rv = {"events": events[start : start + self.page_size]}
+
+        if start + self.page_size < len(events):
+            rv["nextToken"] = str(start + self.page_size)
+
+        return rv
+
+    def describe_log_streams(self, **kwargs):
+        return {"logStreams": self.streams}
+
+
+def _create_event(event_id: str, timestamp: int, stream: str = "a") -> dict:
+    return {
+        "eventId": event_id,
+        "timestamp": timestamp,
+        "message": event_id,
+        "logStreamName": stream,
+    }
+
+
+def test_log_event_cursor():
+    cursor = log_utils.LogEventCursor(10000, lookback_ms=1000, max_seen_events=2)
+
+    assert cursor.start_time == 9000
+    assert cursor.add(_create_event("1", 10500))
+    assert not cursor.add(_create_event("1", 10500))
+    assert cursor.add(_create_event("2", 12000))
+    assert cursor.start_time == 11000
+
+    # The oldest id is removed once the window is full
+    assert cursor.add(_create_event("3", 12000))
+    assert cursor.add(_create_event("1", 10500))
+
+
+def test_adaptive_backoff():
+    backoff = log_utils.AdaptiveBackoff(min_interval=1, max_interval=3)
+
+    assert [backoff.next_interval() for _ in range(4)] == [1, 2, 3, 3]
+    assert backoff.reset() == 1
+    assert backoff.next_interval() == 1
+
+
+def test_poll_events():
+    client = FakeLogsClient(
+        [
+            _create_event("1", 1000),
+            _create_event("2", 2000),
+            _create_event("3", 3000),
+        ]
+    )
+    cursor = log_utils.LogEventCursor(0, lookback_ms=5000)
+
+    assert [x.get("eventId") for x in log_utils.poll_events(client, "g", cursor)] == [
+        "1",
+        "2",
+        "3",
+    ]
+    assert log_utils.poll_events(client, "g", cursor) == []
+
+    # Late events within the lookback window are still found
+    client.events.append(_create_event("4", 2500))
+    assert [x.get("eventId") for x in log_utils.poll_events(client, "g", cursor)] == [
+        "4"
+    ]
+
+
+def test_poll_events_concurrently():
+    lag = log_utils.STREAM_ACTIVITY_LAG_MS
+    client = FakeLogsClient(
+        [
+            _create_event("1", 1000, "a"),
+            _create_event("2", lag + 2000, "b"),
+            _create_event("3", lag + 3000, "c"),
+        ],
+        streams=[
+            {"logStreamName": "c", "lastEventTimestamp": lag + 3000},
+            {"logStreamName": "b", "lastEventTimestamp": lag + 2000},
+            {"logStreamName": "a", "lastEventTimestamp": 1000},
+        ],
+    )
+    cursor = log_utils.LogEventCursor(lag + 2000, lookback_ms=0)
+
+    events = log_utils.poll_events(client, "g", cursor, max_workers=2)
+
+    # Stream 'a' has not been active since well before the cursor so it is not read
+    assert [x.get("eventId") for x in events] == ["2", "3"]
+    assert sorted(client.calls) == [["b"], ["c"]]
+
+
+def test_split_streams():
+    assert log_utils.split_streams(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+    assert [
+        len(x) for x in log_utils.split_streams([str(i) for i in range(250)], 2)
+    ] == [100, 100, 50]
+
+
+def test_export_events():
+    client = FakeLogsClient(
+        [_create_event(str(i), i * 1000, "ab"[i % 2]) for i in range(10)],
+        streams=[
+            {"logStreamName": "a", "lastEventTimestamp": 9000},
+            {"logStreamName": "b", "lastEventTimestamp": 8000},
+        ],
+    )
+    fh = io.StringIO()
+
+    assert (
+        log_utils.export_events(
+            client, "g", fh, start_time=2000, end_time=None, max_workers=2
+        )
+        == 8
+    )
+
+    events = [json.loads(x) for x in fh.getvalue().splitlines()]
+    assert sorted(int(x.get("eventId")) for x in events) == list(range(2, 10))
+    assert set(events[0]) == {
+        "timestamp",
+        "ingestionTime",
+        "logStreamName",
+        "eventId",
+        "message",
+    }
+
+
+def test_run_query():
+    class FakeQueryClient:
+        def __init__(self) -> None:
+            self.statuses = ["Running", "Complete"]
+
+        def start_query(self, **kwargs):
+            return {"queryId": "1"}
+
+        def get_query_results(self, queryId):
+            return {
+                "status": self.statuses.pop(0),
+                "results": [
+                    [
+                        {"field": "@message", "value": "hello"},
+                        {"field": "@ptr", "value": "ptr"},
+                    ]
+                ],
+            }
+
+    assert log_utils.run_query(
+        FakeQueryClient(),
+        "g",
+        "fields @message",
+        0,
+        1,
+        log_utils.AdaptiveBackoff(min_interval=0),
+    ) == [{"@message": "hello"}]
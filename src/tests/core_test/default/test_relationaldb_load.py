@@ -0,0 +1,134 @@
+import os
+import threading
+
+from core.default.commands.relationaldb import load_utils
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "relationaldb_load")
+
+
+class FakeRDSDataClient:
+    def __init__(self, fail_on: int = None) -> None:
+        self.batches = []
+        self._fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def batch_execute_statement(
+        self, resourceArn, secretArn, database, sql, parameterSets
+    ):
+        with self._lock:
+            self.batches.append((sql, parameterSets))
+
+        if any(
+            x.get("name") == "id" and x.get("value").get("longValue") == self._fail_on
+            for parameters in parameterSets
+            for x in parameters
+        ):
+            raise Exception("Batch failed")
+
+        return {"updateResults": [{} for _ in parameterSets]}
+
+
+def _write_file(name: str, contents: str) -> str:
+    os.makedirs(base_dir, exist_ok=True)
+    fp = os.path.join(base_dir, name)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def test_split_sql_statements():
+    script = """
+    -- create the table; with a comment
+    CREATE TABLE notes (id int, body text);
+    INSERT INTO notes VALUES (1, 'a; b'), (2, 'it''s; here');
+    /* a block comment; */
+    CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql;
+    SELECT "semi;colon" FROM notes
+    """
+
+    assert load_utils.split_sql_statements(script) == [
+        "-- create the table; with a comment\n    CREATE TABLE notes (id int, body text)",
+        "INSERT INTO notes VALUES (1, 'a; b'), (2, 'it''s; here')",
+        "/* a block comment; */\n    CREATE FUNCTION f() RETURNS int AS $body$ SELECT 1; $body$ LANGUAGE sql",
+        'SELECT "semi;colon" FROM notes',
+    ]
+
+    assert load_utils.split_sql_statements(";\n-- only a comment;\n") == []
+
+
+def test_iter_rows_from_file():
+    fp = _write_file("rows.csv", "id,name,score,active\n1,a,1.5,true\n02,,x,no\n")
+
+    assert list(load_utils.iter_rows_from_file(fp)) == [
+        {"id": "1", "name": "a", "score": "1.5", "active": "true"},
+        {"id": "02", "name": "", "score": "x", "active": "no"},
+    ]
+    assert list(load_utils.iter_rows_from_file(fp, infer_types=True)) == [
+        {"id": 1, "name": "a", "score": 1.5, "active": True},
+        {"id": "02", "name": None, "score": "x", "active": "no"},
+    ]
+
+    fp = _write_file("rows.jsonl", '{"id": 1, "tags": ["a"]}\n\n{"id": 2}\n')
+    assert list(load_utils.iter_rows_from_file(fp)) == [
+        {"id": 1, "tags": ["a"]},
+        {"id": 2},
+    ]
+
+
+def test_to_sql_parameters():
+    assert load_utils.to_sql_parameters(
+        {"id": 1, "user name": "a", "score": 1.5, "ok": False, "tags": ["a"], "x": None}
+    ) == [
+        {"name": "id", "value": {"longValue": 1}},
+        {"name": "user_name", "value": {"stringValue": "a"}},
+        {"name": "score", "value": {"doubleValue": 1.5}},
+        {"name": "ok", "value": {"booleanValue": False}},
+        {"name": "tags", "value": {"stringValue": '["a"]'}},
+        {"name": "x", "value": {"isNull": True}},
+    ]
+
+
+def test_create_insert_statement():
+    assert (
+        load_utils.create_insert_statement(
+            "public.users", ["id", "user name"], "aurora-postgresql"
+        )
+        == 'INSERT INTO "public"."users" ("id", "user name") VALUES (:id, :user_name)'
+    )
+    assert (
+        load_utils.create_insert_statement("users", ["id", "a`b"], "aurora-mysql")
+        == "INSERT INTO `users` (`id`, `a``b`) VALUES (:id, :a_b)"
+    )
+
+    try:
+        load_utils.create_insert_statement("users", ["a b", "a_b"], "aurora-mysql")
+        assert False
+    except Exception as e:
+        assert "same parameter name 'a_b'" in str(e)
+
+
+def test_execute_batches():
+    client = FakeRDSDataClient(fail_on=7)
+    progress = []
+
+    result = load_utils.execute_batches(
+        client,
+        "cluster",
+        "secret",
+        "db",
+        "INSERT INTO t (id) VALUES (:id)",
+        ({"id": i} for i in range(10)),
+        batch_size=3,
+        max_workers=2,
+        callback=lambda x: progress.append(x.rows + x.failed),
+    )
+
+    assert sorted(len(x[1]) for x in client.batches) == [1, 3, 3, 3]
+    assert result.rows == 7
+    assert result.failed == 3
+    assert result.batches == 3
+    assert result.errors == ["Batch failed"]
+    assert sorted(progress)[-1] == 10
+    assert result.summary().startswith("Loaded 7 rows in 3 batches, failed 3")
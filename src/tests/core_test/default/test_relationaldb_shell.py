@@ -0,0 +1,53 @@
+from collections import namedtuple
+import io
+import json
+import os
+
+from rich.console import Console
+
+from core.default.commands.relationaldb.shell import fmt, write_results
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "relationaldb_shell")
+
+column_description = namedtuple("column_description", ["name", "type_code"])
+
+column_descriptions = [column_description("id", int), column_description("name", str)]
+
+
+def _create_pages():
+    return iter([[(1, "a"), (2, None)], [(3, "c")], [(4, "d")]])
+
+
+def test_print_pages():
+    console = Console(file=io.StringIO(), width=80)
+
+    assert fmt(console).print_pages(column_descriptions, _create_pages(), None) == 4
+
+    assert (
+        fmt(console).print_pages(column_descriptions, _create_pages(), None, max_rows=3)
+        == 3
+    )
+    assert "Showing the first 3 rows" in console.file.getvalue()
+
+    # Stop when the user does not want more rows
+    answers = [True, False]
+    assert (
+        fmt(console).print_pages(
+            column_descriptions, _create_pages(), None, more=lambda: answers.pop(0)
+        )
+        == 3
+    )
+
+
+def test_write_results():
+    os.makedirs(base_dir, exist_ok=True)
+
+    csv_fp = os.path.join(base_dir, "results.csv")
+    assert write_results(column_descriptions, _create_pages(), csv_fp) == 4
+    with open(csv_fp) as fh:
+        assert fh.read().splitlines() == ["id,name", "1,a", "2,", "3,c", "4,d"]
+
+    jsonl_fp = os.path.join(base_dir, "results.jsonl")
+    assert write_results(column_descriptions, _create_pages(), jsonl_fp) == 4
+    with open(jsonl_fp) as fh:
+        assert json.loads(fh.readline()) == {"id": 1, "name": "a"}
@@ -0,0 +1,314 @@
+import io
+import os
+
+from core.constructs.output_manager import RICH_OUTPUT, create_output_manager
+from core.default.commands import s3_utils
+from core.default.commands.bucket import cp
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+
+class FakeS3Client:
+    def __init__(self, failing_keys=()) -> None:
+        self._failing_keys = failing_keys
+        self.uploaded = []
+        self.deleted_batches = []
+        self.downloaded = []
+        self.copied = []
+
+    def upload_file(self, fp, bucket_name, key, ExtraArgs=None, Config=None):
+        if key in self._failing_keys:
+            raise Exception(f"Upload of {key} failed")
+
+        self.uploaded.append((key, ExtraArgs.get("ContentType")))
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": '"multipart-2"'}
+
+    def download_file(self, bucket_name, key, fp, Config=None):
+        self.downloaded.append((key, fp))
+
+    def copy(self, CopySource, bucket_name, key, Config=None):
+        self.copied.append((CopySource.get("Key"), key))
+
+    def delete_objects(self, Bucket, Delete):
+        self.deleted_batches.append([x.get("Key") for x in Delete.get("Objects")])
+        return {}
+
+
+class FakeS3Resource:
+    def __init__(self) -> None:
+        self.uploaded = []
+
+    def Bucket(self, bucket_name):
+        return self
+
+    def upload_file(self, fp, key, ExtraArgs=None):
+        self.uploaded.append((fp, key))
+
+
+class FakeCloudFrontClient:
+    def __init__(self) -> None:
+        self.paths = None
+
+    def create_invalidation(self, DistributionId, InvalidationBatch):
+        self.paths = InvalidationBatch.get("Paths").get("Items")
+        return {"Invalidation": {"Id": "1"}}
+
+
+def _create_local_object(name: str, contents: str) -> s3_utils.local_object:
+    fp = os.path.join(base_dir, "s3_utils", name)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return s3_utils.create_local_object(fp, name, "text/html")
+
+
+def test_plan_sync():
+    unchanged = _create_local_object("index.html", "index")
+    changed = _create_local_object("about.html", "about")
+    new = _create_local_object("new.html", "new")
+    multipart = _create_local_object("large.html", "large")
+
+    remote_objects = {
+        "index.html": {"etag": unchanged.md5, "size": unchanged.size},
+        "about.html": {"etag": "previous", "size": changed.size},
+        "large.html": {"etag": "multipart-2", "size": multipart.size},
+        "removed.html": {"etag": "removed", "size": 1},
+    }
+    manifest_entries = {"large.html": {"md5": multipart.md5, "etag": "multipart-2"}}
+
+    plan = s3_utils.plan_sync(
+        [unchanged, changed, new, multipart], remote_objects, manifest_entries
+    )
+
+    assert [x.key for x in plan.uploads] == ["about.html", "new.html"]
+    assert plan.unchanged == 2
+    assert plan.deletes == []
+
+    plan = s3_utils.plan_sync(
+        [unchanged, changed, new, multipart],
+        remote_objects,
+        manifest_entries,
+        delete=True,
+    )
+    assert plan.deletes == ["removed.html"]
+    assert plan.changed_keys == ["about.html", "new.html", "removed.html"]
+
+
+def test_upload_and_delete():
+    client = FakeS3Client()
+    local = _create_local_object("upload.html", "upload")
+    manifest_entries = {"old.html": {"md5": "1", "etag": "1"}}
+
+    result = s3_utils.upload_objects(
+        client, "bucket", [local], max_workers=2, manifest_entries=manifest_entries
+    )
+
+    assert result.uploaded == 1
+    assert result.bytes_transferred == local.size
+    assert client.uploaded == [("upload.html", "text/html")]
+    assert manifest_entries.get("upload.html") == {
+        "md5": local.md5,
+        "etag": local.md5,
+    }
+
+    keys = ["old.html", *[f"{i}.html" for i in range(s3_utils.DELETE_BATCH_SIZE)]]
+    assert s3_utils.delete_keys(client, "bucket", keys, manifest_entries) == []
+    assert [len(x) for x in client.deleted_batches] == [
+        s3_utils.DELETE_BATCH_SIZE,
+        1,
+    ]
+    assert "old.html" not in manifest_entries
+
+
+def test_apply_sync_plan():
+    client = FakeS3Client()
+    local = _create_local_object("apply.html", "apply")
+    manifest_fp = os.path.join(base_dir, "s3_utils", "manifest.json")
+    manifest = s3_utils.SyncManifest(manifest_fp)
+    manifest.get_bucket_entries("bucket")["old.html"] = {"md5": "1", "etag": "1"}
+    stream = io.StringIO()
+
+    result = s3_utils.apply_sync_plan(
+        client,
+        "bucket",
+        s3_utils.sync_plan(uploads=[local], deletes=["old.html"], unchanged=2),
+        manifest,
+        create_output_manager(RICH_OUTPUT, stream=stream),
+    )
+
+    assert (result.uploaded, result.deleted, result.unchanged) == (1, 1, 2)
+    assert client.deleted_batches == [["old.html"]]
+    assert s3_utils.SyncManifest(manifest_fp).get_bucket_entries("bucket") == {
+        "apply.html": {"md5": local.md5, "etag": local.md5}
+    }
+    assert "Deleting old.html" in stream.getvalue()
+    assert "Uploaded 1, deleted 1, unchanged 2" in stream.getvalue()
+
+
+def test_multipart_upload_is_skipped_on_next_run():
+    client = FakeS3Client()
+    local = _create_local_object("multipart.html", "multipart contents")
+    transfer_config = s3_utils.create_transfer_config()
+    transfer_config.multipart_threshold = 1
+    manifest_entries = {}
+
+    s3_utils.upload_objects(
+        client,
+        "bucket",
+        [local],
+        transfer_config=transfer_config,
+        manifest_entries=manifest_entries,
+    )
+
+    remote_objects = {"multipart.html": {"etag": "multipart-2", "size": local.size}}
+    assert s3_utils.plan_sync([local], remote_objects).uploads == [local]
+    assert s3_utils.plan_sync([local], remote_objects, manifest_entries).unchanged == 1
+
+
+def test_failed_upload_is_not_invalidated():
+    client = FakeS3Client(failing_keys=["broken.html"])
+    cloudfront_client = FakeCloudFrontClient()
+    objects = [
+        _create_local_object("working.html", "working"),
+        _create_local_object("broken.html", "broken"),
+    ]
+
+    result = s3_utils.upload_objects(client, "bucket", objects, max_workers=2)
+
+    assert result.uploaded == 1
+    assert result.failed == ["broken.html"]
+
+    s3_utils.invalidate_keys(
+        cloudfront_client,
+        "dist",
+        result.get_successful_keys(["working.html", "broken.html", "removed.html"]),
+    )
+    assert cloudfront_client.paths == ["/removed.html", "/working.html"]
+
+
+def test_invalidate_keys():
+    client = FakeCloudFrontClient()
+
+    assert s3_utils.invalidate_keys(client, "dist", []) is None
+
+    s3_utils.invalidate_keys(client, "dist", ["about", "img/a b.png", ""])
+    assert client.paths == ["/", "/about", "/img/a%20b.png"]
+
+    s3_utils.invalidate_keys(
+        client, "dist", [str(i) for i in range(s3_utils.MAX_INVALIDATION_PATHS + 1)]
+    )
+    assert client.paths == ["/*"]
+
+
+def test_plan_download():
+    directory = os.path.join(base_dir, "s3_utils", "data")
+    unchanged = _create_local_object("data/unchanged.txt", "unchanged")
+
+    remote_objects = {
+        "data/": {"etag": "", "size": 0},
+        "data/unchanged.txt": {"etag": unchanged.md5, "size": unchanged.size},
+        "data/nested/new.txt": {"etag": "new", "size": 3},
+        "other.txt": {"etag": "other", "size": 5},
+    }
+
+    items, unchanged_count = s3_utils.plan_download(
+        remote_objects, s3_utils.get_prefix("data"), directory
+    )
+
+    assert unchanged_count == 1
+    assert items == [
+        s3_utils.transfer_item(
+            "data/nested/new.txt", os.path.join(directory, "nested", "new.txt"), 3
+        )
+    ]
+
+
+def test_plan_download_outside_of_directory():
+    directory = os.path.join(base_dir, "s3_utils", "data")
+
+    for key in [
+        "data/../../escaped.txt",
+        "data/nested/../../../escaped.txt",
+        "data/..",
+    ]:
+        try:
+            s3_utils.plan_download(
+                {key: {"etag": "escaped", "size": 1}},
+                s3_utils.get_prefix("data"),
+                directory,
+            )
+            assert False
+        except Exception as e:
+            assert "outside of" in str(e)
+
+    # Keys that stay within the directory are still downloaded
+    items, _ = s3_utils.plan_download(
+        {"data/nested/../inside.txt": {"etag": "inside", "size": 1}},
+        s3_utils.get_prefix("data"),
+        directory,
+    )
+    assert [x.destination for x in items] == [os.path.join(directory, "inside.txt")]
+
+
+def test_plan_copy():
+    source_objects = {
+        "data/a.txt": {"etag": "a", "size": 1},
+        "data/b.txt": {"etag": "b", "size": 1},
+        "other.txt": {"etag": "other", "size": 1},
+    }
+    destination_objects = {
+        "backup/data/a.txt": {"etag": "a", "size": 1},
+        "backup/data/b.txt": {"etag": "previous", "size": 1},
+    }
+
+    items, unchanged = s3_utils.plan_copy(
+        source_objects,
+        s3_utils.get_prefix("data/"),
+        destination_objects,
+        s3_utils.get_prefix("backup/data"),
+    )
+
+    assert unchanged == 1
+    assert items == [s3_utils.transfer_item("data/b.txt", "backup/data/b.txt", 1)]
+
+    # The root of a bucket has no prefix
+    items, _ = s3_utils.plan_copy(source_objects, "", {}, s3_utils.get_prefix(None))
+    assert [x.destination for x in items] == ["data/a.txt", "data/b.txt", "other.txt"]
+
+
+def test_download_and_copy_objects():
+    client = FakeS3Client()
+    items = [s3_utils.transfer_item("a.txt", os.path.join(base_dir, "a.txt"), 2)]
+
+    result = s3_utils.download_objects(client, "bucket", items, max_workers=2)
+    assert result.uploaded == 1
+    assert result.bytes_transferred == 2
+    assert client.downloaded == [("a.txt", os.path.join(base_dir, "a.txt"))]
+
+    result = s3_utils.copy_objects(client, "source", "destination", items)
+    assert result.summary("Copied").startswith("Copied 1,")
+    assert client.copied == [("a.txt", os.path.join(base_dir, "a.txt"))]
+
+
+def test_copy_file_with_recursive(monkeypatch):
+    local = _create_local_object("upload.html", "upload")
+    s3 = FakeS3Resource()
+    monkeypatch.setattr(cp.boto3, "resource", lambda x: s3)
+    monkeypatch.setattr(
+        cp.command_utils,
+        "get_cloud_output_from_cdev_name",
+        lambda *args: {"bucket_name": "bucket"},
+    )
+
+    command = cp.cp(create_output_manager(RICH_OUTPUT, stream=io.StringIO()))
+    command.command(
+        source=local.fp,
+        destination="bucket://demo.assets/site/upload.html",
+        recursive=True,
+    )
+
+    assert s3.uploaded == [(local.fp, "site/upload.html")]
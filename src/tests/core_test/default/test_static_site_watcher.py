@@ -0,0 +1,37 @@
+import os
+
+from watchdog.events import (
+    DirModifiedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from core.default.commands.static_site.watcher import StaticSiteWatcher
+
+
+def test_get_changed_paths():
+    watcher = StaticSiteWatcher("site", deployment_function=None, debounce_seconds=0.01)
+
+    for event in [
+        FileModifiedEvent("site/index.html"),
+        DirModifiedEvent("site"),
+        FileDeletedEvent("site/about.html"),
+        FileMovedEvent("site/old.js", "site/new.js"),
+        FileDeletedEvent("site/recreated.png"),
+        FileCreatedEvent("site/recreated.png"),
+    ]:
+        watcher.on_any_event(event)
+
+    changed_paths, deleted_paths = watcher._get_changed_paths()
+
+    assert changed_paths == {
+        os.path.abspath(x)
+        for x in ["site/index.html", "site/new.js", "site/recreated.png"]
+    }
+    assert deleted_paths == {
+        os.path.abspath(x) for x in ["site/about.html", "site/old.js"]
+    }
+
+    assert watcher._get_changed_paths() == (set(), set())
@@ -0,0 +1,267 @@
+import gzip
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+from core.default.commands.table import batch_utils, export_utils, utils as table_utils
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "table_utils")
+
+
+class FakeDynamoDBClient:
+    def __init__(self, unprocessed_calls: int = 0, failing_segment: int = None) -> None:
+        self.unprocessed_calls = unprocessed_calls
+        self.failing_segment = failing_segment
+        self.written = []
+        self.scan_args = None
+        self._lock = threading.Lock()
+
+    def scan(self, TableName, Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        self.scan_args = kwargs
+        # Each segment has two pages of two items
+        page = int(ExclusiveStartKey.get("page").get("N")) if ExclusiveStartKey else 0
+
+        if Segment == self.failing_segment and page == 1:
+            raise Exception("Scan failed")
+        rv = {
+            "Items": [{"id": {"N": str(Segment * 4 + page * 2 + i)}} for i in range(2)]
+        }
+
+        if page == 0:
+            rv["LastEvaluatedKey"] = {"page": {"N": "1"}}
+
+        return rv
+
+    def batch_write_item(self, RequestItems):
+        with self._lock:
+            table_name, requests = next(iter(RequestItems.items()))
+
+            if self.unprocessed_calls:
+                # Throttle half of the batch
+                self.unprocessed_calls -= 1
+                self.written.extend(requests[: len(requests) // 2])
+                return {
+                    "UnprocessedItems": {table_name: requests[len(requests) // 2 :]}
+                }
+
+            self.written.extend(requests)
+            return {"UnprocessedItems": {}}
+
+
+def _write_file(name: str, contents: str) -> str:
+    fp = os.path.join(base_dir, name)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def test_recursive_translate_data():
+    assert table_utils.recursive_translate_data(
+        {
+            "id": 1,
+            "active": True,
+            "scores": [1, 2.5],
+            "tags": ["a"],
+            "meta": {"name": "x", "missing": None},
+            "mixed": [1, "a"],
+        }
+    ) == {
+        "id": {"N": "1"},
+        "active": {"BOOL": True},
+        "scores": {"NS": ["1", "2.5"]},
+        "tags": {"SS": ["a"]},
+        "meta": {"M": {"name": {"S": "x"}, "missing": {"NULL": True}}},
+        "mixed": {"L": [{"N": "1"}, {"S": "a"}]},
+    }
+
+
+def test_iter_items_from_file():
+    assert list(
+        batch_utils.iter_items_from_file(
+            _write_file("items.jsonl", '{"id": 1}\n\n{"id": 2}\n')
+        )
+    ) == [{"id": 1}, {"id": 2}]
+
+    assert [
+        int(x.get("id"))
+        for x in batch_utils.iter_items_from_file(
+            _write_file("items.json", '{"items": [{"id": 1}, {"id": 2}]}')
+        )
+    ] == [1, 2]
+
+
+def test_write_batch_retries_unprocessed_items():
+    client = FakeDynamoDBClient(unprocessed_calls=2)
+    requests = [{"PutRequest": {"Item": {"id": {"N": str(i)}}}} for i in range(8)]
+    sleeps = []
+
+    assert batch_utils.write_batch(client, "t", requests, sleep=sleeps.append) == 2
+    assert len(client.written) == 8
+    assert len(sleeps) == 2
+
+    client = FakeDynamoDBClient(unprocessed_calls=5)
+    try:
+        batch_utils.write_batch(client, "t", requests, max_retries=1, sleep=lambda x: x)
+        assert False
+    except Exception as e:
+        assert "unprocessed" in str(e)
+
+
+def test_write_requests():
+    client = FakeDynamoDBClient()
+    requests = ({"PutRequest": {"Item": {"id": {"N": str(i)}}}} for i in range(1000))
+    progress = []
+
+    result = batch_utils.write_requests(
+        client,
+        "t",
+        requests,
+        max_workers=4,
+        callback=lambda x: progress.append(x.processed),
+    )
+
+    assert result.processed == 1000
+    assert result.failed == 0
+    assert len(client.written) == 1000
+    assert len(progress) == 1000 // batch_utils.BATCH_WRITE_SIZE
+
+
+def test_rate_limiter():
+    now = [0.0]
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = batch_utils.RateLimiter(10, clock=lambda: now[0], sleep=_sleep)
+
+    # The burst is available immediately, and later tokens wait to be refilled
+    limiter.acquire(10)
+    limiter.acquire(5)
+    limiter.acquire(5)
+    assert sleeps == [0.5, 0.5]
+
+    # Tokens taken while other threads are waiting are reserved after theirs
+    now[0] += 1
+    limiter = batch_utils.RateLimiter(10, clock=lambda: now[0], sleep=sleeps.append)
+    limiter.acquire(15)
+    limiter.acquire(5)
+    assert sleeps[2:] == [0.5, 1.0]
+
+
+def test_delete_items():
+    client = FakeDynamoDBClient(unprocessed_calls=1)
+    progress = []
+
+    result = batch_utils.delete_items(
+        client,
+        "t",
+        ["id"],
+        total_segments=3,
+        callback=lambda x: progress.append(x.processed),
+    )
+
+    assert result.processed == 12
+    assert result.retries == 1
+    assert sorted(
+        int(x["DeleteRequest"]["Key"]["id"]["N"]) for x in client.written
+    ) == list(range(12))
+    assert progress[-1] == 12
+
+
+def test_delete_items_with_failed_batch():
+    client = FakeDynamoDBClient(unprocessed_calls=1)
+
+    result = batch_utils.delete_items(
+        client, "t", ["user-id", "sort.key"], total_segments=3, max_retries=0
+    )
+
+    # The failed batch does not stop the other segments
+    assert result.processed == 10
+    assert result.failed == 2
+    assert len(result.errors) == 1
+    assert client.scan_args == {
+        "ProjectionExpression": "#k0, #k1",
+        "ExpressionAttributeNames": {"#k0": "user-id", "#k1": "sort.key"},
+    }
+
+
+def test_recursive_untranslate_data():
+    item = {
+        "id": 1,
+        "price": 2.5,
+        "active": False,
+        "tags": ["a", "b"],
+        "meta": {"nested": [1, {"x": None}]},
+    }
+
+    assert (
+        table_utils.recursive_untranslate_data(
+            table_utils.recursive_translate_data(item)
+        )
+        == item
+    )
+
+
+def _read_shards(output_directory):
+    rv = []
+    for name in sorted(os.listdir(output_directory)):
+        if name.startswith("segment-"):
+            opener = gzip.open if name.endswith(".gz") else open
+            with opener(os.path.join(output_directory, name), "rt") as fh:
+                rv.extend(json.loads(x).get("id") for x in fh)
+
+    return rv
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_table_resumes(compress):
+    output_directory = os.path.join(base_dir, f"export_{compress}")
+    shutil.rmtree(output_directory, ignore_errors=True)
+
+    client = FakeDynamoDBClient(failing_segment=1)
+    with pytest.raises(Exception):
+        export_utils.export_table(
+            client, "t", output_directory, total_segments=3, compress=compress
+        )
+
+    # Simulate a partial write after the last checkpoint of the failed segment
+    with open(export_utils.get_shard_path(output_directory, 1, compress), "ab") as fh:
+        fh.write(b"partial")
+
+    client.failing_segment = None
+    result = export_utils.export_table(
+        client, "t", output_directory, total_segments=3, compress=compress
+    )
+
+    # Only the remaining page of the failed segment is read again
+    assert result.processed == 2
+    assert sorted(_read_shards(output_directory)) == list(range(12))
+
+    with pytest.raises(Exception):
+        export_utils.export_table(client, "t", output_directory, total_segments=4)
+
+
+def test_convert_shard_to_parquet():
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+    shard_fp = os.path.join(base_dir, "shard.jsonl")
+    os.makedirs(base_dir, exist_ok=True)
+    with open(shard_fp, "w") as fh:
+        fh.write('{"id": 1, "name": "a", "meta": {"x": 1}}\n')
+        fh.write('{"id": 2, "score": 1.5}\n')
+
+    parquet_fp = os.path.join(base_dir, "shard.parquet")
+    assert export_utils.convert_shard_to_parquet(shard_fp, parquet_fp) == 2
+
+    assert pyarrow_parquet.read_table(parquet_fp).to_pylist() == [
+        {"id": 1, "name": "a", "meta": '{"x": 1}', "score": None},
+        {"id": 2, "name": None, "meta": None, "score": 1.5},
+    ]
@@ -0,0 +1 @@
+import missing
\ No newline at end of file
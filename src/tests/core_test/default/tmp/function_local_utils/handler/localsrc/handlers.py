@@ -0,0 +1,20 @@
+
+import os
+
+import locallayer
+
+def handler(event, context):
+    try:
+        import pydantic
+        has_site_packages = True
+    except ImportError:
+        has_site_packages = False
+
+    import botocore
+
+    return {
+        "value": locallayer.double(event.get("value")),
+        "env": os.environ.get("LOCAL_TEST_VALUE"),
+        "has_site_packages": has_site_packages,
+        "remaining": context.get_remaining_time_in_millis() > 0,
+    }
@@ -0,0 +1,87 @@
+import os
+import sys
+from zipfile import ZipFile
+
+from core.utils.fs_manager import bytecode_compiler, writer
+
+tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+base_dir = os.path.join(tmp_dir, "bytecode_compiler")
+
+
+def _write_file(relative_path: str, contents: str = "") -> str:
+    fp = os.path.join(base_dir, relative_path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def test_compile_records():
+    version = tuple(sys.version_info[:2])
+    cache_tag = bytecode_compiler.get_cache_tag(version)
+
+    records = [
+        (_write_file("src/handler.py", "from utils import x\n"), "handler.py"),
+        (_write_file("src/utils/__init__.py", "x = 1\n"), "utils/__init__.py"),
+        (_write_file("src/utils/broken.py", "def (\n"), "utils/broken.py"),
+        (_write_file("src/utils/data.json", "{}"), "utils/data.json"),
+    ]
+
+    rv = bytecode_compiler.compile_records(
+        records,
+        version,
+        os.path.join(base_dir, "bytecode"),
+        bytecode_compiler.HANDLER_RUNTIME_DIRECTORY,
+    )
+
+    bytecode_records = {x[1]: x[0] for x in rv[len(records) :]}
+
+    # Files that do not compile are only packaged as source
+    assert rv[: len(records)] == records
+    assert sorted(bytecode_records) == [
+        f"__pycache__/handler.{cache_tag}.pyc",
+        f"utils/__pycache__/__init__.{cache_tag}.pyc",
+    ]
+
+    with open(bytecode_records.get(f"__pycache__/handler.{cache_tag}.pyc"), "rb") as fh:
+        header = fh.read(16)
+
+    # PEP 552: the flags of an unchecked hash based pyc are 0b01
+    assert int.from_bytes(header[4:8], "little") == 0b01
+
+
+def test_compile_records_missing_interpreter():
+    records = [(_write_file("src/handler.py", "x = 1\n"), "handler.py")]
+
+    assert (
+        bytecode_compiler.compile_records(
+            records,
+            (2, 0),
+            os.path.join(base_dir, "bytecode"),
+            bytecode_compiler.HANDLER_RUNTIME_DIRECTORY,
+        )
+        == records
+    )
+
+
+def test_benchmark_import_time():
+    version = tuple(sys.version_info[:2])
+    archive_fp = os.path.join(base_dir, "artifact.zip")
+
+    records = bytecode_compiler.compile_records(
+        [(_write_file("src/benchmarked.py", "x = 1\n"), "benchmarked.py")],
+        version,
+        os.path.join(base_dir, "bytecode"),
+        bytecode_compiler.HANDLER_RUNTIME_DIRECTORY,
+    )
+    writer.create_archive_and_hash(records, archive_fp)
+
+    with ZipFile(archive_fp) as zipfile:
+        assert len(zipfile.namelist()) == 2
+
+    results = bytecode_compiler.benchmark_import_time(archive_fp, "benchmarked", runs=1)
+
+    assert set(results) == {"source", "bytecode"}
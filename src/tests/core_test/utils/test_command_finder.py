@@ -1,14 +1,165 @@
+import os
+import sys
+
+from core.constructs.commands import BaseCommand, BaseCommandContainer
+from core.utils import command_finder
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "command_finder")
+
+PACKAGE_NAME = "finder_commands"
+
+CONTAINER = '''
+from core.constructs.commands import BaseCommandContainer
+
+
+class tools(BaseCommandContainer):
+    help = """
+        Tools commands
+    """
+'''
+
+COMMAND = """
+from core.constructs.commands import BaseCommand
+
+
+class {name}(BaseCommand):
+    help = "Run {name}"
+"""
+
+HELPER = """
+def helper():
+    return 1
+"""
+
+
+def _write(path: str, contents: str, package: str = PACKAGE_NAME) -> None:
+    fp = os.path.join(base_dir, package, path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+
+def _create_commands() -> None:
+    _write("__init__.py", "")
+    _write("tools/__init__.py", CONTAINER)
+    _write("tools/build.py", COMMAND.format(name="build"))
+    _write("tools/build_utils.py", HELPER)
+
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+
+
+def test_build_command_index():
+    _create_commands()
+
+    commands, mtimes = command_finder.build_command_index(
+        PACKAGE_NAME, os.path.join(base_dir, PACKAGE_NAME)
+    )
+
+    assert set(commands) == {"tools", "tools.build", "tools.build_utils"}
+    assert commands.get("tools") == command_finder.command_index_entry(
+        module=f"{PACKAGE_NAME}.tools",
+        is_command=False,
+        class_name="tools",
+        help="Tools commands",
+    )
+    assert commands.get("tools.build").class_name == "build"
+    assert commands.get("tools.build").help == "Run build"
+    assert commands.get("tools.build_utils").class_name is None
+    assert len(mtimes) == 2
+
+    # The commands are found from their source
+    assert f"{PACKAGE_NAME}.tools.build" not in sys.modules
+
+
 def test_find_specified_command():
-    assert True
+    _create_commands()
+    cache_directory = os.path.join(base_dir, "cache")
+
+    obj, program_name, command_name, is_command = command_finder.find_specified_command(
+        ["tools", "build"], [PACKAGE_NAME], None, cache_directory
+    )
+
+    assert isinstance(obj, BaseCommand)
+    assert obj.help == "Run build"
+    assert program_name == f"{PACKAGE_NAME}.tools"
+    assert command_name == "build"
+    assert is_command
+    assert f"{PACKAGE_NAME}.tools.build_utils" not in sys.modules
+
+    obj, _, _, is_command = command_finder.find_specified_command(
+        ["tools"], [PACKAGE_NAME], None, cache_directory
+    )
+    assert isinstance(obj, BaseCommandContainer)
+    assert not is_command
+
+    try:
+        command_finder.find_specified_command(
+            ["tools", "missing"], [PACKAGE_NAME], None, cache_directory
+        )
+        assert False
+    except command_finder.NoCommandFound:
+        pass
+
+
+def test_command_index_cache():
+    _create_commands()
+    cache_directory = os.path.join(base_dir, "index_cache")
+
+    command_finder.load_command_index([PACKAGE_NAME], cache_directory)
+    cache_fp = os.path.join(cache_directory, command_finder.COMMAND_INDEX_FILE_NAME)
+    assert os.path.isfile(cache_fp)
+
+    # The cached index is used while the directories are unchanged
+    cached_mtime = os.stat(cache_fp).st_mtime_ns
+    command_finder.load_command_index([PACKAGE_NAME], cache_directory)
+    assert os.stat(cache_fp).st_mtime_ns == cached_mtime
+
+    # Adding a command changes the directory modification time
+    tools_directory = os.path.join(base_dir, PACKAGE_NAME, "tools")
+    _write("tools/deploy.py", COMMAND.format(name="deploy"))
+    os.utime(tools_directory, ns=(0, 0))
+
+    commands = command_finder.list_commands([PACKAGE_NAME], cache_directory)
+
+    assert list(commands) == ["tools", "tools.build", "tools.deploy"]
+    assert commands.get("tools.deploy").help == "Run deploy"
+
+    assert "tools.build_utils" in command_finder.list_commands(
+        [PACKAGE_NAME], cache_directory, include_unresolved=True
+    )
+
+
+def test_command_is_kept_over_container_of_same_name():
+    package = "shadow_commands"
+    _write("__init__.py", "", package)
+    _write("deploy.py", COMMAND.format(name="deploy"), package)
+    _write("deploy/__init__.py", CONTAINER, package)
+    _write("deploy/run.py", COMMAND.format(name="run"), package)
 
+    commands, _ = command_finder.build_command_index(
+        package, os.path.join(base_dir, package)
+    )
 
-def test_initialize_command_module():
-    assert True
+    assert commands.get("deploy") == command_finder.command_index_entry(
+        module=f"{package}.deploy",
+        is_command=True,
+        class_name="deploy",
+        help="Run deploy",
+    )
 
 
-def test_initialize_command_container_module():
-    assert True
+def test_command_index_cache_with_missing_location():
+    _create_commands()
+    cache_directory = os.path.join(base_dir, "missing_cache")
+    search_locations = [PACKAGE_NAME, "missing_finder_commands"]
 
+    command_finder.load_command_index(search_locations, cache_directory)
+    cache_fp = os.path.join(cache_directory, command_finder.COMMAND_INDEX_FILE_NAME)
+    cached_mtime = os.stat(cache_fp).st_mtime_ns
 
-def test_recursive_find_specified_command():
-    assert True
+    # The missing location is cached as empty instead of being rebuilt on each run
+    commands = command_finder.load_command_index(search_locations, cache_directory)
+    assert commands.get("missing_finder_commands") == {}
+    assert os.stat(cache_fp).st_mtime_ns == cached_mtime
@@ -0,0 +1,116 @@
+import os
+
+from core.utils.fs_manager import file_index
+from core.constructs.settings import Settings
+from core.constructs.workspace import Workspace
+
+tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+
+settings = Settings()
+settings.BASE_PATH = tmp_dir
+settings.INTERMEDIATE_FOLDER_LOCATION = tmp_dir
+
+
+ws = Workspace()
+ws.settings = settings
+
+# monkey patch the global workspace
+Workspace.set_global_instance(ws)
+
+
+def _write_file(relative_path: str, contents: str = "") -> str:
+    fp = os.path.join(tmp_dir, "file_index", relative_path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def test_compile_glob():
+    test_data = [
+        ("*.py", "handler.py", True),
+        ("*.py", "utils/handler.py", False),
+        ("**/*.py", "handler.py", True),
+        ("**/*.py", "utils/nested/handler.py", True),
+        ("utils/*.py", "utils/handler.py", True),
+        ("**/__pycache__/**", "utils/__pycache__/handler.pyc", True),
+        ("**/__pycache__/**", "__pycache__/", True),
+        ("handler?.py", "handler1.py", True),
+        ("handler?.py", "handler.py", False),
+    ]
+
+    for pattern, path, expected in test_data:
+        assert bool(file_index._compile_glob(pattern).fullmatch(path)) == expected
+
+
+def test_find_component_files():
+    base_dir = os.path.join(tmp_dir, "file_index")
+    top_level = _write_file("resources.py")
+    nested = _write_file("api/routes.py")
+    _write_file("api/data.json")
+    _write_file("api/__pycache__/routes.py")
+    excluded = _write_file("tests/test_routes.py")
+
+    assert file_index.find_component_files(base_dir) == [top_level]
+
+    assert file_index.find_component_files(base_dir, includes=["**/*.py"]) == sorted(
+        [top_level, nested, excluded]
+    )
+
+    assert file_index.find_component_files(
+        base_dir, includes=["**/*.py"], excludes=["tests/**"]
+    ) == sorted(
+        [top_level, nested, os.path.join(base_dir, "api/__pycache__/routes.py")]
+    )
+
+
+def test_is_file_unchanged():
+    fp = _write_file("changed.py", "x = 1")
+    stats = file_index.get_file_stats(fp)
+
+    assert file_index.is_file_unchanged(fp, stats)
+
+    # Same contents with a new mtime is not a change
+    os.utime(fp, ns=(stats.get("mtime") + 10**9, stats.get("mtime") + 10**9))
+    assert file_index.is_file_unchanged(fp, stats)
+
+    _write_file("changed.py", "x = 2")
+    assert not file_index.is_file_unchanged(fp, stats)
+
+    os.remove(fp)
+    assert not file_index.is_file_unchanged(fp, stats)
+
+
+def test_component_file_index():
+    index_fp = os.path.join(tmp_dir, "file_index_cache", "index.json")
+    handler_fp = _write_file("index/handler.py", "from .utils import helper")
+    helper_fp = _write_file("index/utils/helper.py", "x = 1")
+
+    index = file_index.ComponentFileIndex(index_fp, "env1")
+    assert not index.is_file_unchanged(handler_fp)
+
+    index.reset_file(handler_fp)
+    entry = index.get_from_cache("file_index/index/handler.py")
+    entry["dependencies"][
+        "file_index/index/utils/helper.py"
+    ] = file_index.get_file_stats(helper_fp)
+    index.dump_to_file()
+
+    loaded_index = file_index.ComponentFileIndex(index_fp, "env1")
+    assert loaded_index.is_file_unchanged(handler_fp)
+
+    # Changing a dependency of the file invalidates it
+    _write_file("index/utils/helper.py", "x = 22")
+    assert not loaded_index.is_file_unchanged(handler_fp)
+
+    # A different environment drops all previous entries
+    assert not file_index.ComponentFileIndex(index_fp, "env2").in_cache(
+        "file_index/index/handler.py"
+    )
+
+    os.remove(handler_fp)
+    loaded_index.remove_missing_files(os.path.join(tmp_dir, "file_index", "index"))
+    assert not loaded_index.in_cache("file_index/index/handler.py")
@@ -0,0 +1,37 @@
+import os
+
+from core.utils.fs_manager import finder, relative_generator
+
+tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+base_dir = os.path.join(tmp_dir, "finder")
+
+
+def _write_file(relative_path: str, contents: str = "") -> str:
+    fp = os.path.join(base_dir, relative_path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def test_get_changes_affecting_folder():
+    relative_generator._DEPENDENCY_CACHE = relative_generator.RelativeDependencyCache(
+        os.path.join(tmp_dir, "finder_cache", "dependencies.json")
+    )
+
+    handler = _write_file("component/handler.py", "from ..shared import utils\n")
+    utils = _write_file("shared/utils.py", "x = 1\n")
+    unrelated = _write_file("other/unrelated.py", "x = 1\n")
+    component_folder = os.path.join(base_dir, "component")
+
+    # Record the relative dependencies of the handler
+    relative_generator.get_all_relative_module_dependencies(handler)
+
+    assert finder.get_changes_affecting_folder(
+        component_folder, [handler, utils, unrelated]
+    ) == {handler, utils}
+
+    assert finder.get_changes_affecting_folder(component_folder, [unrelated]) == set()
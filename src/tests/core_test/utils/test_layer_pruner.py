@@ -0,0 +1,103 @@
+import os
+
+from core.utils.fs_manager import layer_pruner
+
+tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+base_dir = os.path.join(tmp_dir, "layer_pruner")
+
+
+def _write_file(relative_path: str, contents: str = "") -> str:
+    fp = os.path.join(base_dir, relative_path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def _create_records():
+    files = {
+        "pkg/__init__.py": "from .core import run\n",
+        "pkg/core.py": "import json\nfrom . import helpers\n",
+        "pkg/helpers.py": "from dep import tool\n",
+        "pkg/unused.py": "import dep.heavy\n",
+        "pkg/data.json": "{}",
+        "pkg/__init__.pyi": "",
+        "pkg/tests/test_core.py": "import pkg\n",
+        "dep/__init__.py": "",
+        "dep/tool.py": "",
+        "dep/heavy.py": "",
+        "pkg-1.0.dist-info/RECORD": "",
+    }
+
+    return [(_write_file(k, v), os.path.join("python", k)) for k, v in files.items()]
+
+
+def _get_layer_paths(records):
+    return sorted(x[1][len("python/") :] for x in records)
+
+
+def test_trace_static_imports():
+    module_to_record = layer_pruner._create_module_index(_create_records())
+
+    assert layer_pruner.trace_static_imports(["pkg"], module_to_record) == {
+        "pkg",
+        "pkg.core",
+        "pkg.helpers",
+        "dep",
+        "dep.tool",
+    }
+
+    assert layer_pruner.trace_static_imports(["pkg.unused"], module_to_record) == {
+        "pkg",
+        "pkg.core",
+        "pkg.helpers",
+        "pkg.unused",
+        "dep",
+        "dep.tool",
+        "dep.heavy",
+    }
+
+
+def test_prune_records():
+    records = _create_records()
+
+    pruned_records, report = layer_pruner.prune_records(records, ["pkg"])
+
+    assert _get_layer_paths(pruned_records) == [
+        "dep/__init__.py",
+        "dep/tool.py",
+        "pkg-1.0.dist-info/RECORD",
+        "pkg/__init__.py",
+        "pkg/core.py",
+        "pkg/data.json",
+        "pkg/helpers.py",
+    ]
+    assert report.get("original_files") == len(records)
+    assert report.get("pruned_files") == len(pruned_records)
+    assert report.get("pruned_bytes") < report.get("original_bytes")
+
+    # Files loaded dynamically can be explicitly included
+    pruned_records, _ = layer_pruner.prune_records(
+        records, ["pkg"], includes=["dep/heavy.py"]
+    )
+    assert "dep/heavy.py" in _get_layer_paths(pruned_records)
+
+    # Modules reached by the trace are kept even if they are within a tests folder
+    pruned_records, _ = layer_pruner.prune_records(records, ["pkg.tests.test_core"])
+    assert "pkg/tests/test_core.py" in _get_layer_paths(pruned_records)
+
+
+def test_get_absolute_imports():
+    handler = _write_file(
+        "handler.py",
+        "import os.path\nfrom pkg.core import run\nfrom .utils import helper\n",
+    )
+
+    assert layer_pruner.get_absolute_imports([handler]) == {
+        "os.path",
+        "pkg.core",
+        "pkg.core.run",
+    }
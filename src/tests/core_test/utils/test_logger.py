@@ -0,0 +1,169 @@
+import gzip
+import logging
+from logging.handlers import RotatingFileHandler
+import os
+import queue
+import threading
+import time
+
+from core.utils import logger
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "logger")
+
+
+def _create_record(msg: str) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {"name": "core_file", "msg": msg, "levelno": logging.INFO}
+    )
+
+
+def _get_messages(log_queue: queue.Queue) -> list:
+    rv = []
+    while not log_queue.empty():
+        record = log_queue.get_nowait()
+        rv.append(record.msg % record.args if record.args else record.msg)
+
+    return rv
+
+
+def test_drop_newest():
+    handler = logger.BoundedQueueHandler(queue.Queue(2), logger.DROP_NEWEST_POLICY)
+
+    for i in range(4):
+        handler.emit(_create_record(f"message {i}"))
+
+    assert handler.dropped_records == 2
+    assert _get_messages(handler.queue) == ["message 0", "message 1"]
+
+    # The dropped records are reported once there is room in the queue
+    handler.emit(_create_record("message 4"))
+    assert _get_messages(handler.queue) == [
+        "Dropped 2 log records because the log queue was full",
+        "message 4",
+    ]
+
+
+def test_drop_oldest():
+    handler = logger.BoundedQueueHandler(queue.Queue(2), logger.DROP_OLDEST_POLICY)
+
+    for i in range(4):
+        handler.emit(_create_record(f"message {i}"))
+
+    assert handler.dropped_records == 2
+    assert _get_messages(handler.queue) == ["message 2", "message 3"]
+
+    handler.emit(_create_record("message 4"))
+    assert _get_messages(handler.queue) == [
+        "Dropped 2 log records because the log queue was full",
+        "message 4",
+    ]
+
+
+class BlockingHandler(logging.Handler):
+    """Handler that waits to be released before handling each record"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.released = threading.Event()
+        self.messages = []
+
+    def handle(self, record: logging.LogRecord) -> None:
+        self.released.wait()
+        self.messages.append(record.msg)
+
+
+def test_drop_report_ignores_handler_level():
+    handler = BlockingHandler()
+    handler.released.set()
+    handler.setLevel(logging.ERROR)
+    listener = logger.RoutingQueueListener(queue.Queue(), {"core_file": [handler]})
+
+    listener.handle(_create_record("message 0"))
+    listener.handle(logger.BoundedQueueHandler(queue.Queue(2))._create_drop_record(2))
+
+    assert handler.messages == ["Dropped %d log records because the log queue was full"]
+
+
+def test_stop_listener_with_full_queue():
+    handler = BlockingHandler()
+    log_queue = queue.Queue(1)
+    listener = logger.RoutingQueueListener(log_queue, {"core_file": [handler]})
+    listener.start()
+
+    log_queue.put(_create_record("message 0"))
+    # Wait for the listener to take the first record, so the second one fills the queue
+    while not log_queue.empty():
+        time.sleep(0.001)
+    log_queue.put(_create_record("message 1"))
+
+    threading.Timer(0.05, handler.released.set).start()
+    listener.stop()
+
+    assert handler.messages == ["message 0", "message 1"]
+
+
+def test_records_are_formatted_lazily():
+    handler = logger.BoundedQueueHandler(queue.Queue(2))
+    record = logging.makeLogRecord(
+        {"name": "core_file", "msg": "value %s", "args": ("a",)}
+    )
+
+    handler.emit(record)
+
+    assert handler.queue.get_nowait().args == ("a",)
+
+
+def test_rotating_compressed_log_file(monkeypatch):
+    os.makedirs(base_dir, exist_ok=True)
+    monkeypatch.chdir(base_dir)
+
+    new_logger = logger.cdev_logger(
+        logging_level="DEBUG",
+        max_bytes=1024,
+        backup_count=2,
+        compress=True,
+    )
+    logger.set_global_logger(new_logger)
+
+    for i in range(100):
+        logger.log.debug("debug message %s", i)
+
+    new_logger.close()
+
+    log_directory = os.path.join(base_dir, ".cdev", "logs")
+    assert new_logger.dropped_records == 0
+    assert sorted(os.listdir(log_directory)) == [
+        "userlogs",
+        "userlogs.1.gz",
+        "userlogs.2.gz",
+    ]
+
+    with gzip.open(os.path.join(log_directory, "userlogs.1.gz"), "rt") as fh:
+        assert "debug message" in fh.read()
+
+    monkeypatch.undo()
+    logger.set_global_logger(logger.cdev_logger())
+
+
+def test_logger_from_settings(monkeypatch):
+    from cdev.cli.logger import set_global_logger_from_cli
+    from core.constructs.settings import Settings
+
+    os.makedirs(base_dir, exist_ok=True)
+    monkeypatch.chdir(base_dir)
+    monkeypatch.setenv("CDEV_COMPRESS_LOG_FILES", "true")
+
+    settings = Settings(LOG_FILE_MAX_BYTES=1024, LOG_DROP_POLICY="drop_oldest")
+    set_global_logger_from_cli(logging.DEBUG, settings)
+
+    new_logger = logger.log._logger
+    handler = new_logger._listener._handlers_by_logger.get("core_file")[0]
+
+    assert new_logger.show_logs
+    assert new_logger._queue_handler.drop_policy == logger.DROP_OLDEST_POLICY
+    assert isinstance(handler, RotatingFileHandler)
+    assert handler.maxBytes == 1024
+    assert handler.namer("userlogs.1") == "userlogs.1.gz"
+
+    monkeypatch.undo()
+    logger.set_global_logger(logger.cdev_logger())
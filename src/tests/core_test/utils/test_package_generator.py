@@ -0,0 +1,71 @@
+import os
+
+from core.utils.fs_manager import package_generator
+
+base_dir = os.path.join(os.path.dirname(__file__), "tmp", "package_generator")
+
+
+def test_plan_layer_groups():
+    # Example from the fs_manager README: A and B share Z, so they make up the composite layer
+    closures = {
+        "A": frozenset(["A", "Z"]),
+        "B": frozenset(["B", "Z"]),
+        "C": frozenset(["C", "X"]),
+    }
+    sizes = {"A": 10, "B": 5, "C": 10, "Z": 50, "X": 20}
+
+    assert package_generator.plan_layer_groups(closures, sizes, max_layers=2) == [
+        frozenset(["A", "B"]),
+        frozenset(["C"]),
+    ]
+
+    # Within the limit every distribution keeps its own reusable layer
+    assert package_generator.plan_layer_groups(closures, sizes) == [
+        frozenset(["A"]),
+        frozenset(["B"]),
+        frozenset(["C"]),
+    ]
+
+
+def test_plan_layer_groups_removes_contained_distributions():
+    closures = {
+        "requests": frozenset(["requests", "urllib3", "idna"]),
+        "urllib3": frozenset(["urllib3"]),
+        "boto3": frozenset(),
+    }
+    sizes = {"requests": 10, "urllib3": 20, "idna": 5}
+
+    assert package_generator.plan_layer_groups(closures, sizes) == [
+        frozenset(["requests"])
+    ]
+
+
+def test_plan_layer_groups_prefers_existing_groups():
+    closures = {x: frozenset([x]) for x in "ABCDEF"}
+    sizes = {x: 10 for x in "ABCDEF"}
+
+    assert frozenset(["E", "F"]) in package_generator.plan_layer_groups(
+        closures, sizes, existing_groups={frozenset(["E", "F"])}
+    )
+
+    assert len(package_generator.plan_layer_groups(closures, sizes)) == 5
+
+
+def test_layer_group_cache():
+    fp = os.path.join(base_dir, "layer_groups.json")
+    cache = package_generator.LayerGroupCache(fp)
+
+    assert cache.get_groups() == set()
+    assert cache.add_group(frozenset(["E", "F"]))
+    assert not cache.add_group(frozenset(["F", "E"]))
+    cache.dump_to_file()
+
+    # The groups are available to the plans of later runs
+    closures = {x: frozenset([x]) for x in "ABCDEF"}
+    sizes = {x: 10 for x in "ABCDEF"}
+
+    assert frozenset(["E", "F"]) in package_generator.plan_layer_groups(
+        closures,
+        sizes,
+        existing_groups=package_generator.LayerGroupCache(fp).get_groups(),
+    )
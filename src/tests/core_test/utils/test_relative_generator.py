@@ -0,0 +1,61 @@
+import os
+
+from core.utils.fs_manager import relative_generator
+
+tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
+
+base_dir = os.path.join(tmp_dir, "relative_generator")
+
+
+def _write_file(relative_path: str, contents: str = "") -> str:
+    fp = os.path.join(base_dir, relative_path)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+
+    with open(fp, "w") as fh:
+        fh.write(contents)
+
+    return fp
+
+
+def _set_cache():
+    relative_generator._DEPENDENCY_CACHE = relative_generator.RelativeDependencyCache(
+        os.path.join(tmp_dir, "relative_generator_cache", "dependencies.json")
+    )
+
+
+def test_get_all_relative_module_dependencies():
+    _set_cache()
+    handler = _write_file("handler.py", "import os\nfrom .helpers import a\n")
+    _write_file("helpers/__init__.py")
+    a = _write_file("helpers/a.py", "from . import b\n")
+    b = _write_file("helpers/b.py", "import json\nfrom . import a\n")
+    helpers = os.path.join(base_dir, "helpers")
+
+    assert relative_generator.get_all_relative_module_dependencies(handler) == (
+        {helpers, a, b},
+        set(),
+        {"os", "json"},
+    )
+
+    relative_generator.save_dependency_cache()
+    _set_cache()
+
+    # Unchanged modules are loaded from the persisted cache
+    assert relative_generator._get_dependency_cache().get_dependencies(handler) == [
+        ".helpers",
+        "os",
+    ]
+
+    assert relative_generator.get_dependent_modules(b) == {handler, helpers, a, b}
+
+    _write_file("handler.py", "import os\nimport sys\n")
+    assert relative_generator._get_dependency_cache().get_dependencies(handler) is None
+    assert relative_generator.get_all_relative_module_dependencies(handler) == (
+        set(),
+        set(),
+        {"os", "sys"},
+    )
+
+    # Updating an entry rebuilds the reverse dependencies
+    assert relative_generator.get_dependent_modules(b) == {helpers, a, b}
+    assert relative_generator._get_dependency_cache().get_dependents(helpers) == set()
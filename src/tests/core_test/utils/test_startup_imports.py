@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+DEFERRED_MODULES = ["boto3", "networkx", "pkg_resources", "pydantic", "rich"]
+
+
+STARTUP_SCRIPT = """
+import sys
+
+try:
+    {statement}
+except SystemExit:
+    pass
+
+print(" ".join(sys.modules))
+"""
+
+
+def _get_loaded_modules(statement: str) -> set:
+    rv = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT.format(statement=statement)],
+        cwd=SRC_DIR,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    # The loaded modules are printed on the last line, after any output of the statement
+    return set(rv.stdout.decode().splitlines()[-1].split())
+
+
+def test_cli_defers_heavy_imports():
+    loaded_modules = _get_loaded_modules(
+        "import runpy; sys.argv = ['cdev', '--help']; runpy.run_module('cdev.cli', run_name='__main__')"
+    )
+
+    assert not loaded_modules.intersection(DEFERRED_MODULES)
+    assert "cdev.commands.deploy" not in loaded_modules
+
+
+def test_workspace_defers_heavy_imports():
+    loaded_modules = _get_loaded_modules("import core.constructs.workspace")
+
+    assert "networkx" not in loaded_modules
+    assert "boto3" not in loaded_modules